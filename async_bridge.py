@@ -0,0 +1,91 @@
+# async_bridge.py
+"""پل اجرای ناهمگام فراخوانی‌های کنترلر روی QThreadPool.
+
+کار (مثلاً گزارش هفتگی یا صفحه‌ای از فاکتورها) در یک QRunnable روی thread کارگر اجرا می‌شود و
+نتیجه با سیگنال Qt به thread رابط کاربری برمی‌گردد؛ callback ها همیشه روی thread رابط اجرا می‌شوند.
+
+نمونه:
+    bridge = AsyncBridge(parent=window)
+    bridge.submit(controller.get_weekly_data, on_result=window.render_weekly)
+"""
+
+from __future__ import annotations
+
+import itertools
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+ResultCallback = Callable[[Any], None]
+ErrorCallback = Callable[[BaseException], None]
+
+
+class _CallSignals(QObject):
+    # (شناسه فراخوانی، موفق؟، نتیجه یا استثنا)
+    finished = Signal(object)
+
+
+class _AsyncCall(QRunnable):
+    def __init__(self, call_id: int, func: Callable[..., Any], args: Tuple[Any, ...], signals: _CallSignals) -> None:
+        super().__init__()
+        self._call_id = call_id
+        self._func = func
+        self._args = args
+        self._signals = signals
+
+    def run(self) -> None:
+        try:
+            result = self._func(*self._args)
+        except Exception as exc:  # pylint: disable=broad-except
+            self._signals.finished.emit((self._call_id, False, exc))
+        else:
+            self._signals.finished.emit((self._call_id, True, result))
+
+
+class AsyncBridge(QObject):
+    """ارسال کار به QThreadPool و تحویل نتیجه روی thread مالک این شیء (thread رابط کاربری)."""
+
+    def __init__(self, pool: Optional[QThreadPool] = None, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self._pool = pool if pool is not None else QThreadPool.globalInstance()
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, Tuple[Optional[ResultCallback], Optional[ErrorCallback], _CallSignals]] = {}
+
+    def submit(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        on_result: Optional[ResultCallback] = None,
+        on_error: Optional[ErrorCallback] = None,
+    ) -> int:
+        """اجرای func(*args) روی thread کارگر؛ شناسه فراخوانی را برمی‌گرداند."""
+        call_id = next(self._ids)
+        signals = _CallSignals()
+        # اتصال به slot همین شیء (نه lambda) تا تحویل به صورت queued روی thread رابط انجام شود
+        signals.finished.connect(self._deliver)
+        self._pending[call_id] = (on_result, on_error, signals)
+        self._pool.start(_AsyncCall(call_id, func, args, signals))
+        return call_id
+
+    def pending_count(self) -> int:
+        """تعداد کارهای در حال اجرا."""
+        return len(self._pending)
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        """انتظار برای پایان کارهای صف (برای خروج برنامه و تست‌ها)."""
+        return self._pool.waitForDone(msecs)
+
+    @Slot(object)
+    def _deliver(self, packet: Tuple[int, bool, Any]) -> None:
+        call_id, ok, payload = packet
+        entry = self._pending.pop(call_id, None)
+        if entry is None:
+            return
+        on_result, on_error, _signals = entry
+        if ok:
+            if on_result is not None:
+                on_result(payload)
+        elif on_error is not None:
+            on_error(payload)
+        else:
+            raise payload
@@ -0,0 +1,131 @@
+# background_jobs.py
+"""کارهای دوره‌ای پس‌زمینه پنجره اصلی: بایگانی تدریجی و همگام‌سازی با مخزن مرکزی.
+
+هر کار روی AsyncBridge (thread کارگر) اجرا می‌شود و از هر کار در هر لحظه حداکثر یک اجرا در جریان است؛
+تایمری که در حین اجرا می‌رسد نادیده گرفته می‌شود و کار در دور بعد دوباره اجرا می‌شود. خطاها در لاگ
+ثبت می‌شوند و پیام آماده نمایش آن‌ها با سیگنال failed به رابط کاربری می‌رسد.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from functools import partial
+from typing import TYPE_CHECKING, Optional
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from async_bridge import AsyncBridge
+from constants import EMOJI_ERROR, EVENT_RELOADED, MSG_ARCHIVE_FAILED, MSG_SYNC_FAILED
+from controller import Controller, InvoiceEvent
+
+if TYPE_CHECKING:
+    from sync import SyncReport
+
+_LOG = logging.getLogger(__name__)
+
+# فاصله اجرای بایگانی تدریجی فاکتورهای خارج‌شده قدیمی
+ARCHIVE_INTERVAL_MS = 15 * 60 * 1000
+# فاصله دورهای همگام‌سازی با مخزن مرکزی (فقط با sync_path در تنظیمات)
+SYNC_INTERVAL_MS = 2000
+
+
+class BackgroundJobs(QObject):
+    """زمان‌بندی بایگانی و همگام‌سازی روی thread کارگر."""
+
+    # پیام خطای آماده نمایش (کادر پیام پنجره اصلی)
+    failed = Signal(str)
+
+    def __init__(self, controller: Controller, bridge: AsyncBridge, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self._controller = controller
+        self._bridge = bridge
+        # با stop() تنظیم می‌شود و دورهای در جریان روی thread کارگر را زودتر تمام می‌کند
+        self._cancel = threading.Event()
+        self._archiving = False
+        self.archive_timer = QTimer(self)
+        self.archive_timer.setInterval(ARCHIVE_INTERVAL_MS)
+        self.archive_timer.timeout.connect(self.run_archive)  # type: ignore[arg-type]
+        self._syncing = False
+        # همگام‌سازی هر چند ثانیه تکرار می‌شود: قطعی مخزن فقط یک بار (در شروع قطعی) گزارش می‌شود
+        self._sync_failing = False
+        self.sync_timer = QTimer(self)
+        self.sync_timer.setInterval(SYNC_INTERVAL_MS)
+        self.sync_timer.timeout.connect(self.run_sync)  # type: ignore[arg-type]
+
+    def start(self) -> None:
+        """اجرای اول هر کار و شروع تایمرها (بایگانی فقط با archive_days و همگام‌سازی فقط با sync_path)."""
+        if self._controller.archive_enabled():
+            # جدول کاری کوچک می‌ماند: بایگانی در شروع و سپس دوره‌ای
+            self.run_archive()
+            self.archive_timer.start()
+        if self._controller.sync_enabled():
+            self.run_sync()
+            self.sync_timer.start()
+
+    def stop(self) -> None:
+        """توقف تایمرها و لغو دورهای در جریان (بستن پنجره).
+
+        بایگانی بعد از دسته جاری و همگام‌سازی قبل از دور بعد متوقف می‌شود؛ دوری که شروع شده تا آخر
+        (در تراکنش خودش) اجرا می‌شود.
+        """
+        self._cancel.set()
+        self.archive_timer.stop()
+        self.sync_timer.stop()
+
+    def is_running(self) -> bool:
+        """آیا بایگانی یا همگام‌سازی در حال اجراست."""
+        return self._archiving or self._syncing
+
+    # بایگانی تدریجی در پس‌زمینه (هر بار فقط یک اجرا)
+    def run_archive(self) -> None:
+        """اجرای یک دور بایگانی اگر دور قبلی تمام شده است."""
+        if self._archiving or self._cancel.is_set():
+            return
+        self._archiving = True
+
+        def on_error(exc: BaseException) -> None:
+            self._archiving = False
+            _LOG.warning("archive failed: %s", exc, exc_info=exc)
+            self.failed.emit(MSG_ARCHIVE_FAILED.format(reason=exc, error=EMOJI_ERROR))
+
+        self._bridge.submit(
+            partial(self._controller.archive_old_invoices, cancelled=self._cancel.is_set),
+            on_result=self._on_archived,
+            on_error=on_error,
+        )
+
+    def _on_archived(self, _moved: int) -> None:
+        self._archiving = False
+
+    # همگام‌سازی دوره‌ای با ایستگاه‌های دیگر (خطای شبکه فقط در دور بعد تکرار می‌شود)
+    def run_sync(self) -> None:
+        """اجرای یک دور همگام‌سازی اگر دور قبلی تمام شده است."""
+        if self._syncing or self._cancel.is_set():
+            return
+        self._syncing = True
+
+        def on_error(exc: BaseException) -> None:
+            self._syncing = False
+            if not self._sync_failing:
+                self._sync_failing = True
+                _LOG.warning("sync failed: %s", exc, exc_info=exc)
+                self.failed.emit(MSG_SYNC_FAILED.format(reason=exc, error=EMOJI_ERROR))
+
+        self._bridge.submit(self._sync_round, on_result=self._on_synced, on_error=on_error)
+
+    def _sync_round(self) -> Optional["SyncReport"]:
+        # روی thread کارگر؛ دوری که در صف pool مانده بعد از stop() اجرا نمی‌شود
+        if self._cancel.is_set():
+            return None
+        return self._controller.sync_once()
+
+    def _on_synced(self, report: Optional["SyncReport"]) -> None:
+        self._syncing = False
+        if report is None:
+            return
+        if self._sync_failing:
+            self._sync_failing = False
+            _LOG.info("sync recovered")
+        if report.changed:
+            self._controller.publish_events([InvoiceEvent(EVENT_RELOADED, None, None)])
@@ -0,0 +1,60 @@
+"""بنچمارک ثبت ورود/خروج انبوه (add_invoices_bulk / process_exit_bulk) روی فایل دیتابیس.
+
+اجرا (از ریشه پروژه):
+    python benchmarks/bench_bulk.py
+    python benchmarks/bench_bulk.py --count 200000 --preload 100000
+
+یک invoices.db موقت ساخته می‌شود؛ preload فاکتور از قبل وجود دارد و نیمی از دسته ورودی
+با آن‌ها هم‌پوشانی دارد تا مسیر تشخیص تکراری هم اندازه‌گیری شود.
+هدف: بیش از ۵۰ هزار فاکتور در ثانیه روی دیسک لپ‌تاپ.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from controller import Controller  # noqa: E402  pylint: disable=wrong-import-position
+from db_config import DatabaseSettings  # noqa: E402  pylint: disable=wrong-import-position
+from model import Database  # noqa: E402  pylint: disable=wrong-import-position
+
+
+def run(count: int, preload: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        Database.reset()
+        try:
+            Database(DatabaseSettings(path=str(Path(tmp) / "invoices.db")))
+            controller = Controller()
+            controller.add_invoices_bulk(str(1_000_000 + i) for i in range(preload))
+            start_number = 1_000_000 + preload // 2
+            numbers = [str(start_number + i) for i in range(count)]
+
+            start = time.perf_counter()
+            added = controller.add_invoices_bulk(numbers)
+            add_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            controller.process_exit_bulk(numbers)
+            exit_seconds = time.perf_counter() - start
+        finally:
+            Database.reset()
+    registered = sum(1 for _, outcome in added if outcome == "registered")
+    print(f"add_invoices_bulk:  {count} numbers ({registered} new) in {add_seconds:.3f}s -> {count / add_seconds:,.0f}/s")
+    print(f"process_exit_bulk:  {count} numbers in {exit_seconds:.3f}s -> {count / exit_seconds:,.0f}/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--preload", type=int, default=50_000)
+    args = parser.parse_args()
+    run(args.count, args.preload)
+
+
+if __name__ == "__main__":
+    main()
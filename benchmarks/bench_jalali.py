@@ -0,0 +1,114 @@
+"""بنچمارک تولید کلید روز جلالی: تبدیل مستقیم jdatetime در برابر جدول از پیش محاسبه‌شده jalali.py.
+
+اجرا (از ریشه پروژه):
+    python benchmarks/bench_jalali.py
+    python benchmarks/bench_jalali.py --calls 200000 --history-days 365
+
+مسیرها:
+    scan     کلید روز هر اسکن: jdatetime.datetime.now().strftime (روش نسخه اولیه)، تبدیل jdatetime از
+             epoch بدون کش، و jalali.day_key(now_ts()) با کش امروز
+    weekly   هفت کلید روز هفته اخیر (shift_day_key) با jdatetime و با جدول
+    history  قالب‌بندی تاریخ epoch های پخش در history-days روز (format_date، بدون کش امروز)
+برای هر مسیر هزینه هر فراخوانی (نانوثانیه) و نسبت به مسیر jdatetime گزارش می‌شود.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import jdatetime
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import jalali  # noqa: E402  pylint: disable=wrong-import-position
+
+
+def _per_call_ns(func: Callable[[], object], calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) * 1e9 / calls
+
+
+def _legacy_scan() -> object:
+    return jdatetime.datetime.now().strftime("%Y/%m/%d")
+
+
+def _uncached_scan() -> object:
+    return jalali.jalali_date_key(jdatetime.date.fromgregorian(date=datetime.fromtimestamp(jalali.now_ts()).date()))
+
+
+def _table_scan() -> object:
+    return jalali.day_key(jalali.now_ts())
+
+
+def _legacy_weekly() -> object:
+    today = date.today()
+    return [
+        jalali.jalali_date_key(jdatetime.date.fromgregorian(date=today - timedelta(days=offset)))
+        for offset in range(6, -1, -1)
+    ]
+
+
+def _table_weekly() -> object:
+    today = jalali.today_key()
+    return [jalali.shift_day_key(today, -offset) for offset in range(6, -1, -1)]
+
+
+def run(calls: int, history_days: int) -> Dict[str, Dict[str, float]]:
+    """{مسیر: {روش: نانوثانیه برای هر فراخوانی}}."""
+    rng = random.Random(1404)
+    now = jalali.now_ts()
+    stamps = [now - rng.randrange(history_days * 86400) for _ in range(calls)]
+    history = iter(stamps * 2)
+
+    def legacy_history() -> object:
+        local = datetime.fromtimestamp(next(history))
+        return jdatetime.date.fromgregorian(date=local.date()).strftime("%Y/%m/%d")
+
+    def table_history() -> object:
+        return jalali.format_date(next(history))
+
+    jalali.today_key()  # ساخت جدول خارج از زمان‌سنجی
+    weekly_calls = max(1, calls // 7)
+    return {
+        "scan": {
+            "jdatetime now": _per_call_ns(_legacy_scan, calls),
+            "jdatetime epoch": _per_call_ns(_uncached_scan, calls),
+            "table": _per_call_ns(_table_scan, calls),
+        },
+        "weekly": {
+            "jdatetime": _per_call_ns(_legacy_weekly, weekly_calls),
+            "table": _per_call_ns(_table_weekly, weekly_calls),
+        },
+        "history": {
+            "jdatetime": _per_call_ns(legacy_history, calls),
+            "table": _per_call_ns(table_history, calls),
+        },
+    }
+
+
+def _print_report(report: Dict[str, Dict[str, float]]) -> None:
+    for path, methods in report.items():
+        baseline = next(iter(methods.values()))
+        for method, ns in methods.items():
+            print(f"{path:>8} {method:<16} {ns:10.1f} ns/call  x{baseline / ns:6.1f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100_000)
+    parser.add_argument("--history-days", type=int, default=365)
+    args = parser.parse_args(argv)
+    _print_report(run(args.calls, max(1, args.history_days)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
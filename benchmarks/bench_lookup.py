@@ -0,0 +1,100 @@
+"""بنچمارک تأخیر جستجوی فاکتور (WHERE invoice_number = ?) و فیلتر ماه، قبل و بعد از مهاجرت‌ها.
+
+اجرا (از ریشه پروژه):
+    python benchmarks/bench_lookup.py
+    python benchmarks/bench_lookup.py --sizes 10000 100000 --lookups 500
+
+برای هر اندازه یک فایل دیتابیس موقت با schema نسخه ۱ (بدون ایندکس) ساخته می‌شود،
+سپس همان جستجوهای تصادفی یک بار قبل و یک بار بعد از migrate() اندازه‌گیری می‌شوند.
+فیلتر ماه قبل از مهاجرت LIKE روی تاریخ متنی و بعد از آن اسکن بازه‌ای عددی روی enter_day است.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from migrations import migrate, _migration_v1_create_invoices  # noqa: E402  pylint: disable=wrong-import-position
+
+# ستون‌های مشترک schema متنی قدیمی و schema عددی
+LOOKUP_QUERY = "SELECT first_status, second_status FROM invoices WHERE invoice_number = ?"
+MONTH_QUERY_TEXT = "SELECT COUNT(*) FROM invoices WHERE date_enter LIKE ?"
+MONTH_QUERY_INT = "SELECT COUNT(*) FROM invoices WHERE enter_day BETWEEN ? AND ?"
+MONTH_RUNS = 20
+
+
+def _fill(connection: sqlite3.Connection, rows: int) -> None:
+    connection.executemany(
+        "INSERT INTO invoices (invoice_number, date_enter, time_enter, first_status) VALUES (?, ?, ?, ?)",
+        (
+            (100000 + i, f"1404/{1 + (i // 31000) % 12:02d}/{1 + (i // 1000) % 31:02d}", "10:00:00", "وارد شده")
+            for i in range(rows)
+        ),
+    )
+    connection.commit()
+
+
+def _measure(connection: sqlite3.Connection, numbers: List[str]) -> List[float]:
+    samples: List[float] = []
+    for number in numbers:
+        start = time.perf_counter()
+        connection.execute(LOOKUP_QUERY, (number,)).fetchone()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def _measure_month(connection: sqlite3.Connection, query: str, params: Tuple[object, ...]) -> List[float]:
+    samples: List[float] = []
+    for _ in range(MONTH_RUNS):
+        start = time.perf_counter()
+        connection.execute(query, params).fetchone()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def _summary(samples: List[float]) -> str:
+    ordered = sorted(samples)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    return f"median={statistics.median(ordered):10.1f}us  p95={p95:10.1f}us"
+
+
+def run(sizes: List[int], lookups: int) -> None:
+    rng = random.Random(1404)
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = Path(tmp) / f"bench_{size}.db"
+            connection = sqlite3.connect(path)
+            _migration_v1_create_invoices(connection)
+            _fill(connection, size)
+            numbers = [str(100000 + rng.randrange(size)) for _ in range(lookups)]
+            before = _measure(connection, numbers)
+            month_before = _measure_month(connection, MONTH_QUERY_TEXT, ("1404/07%",))
+            migrate(connection)
+            after = _measure(connection, numbers)
+            month_after = _measure_month(connection, MONTH_QUERY_INT, (14040701, 14040731))
+            connection.close()
+            print(f"rows={size:>9}  lookup before: {_summary(before)}")
+            print(f"rows={size:>9}  lookup after:  {_summary(after)}")
+            print(f"rows={size:>9}  month  before: {_summary(month_before)}")
+            print(f"rows={size:>9}  month  after:  {_summary(month_after)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+    run(args.sizes, args.lookups)
+
+
+if __name__ == "__main__":
+    main()
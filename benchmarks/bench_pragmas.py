@@ -0,0 +1,68 @@
+"""بنچمارک تنظیمات اتصال: پروفایل قبلی (rollback journal + synchronous=FULL) در برابر پروفایل تنظیم‌شده (WAL).
+
+اجرا (از ریشه پروژه):
+    python benchmarks/bench_pragmas.py
+    python benchmarks/bench_pragmas.py --scans 5000
+
+هر اسکن یک Controller.add_invoice کامل است (جستجو + INSERT + commit)؛ برای هر پروفایل
+اسکن در ثانیه و تأخیر commit (میانه / p95) گزارش می‌شود.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from controller import Controller  # noqa: E402  pylint: disable=wrong-import-position
+from db_config import DatabaseSettings, LEGACY_SETTINGS  # noqa: E402  pylint: disable=wrong-import-position
+from model import Database  # noqa: E402  pylint: disable=wrong-import-position
+
+
+def _run_profile(settings: DatabaseSettings, scans: int) -> List[float]:
+    Database.reset()
+    try:
+        Database(settings)
+        controller = Controller()
+        samples: List[float] = []
+        for i in range(scans):
+            start = time.perf_counter()
+            controller.add_invoice(str(2_000_000 + i))
+            samples.append(time.perf_counter() - start)
+        return samples
+    finally:
+        Database.reset()
+
+
+def run(scans: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        profiles = {
+            "legacy": LEGACY_SETTINGS._replace(path=str(Path(tmp) / "legacy.db")),
+            "tuned": DatabaseSettings(path=str(Path(tmp) / "tuned.db")),
+        }
+        for name, settings in profiles.items():
+            samples = _run_profile(settings, scans)
+            ordered = sorted(samples)
+            p95 = ordered[int(len(ordered) * 0.95) - 1]
+            print(
+                f"{name:>6}: {scans / sum(samples):10,.0f} scans/s  "
+                f"median={statistics.median(ordered) * 1e3:7.3f}ms  p95={p95 * 1e3:7.3f}ms  "
+                f"(journal_mode={settings.journal_mode}, synchronous={settings.synchronous})"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scans", type=int, default=2000)
+    args = parser.parse_args()
+    run(args.scans)
+
+
+if __name__ == "__main__":
+    main()
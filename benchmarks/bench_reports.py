@@ -0,0 +1,118 @@
+"""بنچمارک گزارش بازه‌ای (reports.py): ستونی و کش‌شده در برابر پیمایش tuple های فاکتور در پایتون.
+
+اجرا (از ریشه پروژه):
+    python benchmarks/bench_reports.py
+    python benchmarks/bench_reports.py --rows 1000000 --days 365 --repeat 5
+
+مراحل (دیتابیس فایل موقت پرشده با datagen، بازه: همه روزهای داده):
+    tuples   iter_invoices و محاسبه ساعت / ماندگاری / روز هفته و مرتب‌سازی برای هر فاکتور در پایتون
+    cold     ReportEngine تازه (بارگذاری ستونی همه روزها)
+    warm     همان ReportEngine دوباره (روزهای گذشته از کش، فقط امروز از دیتابیس)
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import jalali  # noqa: E402  pylint: disable=wrong-import-position
+from benchmarks.datagen import populate  # noqa: E402  pylint: disable=wrong-import-position
+from benchmarks.suite import percentile  # noqa: E402  pylint: disable=wrong-import-position
+from db_config import DatabaseSettings  # noqa: E402  pylint: disable=wrong-import-position
+from model import Database  # noqa: E402  pylint: disable=wrong-import-position
+from reports import DWELL_PERCENTILES, HOURS, ReportEngine, weekday_index  # noqa: E402  pylint: disable=wrong-import-position
+
+
+def tuple_report(db: Database, start_day: int, end_day: int) -> Dict[str, Any]:
+    """همان گزارش با روش قبلی: یک InvoiceRow برای هر فاکتور و محاسبه در پایتون."""
+    hourly = [0] * HOURS
+    weekday = [0] * 7
+    dwell: List[int] = []
+    entered = 0
+    for row in db.iter_invoices(start_day, end_day):
+        entered += 1
+        hourly[datetime.fromtimestamp(row.enter_ts).hour] += 1
+        weekday[weekday_index(row.enter_day)] += 1
+        if row.exit_ts is not None:
+            dwell.append(max(row.exit_ts - row.enter_ts, 0))
+    dwell.sort()
+    return {
+        "entered": entered,
+        "exited": len(dwell),
+        "dwell_percentiles": {pct: percentile(dwell, pct) for pct in DWELL_PERCENTILES},
+        "hourly": tuple(hourly),
+        "weekday": tuple(weekday),
+    }
+
+
+def _timed(func: Any, repeat: int) -> Dict[str, Any]:
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": round(statistics.median(samples), 2), "min_ms": round(min(samples), 2), "result": result}
+
+
+def run(rows: int, days: int, repeat: int, workdir: Path) -> Dict[str, Any]:
+    """اجرای سه مرحله روی یک دیتابیس فایل موقت."""
+    Database.reset()
+    try:
+        db = Database(DatabaseSettings(path=str(workdir / "reports.db")))
+        with Database.pool.writer() as connection:
+            populate(connection, rows, days)
+        end_day = jalali.today_key()
+        start_day = jalali.shift_day_key(end_day, -(days - 1))
+        report: Dict[str, Any] = {"rows": rows, "days": days}
+        report["tuples"] = _timed(lambda: tuple_report(db, start_day, end_day), repeat)
+        # هر تکرار cold با کش خالی
+        report["cold"] = _timed(lambda: ReportEngine(db).range_report(start_day, end_day), repeat)
+        engine = ReportEngine(db)
+        engine.range_report(start_day, end_day)
+        report["warm"] = _timed(lambda: engine.range_report(start_day, end_day), repeat)
+        expected = report["tuples"]["result"]
+        for phase in ("cold", "warm"):
+            result = report[phase]["result"]
+            report[phase]["matches_tuples"] = (
+                (result.entered, result.exited, result.hourly, result.weekday, result.dwell_percentiles)
+                == (expected["entered"], expected["exited"], expected["hourly"], expected["weekday"],
+                    expected["dwell_percentiles"])
+            )
+    finally:
+        Database.reset()
+    return report
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    print(f"{report['rows']} invoice(s) over {report['days']} day(s)")
+    baseline = report["tuples"]["median_ms"]
+    for phase in ("tuples", "cold", "warm"):
+        item = report[phase]
+        speedup = baseline / item["median_ms"] if item["median_ms"] else float("inf")
+        check = "" if phase == "tuples" else f"  same result: {item['matches_tuples']}"
+        print(f"{phase:>6}: median={item['median_ms']:9.2f}ms  min={item['min_ms']:9.2f}ms  x{speedup:7.1f}{check}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        report = run(max(1, args.rows), max(1, args.days), max(1, args.repeat), Path(tmp))
+    _print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
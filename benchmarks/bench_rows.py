@@ -0,0 +1,110 @@
+"""بنچمارک حافظه لیست فاکتورها: بایت برای هر ردیف get_all_invoices.
+
+اجرا (از ریشه پروژه):
+    python benchmarks/bench_rows.py                  # 1,000,000 فاکتور
+    python benchmarks/bench_rows.py --rows 200000
+
+دو روش روی یک دیتابیس فایل موقت پرشده با datagen (tracemalloc؛ حافظه نگه‌داشته‌شده بعد از ساخت لیست و
+اوج حافظه در حین ساخت، هر دو تقسیم بر تعداد ردیف):
+    namedtuple   روش قبلی: fetchall ردیف‌های خام و لیست دوم NamedTuple با تبدیل int() / str() هر ستون
+    rows         Database.get_all_invoices: InvoiceRow (__slots__) مستقیم از row_factory با متن وضعیت مشترک
+زمان ساخت جدا و بدون tracemalloc اندازه گرفته می‌شود.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.datagen import populate  # noqa: E402  pylint: disable=wrong-import-position
+from db_config import DatabaseSettings  # noqa: E402  pylint: disable=wrong-import-position
+from model import Database  # noqa: E402  pylint: disable=wrong-import-position
+
+LISTING_QUERY = """
+    SELECT invoice_number, enter_ts, enter_day,
+           CASE WHEN second_status IS NOT NULL THEN second_status ELSE first_status END AS status,
+           exit_ts
+    FROM invoices
+    ORDER BY enter_ts DESC, id DESC
+"""
+
+
+class LegacyRow(NamedTuple):
+    """ساختار ردیف پیش از InvoiceRow فشرده."""
+    invoice_number: int
+    enter_ts: int
+    enter_day: int
+    status: str
+    exit_ts: Optional[int]
+
+
+def legacy_listing(db: Database) -> List[LegacyRow]:
+    """همان لیست با روش قبلی (ردیف‌های خام و سپس لیست دوم با تبدیل هر ستون)."""
+    rows = db.connection.execute(LISTING_QUERY).fetchall()
+    return [LegacyRow(int(r[0]), int(r[1]), int(r[2]), str(r[3]), None if r[4] is None else int(r[4])) for r in rows]
+
+
+def measure(build: Callable[[], List[Any]]) -> Dict[str, float]:
+    """بایت نگه‌داشته‌شده و اوج برای هر ردیف (زیر tracemalloc) و زمان ساخت (جدا، بدون tracemalloc)."""
+    gc.collect()
+    start = time.perf_counter()
+    count = max(1, len(build()))
+    seconds = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    try:
+        rows = build()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del rows
+    return {
+        "rows": count,
+        "retained_bytes_per_row": round(retained / count, 1),
+        "peak_bytes_per_row": round(peak / count, 1),
+        "seconds": round(seconds, 3),
+    }
+
+
+def run(rows: int, workdir: Path) -> Dict[str, Dict[str, float]]:
+    """اندازه‌گیری هر دو روش روی یک دیتابیس فایل موقت."""
+    Database.reset()
+    try:
+        db = Database(DatabaseSettings(path=str(workdir / "rows.db")))
+        with Database.pool.writer() as connection:
+            populate(connection, rows)
+        return {
+            "namedtuple": measure(lambda: legacy_listing(db)),
+            "rows": measure(db.get_all_invoices),
+        }
+    finally:
+        Database.reset()
+
+
+def _print_report(report: Dict[str, Dict[str, float]]) -> None:
+    print(f"{'method':<12}{'rows':>10}{'retained B/row':>16}{'peak B/row':>12}{'seconds':>10}")
+    for name, item in report.items():
+        print(f"{name:<12}{item['rows']:>10}{item['retained_bytes_per_row']:>16.1f}"
+              f"{item['peak_bytes_per_row']:>12.1f}{item['seconds']:>10.3f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        report = run(max(1, args.rows), Path(tmp))
+    _print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
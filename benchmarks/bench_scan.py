@@ -0,0 +1,163 @@
+"""بنچمارک تأخیر هر اسکن (ثبت / خروج / حذف) با دستورهای اتمی RETURNING در برابر روش چندکوئری قبلی.
+
+اجرا (از ریشه پروژه):
+    python benchmarks/bench_scan.py
+    python benchmarks/bench_scan.py --scans 5000 --batch-size 64
+
+"atomic": متدهای فعلی Database که Controller صدا می‌زند (هر اسکن موفق یک دستور: INSERT/UPDATE/DELETE ... RETURNING).
+"legacy": شبیه‌سازی مسیر قبلی کنترلر روی همان اتصال (بررسی وجود/وضعیت، نوشتن، سپس خواندن ردیف برای رویداد).
+برای هر عملیات میانه و p95 تأخیر هر اسکن گزارش می‌شود.
+"burst": رگبار اسکن از مسیر Controller، یک commit برای هر اسکن در برابر Controller.process_scans
+(دسته‌های --batch-size در یک تراکنش، همان مسیر صف اسکن رابط کاربری)؛ اسکن در ثانیه گزارش می‌شود.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import jalali  # noqa: E402  pylint: disable=wrong-import-position
+from constants import EVENT_ADDED, EVENT_EXITED  # noqa: E402  pylint: disable=wrong-import-position
+from controller import Controller  # noqa: E402  pylint: disable=wrong-import-position
+from db_config import DatabaseSettings  # noqa: E402  pylint: disable=wrong-import-position
+from model import Database  # noqa: E402  pylint: disable=wrong-import-position
+
+ROW_QUERY = (
+    "SELECT invoice_number, enter_ts, enter_day, first_status, exit_ts FROM invoices WHERE invoice_number = ?"
+)
+STATUS_QUERY = "SELECT enter_ts, first_status, exit_ts, second_status FROM invoices WHERE invoice_number = ?"
+EXIT_QUERY = """
+    UPDATE invoices SET exit_ts = ?, exit_day = ?, second_status = ?
+    WHERE invoice_number = ? AND second_status IS NULL
+"""
+
+
+def _legacy_ops(db: Database) -> Dict[str, Callable[[str], object]]:
+    connection = db.connection
+
+    def add(number: str) -> None:
+        if connection.execute(STATUS_QUERY, (number,)).fetchone() is not None:
+            return
+        timestamp = jalali.now_ts()
+        with connection:
+            if connection.execute("SELECT id FROM invoices WHERE invoice_number = ?", (number,)).fetchone():
+                return
+            connection.execute(
+                "INSERT INTO invoices (invoice_number, enter_ts, enter_day, first_status) VALUES (?, ?, ?, ?)",
+                (number, timestamp, jalali.day_key(timestamp), "وارد شده"),
+            )
+        connection.execute(ROW_QUERY, (number,)).fetchone()
+
+    def exit_(number: str) -> None:
+        if connection.execute(STATUS_QUERY, (number,)).fetchone() is None:
+            return
+        timestamp = jalali.now_ts()
+        with connection:
+            connection.execute(EXIT_QUERY, (timestamp, jalali.day_key(timestamp), "خارج شده", number))
+        connection.execute(ROW_QUERY, (number,)).fetchone()
+
+    def delete(number: str) -> None:
+        if connection.execute(ROW_QUERY, (number,)).fetchone() is None:
+            return
+        with connection:
+            status = connection.execute(
+                "SELECT second_status FROM invoices WHERE invoice_number = ?", (number,)
+            ).fetchone()
+            if status and status[0] == "خارج شده":
+                return
+            connection.execute("DELETE FROM invoices WHERE invoice_number = ?", (number,))
+
+    return {"add": add, "exit": exit_, "delete": delete}
+
+
+def _atomic_ops(db: Database) -> Dict[str, Callable[[str], object]]:
+    return {
+        "add": db.add_invoice,
+        "exit": db.update_invoice_exit,
+        "delete": db.delete_open_invoice,
+    }
+
+
+def _time_each(operation: Callable[[str], object], numbers: List[str]) -> List[float]:
+    samples: List[float] = []
+    for number in numbers:
+        start = time.perf_counter()
+        operation(number)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def _summary(samples: List[float]) -> str:
+    ordered = sorted(samples)
+    p95 = ordered[max(0, int(len(ordered) * 0.95) - 1)]
+    return f"median={statistics.median(ordered):9.1f}us  p95={p95:9.1f}us"
+
+
+def _run_variant(name: str, path: Path, scans: int) -> None:
+    Database.reset()
+    try:
+        db = Database(DatabaseSettings(path=str(path)))
+        ops = _legacy_ops(db) if name == "legacy" else _atomic_ops(db)
+        entered = [str(3_000_000 + i) for i in range(scans)]
+        deleted = [str(4_000_000 + i) for i in range(scans)]
+        add = _time_each(ops["add"], entered)
+        exit_ = _time_each(ops["exit"], entered)
+        for number in deleted:
+            ops["add"](number)
+        delete = _time_each(ops["delete"], deleted)
+        for label, samples in (("add", add), ("exit", exit_), ("delete", delete)):
+            print(f"{name:>6} {label:>6}: {_summary(samples)}")
+    finally:
+        Database.reset()
+
+
+def _run_burst(path: Path, scans: int, batch_size: int) -> None:
+    Database.reset()
+    try:
+        Database(DatabaseSettings(path=str(path)))
+        controller = Controller()
+        single = [str(5_000_000 + i) for i in range(scans)]
+        start = time.perf_counter()
+        for number in single:
+            controller.add_invoice(number)
+        for number in single:
+            controller.process_exit_invoice(number)
+        single_seconds = time.perf_counter() - start
+
+        scans_list = [(EVENT_ADDED, str(6_000_000 + i)) for i in range(scans)]
+        scans_list += [(EVENT_EXITED, number) for _, number in scans_list]
+        start = time.perf_counter()
+        for offset in range(0, len(scans_list), batch_size):
+            controller.process_scans(scans_list[offset:offset + batch_size])
+        batched_seconds = time.perf_counter() - start
+
+        print(f" burst single : {2 * scans / single_seconds:9.0f} scans/s")
+        print(f" burst batch{batch_size:<3}: {2 * scans / batched_seconds:9.0f} scans/s")
+    finally:
+        Database.reset()
+
+
+def run(scans: int, batch_size: int = 64) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("legacy", "atomic"):
+            _run_variant(name, Path(tmp) / f"{name}.db", scans)
+        _run_burst(Path(tmp) / "burst.db", scans, max(1, batch_size))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scans", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=64, help="اندازه دسته process_scans در حالت burst")
+    args = parser.parse_args()
+    run(args.scans, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
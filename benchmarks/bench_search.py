@@ -0,0 +1,116 @@
+"""بنچمارک جستجوی شماره فاکتور (Database.search_invoices): ایندکس trigram در برابر پیمایش با LIKE.
+
+اجرا (از ریشه پروژه):
+    python benchmarks/bench_search.py                    # 1,000,000 فاکتور
+    python benchmarks/bench_search.py --rows 200000 --queries 200
+
+دیتابیس فایل موقت پرشده با datagen؛ برای هر حالت (prefix / suffix / substring) queries الگوی تصادفی
+سه تا پنج رقمی از شماره‌های موجود ساخته و صفحه اول (20 ردیف) هر الگو خوانده می‌شود:
+    index    جدول invoice_search (FTS5 trigram) که trigger ها به‌روز نگه می‌دارند
+    scan     همان جستجو با CAST(invoice_number AS TEXT) LIKE روی دو جدول (مسیر بدون FTS5)
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.datagen import FIRST_INVOICE_NUMBER, populate  # noqa: E402  pylint: disable=wrong-import-position
+from benchmarks.suite import percentile  # noqa: E402  pylint: disable=wrong-import-position
+from constants import SEARCH_MODES, SEARCH_PREFIX, SEARCH_SUFFIX  # noqa: E402  pylint: disable=wrong-import-position
+from db_config import DatabaseSettings  # noqa: E402  pylint: disable=wrong-import-position
+from model import Database  # noqa: E402  pylint: disable=wrong-import-position
+
+PAGE_SIZE = 20
+
+
+def sample_patterns(mode: str, last_number: int, queries: int, seed: int = 1404) -> List[str]:
+    """الگوهای سه تا پنج رقمی از شماره‌های ثبت‌شده، متناسب با حالت جستجو."""
+    rng = random.Random(f"{seed}-{mode}")
+    patterns = []
+    for _ in range(queries):
+        number = str(rng.randint(FIRST_INVOICE_NUMBER, last_number))
+        length = rng.randint(3, 5)
+        if mode == SEARCH_PREFIX:
+            patterns.append(number[:length])
+        elif mode == SEARCH_SUFFIX:
+            patterns.append(number[-length:])
+        else:
+            start = rng.randrange(len(number) - length + 1)
+            patterns.append(number[start:start + length])
+    return patterns
+
+
+def measure(db: Database, mode: str, patterns: List[str], indexed: bool) -> Dict[str, Any]:
+    """زمان صفحه اول هر الگو (میلی‌ثانیه) با ایندکس یا با پیمایش."""
+    saved = Database.search_indexed
+    Database.search_indexed = indexed and saved
+    try:
+        samples = []
+        pages = []
+        for pattern in patterns:
+            start = time.perf_counter()
+            page = db.search_invoices(pattern, mode, PAGE_SIZE)
+            samples.append((time.perf_counter() - start) * 1000)
+            pages.append([row.invoice_number for row in page.rows])
+    finally:
+        Database.search_indexed = saved
+    samples.sort()
+    return {
+        "n": len(samples),
+        "median_ms": round(statistics.median(samples), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+        "max_ms": round(samples[-1], 3),
+        "pages": pages,
+    }
+
+
+def run(rows: int, queries: int, workdir: Path) -> Dict[str, Any]:
+    """اندازه‌گیری هر سه حالت با ایندکس و با پیمایش روی یک دیتابیس فایل موقت."""
+    Database.reset()
+    try:
+        db = Database(DatabaseSettings(path=str(workdir / "search.db")))
+        with Database.pool.writer() as connection:
+            last = populate(connection, rows)
+        report: Dict[str, Any] = {"rows": rows, "indexed": Database.search_indexed}
+        for mode in SEARCH_MODES:
+            patterns = sample_patterns(mode, last, queries)
+            index = measure(db, mode, patterns, indexed=True)
+            scan = measure(db, mode, patterns, indexed=False)
+            report[mode] = {"index": index, "scan": scan, "same_results": index.pop("pages") == scan.pop("pages")}
+    finally:
+        Database.reset()
+    return report
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    print(f"{report['rows']} invoice(s), FTS5 index: {report['indexed']}")
+    print(f"{'mode':<10}{'method':<8}{'median ms':>11}{'p99 ms':>10}{'max ms':>10}")
+    for mode in SEARCH_MODES:
+        for method in ("index", "scan"):
+            item = report[mode][method]
+            print(f"{mode:<10}{method:<8}{item['median_ms']:>11.3f}{item['p99_ms']:>10.3f}{item['max_ms']:>10.3f}")
+        print(f"{'':<10}same results: {report[mode]['same_results']}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=100)
+    args = parser.parse_args(argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        report = run(max(1, args.rows), max(1, args.queries), Path(tmp))
+    _print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
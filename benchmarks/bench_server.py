@@ -0,0 +1,144 @@
+"""تست بار سرور HTTP اسکن (server.py): چند ایستگاه هم‌زمان با اتصال keep-alive.
+
+اجرا (از ریشه پروژه):
+    python benchmarks/bench_server.py                              # سرور محلی روی فایل موقت
+    python benchmarks/bench_server.py --clients 32 --scans 20000
+    python benchmarks/bench_server.py --port 8765                  # سرور در حال اجرای جدا (python server.py)
+
+هر کلاینت برای شماره‌های یکتای خودش ورود و سپس خروج ثبت می‌کند و با احتمال --read-ratio بعد از هر
+اسکن یک جستجو (GET /invoices/{n}) هم می‌فرستد. خروجی: تعداد درخواست در ثانیه و صدک‌های تأخیر
+هر نوع درخواست (میکروثانیه).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.suite import summarize  # noqa: E402  pylint: disable=wrong-import-position
+from db_config import DatabaseSettings  # noqa: E402  pylint: disable=wrong-import-position
+from model import Database  # noqa: E402  pylint: disable=wrong-import-position
+from server import BackgroundServer  # noqa: E402  pylint: disable=wrong-import-position
+
+FIRST_NUMBER = 50_000_000
+
+
+class _Client:
+    """کلاینت HTTP/1.1 حداقلی روی یک اتصال keep-alive."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str) -> None:
+        self._reader = reader
+        self._writer = writer
+        self._host = host
+
+    @classmethod
+    async def connect(cls, host: str, port: int) -> "_Client":
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer, host)
+
+    async def request(self, method: str, path: str) -> Tuple[int, Any]:
+        self._writer.write(f"{method} {path} HTTP/1.1\r\nHost: {self._host}\r\nContent-Length: 0\r\n\r\n".encode())
+        await self._writer.drain()
+        head = (await self._reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+        status = int(head[0].split(" ", 2)[1])
+        length = next(int(line.split(":", 1)[1]) for line in head if line.lower().startswith("content-length:"))
+        return status, json.loads(await self._reader.readexactly(length))
+
+    async def close(self) -> None:
+        self._writer.close()
+        await self._writer.wait_closed()
+
+
+async def _station(
+    host: str, port: int, numbers: List[int], *, read_ratio: float, seed: int, samples: Dict[str, List[float]]
+) -> None:
+    rng = random.Random(seed)
+    client = await _Client.connect(host, port)
+    try:
+        for number in numbers:
+            for kind, method, path in (
+                ("enter", "POST", f"/invoices/{number}/enter"),
+                ("exit", "POST", f"/invoices/{number}/exit"),
+            ):
+                start = time.perf_counter()
+                status, _ = await client.request(method, path)
+                samples[kind].append((time.perf_counter() - start) * 1e6)
+                if status != 200:
+                    raise RuntimeError(f"{method} {path} -> {status}")
+                if rng.random() < read_ratio:
+                    start = time.perf_counter()
+                    await client.request("GET", f"/invoices/{number}")
+                    samples["search"].append((time.perf_counter() - start) * 1e6)
+    finally:
+        await client.close()
+
+
+async def load_test(host: str, port: int, clients: int, scans: int, read_ratio: float = 0.2) -> Dict[str, Any]:
+    """اجرای بار؛ {"requests", "seconds", "rps", "latency": {نوع: خلاصه}}."""
+    samples: Dict[str, List[float]] = {"enter": [], "exit": [], "search": []}
+    per_client = max(1, scans // clients)
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _station(
+            host, port,
+            list(range(FIRST_NUMBER + i * per_client, FIRST_NUMBER + (i + 1) * per_client)),
+            read_ratio=read_ratio, seed=i, samples=samples,
+        )
+        for i in range(clients)
+    ))
+    seconds = time.perf_counter() - started
+    requests = sum(len(values) for values in samples.values())
+    return {
+        "requests": requests,
+        "seconds": round(seconds, 3),
+        "rps": round(requests / seconds, 1),
+        "scans_per_second": round((len(samples["enter"]) + len(samples["exit"])) / seconds, 1),
+        "latency": {kind: summarize(values) for kind, values in samples.items() if values},
+    }
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    print(
+        f"{report['requests']} requests in {report['seconds']}s: "
+        f"{report['rps']} req/s, {report['scans_per_second']} scans/s"
+    )
+    for kind, summary in report["latency"].items():
+        print(f"{kind:>7}: n={int(summary['n']):>6}  p50={summary['p50_us']:9.1f}us  "
+              f"p95={summary['p95_us']:9.1f}us  p99={summary['p99_us']:9.1f}us")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="سرور در حال اجرا؛ بدون آن یک سرور محلی روی فایل موقت ساخته می‌شود")
+    parser.add_argument("--clients", type=int, default=16, help="تعداد ایستگاه هم‌زمان")
+    parser.add_argument("--scans", type=int, default=5000, help="تعداد شماره (هر شماره ورود + خروج)")
+    parser.add_argument("--read-ratio", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    if args.port is not None:
+        _print_report(asyncio.run(load_test(args.host, args.port, args.clients, args.scans, args.read_ratio)))
+        return 0
+    with tempfile.TemporaryDirectory() as tmp:
+        Database.reset()
+        try:
+            Database(DatabaseSettings(path=str(Path(tmp) / "bench_server.db")))
+            with BackgroundServer(host=args.host, port=0) as background:
+                report = asyncio.run(load_test(args.host, background.port, args.clients, args.scans, args.read_ratio))
+        finally:
+            Database.reset()
+    _print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
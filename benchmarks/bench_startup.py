@@ -0,0 +1,130 @@
+"""بنچمارک راه‌اندازی رابط کاربری: زمان تا اولین رسم پنجره و تا آماده به کار شدن.
+
+اجرا (از ریشه پروژه):
+    python benchmarks/bench_startup.py                                   # نسخه سورس (python view.py)
+    python benchmarks/bench_startup.py --rows 100000 --runs 7 --offscreen
+    python benchmarks/bench_startup.py --exe dist/invoice_management/invoice_management.exe   # نسخه PyInstaller
+    python benchmarks/bench_startup.py --import-profile                  # پرهزینه‌ترین import ها (python -X importtime)
+
+هر اجرا یک پروسه تازه است با INVOICE_STARTUP_REPORT (startup.py): برنامه بعد از آماده به کار شدن گزارش
+JSON می‌نویسد و بسته می‌شود. زمان‌ها از لحظه اجرای پروسه در همین اسکریپت اندازه گرفته می‌شوند، پس
+بالا آمدن مفسر / bootloader فایل اجرایی را هم شامل می‌شوند:
+    launch->import       تا ورود اولین ماژول برنامه (مفسر، یا باز شدن بسته PyInstaller)
+    launch->first_paint  اولین رسم پنجره (پوسته خالی)
+    launch->interactive  صفحه اول جدول، گزارش هفتگی و ماهانه و شمارنده رسم شده‌اند
+اجرای اول جدا گزارش می‌شود (کش دیسک / bytecode سرد)؛ بقیه با میانه و کمینه.
+دیتابیس با benchmarks/datagen.py در پوشه موقت ساخته می‌شود و بایگانی خودکار خاموش است تا اجراها یکسان باشند.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.datagen import populate  # noqa: E402  pylint: disable=wrong-import-position
+from db_config import DatabaseSettings  # noqa: E402  pylint: disable=wrong-import-position
+from model import Database  # noqa: E402  pylint: disable=wrong-import-position
+from startup import MARK_FIRST_PAINT, MARK_INTERACTIVE, STARTUP_REPORT_ENV  # noqa: E402  pylint: disable=wrong-import-position
+
+PHASES = ("launch->import", "launch->first_paint", "launch->interactive")
+
+
+def _prepare_database(path: Path, rows: int) -> None:
+    Database.reset()
+    try:
+        Database(DatabaseSettings(path=str(path)))
+        if rows:
+            with Database.pool.writer() as connection:
+                populate(connection, rows)
+    finally:
+        Database.reset()
+
+
+def _launch_once(command: Sequence[str], env: Dict[str, str], workdir: Path, timeout: float) -> Dict[str, float]:
+    report_path = workdir / "startup.json"
+    report_path.unlink(missing_ok=True)
+    env = {**env, STARTUP_REPORT_ENV: str(report_path)}
+    launched = time.time()
+    subprocess.run(command, cwd=workdir, env=env, timeout=timeout, check=True)
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    marks = report["marks"]
+    return {
+        "launch->import": (report["import_started"] - launched) * 1000,
+        "launch->first_paint": (marks[MARK_FIRST_PAINT] - launched) * 1000,
+        "launch->interactive": (marks[MARK_INTERACTIVE] - launched) * 1000,
+    }
+
+
+def run(command: Sequence[str], rows: int, runs: int, offscreen: bool, timeout: float) -> List[Dict[str, float]]:
+    """اندازه‌گیری runs اجرای پشت سر هم؛ میلی‌ثانیه هر مرحله برای هر اجرا."""
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        db_path = workdir / "invoices.db"
+        _prepare_database(db_path, rows)
+        env = {**os.environ, "INVOICE_DB_PATH": str(db_path), "INVOICE_DB_ARCHIVE_DAYS": "0"}
+        if offscreen:
+            env["QT_QPA_PLATFORM"] = "offscreen"
+        return [_launch_once(command, env, workdir, timeout) for _ in range(runs)]
+
+
+def import_profile(top: int) -> List[str]:
+    """پرهزینه‌ترین ماژول‌ها (زمان تجمعی) هنگام import view در نسخه سورس."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import view"],
+        cwd=ROOT,
+        env={**os.environ, "QT_QPA_PLATFORM": "offscreen"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            entries.append((int(parts[1]), parts[2].rstrip()))
+    return [f"{cumulative / 1000:8.1f} ms  {name}" for cumulative, name in sorted(entries, reverse=True)[:top]]
+
+
+def _print_report(samples: List[Dict[str, float]]) -> None:
+    print(f"{'phase':<22}{'first run':>12}{'median':>12}{'min':>12}")
+    for phase in PHASES:
+        first = samples[0][phase]
+        rest = [sample[phase] for sample in samples[1:]] or [first]
+        print(f"{phase:<22}{first:10.1f}ms{statistics.median(rest):10.1f}ms{min(rest):10.1f}ms")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--exe", help="فایل اجرایی PyInstaller (پیش‌فرض: python view.py)")
+    parser.add_argument("--rows", type=int, default=100_000, help="تعداد فاکتورهای مصنوعی دیتابیس")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--offscreen", action="store_true", help="QT_QPA_PLATFORM=offscreen (بدون نمایشگر)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="حداکثر ثانیه هر اجرا")
+    parser.add_argument("--import-profile", type=int, nargs="?", const=15, metavar="TOP")
+    parser.add_argument("--output", help="ذخیره نمونه‌ها به صورت JSON")
+    args = parser.parse_args(argv)
+
+    if args.import_profile:
+        print("\n".join(import_profile(args.import_profile)))
+        return 0
+    command = [str(Path(args.exe).resolve())] if args.exe else [sys.executable, str(ROOT / "view.py")]
+    samples = run(command, max(0, args.rows), max(1, args.runs), args.offscreen, args.timeout)
+    _print_report(samples)
+    if args.output:
+        Path(args.output).write_text(json.dumps({"command": command, "samples": samples}, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
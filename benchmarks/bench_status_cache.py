@@ -0,0 +1,110 @@
+"""بنچمارک تأخیر جستجوی وضعیت فاکتور با کش وضعیت روشن و خاموش.
+
+اجرا (از ریشه پروژه):
+    python benchmarks/bench_status_cache.py
+    python benchmarks/bench_status_cache.py --rows 200000 --hot 3000 --lookups 20000
+
+یک فایل دیتابیس موقت با rows فاکتور ساخته می‌شود؛ جستجوها (Controller.get_invoice_status، همان مسیر
+handle_search و اسکن‌های تکراری) روی یک مجموعه داغ hot شماره‌ای از فاکتورهای اخیر تکرار می‌شوند.
+برای هر حالت میانه / p95 تأخیر و برای کش روشن نسبت hit گزارش می‌شود.
+
+دور دوم چرخه اسکن یک شیفت را روی شماره‌های تازه اندازه می‌گیرد (ورود، ورود تکراری، خروج، خروج تکراری،
+ورود بعد از خروج، جستجو): کش فقط اسکن‌های تکراری فاکتور خارج‌شده و جستجو را بدون SQLite پاسخ می‌دهد؛
+ورود و خروج واقعی همیشه دستور اتمی دیتابیس را اجرا می‌کنند.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from controller import Controller  # noqa: E402  pylint: disable=wrong-import-position
+from db_config import DatabaseSettings  # noqa: E402  pylint: disable=wrong-import-position
+from model import Database  # noqa: E402  pylint: disable=wrong-import-position
+from status_cache import StatusCache  # noqa: E402  pylint: disable=wrong-import-position
+
+
+def _measure(controller: Controller, numbers: List[str]) -> List[float]:
+    samples: List[float] = []
+    for number in numbers:
+        start = time.perf_counter()
+        controller.get_invoice_status(number)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+# چرخه اسکن هر فاکتور در یک شیفت (نام، متد Controller)
+SCAN_CYCLE = (
+    ("enter", "add_invoice"),
+    ("enter again", "add_invoice"),
+    ("exit", "process_exit_invoice"),
+    ("exit again", "process_exit_invoice"),
+    ("enter after exit", "add_invoice"),
+    ("search", "get_invoice_status"),
+)
+
+
+def _measure_cycle(controller: Controller, numbers: List[str]) -> Dict[str, List[float]]:
+    samples: Dict[str, List[float]] = {name: [] for name, _ in SCAN_CYCLE}
+    for name, method in SCAN_CYCLE:
+        call = getattr(controller, method)
+        for number in numbers:
+            start = time.perf_counter()
+            call(number)
+            samples[name].append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def _summary(samples: List[float]) -> str:
+    ordered = sorted(samples)
+    p95 = ordered[max(0, int(len(ordered) * 0.95) - 1)]
+    return f"median={statistics.median(ordered):8.1f}us  p95={p95:8.1f}us"
+
+
+def run(rows: int, hot: int, lookups: int) -> None:
+    rng = random.Random(1404)
+    with tempfile.TemporaryDirectory() as tmp:
+        Database.reset()
+        try:
+            Database(DatabaseSettings(path=str(Path(tmp) / "bench.db")))
+            Controller().add_invoices_bulk(str(5_000_000 + i) for i in range(rows))
+            hot_set = [str(5_000_000 + rows - 1 - i) for i in range(min(hot, rows))]
+            numbers = [rng.choice(hot_set) for _ in range(lookups)]
+
+            off = Controller(StatusCache(capacity=0))
+            print(f"cache off: {_summary(_measure(off, numbers))}")
+
+            on = Controller(StatusCache(capacity=max(hot, 1)))
+            warmed = on.warm_status_cache()
+            samples = _measure(on, numbers)
+            stats = on.status_cache_stats()
+            print(f"cache on:  {_summary(samples)}  hit_ratio={stats.hit_ratio:.3f}  warmed={warmed}")
+
+            cycle = min(hot, 2000)
+            off_cycle = _measure_cycle(off, [str(7_000_000 + i) for i in range(cycle)])
+            on_cycle = _measure_cycle(on, [str(8_000_000 + i) for i in range(cycle)])
+            for name, _ in SCAN_CYCLE:
+                print(f"{name:>16}  off: {_summary(off_cycle[name])}   on: {_summary(on_cycle[name])}")
+        finally:
+            Database.reset()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--hot", type=int, default=3000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    args = parser.parse_args()
+    run(args.rows, args.hot, args.lookups)
+
+
+if __name__ == "__main__":
+    main()
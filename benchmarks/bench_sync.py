@@ -0,0 +1,149 @@
+"""بنچمارک همگام‌سازی ایستگاه‌ها (sync.py): توان ارسال و دریافت و اثر آن روی تأخیر اسکن.
+
+اجرا (از ریشه پروژه):
+    python benchmarks/bench_sync.py
+    python benchmarks/bench_sync.py --changes 50000 --stations 4 --batch-size 1000 --scans 5000
+
+مراحل (دیتابیس محلی و مخزن مرکزی هر دو فایل موقت):
+    push      ارسال changes تغییر outbox محلی به مخزن مرکزی (تغییر در ثانیه)
+    pull      دریافت و اعمال changes تغییر از stations ایستگاه مصنوعی دیگر (ورود، سپس خروج نیمی از آن‌ها)
+    scans     تأخیر add_invoice بدون همگام‌سازی و هم‌زمان با یک thread که پیوسته sync_once اجرا می‌کند
+              (ایستگاه‌های دیگر در همان حال تغییر تازه می‌فرستند)؛ اسکن‌ها فقط منتظر قفل نویسنده محلی‌اند
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.suite import summarize  # noqa: E402  pylint: disable=wrong-import-position
+from constants import CHANGE_ENTER, CHANGE_EXIT  # noqa: E402  pylint: disable=wrong-import-position
+from db_config import DatabaseSettings  # noqa: E402  pylint: disable=wrong-import-position
+from model import Database, SyncChange  # noqa: E402  pylint: disable=wrong-import-position
+from sync import CentralStore, Synchronizer  # noqa: E402  pylint: disable=wrong-import-position
+
+FIRST_NUMBER = 70_000_000
+
+
+def _remote_changes(stations: int, count: int, start: int) -> Dict[str, List[SyncChange]]:
+    """count تغییر بین stations ایستگاه: ورود هر شماره و خروج هر شماره زوج."""
+    now = int(time.time())
+    per_station: Dict[str, List[SyncChange]] = {f"remote-{i}": [] for i in range(stations)}
+    names = list(per_station)
+    number = start
+    produced = 0
+    while produced < count:
+        station = names[number % stations]
+        changes = per_station[station]
+        changes.append(SyncChange(station, len(changes) + 1, number, CHANGE_ENTER, now, None, now))
+        produced += 1
+        if number % 2 == 0 and produced < count:
+            changes.append(SyncChange(station, len(changes) + 1, number, CHANGE_EXIT, now, now + 60, now + 60))
+            produced += 1
+        number += 1
+    return per_station
+
+
+def _timed_scans(db: Database, numbers: range) -> List[float]:
+    samples = []
+    for number in numbers:
+        start = time.perf_counter()
+        db.add_invoice(str(number))
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def run(changes: int, stations: int, batch_size: int, scans: int, workdir: Path) -> Dict[str, Any]:
+    """اجرای سه مرحله روی فایل‌های پوشه workdir."""
+    report: Dict[str, Any] = {}
+    store = CentralStore(str(workdir / "central.db"))
+    Database.reset()
+    try:
+        db = Database(DatabaseSettings(path=str(workdir / "station.db")))
+        synchronizer = Synchronizer(db, store, "local", batch_size)
+        db.add_invoices_bulk(str(n) for n in range(FIRST_NUMBER, FIRST_NUMBER + changes))
+
+        start = time.perf_counter()
+        pushed = synchronizer.push_pending()
+        seconds = time.perf_counter() - start
+        report["push"] = {"changes": pushed, "seconds": round(seconds, 3), "per_second": round(pushed / seconds, 1)}
+
+        remote_start = FIRST_NUMBER + changes
+        for batch in _remote_changes(stations, changes, remote_start).values():
+            store.push(batch)
+        start = time.perf_counter()
+        pulled, changed = synchronizer.pull_remote()
+        seconds = time.perf_counter() - start
+        report["pull"] = {
+            "changes": pulled,
+            "invoices": len(changed),
+            "seconds": round(seconds, 3),
+            "per_second": round(pulled / seconds, 1),
+        }
+
+        scan_start = remote_start + changes
+        idle = _timed_scans(db, range(scan_start, scan_start + scans))
+        stop = threading.Event()
+        rounds = [0]
+
+        def sync_loop() -> None:
+            feed = _remote_changes(stations, scans, scan_start + 2 * scans)
+            sequence = {station: 10**9 for station in feed}
+            while not stop.is_set():
+                for station, batch in feed.items():
+                    # ایستگاه‌های دیگر در حین اسکن‌ها تغییر تازه می‌فرستند
+                    fresh = [change._replace(station_seq=sequence[station] + i) for i, change in enumerate(batch[:50])]
+                    sequence[station] += len(fresh)
+                    del batch[:50]
+                    store.push(fresh)
+                synchronizer.sync_once()
+                rounds[0] += 1
+
+        worker = threading.Thread(target=sync_loop, daemon=True)
+        worker.start()
+        try:
+            busy = _timed_scans(db, range(scan_start + scans, scan_start + 2 * scans))
+        finally:
+            stop.set()
+            worker.join()
+        report["scans"] = {"idle": summarize(idle), "during_sync": summarize(busy), "sync_rounds": rounds[0]}
+    finally:
+        Database.reset()
+        store.close()
+    return report
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    for phase in ("push", "pull"):
+        item = report[phase]
+        print(f"{phase:>5}: {item['changes']} changes in {item['seconds']}s ({item['per_second']} changes/s)")
+    scans = report["scans"]
+    for name in ("idle", "during_sync"):
+        summary = scans[name]
+        print(f"scan {name:>11}: p50={summary['p50_us']:8.1f}us  p95={summary['p95_us']:8.1f}us  "
+              f"p99={summary['p99_us']:8.1f}us")
+    print(f"sync rounds during scans: {scans['sync_rounds']}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--changes", type=int, default=20_000)
+    parser.add_argument("--stations", type=int, default=3, help="تعداد ایستگاه مصنوعی دیگر")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--scans", type=int, default=2000)
+    args = parser.parse_args(argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        report = run(max(1, args.changes), max(1, args.stations), args.batch_size, max(1, args.scans), Path(tmp))
+    _print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""تولید داده مصنوعی واقع‌گرایانه فاکتور برای بنچمارک‌ها.
+
+- فاکتورها در days روز اخیر (تا امروز) پخش می‌شوند؛ ساعت ورود در شیفت کاری 08:00 تا 20:00 (ساعت محلی)
+- شماره فاکتورها با زمان ورود صعودی است (مثل شماره‌گذاری واقعی)
+- فاکتورهای روزهای قبل تقریباً همه خارج شده‌اند (۰.۵ تا ۸ ساعت بعد از ورود)؛ فاکتورهای امروز حدود نصف
+- ستون‌ها همان schema فعلی هستند (enter_ts / enter_day / exit_ts / exit_day) و daily_stats با trigger ها پر می‌شود
+
+اجرا مستقیم (ساخت یک فایل نمونه):
+    python benchmarks/datagen.py sample.db --rows 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import jalali  # noqa: E402  pylint: disable=wrong-import-position
+from constants import STATUS_ENTERED, STATUS_EXITED  # noqa: E402  pylint: disable=wrong-import-position
+from db_config import DatabaseSettings  # noqa: E402  pylint: disable=wrong-import-position
+from model import Database  # noqa: E402  pylint: disable=wrong-import-position
+
+FIRST_INVOICE_NUMBER = 10_000_000
+SHIFT_START_SECONDS = 8 * 3600
+SHIFT_LENGTH_SECONDS = 12 * 3600
+PAST_EXIT_RATIO = 0.97
+TODAY_EXIT_RATIO = 0.5
+
+# (invoice_number, enter_ts, enter_day, first_status, exit_ts, exit_day, second_status)
+InvoiceTuple = Tuple[int, int, int, str, Optional[int], Optional[int], Optional[str]]
+
+
+def generate_invoices(rows: int, days: int = 365, seed: int = 1404, now: Optional[datetime] = None) -> Iterator[InvoiceTuple]:
+    """ردیف‌های مصنوعی به ترتیب زمان ورود (قدیم به جدید)."""
+    rng = random.Random(seed)
+    now = now or datetime.now()
+    today = now.date()
+    now_ts = int(now.timestamp())
+    day_keys = jalali.day_key
+    days = max(1, days)
+    per_day, extra = divmod(rows, days)
+    number = FIRST_INVOICE_NUMBER
+    for offset in range(days - 1, -1, -1):
+        gday = today - timedelta(days=offset)
+        midnight = int(datetime(gday.year, gday.month, gday.day).timestamp())
+        count = per_day + (1 if offset < extra else 0)
+        # امروز فقط تا همین لحظه ورود دارد
+        limit = SHIFT_LENGTH_SECONDS if offset else max(1, min(SHIFT_LENGTH_SECONDS, now_ts - midnight - SHIFT_START_SECONDS))
+        exit_ratio = TODAY_EXIT_RATIO if offset == 0 else PAST_EXIT_RATIO
+        for enter_ts in sorted(midnight + SHIFT_START_SECONDS + rng.randrange(limit) for _ in range(count)):
+            enter_day = day_keys(enter_ts)
+            if rng.random() < exit_ratio:
+                exit_ts = enter_ts + rng.randint(1800, 8 * 3600)
+                if offset == 0:
+                    exit_ts = min(exit_ts, max(enter_ts, now_ts))
+                yield (number, enter_ts, enter_day, STATUS_ENTERED, exit_ts, day_keys(exit_ts), STATUS_EXITED)
+            else:
+                yield (number, enter_ts, enter_day, STATUS_ENTERED, None, None, None)
+            number += 1
+
+
+def populate(connection: sqlite3.Connection, rows: int, days: int = 365, seed: int = 1404) -> int:
+    """درج rows فاکتور مصنوعی در یک تراکنش روی دیتابیس مهاجرت‌شده؛ بزرگ‌ترین شماره ثبت‌شده."""
+    last = FIRST_INVOICE_NUMBER - 1
+    with connection:
+        cursor = connection.executemany(
+            """
+            INSERT INTO invoices
+                (invoice_number, enter_ts, enter_day, first_status, exit_ts, exit_day, second_status)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            generate_invoices(rows, days, seed),
+        )
+        last += cursor.rowcount
+    return last
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=1404)
+    args = parser.parse_args()
+
+    Database.reset()
+    try:
+        Database(DatabaseSettings(path=args.path))
+        with Database.pool.writer() as connection:
+            last = populate(connection, args.rows, args.days, args.seed)
+        print(f"{args.rows} invoices written to {args.path} (numbers {FIRST_INVOICE_NUMBER}..{last})")
+    finally:
+        Database.reset()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""مجموعه بنچمارک مسیرهای داغ: اسکن (ثبت/خروج)، گزارش‌ها و بارگذاری جدول.
+
+اجرا (از ریشه پروژه):
+    python benchmarks/suite.py                                   # 10k و 100k روی memory و file
+    python benchmarks/suite.py --sizes 10000 100000 1000000 --output results.json
+    python benchmarks/suite.py --sizes 10000 --compare baseline.json --threshold 0.25
+
+برای هر (backend, تعداد ردیف) یک Database تازه مثل fixture های تست ساخته می‌شود
+("memory": مسیر :memory:، "file": فایل موقت با تنظیمات پیش‌فرض WAL)، با datagen پر می‌شود و
+تأخیر هر عملیات (p50/p90/p95/p99 به میکروثانیه) اندازه‌گیری می‌شود. نتیجه در فایل JSON نوشته می‌شود.
+
+حالت مقایسه: هر عملیاتی که متریک آن (پیش‌فرض p50_us) بیش از threshold نسبت به baseline کندتر شده باشد
+(و اختلاف مطلق از min_delta_us بیشتر باشد) به عنوان پسرفت گزارش می‌شود و کد خروج 1 است.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks import datagen  # noqa: E402  pylint: disable=wrong-import-position
+from controller import Controller  # noqa: E402  pylint: disable=wrong-import-position
+from db_config import DatabaseSettings  # noqa: E402  pylint: disable=wrong-import-position
+from model import Database, encode_page_cursor  # noqa: E402  pylint: disable=wrong-import-position
+from status_cache import StatusCache  # noqa: E402  pylint: disable=wrong-import-position
+
+BACKENDS = ("memory", "file")
+DEFAULT_SIZES = (10_000, 100_000)
+PERCENTILES = (50, 90, 95, 99)
+RESULT_FORMAT = 1
+
+
+class Regression(NamedTuple):
+    """یک پسرفت نسبت به baseline."""
+    key: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        """نسبت مقدار فعلی به baseline."""
+        return self.current / self.baseline if self.baseline else math.inf
+
+
+def percentile(ordered: Sequence[float], pct: float) -> float:
+    """صدک با درون‌یابی خطی روی لیست مرتب."""
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * pct / 100
+    low = math.floor(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(samples_us: List[float]) -> Dict[str, float]:
+    """خلاصه آماری نمونه‌ها (میکروثانیه)."""
+    ordered = sorted(samples_us)
+    summary: Dict[str, float] = {"n": len(ordered)}
+    for pct in PERCENTILES:
+        summary[f"p{pct}_us"] = round(percentile(ordered, pct), 2)
+    summary["mean_us"] = round(sum(ordered) / len(ordered), 2) if ordered else 0.0
+    summary["max_us"] = round(ordered[-1], 2) if ordered else 0.0
+    return summary
+
+
+def _timed(operation: Callable[[Any], Any], arguments: Sequence[Any]) -> List[float]:
+    samples: List[float] = []
+    for argument in arguments:
+        start = time.perf_counter()
+        operation(argument)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def _repeat(operation: Callable[[], Any], count: int) -> List[float]:
+    return _timed(lambda _: operation(), range(count))
+
+
+@contextmanager
+def open_database(backend: str, directory: Path, rows: int) -> Iterator[Database]:
+    """Database تازه (مثل fixture های memory_db / فایل موقت تست‌ها) پرشده با rows فاکتور مصنوعی."""
+    path = ":memory:" if backend == "memory" else str(directory / f"bench_{rows}.db")
+    Database.reset()
+    try:
+        db = Database(DatabaseSettings(path=path))
+        with Database.pool.writer() as connection:
+            datagen.populate(connection, rows)
+        yield db
+    finally:
+        Database.reset()
+        if backend == "file":
+            for suffix in ("", "-wal", "-shm"):
+                Path(path + suffix).unlink(missing_ok=True)
+
+
+def bench_dataset(
+    backend: str, rows: int, directory: Path, *, scans: int, reps: int, list_reps: int
+) -> Dict[str, Dict[str, float]]:
+    """اجرای همه عملیات روی یک دیتاست؛ {نام عملیات: خلاصه}."""
+    with open_database(backend, directory, rows) as db:
+        # کش وضعیت خاموش تا هر اسکن واقعاً به SQLite برسد
+        controller = Controller(StatusCache(capacity=0))
+        # صفحه‌ای در میانه تاریخچه: OFFSET در برابر توکن keyset همان نقطه
+        middle = rows // 2
+        deep_ts, deep_id = db.connection.execute(
+            "SELECT enter_ts, id FROM invoices ORDER BY enter_ts DESC, id DESC LIMIT 1 OFFSET ?", (middle - 1,)
+        ).fetchone()
+        deep_cursor = encode_page_cursor(deep_ts, deep_id)
+        new_numbers = [str(datagen.FIRST_INVOICE_NUMBER + rows + i) for i in range(scans)]
+        results = {
+            "add_invoice": _timed(controller.add_invoice, new_numbers),
+            "add_invoice_duplicate": _timed(controller.add_invoice, new_numbers),
+            "process_exit_invoice": _timed(controller.process_exit_invoice, new_numbers),
+            "get_invoices_page": _repeat(lambda: controller.get_invoices_page(0, 200), reps),
+            "get_invoices_page_deep": _repeat(lambda: controller.get_invoices_page(middle, 200), reps),
+            "list_invoices": _repeat(lambda: controller.list_invoices(None, 200), reps),
+            "list_invoices_deep": _repeat(lambda: controller.list_invoices(deep_cursor, 200), reps),
+            "get_weekly_data": _repeat(controller.get_weekly_data, reps),
+            "get_monthly_data": _repeat(controller.get_monthly_data, reps),
+            "get_count_invoice_enter": _repeat(controller.get_count_invoice_enter, reps),
+            "get_all_invoices": _repeat(controller.get_all_invoices, list_reps),
+        }
+    return {name: summarize(samples) for name, samples in results.items()}
+
+
+def run(
+    sizes: Sequence[int],
+    backends: Sequence[str] = BACKENDS,
+    scans: int = 300,
+    reps: int = 100,
+    list_reps: int = 3,
+) -> Dict[str, Any]:
+    """اجرای کامل؛ خروجی قابل ذخیره به JSON."""
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            for backend in backends:
+                summaries = bench_dataset(backend, rows, Path(tmp), scans=scans, reps=reps, list_reps=list_reps)
+                for operation, summary in summaries.items():
+                    results[f"{backend}/{rows}/{operation}"] = summary
+    return {
+        "format": RESULT_FORMAT,
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "sizes": list(sizes),
+            "backends": list(backends),
+            "scans": scans,
+            "reps": reps,
+            "list_reps": list_reps,
+        },
+        "results": results,
+    }
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = 0.25,
+    metric: str = "p50_us",
+    min_delta_us: float = 10.0,
+) -> List[Regression]:
+    """عملیاتی که نسبت به baseline بیش از threshold کندتر شده‌اند (فقط کلیدهای مشترک)."""
+    regressions: List[Regression] = []
+    for key, summary in sorted(current["results"].items()):
+        reference = baseline.get("results", {}).get(key)
+        if reference is None or metric not in reference or metric not in summary:
+            continue
+        before, after = float(reference[metric]), float(summary[metric])
+        if after > before * (1 + threshold) and after - before > min_delta_us:
+            regressions.append(Regression(key, metric, before, after))
+    return regressions
+
+
+def format_table(report: Dict[str, Any]) -> str:
+    """جدول متنی نتایج برای چاپ."""
+    lines = [f"{'operation':<44} {'n':>6} {'p50_us':>11} {'p95_us':>11} {'p99_us':>11}"]
+    for key, summary in report["results"].items():
+        lines.append(
+            f"{key:<44} {int(summary['n']):>6} {summary['p50_us']:>11.1f} {summary['p95_us']:>11.1f} {summary['p99_us']:>11.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--scans", type=int, default=300, help="تعداد اسکن ثبت/خروج برای هر دیتاست")
+    parser.add_argument("--reps", type=int, default=100, help="تکرار گزارش‌ها و صفحه اول جدول")
+    parser.add_argument("--list-reps", type=int, default=3, help="تکرار get_all_invoices (کل جدول)")
+    parser.add_argument("--output", type=Path, default=Path("bench_results.json"))
+    parser.add_argument("--compare", type=Path, help="فایل JSON baseline برای تشخیص پسرفت")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--metric", default="p50_us")
+    parser.add_argument("--min-delta-us", type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.backends, args.scans, args.reps, args.list_reps)
+    print(format_table(report))
+    args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"results written to {args.output}")
+
+    if args.compare is None:
+        return 0
+    baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+    regressions = compare(report, baseline, args.threshold, args.metric, args.min_delta_us)
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression.key}: {regression.metric} "
+            f"{regression.baseline:.1f} -> {regression.current:.1f} (x{regression.ratio:.2f})"
+        )
+    if not regressions:
+        print(f"no regressions against {args.compare} (threshold {args.threshold:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
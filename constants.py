@@ -10,6 +10,32 @@
 STATUS_ENTERED = "وارد شده"
 STATUS_EXITED = "خارج شده"
 
+# انواع رویداد تغییر فاکتور (Controller -> View)
+EVENT_ADDED = "added"
+EVENT_EXITED = "exited"
+EVENT_DELETED = "deleted"
+
+EVENT_RELOADED = "reloaded"  # تغییر گروهی (ورود/خروج انبوه)؛ بارگذاری دوباره جداول
+
+# انواع تغییر در صف ارسال همگام‌سازی (outbox) بین ایستگاه‌ها
+CHANGE_ENTER = "enter"
+CHANGE_EXIT = "exit"
+CHANGE_DELETE = "delete"
+
+# نتیجه هر شماره در عملیات انبوه (bulk)
+OUTCOME_REGISTERED = "registered"
+OUTCOME_ALREADY_PRESENT = "already_present"
+OUTCOME_INVALID = "invalid"
+OUTCOME_EXITED = "exited"
+OUTCOME_ALREADY_EXITED = "already_exited"
+OUTCOME_NOT_FOUND = "not_found"
+
+# حالت‌های جستجوی شماره فاکتور (Database.search_invoices)
+SEARCH_PREFIX = "prefix"
+SEARCH_SUFFIX = "suffix"
+SEARCH_SUBSTRING = "substring"
+SEARCH_MODES = (SEARCH_PREFIX, SEARCH_SUFFIX, SEARCH_SUBSTRING)
+
 # ایموجی‌ها
 EMOJI_SUCCESS = "✅"
 EMOJI_ERROR = "❌"
@@ -23,6 +49,12 @@ MSG_EXITED = "فاکتور {number} خارج شد {success}"
 MSG_STATUS_UNKNOWN = "وضعیت نامشخص برای فاکتور {number} {error}"
 MSG_CANNOT_DELETE_EXITED = "فاکتور {number} قبلاً خارج شده و قابل حذف نیست {error}"
 MSG_DELETED = "فاکتور {number} حذف شد {success}"
+MSG_EXPORTED = "{count} ردیف در {path} ذخیره شد {success}"
+MSG_EXPORT_FAILED = "خروجی گرفتن ناموفق بود: {reason} {error}"
+MSG_SCAN_FAILED = "ثبت {count} اسکن ناموفق بود: {reason} {error}"
+MSG_ARCHIVE_FAILED = "بایگانی فاکتورهای قدیمی ناموفق بود: {reason} {error}"
+MSG_SYNC_FAILED = "همگام‌سازی با مخزن مرکزی ناموفق بود: {reason} {error}"
+MSG_PAGE_FAILED = "بارگذاری فهرست فاکتورها ناموفق بود: {reason} {error}"
 
 # مجموعه‌ای از کاراکترهایی که ممکن است بعداً در تصمیم‌های UI استفاده شوند
 SUCCESS_MARK = EMOJI_SUCCESS
@@ -25,12 +25,24 @@
 
 from __future__ import annotations
 
-from typing import Optional, NamedTuple, Tuple, List, TypeAlias
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, Optional, NamedTuple, Tuple, List, TypeAlias
 
-from model import Database
+import jalali
+from model import Database, InvoicePage, InvoiceRow
+from reports import RangeReport, ReportEngine
+from status_cache import CacheStats, StatusCache
 from constants import (
     STATUS_ENTERED,
     STATUS_EXITED,
+    EVENT_ADDED,
+    EVENT_EXITED,
+    EVENT_DELETED,
+    EVENT_RELOADED,
+    OUTCOME_INVALID,
+    OUTCOME_REGISTERED,
+    OUTCOME_EXITED,
     EMOJI_SUCCESS,
     EMOJI_ERROR,
     MSG_INVALID_NUMBER,
@@ -41,27 +53,130 @@ from constants import (
     MSG_STATUS_UNKNOWN,
     MSG_CANNOT_DELETE_EXITED,
     MSG_DELETED,
+    SEARCH_SUBSTRING,
 )
 
+if TYPE_CHECKING:
+    # sync فقط با sync_path در sync_once وارد می‌شود (بیرون از مسیر راه‌اندازی)
+    from sync import SyncReport, Synchronizer
 
-class InvoiceStatus(NamedTuple):
-    """ساختار تایپی وضعیت یک فاکتور (خواناتر از tuple خام)."""
-    date_enter: str
-    time_enter: str
-    first_status: str
-    date_exit: Optional[str]
-    time_exit: Optional[str]
-    second_status: Optional[str]
+
+class InvoiceStatus:
+    """وضعیت یک فاکتور (کش وضعیت و پیام‌ها)؛ تاریخ/ساعت‌ها متن جلالی قالب‌بندی‌شده‌اند.
+
+    فقط زمان‌های عددی همان ردیف دیتابیس نگه داشته می‌شود (__slots__)؛ متن تاریخ و ساعت هنگام خواندن
+    ویژگی ساخته می‌شود، پس پر کردن کش با هزاران وضعیت چهار رشته برای هر فاکتور نمی‌سازد.
+    """
+
+    __slots__ = ("enter_ts", "first_status", "exit_ts", "second_status")
+
+    def __init__(self, enter_ts: int, first_status: str, exit_ts: Optional[int], second_status: Optional[str]) -> None:
+        self.enter_ts = enter_ts
+        self.first_status = first_status
+        self.exit_ts = exit_ts
+        self.second_status = second_status
+
+    @property
+    def date_enter(self) -> str:
+        return jalali.format_date(self.enter_ts)
+
+    @property
+    def time_enter(self) -> str:
+        return jalali.format_time(self.enter_ts)
+
+    @property
+    def date_exit(self) -> Optional[str]:
+        return None if self.exit_ts is None else jalali.format_date(self.exit_ts)
+
+    @property
+    def time_exit(self) -> Optional[str]:
+        return None if self.exit_ts is None else jalali.format_time(self.exit_ts)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, InvoiceStatus):
+            return NotImplemented
+        return (self.enter_ts, self.first_status, self.exit_ts, self.second_status) == (
+            other.enter_ts, other.first_status, other.exit_ts, other.second_status
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.enter_ts, self.first_status, self.exit_ts, self.second_status))
 
 # Type aliases برای وضوح بیشتر
 InvoiceNumber: TypeAlias = str
-InvoiceInfoRow: TypeAlias = Tuple[str, str, str, Optional[str], Optional[str], Optional[str]]
-InvoiceListRow: TypeAlias = Tuple[int, str, str, str]
-WeeklyRow: TypeAlias = Tuple[str, int, int]
-MonthlyRow: TypeAlias = Tuple[str, int]
+# (enter_ts, first_status, exit_ts, second_status)؛ زمان‌ها ثانیه epoch
+InvoiceInfoRow: TypeAlias = Tuple[int, str, Optional[int], Optional[str]]
+InvoiceListRow: TypeAlias = InvoiceRow
+# کلید روز جلالی به صورت عدد YYYYMMDD (قالب‌بندی با jalali.format_day_key)
+DayKey: TypeAlias = int
+WeeklyRow: TypeAlias = Tuple[DayKey, int, int]
+MonthlyRow: TypeAlias = Tuple[DayKey, int]
+BulkOutcomeRow: TypeAlias = Tuple[InvoiceNumber, str]
+StatsDriftRow: TypeAlias = Tuple[DayKey, Tuple[int, int, int, int], Tuple[int, int, int, int]]
+# (کلید روز، ورودی، خارج‌شده، باز)
+DailyStatsRow: TypeAlias = Tuple[DayKey, int, int, int]
+
+
+class InvoiceEvent(NamedTuple):
+    """رویداد ساختاریافته تغییر یک فاکتور برای به‌روزرسانی درجای رابط کاربری.
+
+    kind: یکی از EVENT_ADDED / EVENT_EXITED / EVENT_DELETED / EVENT_RELOADED
+    row: ردیف فاکتور بعد از تغییر (برای حذف: آخرین وضعیت قبل از حذف)؛ در EVENT_RELOADED برابر None
+    date: کلید روز ورود فاکتور؛ کلید سطر جدول هفتگی و خانه جدول ماهانه (در EVENT_RELOADED برابر None)
+    """
+    kind: str
+    row: Optional[InvoiceListRow]
+    date: Optional[DayKey]
+
+
+InvoiceEventListener: TypeAlias = Callable[[InvoiceEvent], None]
+
+# بایگانی تدریجی: اندازه هر دسته (یک تراکنش) و مکث بین دسته‌ها تا اسکن‌ها قفل نویسنده را بگیرند
+ARCHIVE_BATCH_SIZE = 500
+ARCHIVE_PAUSE_SECONDS = 0.005
+# (نوع اسکن: EVENT_ADDED برای ورود یا EVENT_EXITED برای خروج، شماره خام ورودی)
+ScanRequest: TypeAlias = Tuple[str, InvoiceNumber]
+
+
+class ScanResult(NamedTuple):
+    """نتیجه یک اسکن در process_scans (به ترتیب اسکن‌ها).
+
+    event: رویداد تغییر همان اسکن (اگر چیزی تغییر کرد)؛ منتشر نشده است تا فراخواننده با
+    publish_events روی thread خودش (مثلاً thread رابط کاربری) منتشر کند.
+    """
+    kind: str
+    number: InvoiceNumber
+    message: str
+    event: Optional[InvoiceEvent]
+
+
+# (سال، ماه) جلالی
+MonthKey: TypeAlias = Tuple[int, int]
+
+
+class MonthSummary(NamedTuple):
+    """خلاصه یک ماه جلالی برای جدول ماهانه.
+
+    entered / exited: شمارش روزهای 1 تا days (اندیس صفر روز اول)؛ closed: ماه پیش از ماه جاری است و
+    خلاصه آن در کش کنترلر نگه داشته می‌شود.
+    """
+    year: int
+    month: int
+    days: int
+    entered: Tuple[int, ...]
+    exited: Tuple[int, ...]
+    closed: bool
+
+    @property
+    def total_entered(self) -> int:
+        return sum(self.entered)
+
+    @property
+    def total_exited(self) -> int:
+        return sum(self.exited)
 
 # کلاس کنترلر
-class Controller:
+class Controller:  # pylint: disable=too-many-public-methods
     """کنترلر بین لایه رابط کاربری و پایگاه داده.
 
     وظایف:
@@ -70,21 +185,198 @@ class Controller:
         - منطق ورود / خروج و حذف
     """
 
-    def __init__(self) -> None:
+    def __init__(self, status_cache: Optional[StatusCache[int, InvoiceStatus]] = None) -> None:
         self.db = Database()
+        self._listeners: List[InvoiceEventListener] = []
+        # کش وضعیت شماره‌های پرتکرار جلوی Database؛ StatusCache(capacity=0) یعنی خاموش
+        self.status_cache: StatusCache[int, InvoiceStatus] = status_cache if status_cache is not None else StatusCache()
+        # رویدادهای جمع‌شده process_scans روی thread جاری (به جای فراخوانی شنونده‌ها)
+        self._captured = threading.local()
+        # گزارش‌های بازه‌ای با کش خلاصه روزهای بسته
+        self.reports = ReportEngine(self.db)
+        # خلاصه ماه‌های بسته برای مرور تاریخچه؛ نسل با هر باطل‌سازی بالا می‌رود تا واکشی هم‌زمان کهنه ذخیره نشود
+        self._month_lock = threading.Lock()
+        self._month_cache: Dict[MonthKey, MonthSummary] = {}
+        self._month_generation = 0
+        # همگام‌سازی با مخزن مرکزی (ساخت تنبل در اولین sync_once، روی thread کارگر؛ همان‌جا outbox یک بار
+        # همراه سابقه فعلی پر می‌شود و پرچم sync_state['outbox'] تکرار آن را در اجراهای بعد بی‌اثر می‌کند)
+        self._sync_lock = threading.Lock()
+        self._synchronizer: Optional[Synchronizer] = None
+
+    # ---------------------- events ----------------------
+    def subscribe(self, listener: InvoiceEventListener) -> None:
+        """ثبت شنونده رویدادهای تغییر فاکتور."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener: InvoiceEventListener) -> None:
+        """حذف شنونده ثبت‌شده (در صورت وجود)."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _emit(self, kind: str, row: Optional[InvoiceListRow]) -> None:
+        if row is None:
+            return
+        self._publish(InvoiceEvent(kind, row, row.enter_day))
+
+    def _publish(self, event: InvoiceEvent) -> None:
+        # تغییر روزهای ماه بسته (مثلاً حذف فاکتور باز قدیمی) خلاصه همان ماه را باطل می‌کند
+        if event.date is None:
+            self.invalidate_months()
+        elif event.date // 100 < jalali.today_key() // 100:
+            self.invalidate_months((event.date // 10000, event.date // 100 % 100))
+        captured = getattr(self._captured, "events", None)
+        if captured is not None:
+            captured.append(event)
+            return
+        for listener in list(self._listeners):
+            listener(event)
+
+    def publish_events(self, events: Iterable[Optional[InvoiceEvent]]) -> None:
+        """انتشار رویدادهای برگشتی process_scans برای شنونده‌ها (None ها نادیده گرفته می‌شوند)."""
+        for event in events:
+            if event is not None:
+                self._publish(event)
 
     def add_invoice(self, invoice_number: InvoiceNumber) -> str:
         """ثبت فاکتور جدید یا بازگرداندن وضعیت قبلی."""
         norm = self._normalize_invoice_number(invoice_number)
         if not self._is_valid_invoice_number(norm):
             return MSG_INVALID_NUMBER
-        existing: Optional[InvoiceInfoRow] = self.db.get_invoice_info(norm)  # type: ignore[assignment]
-        if existing is not None:
-            date_enter, time_enter, first_status, date_exit, time_exit, second_status = existing
-            status = InvoiceStatus(date_enter, time_enter, first_status, date_exit, time_exit, second_status)
-            return self._format_invoice_status_message(norm, status)
-        self.db.add_invoice(norm)
-        return MSG_REGISTERED.format(number=norm, success=EMOJI_SUCCESS)
+        cached = self.status_cache.get(self._cache_key(norm))
+        if cached is not None and cached.second_status == STATUS_EXITED:
+            # اسکن تکراری فاکتور خارج‌شده (وضعیت نهایی): پیام بدون رفتن به دیتابیس. وضعیت «ورود» کش
+            # ممکن است کهنه باشد (حذف در ایستگاه دیگر روی همان فایل)، پس درج اتمی همیشه اجرا می‌شود
+            return self._format_invoice_status_message(norm, cached)
+        row = self.db.add_invoice(norm)
+        if row is not None:
+            self.status_cache.put(self._cache_key(norm), self._row_status(row))
+            self._emit(EVENT_ADDED, row)
+            return MSG_REGISTERED.format(number=norm, success=EMOJI_SUCCESS)
+        # فقط در حالت تکراری وضعیت قبلی برای پیام خوانده می‌شود
+        existing = self._load_status(norm)
+        if existing is None:
+            # بین دو دستور در ایستگاه دیگری حذف شده است
+            return MSG_NOT_FOUND.format(number=norm, error=EMOJI_ERROR)
+        return self._format_invoice_status_message(norm, existing)
+
+    def add_invoices_bulk(self, invoice_numbers: Iterable[InvoiceNumber]) -> List[BulkOutcomeRow]:
+        """ثبت انبوه شماره‌ها در یک تراکنش.
+
+        خروجی: (شماره نرمال‌شده، نتیجه) به ترتیب ورودی؛ نتیجه یکی از
+        OUTCOME_REGISTERED / OUTCOME_ALREADY_PRESENT / OUTCOME_INVALID است.
+        """
+        return self._run_bulk(invoice_numbers, self.db.add_invoices_bulk, OUTCOME_REGISTERED)
+
+    def process_exit_bulk(self, invoice_numbers: Iterable[InvoiceNumber]) -> List[BulkOutcomeRow]:
+        """ثبت خروج انبوه در یک تراکنش.
+
+        خروجی: (شماره نرمال‌شده، نتیجه) به ترتیب ورودی؛ نتیجه یکی از
+        OUTCOME_EXITED / OUTCOME_ALREADY_EXITED / OUTCOME_NOT_FOUND / OUTCOME_INVALID است.
+        """
+        return self._run_bulk(invoice_numbers, self.db.process_exit_bulk, OUTCOME_EXITED)
+
+    def process_scans(self, scans: Iterable[ScanRequest]) -> List[ScanResult]:
+        """پردازش دسته‌ای اسکن‌ها به ترتیب و در یک تراکنش (صف اسکن در بارکدخوانی پشت سر هم).
+
+        هر اسکن همان منطق add_invoice / process_exit_invoice / delete_invoice را دارد (پیام‌ها یکسان‌اند)، اما کل دسته
+        یک commit است. رویدادها منتشر نمی‌شوند و در ScanResult.event برمی‌گردند. در صورت خطا کل دسته
+        rollback می‌شود و استثنا بالا می‌رود.
+        """
+        operations = {
+            EVENT_ADDED: self.add_invoice,
+            EVENT_EXITED: self.process_exit_invoice,
+            EVENT_DELETED: self.delete_invoice,
+        }
+        requests = list(scans)
+        for kind, _ in requests:
+            if kind not in operations:
+                raise ValueError(f"نوع اسکن نامعتبر: {kind}")
+        results: List[ScanResult] = []
+        events: List[InvoiceEvent] = []
+        self._captured.events = events
+        try:
+            with self.db.batch():
+                for kind, number in requests:
+                    message = operations[kind](number)
+                    results.append(ScanResult(kind, number, message, events[-1] if events else None))
+                    events.clear()
+        except BaseException:
+            # وضعیت‌های write-through این دسته commit نشده‌اند
+            self.status_cache.invalidate_many(
+                self._cache_key(norm)
+                for norm in (self._normalize_invoice_number(n) for _, n in requests)
+                if self._is_valid_invoice_number(norm)
+            )
+            raise
+        finally:
+            self._captured.events = None
+        return results
+
+    def archive_enabled(self) -> bool:
+        """آیا بایگانی دوره‌ای روشن است (settings.archive_days > 0؛ پیش‌فرض خاموش)."""
+        return self.db.settings.archive_days > 0
+
+    def archive_old_invoices(
+        self,
+        days: Optional[int] = None,
+        batch_size: int = ARCHIVE_BATCH_SIZE,
+        max_batches: Optional[int] = None,
+        cancelled: Optional[Callable[[], bool]] = None,
+    ) -> int:
+        """انتقال تدریجی فاکتورهای خارج‌شده پیش از days روز اخیر به بایگانی (پیش‌فرض: settings.archive_days).
+
+        هر دسته تراکنش جدای خودش است و بین دسته‌ها قفل نویسنده آزاد می‌شود؛ اجرا روی thread کارگر اسکن‌ها
+        را مسدود نمی‌کند. اگر cancelled() درست شود (بستن پنجره) اجرا بعد از دسته جاری متوقف می‌شود. وضعیت و
+        گزارش‌ها تغییر نمی‌کنند (جستجو و لیست بایگانی را هم می‌بینند)، پس رویدادی منتشر نمی‌شود. خروجی: تعداد فاکتورهای منتقل‌شده.
+        """
+        days = self.db.settings.archive_days if days is None else days
+        if days <= 0:
+            return 0
+        before_ts = jalali.day_start_ts(jalali.shift_day_key(jalali.today_key(), -days))
+        moved = batches = 0
+        while max_batches is None or batches < max_batches:
+            count = self.db.archive_exited(before_ts, batch_size)
+            moved += count
+            batches += 1
+            if count < batch_size or (cancelled is not None and cancelled()):
+                break
+            time.sleep(ARCHIVE_PAUSE_SECONDS)
+        return moved
+
+    # ---------------------- همگام‌سازی ایستگاه‌ها ----------------------
+    def sync_enabled(self) -> bool:
+        """آیا مخزن مرکزی (settings.sync_path) تنظیم شده است."""
+        return bool(self.db.settings.sync_path)
+
+    def sync_once(self) -> SyncReport:
+        """یک دور ارسال / دریافت با مخزن مرکزی (روی thread کارگر؛ اسکن‌ها منتظر آن نمی‌مانند).
+
+        دور اول outbox را فعال و با سابقه موجود پر می‌کند (فقط یک بار برای هر دیتابیس)؛ اسکن‌های پیش از آن در
+        همین سابقه هستند.
+
+        کش وضعیت شماره‌های تغییرکرده پاک می‌شود. رویدادی منتشر نمی‌شود: اگر report.changed خالی نیست
+        فراخواننده روی thread خودش EVENT_RELOADED منتشر می‌کند. بدون sync_path: ValueError.
+        """
+        with self._sync_lock:
+            if self._synchronizer is None:
+                settings = self.db.settings
+                if not settings.sync_path:
+                    raise ValueError("sync_path تنظیم نشده است")
+                # pylint: disable-next=import-outside-toplevel
+                from sync import CentralStore, Synchronizer, station_id
+                store = CentralStore(settings.sync_path, settings.busy_timeout)
+                self._synchronizer = Synchronizer(self.db, store, station_id(self.db))
+            report = self._synchronizer.sync_once()
+        self.status_cache.invalidate_many(report.changed)
+        if report.changed:
+            # ورودهای ایستگاه‌های دیگر ممکن است در ماه‌های گذشته باشند
+            self.invalidate_months()
+        return report
+
+    def count_rows(self) -> Tuple[int, int]:
+        """(ردیف‌های جدول کاری، ردیف‌های بایگانی)."""
+        return self.db.count_rows()
 
     def get_count_invoice_enter(self) -> int:
         """تعداد فاکتورهای در وضعیت ورود."""
@@ -95,48 +387,214 @@ class Controller:
         norm = self._normalize_invoice_number(invoice_number)
         if not self._is_valid_invoice_number(norm):
             return MSG_INVALID_NUMBER
-        status_tuple: Optional[InvoiceInfoRow] = self.db.get_invoice_status(norm)  # type: ignore[assignment]
-        if status_tuple is None:
+        cached = self.status_cache.get(self._cache_key(norm))
+        if cached is not None and cached.second_status == STATUS_EXITED:
+            return self._format_invoice_status_message(norm, cached)
+        row = self.db.update_invoice_exit(norm)
+        if row is not None:
+            self.status_cache.put(self._cache_key(norm), self._row_status(row))
+            self._emit(EVENT_EXITED, row)
+            return MSG_EXITED.format(number=norm, success=EMOJI_SUCCESS)
+        # خروج انجام نشد: علت از وضعیت فعلی خوانده می‌شود
+        status = self._load_status(norm)
+        if status is None:
             return MSG_NOT_FOUND.format(number=norm, error=EMOJI_ERROR)
-        date_enter, time_enter, first_status, date_exit, time_exit, second_status = status_tuple
-        status = InvoiceStatus(date_enter, time_enter, first_status, date_exit, time_exit, second_status)
         if status.second_status == STATUS_EXITED:
             return self._format_invoice_status_message(norm, status)
-        if status.first_status == STATUS_ENTERED:
-            self.db.update_invoice_exit(norm)
-            return MSG_EXITED.format(number=norm, success=EMOJI_SUCCESS)
         return MSG_STATUS_UNKNOWN.format(number=norm, error=EMOJI_ERROR)
 
     def get_all_invoices(self) -> List[InvoiceListRow]:
-        """همه فاکتورها (زمان نزولی)."""
-        return self.db.get_all_invoices()  # type: ignore[return-value]
+        """همه فاکتورها (زمان نزولی) همراه با تاریخ/ساعت خروج."""
+        return self.db.get_all_invoices()
+
+    def get_invoices_page(self, offset: int, limit: int) -> List[InvoiceListRow]:
+        """یک صفحه از فاکتورها (زمان نزولی) برای بارگذاری تنبل جدول."""
+        return self.db.get_invoices_page(offset, limit)
+
+    def list_invoices(  # pylint: disable=too-many-arguments
+        self,
+        after_cursor: Optional[str] = None,
+        limit: int = 200,
+        *,
+        status: Optional[str] = None,
+        date_from: Optional[DayKey] = None,
+        date_to: Optional[DayKey] = None,
+        number_prefix: Optional[str] = None,
+    ) -> InvoicePage:
+        """یک صفحه از فاکتورها (جدیدترین اول) با توکن ادامه؛ هزینه هر صفحه ثابت (keyset، بدون OFFSET).
+
+        after_cursor: next_cursor صفحه قبل (None برای صفحه اول)؛ توکن نامعتبر ValueError می‌دهد.
+        status: STATUS_ENTERED یا STATUS_EXITED؛ date_from / date_to: کلید روز ورود؛ number_prefix: پیشوند رقمی.
+        """
+        return self.db.list_invoices(
+            after_cursor,
+            limit,
+            status=status,
+            date_from=date_from,
+            date_to=date_to,
+            number_prefix=self._normalize_invoice_number(number_prefix) if number_prefix else None,
+        )
+
+    def search_invoices(
+        self, text: str, mode: str = SEARCH_SUBSTRING, limit: int = 20, after_cursor: Optional[str] = None
+    ) -> InvoicePage:
+        """فاکتورهایی که شماره‌شان با text شروع / تمام می‌شود یا آن را در بر دارد (تازه‌ترین اول، صفحه‌ای).
+
+        برای بارکد ناقص یا ناخوانا؛ متن غیررقمی یا خالی صفحه خالی برمی‌گرداند.
+        """
+        norm = self._normalize_invoice_number(text)
+        if not self._is_valid_invoice_number(norm):
+            return InvoicePage([], None)
+        return self.db.search_invoices(norm, mode, limit, after_cursor)
+
+    def iter_invoices(self, start_day: Optional[DayKey] = None, end_day: Optional[DayKey] = None) -> Iterator[InvoiceListRow]:
+        """پیمایش جریانی فاکتورهای بازه روز ورود (قدیم به جدید) برای خروجی گرفتن؛ بدون ساخت لیست کامل."""
+        return self.db.iter_invoices(start_day, end_day)
+
+    def iter_daily_stats(self, start_day: Optional[DayKey] = None, end_day: Optional[DayKey] = None) -> Iterator[DailyStatsRow]:
+        """پیمایش خلاصه روزانه بازه (قدیم به جدید)."""
+        return self.db.iter_daily_stats(start_day, end_day)
+
+    def get_invoice_status(self, invoice_number: InvoiceNumber) -> Optional[InvoiceStatus]:
+        """وضعیت فاکتور با تاریخ/ساعت قالب‌بندی‌شده جلالی (یا None)."""
+        norm = self._normalize_invoice_number(invoice_number)
+        if not self._is_valid_invoice_number(norm):
+            return None
+        cached = self.status_cache.get(self._cache_key(norm))
+        return cached if cached is not None else self._load_status(norm)
+
+    def warm_status_cache(self, days: int = 3) -> int:
+        """پر کردن کش وضعیت با فاکتورهای ورودی days روز اخیر (جدیدترین‌ها)؛ تعداد موارد درج‌شده."""
+        if not self.status_cache.enabled:
+            return 0
+        since = jalali.shift_day_key(jalali.today_key(), -days)
+        rows = self.db.get_recent_statuses(since, self.status_cache.capacity)
+        return self.status_cache.put_many(
+            (number, InvoiceStatus(enter_ts, first_status, exit_ts, second_status))
+            for number, enter_ts, first_status, exit_ts, second_status in rows
+        )
+
+    def status_cache_stats(self) -> CacheStats:
+        """شمارنده‌های hit/miss کش وضعیت."""
+        return self.status_cache.stats()
+
+    def get_invoice_row(self, invoice_number: InvoiceNumber) -> Optional[InvoiceListRow]:
+        """ردیف لیست یک فاکتور برای به‌روزرسانی درجای جدول (یا None)."""
+        norm = self._normalize_invoice_number(invoice_number)
+        if not self._is_valid_invoice_number(norm):
+            return None
+        return self.db.get_invoice_row(norm)
 
     def get_weekly_data(self) -> List[WeeklyRow]:
         """خلاصه هفتگی ورود/خروج."""
-        return self.db.get_weekly_summary()  # type: ignore[return-value]
+        return self.db.get_weekly_summary()
 
     def get_monthly_data(self) -> List[MonthlyRow]:
         """خلاصه ماهانه ورود."""
-        return self.db.get_monthly_summary()  # type: ignore[return-value]
+        return self.db.get_monthly_summary()
+
+    def get_month_summary(self, year: int, month: int) -> MonthSummary:
+        """خلاصه ماه جلالی year/month؛ ماه‌های بسته یک بار از daily_stats خوانده و سپس از کش داده می‌شوند."""
+        cached = self.cached_month_summary(year, month)
+        if cached is not None:
+            return cached
+        current = jalali.today_key() // 100
+        closed = year * 100 + month < current
+        with self._month_lock:
+            generation = self._month_generation
+        days = jalali.month_length(year, month)
+        entered = [0] * days
+        exited = [0] * days
+        for day, day_entered, day_exited in self.db.get_month_summary(year, month):
+            if day % 100 <= days:
+                entered[day % 100 - 1] = day_entered
+                exited[day % 100 - 1] = day_exited
+        summary = MonthSummary(year, month, days, tuple(entered), tuple(exited), closed)
+        if closed:
+            with self._month_lock:
+                if generation == self._month_generation:
+                    self._month_cache[(year, month)] = summary
+        return summary
+
+    def cached_month_summary(self, year: int, month: int) -> Optional[MonthSummary]:
+        """خلاصه ماه بسته از کش (بدون دسترسی به دیتابیس) یا None."""
+        with self._month_lock:
+            return self._month_cache.get((year, month))
+
+    def prefetch_months(self, year: int, month: int) -> int:
+        """بارگذاری ماه‌های مجاور year/month (ماه و سال قبل و بعد) در کش؛ تعداد ماه‌های تازه خوانده‌شده.
+
+        برای اجرا روی thread کارگر تا ورق زدن تاریخچه در رابط کاربری از کش پاسخ بگیرد.
+        """
+        current = jalali.today_key() // 100
+        loaded = 0
+        for delta in (-1, 1, -12, 12):
+            neighbour = jalali.shift_month(year, month, delta)
+            if neighbour[0] * 100 + neighbour[1] < current and self.cached_month_summary(*neighbour) is None:
+                self.get_month_summary(*neighbour)
+                loaded += 1
+        return loaded
+
+    def invalidate_months(self, *months: MonthKey) -> None:
+        """باطل کردن خلاصه ماه‌های داده‌شده در کش (بدون آرگومان: همه ماه‌ها)."""
+        with self._month_lock:
+            self._month_generation += 1
+            if not months:
+                self._month_cache.clear()
+            for key in months:
+                self._month_cache.pop(key, None)
+
+    def get_range_report(self, start_day: DayKey, end_day: DayKey) -> RangeReport:
+        """صدک ماندگاری، ورود ساعتی و بار روزهای هفته برای روزهای start_day..end_day."""
+        return self.reports.range_report(start_day, end_day)
+
+    def rebuild_daily_stats(self) -> int:
+        """بازسازی جدول خلاصه روزانه از روی فاکتورها؛ تعداد روزها."""
+        try:
+            return self.db.rebuild_daily_stats()
+        finally:
+            self.invalidate_months()
+
+    def verify_daily_stats(self) -> List[StatsDriftRow]:
+        """روزهایی که خلاصه روزانه با شمارش مستقیم فاکتورها اختلاف دارد."""
+        return self.db.verify_daily_stats()
 
     def delete_invoice(self, invoice_number: InvoiceNumber) -> str:
         """حذف فاکتور اگر خارج نشده باشد."""
         norm = self._normalize_invoice_number(invoice_number)
         if not self._is_valid_invoice_number(norm):
             return MSG_INVALID_NUMBER
-        if not self.db.invoice_exists(norm):
-            return MSG_NOT_FOUND.format(number=norm, error=EMOJI_ERROR)
-        status_tuple: Optional[InvoiceInfoRow] = self.db.get_invoice_status(norm)  # type: ignore[assignment]
-        if status_tuple is not None:
-            date_enter, time_enter, first_status, date_exit, time_exit, second_status = status_tuple
-            status = InvoiceStatus(date_enter, time_enter, first_status, date_exit, time_exit, second_status)
-            if status.second_status == STATUS_EXITED:
-                return MSG_CANNOT_DELETE_EXITED.format(number=norm, error=EMOJI_ERROR)
-        if self.db.delete_invoice(norm) is False:
+        cached = self.status_cache.get(self._cache_key(norm))
+        if cached is not None and cached.second_status == STATUS_EXITED:
             return MSG_CANNOT_DELETE_EXITED.format(number=norm, error=EMOJI_ERROR)
-        return MSG_DELETED.format(number=norm, success=EMOJI_SUCCESS)
+        row = self.db.delete_open_invoice(norm)
+        if row is not None:
+            self.status_cache.invalidate(self._cache_key(norm))
+            self._emit(EVENT_DELETED, row)
+            return MSG_DELETED.format(number=norm, success=EMOJI_SUCCESS)
+        if self._load_status(norm) is None:
+            return MSG_NOT_FOUND.format(number=norm, error=EMOJI_ERROR)
+        return MSG_CANNOT_DELETE_EXITED.format(number=norm, error=EMOJI_ERROR)
 
     # ---------------------- helpers ----------------------
+    def _run_bulk(
+        self,
+        invoice_numbers: Iterable[InvoiceNumber],
+        operation: Callable[[Iterable[str]], List[BulkOutcomeRow]],
+        changed_outcome: str,
+    ) -> List[BulkOutcomeRow]:
+        normalized = [self._normalize_invoice_number(n) for n in invoice_numbers]
+        valid = [n for n in normalized if self._is_valid_invoice_number(n)]
+        results = iter(operation(valid)) if valid else iter(())
+        # وضعیت شماره‌های دسته ممکن است عوض شده باشد؛ بار بعد از دیتابیس خوانده می‌شوند
+        self.status_cache.invalidate_many(self._cache_key(n) for n in valid)
+        report: List[BulkOutcomeRow] = [
+            next(results) if self._is_valid_invoice_number(n) else (n, OUTCOME_INVALID) for n in normalized
+        ]
+        if any(outcome == changed_outcome for _, outcome in report):
+            self._publish(InvoiceEvent(EVENT_RELOADED, None, None))
+        return report
+
     def _normalize_invoice_number(self, invoice_number: str) -> str:
         """نرمال‌سازی ورودی (امکان توسعه برای حذف کاراکترهای غیرعددی)."""
         return invoice_number.strip()
@@ -145,6 +603,33 @@ class Controller:
         """اعتبارسنجی ساده: فقط ارقام و حداقل طول 1."""
         return bool(invoice_number) and invoice_number.isdigit()
 
+    @staticmethod
+    def _cache_key(norm: InvoiceNumber) -> int:
+        """کلید کش وضعیت: مقدار عددی شماره معتبر (همان مقدار ستون invoice_number)."""
+        return int(norm)
+
+    def _load_status(self, norm: InvoiceNumber) -> Optional[InvoiceStatus]:
+        """خواندن وضعیت از دیتابیس و همگام کردن کش (نبودن فاکتور = حذف از کش)."""
+        info = self.db.get_invoice_info(norm)
+        if info is None:
+            self.status_cache.invalidate(self._cache_key(norm))
+            return None
+        status = self._to_invoice_status(info)
+        self.status_cache.put(self._cache_key(norm), status)
+        return status
+
+    @staticmethod
+    def _row_status(row: InvoiceListRow) -> InvoiceStatus:
+        """وضعیت متناظر ردیف برگشتی دستورهای RETURNING (برای write-through کش)."""
+        if row.exit_ts is None:
+            return InvoiceStatus(row.enter_ts, row.status, None, None)
+        return InvoiceStatus(row.enter_ts, STATUS_ENTERED, row.exit_ts, row.status)
+
+    @staticmethod
+    def _to_invoice_status(info: InvoiceInfoRow) -> InvoiceStatus:
+        """وضعیت از ردیف (enter_ts, first_status, exit_ts, second_status)؛ قالب‌بندی جلالی هنگام خواندن."""
+        return InvoiceStatus(*info)
+
     def _format_invoice_status_message(self, number: InvoiceNumber, status: InvoiceStatus) -> str:
         """ساخت پیام قابل نمایش بر اساس وضعیت فعلی."""
         if status.second_status == STATUS_EXITED and status.date_exit and status.time_exit:
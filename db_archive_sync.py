@@ -0,0 +1,167 @@
+# db_archive_sync.py
+"""دستورهای بایگانی و همگام‌سازی روی یک اتصال نویسنده (داخل تراکنشی که Database باز کرده است).
+
+- archive_exited: انتقال یک دسته فاکتور خارج‌شده قدیمی از invoices به invoices_archive (id حفظ می‌شود)
+- station_uuid: شناسه پایدار همین فایل دیتابیس (بخشی از کلید ایستگاه در مخزن مرکزی)
+- enable_outbox: پر کردن اولیه صف ارسال با سابقه همین ایستگاه
+- apply_changes: اعمال تغییرهای ایستگاه‌های دیگر با حل تعارض برای هر فاکتور
+"""
+
+import sqlite3
+import uuid
+from typing import List, NamedTuple, Optional, Sequence
+
+import jalali
+from constants import CHANGE_DELETE, CHANGE_ENTER, CHANGE_EXIT, STATUS_ENTERED, STATUS_EXITED
+from db_rows import chunks
+
+
+class SyncChange(NamedTuple):
+    """یک تغییر قابل همگام‌سازی: وضعیت فاکتور بعد از تغییر (نه فقط نوع عملیات).
+
+    (station, station_seq) کلید یکتای تغییر در مخزن مرکزی است (ارسال دوباره بی‌اثر است).
+    op: CHANGE_ENTER / CHANGE_EXIT / CHANGE_DELETE؛ برای حذف، enter_ts همان ورود حذف‌شده است.
+    """
+    station: str
+    station_seq: int
+    invoice_number: int
+    op: str
+    enter_ts: int
+    exit_ts: Optional[int]
+    ts: int
+
+
+def archive_exited(connection: sqlite3.Connection, before_ts: int, limit: int, archived_ts: int) -> int:
+    """انتقال حداکثر limit فاکتور خارج‌شده پیش از before_ts، قدیمی‌ترین ورودها اول؛ تعداد منتقل‌شده.
+
+    پیمایش روی ایندکس idx_invoices_enter_ts؛ daily_stats و ایندکس جستجو تغییر نمی‌کنند (trigger های حذف
+    ردیفی را که همان لحظه در بایگانی است نادیده می‌گیرند).
+    """
+    ids = [
+        int(r[0])
+        for r in connection.execute(
+            """
+            SELECT id FROM invoices
+            WHERE enter_ts < ? AND exit_ts < ?
+            ORDER BY enter_ts ASC, id ASC
+            LIMIT ?
+            """,
+            (before_ts, before_ts, limit),
+        )
+    ]
+    for chunk in chunks(ids):
+        marks = ",".join("?" * len(chunk))
+        connection.execute(
+            f"""
+            INSERT INTO invoices_archive
+                (id, invoice_number, enter_ts, enter_day, first_status, exit_ts, exit_day, second_status,
+                 archived_ts)
+            SELECT id, invoice_number, enter_ts, enter_day, first_status, exit_ts, exit_day, second_status, ?
+            FROM invoices WHERE id IN ({marks})
+            """,
+            (archived_ts, *chunk),
+        )
+        connection.execute(f"DELETE FROM invoices WHERE id IN ({marks})", chunk)
+    return len(ids)
+
+
+def station_uuid(connection: sqlite3.Connection) -> str:
+    """UUID این فایل دیتابیس؛ بار اول ساخته و در sync_state['station'] ذخیره می‌شود.
+
+    ستون value از نوع INTEGER است ولی UUID خط‌دار هرگز عدد معتبر نیست و به شکل متن ذخیره می‌شود.
+    """
+    connection.execute("INSERT OR IGNORE INTO sync_state (key, value) VALUES ('station', ?)", (str(uuid.uuid4()),))
+    return str(connection.execute("SELECT value FROM sync_state WHERE key = 'station'").fetchone()[0])
+
+
+def enable_outbox(connection: sqlite3.Connection) -> int:
+    """فعال کردن outbox اگر فعال نیست و افزودن همه فاکتورهای موجود به صف؛ تعداد تغییرهای اضافه‌شده."""
+    if connection.execute("SELECT 1 FROM sync_state WHERE key = 'outbox'").fetchone() is not None:
+        return 0
+    cursor = connection.execute(
+        f"""
+        INSERT INTO outbox (invoice_number, op, enter_ts, exit_ts, ts)
+        SELECT invoice_number, CASE WHEN exit_ts IS NULL THEN '{CHANGE_ENTER}' ELSE '{CHANGE_EXIT}' END,
+               enter_ts, exit_ts, COALESCE(exit_ts, enter_ts)
+        FROM (
+            SELECT id, invoice_number, enter_ts, exit_ts FROM invoices
+            UNION ALL
+            SELECT id, invoice_number, enter_ts, exit_ts FROM invoices_archive
+        )
+        ORDER BY enter_ts, id
+        """
+    )
+    connection.execute("INSERT INTO sync_state (key, value) VALUES ('outbox', 1)")
+    return cursor.rowcount
+
+
+def apply_changes(connection: sqlite3.Connection, changes: Sequence[SyncChange], pulled_seq: int) -> List[int]:
+    """اعمال changes و ثبت pulled_seq؛ شماره فاکتورهایی که تغییر کردند (یکتا، به ترتیب اولین تغییر).
+
+    ثبت در outbox در طول اعمال خاموش است (تغییرهای دریافتی به مخزن برنمی‌گردند).
+    """
+    changed: List[int] = []
+    connection.execute("UPDATE sync_state SET value = 0 WHERE key = 'outbox'")
+    for change in changes:
+        if _apply_change(connection, change):
+            changed.append(change.invoice_number)
+    connection.execute("UPDATE sync_state SET value = 1 WHERE key = 'outbox'")
+    connection.execute(
+        """
+        INSERT INTO sync_state (key, value) VALUES ('pulled_seq', ?)
+        ON CONFLICT (key) DO UPDATE SET value = excluded.value
+        """,
+        (pulled_seq,),
+    )
+    return list(dict.fromkeys(changed))
+
+
+def _apply_change(connection: sqlite3.Connection, change: SyncChange) -> bool:
+    number = change.invoice_number
+    if change.op == CHANGE_DELETE:
+        cursor = connection.execute(
+            "DELETE FROM invoices WHERE invoice_number = ? AND exit_ts IS NULL AND enter_ts <= ?",
+            (number, change.enter_ts),
+        )
+    elif change.op == CHANGE_ENTER:
+        cursor = connection.execute(
+            """
+            INSERT INTO invoices (invoice_number, enter_ts, enter_day, first_status)
+            SELECT ?, ?, ?, ?
+            WHERE NOT EXISTS (SELECT 1 FROM invoices_archive WHERE invoice_number = ?)
+            ON CONFLICT (invoice_number) DO UPDATE SET enter_ts = excluded.enter_ts, enter_day = excluded.enter_day
+            WHERE excluded.enter_ts < invoices.enter_ts
+            """,
+            (number, change.enter_ts, jalali.day_key(change.enter_ts), STATUS_ENTERED, number),
+        )
+    elif change.op == CHANGE_EXIT and change.exit_ts is not None:
+        cursor = connection.execute(
+            """
+            INSERT INTO invoices (invoice_number, enter_ts, enter_day, first_status, exit_ts, exit_day, second_status)
+            SELECT ?, ?, ?, ?, ?, ?, ?
+            WHERE NOT EXISTS (SELECT 1 FROM invoices_archive WHERE invoice_number = ?)
+            ON CONFLICT (invoice_number) DO UPDATE SET
+                enter_ts = MIN(invoices.enter_ts, excluded.enter_ts),
+                enter_day = CASE WHEN excluded.enter_ts < invoices.enter_ts THEN excluded.enter_day
+                                 ELSE invoices.enter_day END,
+                exit_ts = MIN(COALESCE(invoices.exit_ts, excluded.exit_ts), excluded.exit_ts),
+                exit_day = CASE WHEN invoices.exit_ts IS NULL OR excluded.exit_ts < invoices.exit_ts
+                                THEN excluded.exit_day ELSE invoices.exit_day END,
+                second_status = excluded.second_status
+            WHERE invoices.exit_ts IS NULL OR excluded.exit_ts < invoices.exit_ts
+                OR excluded.enter_ts < invoices.enter_ts
+            """,
+            (
+                number,
+                change.enter_ts,
+                jalali.day_key(change.enter_ts),
+                STATUS_ENTERED,
+                change.exit_ts,
+                jalali.day_key(change.exit_ts),
+                STATUS_EXITED,
+                number,
+            ),
+        )
+    else:
+        raise ValueError(f"نوع تغییر نامعتبر: {change.op}")
+    return cursor.rowcount > 0
@@ -0,0 +1,151 @@
+# db_config.py
+"""پیکربندی اتصال SQLite: مسیر دیتابیس و PRAGMA های کارایی.
+
+ترتیب اولویت (هر مرحله قبلی را بازنویسی می‌کند):
+    1. مقادیر پیش‌فرض (پروفایل تنظیم‌شده: WAL + synchronous=NORMAL)
+    2. فایل پیکربندی INI (مسیر از متغیر INVOICE_DB_CONFIG یا invoice_management.ini در پوشه جاری)
+    3. متغیرهای محیطی INVOICE_DB_PATH, INVOICE_DB_JOURNAL_MODE, INVOICE_DB_SYNCHRONOUS,
+       INVOICE_DB_CACHE_SIZE, INVOICE_DB_MMAP_SIZE, INVOICE_DB_TEMP_STORE, INVOICE_DB_BUSY_TIMEOUT,
+       INVOICE_DB_READ_CONNECTIONS, INVOICE_DB_ARCHIVE_DAYS, INVOICE_DB_SYNC_PATH, INVOICE_DB_STATION_ID
+
+نمونه فایل invoice_management.ini:
+    [database]
+    path = D:/data/invoices.db
+    journal_mode = WAL
+    synchronous = NORMAL
+    cache_size = -16000
+    mmap_size = 268435456
+    temp_store = MEMORY
+    read_connections = 4
+    archive_days = 90
+    sync_path = //server/share/invoices_central.db
+    station_id = receiving-1
+"""
+
+from __future__ import annotations
+
+import configparser
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, Mapping, NamedTuple, Optional
+
+CONFIG_ENV = "INVOICE_DB_CONFIG"
+CONFIG_FILENAME = "invoice_management.ini"
+CONFIG_SECTION = "database"
+ENV_PREFIX = "INVOICE_DB_"
+
+# مقادیر مجاز PRAGMA ها (PRAGMA پارامتر ? نمی‌پذیرد؛ پس فقط مقادیر شناخته‌شده اعمال می‌شوند)
+JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+TEMP_STORES = ("DEFAULT", "FILE", "MEMORY")
+
+
+class DatabaseSettings(NamedTuple):
+    """تنظیمات اتصال؛ cache_size منفی یعنی KiB (مثلاً -16000 ≈ 16MB).
+
+    read_connections: حداکثر اتصال‌های خواننده در ConnectionPool (کنار یک اتصال نویسنده).
+    archive_days: فاکتورهای خارج‌شده قدیمی‌تر از این تعداد روز به invoices_archive منتقل می‌شوند (0 = خاموش، پیش‌فرض؛
+        بایگانی فقط با انتخاب کاربر روشن می‌شود).
+    sync_path: فایل SQLite مخزن مرکزی همگام‌سازی ایستگاه‌ها (خالی = خاموش؛ sync.py).
+    station_id: نام این ایستگاه در مخزن مرکزی (خالی = نام میزبان)؛ کلید ایستگاه UUID فایل دیتابیس را هم دارد.
+    """
+    path: str = "invoices.db"
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    cache_size: int = -16000
+    mmap_size: int = 256 * 1024 * 1024
+    temp_store: str = "MEMORY"
+    busy_timeout: int = 5000
+    read_connections: int = 4
+    archive_days: int = 0
+    sync_path: str = ""
+    station_id: str = ""
+
+
+# پروفایل رفتار قبلی (پیش‌فرض‌های SQLite) برای مقایسه در بنچمارک
+LEGACY_SETTINGS = DatabaseSettings(
+    journal_mode="DELETE",
+    synchronous="FULL",
+    cache_size=-2000,
+    mmap_size=0,
+    temp_store="DEFAULT",
+)
+
+_INT_FIELDS = ("cache_size", "mmap_size", "busy_timeout", "read_connections", "archive_days")
+# فیلدهای متنی که بدون تبدیل به حروف بزرگ خوانده می‌شوند
+_TEXT_FIELDS = ("path", "sync_path", "station_id")
+
+
+def _coerce(values: Mapping[str, str]) -> Dict[str, object]:
+    result: Dict[str, object] = {}
+    for field in DatabaseSettings._fields:
+        if field not in values:
+            continue
+        raw = values[field].strip()
+        result[field] = int(raw) if field in _INT_FIELDS else (raw if field in _TEXT_FIELDS else raw.upper())
+    return result
+
+
+def load_settings(environ: Optional[Mapping[str, str]] = None, cwd: Optional[Path] = None) -> DatabaseSettings:
+    """خواندن تنظیمات از فایل INI و متغیرهای محیطی."""
+    environ = os.environ if environ is None else environ
+    cwd = Path.cwd() if cwd is None else cwd
+    settings = DatabaseSettings()
+
+    config_path = Path(environ[CONFIG_ENV]) if environ.get(CONFIG_ENV) else cwd / CONFIG_FILENAME
+    if config_path.is_file():
+        parser = configparser.ConfigParser()
+        parser.read(config_path, encoding="utf-8")
+        if parser.has_section(CONFIG_SECTION):
+            values = _coerce(dict(parser.items(CONFIG_SECTION)))
+            # مسیر نسبی در فایل پیکربندی نسبت به محل همان فایل سنجیده می‌شود
+            for field in ("path", "sync_path"):
+                path = values.get(field)
+                if isinstance(path, str) and path and path != ":memory:" and not Path(path).is_absolute():
+                    values[field] = str(config_path.parent / path)
+            settings = settings._replace(**values)
+
+    env_values = {
+        field: environ[ENV_PREFIX + field.upper()]
+        for field in DatabaseSettings._fields
+        if environ.get(ENV_PREFIX + field.upper())
+    }
+    return validate_settings(settings._replace(**_coerce(env_values)))
+
+
+def validate_settings(settings: DatabaseSettings) -> DatabaseSettings:
+    """بررسی مقادیر مجاز؛ در صورت خطا ValueError."""
+    if settings.journal_mode not in JOURNAL_MODES:
+        raise ValueError(f"journal_mode نامعتبر: {settings.journal_mode}")
+    if settings.synchronous not in SYNCHRONOUS_MODES:
+        raise ValueError(f"synchronous نامعتبر: {settings.synchronous}")
+    if settings.temp_store not in TEMP_STORES:
+        raise ValueError(f"temp_store نامعتبر: {settings.temp_store}")
+    if min(settings.mmap_size, settings.busy_timeout, settings.read_connections, settings.archive_days) < 0:
+        raise ValueError("mmap_size و busy_timeout و read_connections و archive_days باید نامنفی باشند")
+    return settings
+
+
+def apply_pragmas(connection: sqlite3.Connection, settings: DatabaseSettings, read_only: bool = False) -> None:
+    """اعمال PRAGMA های کارایی روی اتصال تازه باز شده.
+
+    journal_mode در فایل ذخیره می‌شود و فقط اتصال نویسنده آن را تنظیم می‌کند.
+    """
+    validate_settings(settings)
+    if not read_only:
+        connection.execute(f"PRAGMA journal_mode = {settings.journal_mode}")
+    connection.execute(f"PRAGMA synchronous = {settings.synchronous}")
+    connection.execute(f"PRAGMA cache_size = {int(settings.cache_size)}")
+    connection.execute(f"PRAGMA mmap_size = {int(settings.mmap_size)}")
+    connection.execute(f"PRAGMA temp_store = {settings.temp_store}")
+    connection.execute(f"PRAGMA busy_timeout = {int(settings.busy_timeout)}")
+    if read_only:
+        connection.execute("PRAGMA query_only = ON")
+
+
+def connect(settings: DatabaseSettings, check_same_thread: bool = True, read_only: bool = False) -> sqlite3.Connection:
+    """باز کردن اتصال با تنظیمات داده‌شده (read_only: اتصال خواننده با query_only)."""
+    connection = sqlite3.connect(settings.path, check_same_thread=check_same_thread)
+    apply_pragmas(connection, settings, read_only=read_only)
+    return connection
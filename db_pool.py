@@ -0,0 +1,107 @@
+# db_pool.py
+"""استخر اتصال thread-safe برای SQLite: یک اتصال نویسنده + N اتصال خواننده.
+
+- همه نوشتن‌ها با قفل روی یک اتصال نویسنده سریال می‌شوند (SQLite در هر لحظه یک نویسنده دارد).
+- خواندن‌ها از اتصال‌های خواننده جدا انجام می‌شوند؛ در حالت WAL خواننده‌ها نویسنده را مسدود نمی‌کنند.
+- هر اتصال در هر لحظه فقط در اختیار یک thread است؛ هر فراخوانی cursor خودش را می‌سازد.
+- برای ":memory:" دیتابیس بین اتصال‌ها مشترک نیست؛ پس خواندن هم از اتصال نویسنده (با همان قفل) انجام می‌شود.
+"""
+
+from __future__ import annotations
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, List
+
+from db_config import DatabaseSettings, connect
+
+ConnectHook = Callable[[sqlite3.Connection], None]
+
+
+class ConnectionPool:
+    """یک نویسنده (با قفل) و حداکثر settings.read_connections خواننده (ساخت تنبل)."""
+
+    def __init__(self, settings: DatabaseSettings) -> None:
+        self.settings = settings
+        self._write_lock = threading.RLock()
+        self._writer = connect(settings, check_same_thread=False)
+        self._shared_memory = settings.path == ":memory:"
+        self._max_readers = 0 if self._shared_memory else max(0, settings.read_connections)
+        self._idle_readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._connect_hooks: List[ConnectHook] = []
+        self._closed = False
+
+    @property
+    def writer_connection(self) -> sqlite3.Connection:
+        """اتصال نویسنده (برای مهاجرت schema و ابزارهای تشخیصی)."""
+        return self._writer
+
+    def connections(self) -> List[sqlite3.Connection]:
+        """همه اتصال‌های باز (نویسنده + خواننده‌های ساخته‌شده)."""
+        with self._readers_lock:
+            return [self._writer, *self._readers]
+
+    def add_connect_hook(self, hook: ConnectHook) -> None:
+        """اجرای hook روی همه اتصال‌های فعلی و اتصال‌های خواننده‌ای که بعداً ساخته می‌شوند (مثلاً trace)."""
+        with self._write_lock, self._readers_lock:
+            self._connect_hooks.append(hook)
+            for connection in [self._writer, *self._readers]:
+                hook(connection)
+
+    def remove_connect_hook(self, hook: ConnectHook) -> None:
+        """حذف hook از اتصال‌های آینده (اثر روی اتصال‌های فعلی با خود فراخواننده است)."""
+        with self._readers_lock:
+            if hook in self._connect_hooks:
+                self._connect_hooks.remove(hook)
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """دسترسی انحصاری به اتصال نویسنده."""
+        with self._write_lock:
+            yield self._writer
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """یک اتصال خواننده آزاد (یا نویسنده وقتی خواننده جدا ممکن نیست)."""
+        if self._max_readers == 0:
+            with self._write_lock:
+                yield self._writer
+            return
+        connection = self._acquire_reader()
+        try:
+            yield connection
+        finally:
+            if connection.in_transaction:
+                connection.rollback()
+            self._idle_readers.put(connection)
+
+    def close(self) -> None:
+        """بستن همه اتصال‌ها."""
+        with self._write_lock, self._readers_lock:
+            if self._closed:
+                return
+            self._closed = True
+            for connection in [self._writer, *self._readers]:
+                try:
+                    connection.close()
+                except sqlite3.Error:
+                    pass
+            self._readers = []
+
+    def _acquire_reader(self) -> sqlite3.Connection:
+        try:
+            return self._idle_readers.get_nowait()
+        except queue.Empty:
+            pass
+        with self._readers_lock:
+            if len(self._readers) < self._max_readers:
+                connection = connect(self.settings, check_same_thread=False, read_only=True)
+                for hook in self._connect_hooks:
+                    hook(connection)
+                self._readers.append(connection)
+                return connection
+        return self._idle_readers.get()
@@ -0,0 +1,157 @@
+# db_rows.py
+"""ساختار ردیف‌های برگشتی Database و ابزارهای کمکی کوئری (مشترک بین model و db_archive_sync).
+
+InvoiceRow فشرده و row_factory آن، صفحه keyset (InvoicePage و توکن ادامه)، ستون‌های روزانه گزارش‌ها
+(DayColumns) و تکه‌کردن IN (...) / پیمایش دسته‌ای cursor.
+"""
+
+import base64
+import binascii
+import sqlite3
+from array import array
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import jalali
+from constants import STATUS_ENTERED, STATUS_EXITED
+
+
+class InvoiceRow:
+    """ردیف لیست فاکتورها؛ همه اطلاعات لازم برای نمایش در یک کوئری واکشی می‌شود.
+
+    enter_ts / exit_ts ثانیه epoch و enter_day کلید روز جلالی (YYYYMMDD) است؛ قالب‌بندی با ماژول jalali.
+    کلاس __slots__ است (بدون __dict__ و بدون tuple میانی) و row_factory کوئری‌ها آن را مستقیم از ردیف
+    sqlite3 می‌سازد؛ متن وضعیت بین همه ردیف‌ها مشترک است. مثل NamedTuple قبلی قابل unpack، اندیس‌گذاری،
+    مقایسه و _asdict است.
+    """
+
+    __slots__ = ("invoice_number", "enter_ts", "enter_day", "status", "exit_ts")
+    _fields = __slots__
+
+    invoice_number: int
+    enter_ts: int
+    enter_day: int
+    status: str
+    exit_ts: Optional[int]
+
+    def __init__(self, invoice_number: int, enter_ts: int, enter_day: int, status: str, exit_ts: Optional[int]) -> None:
+        self.invoice_number = invoice_number
+        self.enter_ts = enter_ts
+        self.enter_day = enter_day
+        self.status = status
+        self.exit_ts = exit_ts
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter((self.invoice_number, self.enter_ts, self.enter_day, self.status, self.exit_ts))
+
+    def __getitem__(self, index: int) -> Any:
+        return getattr(self, self.__slots__[index])
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, InvoiceRow):
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    def __hash__(self) -> int:
+        return hash(tuple(self))
+
+    def __repr__(self) -> str:
+        return f"InvoiceRow({', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)})"
+
+    def _asdict(self) -> Dict[str, Any]:
+        return dict(zip(self.__slots__, self))
+
+
+# متن‌های وضعیت مشترک: هر ردیف به جای رشته تازه‌ای که sqlite3 برای هر مقدار TEXT می‌سازد به همین‌ها اشاره می‌کند
+_STATUS_TEXTS: Dict[str, str] = {STATUS_ENTERED: STATUS_ENTERED, STATUS_EXITED: STATUS_EXITED}
+
+
+# ستون‌های SELECT متناظر با InvoiceRow
+INVOICE_ROW_COLUMNS = """
+    invoice_number, enter_ts, enter_day,
+    CASE WHEN second_status IS NOT NULL THEN second_status ELSE first_status END AS status,
+    exit_ts
+"""
+
+
+def to_invoice_row(r: Sequence[Any]) -> InvoiceRow:
+    """InvoiceRow از ردیف ستون‌های INVOICE_ROW_COLUMNS (INTEGER ها خودشان int هستند؛ متن وضعیت مشترک می‌شود)."""
+    status = r[3]
+    return InvoiceRow(r[0], r[1], r[2], _STATUS_TEXTS.get(status, status), r[4])
+
+
+def invoice_row_factory(_cursor: sqlite3.Cursor, r: Tuple[Any, ...]) -> InvoiceRow:
+    """row_factory کوئری‌های INVOICE_ROW_COLUMNS: ساخت مستقیم InvoiceRow بدون لیست دوم tuple ها."""
+    return to_invoice_row(r)
+
+
+class DayColumns(NamedTuple):
+    """ستون‌های فشرده یک روز برای گزارش‌ها (reports.py).
+
+    bucket_starts / bucket_counts: شروع epoch هر بازه ۱۵ دقیقه‌ای دارای ورود و تعداد ورودی آن
+    (۱۵ دقیقه تا ساعت محلی برای هر منطقه زمانی دقیق بماند)؛ dwell: ثانیه‌های ماندگاری
+    (exit_ts - enter_ts) فاکتورهای خارج‌شده، مرتب.
+    """
+    day: int
+    bucket_starts: array
+    bucket_counts: array
+    dwell: array
+
+
+class InvoicePage(NamedTuple):
+    """یک صفحه از لیست فاکتورها؛ next_cursor توکن صفحه بعد (None یعنی صفحه آخر)."""
+    rows: List[InvoiceRow]
+    next_cursor: Optional[str]
+
+
+def encode_page_cursor(enter_ts: int, row_id: int) -> str:
+    """توکن ادامه (base64 امن برای URL) از کلید مرتب‌سازی آخرین ردیف صفحه."""
+    return base64.urlsafe_b64encode(f"{enter_ts}:{row_id}".encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_page_cursor(token: str) -> Tuple[int, int]:
+    """(enter_ts, id) از توکن ادامه؛ ValueError برای توکن نامعتبر."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode("ascii")
+        enter_ts, row_id = raw.split(":")
+        return int(enter_ts), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError(f"توکن صفحه نامعتبر: {token!r}") from exc
+
+
+def enter_ts_range(start_day: Optional[int], end_day: Optional[int]) -> Tuple[List[str], List[Any]]:
+    """(شرط‌ها، پارامترها) بازه روز ورود (دو سر شامل) روی enter_ts تا پیمایش روی ایندکس زمان بماند."""
+    conditions: List[str] = []
+    params: List[Any] = []
+    if start_day is not None:
+        conditions.append("enter_ts >= ?")
+        params.append(jalali.day_start_ts(start_day))
+    if end_day is not None:
+        conditions.append("enter_ts < ?")
+        params.append(jalali.day_start_ts(jalali.shift_day_key(end_day, 1)))
+    return conditions, params
+
+
+# حداکثر پارامتر در هر IN (...) برای سازگاری با SQLite های قدیمی (SQLITE_MAX_VARIABLE_NUMBER=999)
+IN_CHUNK = 500
+
+
+def chunks(values: List[int], size: int = IN_CHUNK) -> Iterator[List[int]]:
+    """تکه‌های حداکثر size عضوی values برای IN (...)."""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def finish_day_columns(columns: DayColumns, packed: List[str]) -> DayColumns:
+    """ریختن ماندگاری‌های بسته‌بندی‌شده (group_concat) همه بازه‌های روز، مرتب، در columns.dwell."""
+    if packed:
+        columns.dwell.extend(sorted(map(int, ",".join(packed).split(","))))
+    return columns
+
+
+def fetch_batches(cursor: sqlite3.Cursor, batch_size: int) -> Iterator[Tuple[Any, ...]]:
+    """پیمایش ردیف‌های cursor با fetchmany دسته‌ای (حافظه ثابت)."""
+    while batch := cursor.fetchmany(batch_size):
+        yield from batch
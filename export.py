@@ -0,0 +1,134 @@
+# export.py
+"""خروجی جریانی فاکتورها و خلاصه‌ها به CSV یا JSON-lines.
+
+ردیف‌ها مستقیم از cursor دیتابیس (fetchmany دسته‌ای) خوانده و بلافاصله نوشته می‌شوند؛ کل جدول هیچ‌وقت
+در حافظه ساخته نمی‌شود و مصرف حافظه برای هر اندازه دیتابیس ثابت می‌ماند.
+
+نوع خروجی (kind):
+    invoices  همه فاکتورها یا بازه روز ورود (start_day / end_day، دو سر شامل)
+    daily     خلاصه روزانه (daily_stats) در همان بازه
+    weekly    خلاصه هفت روز اخیر (همان جدول هفتگی)
+    monthly   خلاصه ماه جاری (همان جدول ماهانه)
+
+CSV با BOM (utf-8-sig) نوشته می‌شود تا Excel متن فارسی را درست نشان دهد. فایل ابتدا با پسوند .part
+نوشته و در پایان جایگزین می‌شود؛ خروجی نیمه‌کاره هیچ‌وقت با نام نهایی باقی نمی‌ماند.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, TextIO, Tuple, Union
+
+import jalali
+from controller import Controller, DayKey, InvoiceListRow
+
+KIND_INVOICES = "invoices"
+KIND_DAILY = "daily"
+KIND_WEEKLY = "weekly"
+KIND_MONTHLY = "monthly"
+EXPORT_KINDS = (KIND_INVOICES, KIND_DAILY, KIND_WEEKLY, KIND_MONTHLY)
+
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+EXPORT_FORMATS = (FORMAT_CSV, FORMAT_JSONL)
+
+# ترتیب ستون‌های CSV
+INVOICE_FIELDS = (
+    "invoice_number", "enter_date", "enter_time", "status", "exit_date", "exit_time", "enter_ts", "enter_day", "exit_ts",
+)
+DAILY_FIELDS = ("day", "date", "entered", "exited", "open")
+WEEKLY_FIELDS = ("day", "date", "entered", "exited")
+MONTHLY_FIELDS = ("day", "date", "entered")
+
+Record = Dict[str, Any]
+
+
+def invoice_record(row: InvoiceListRow) -> Record:
+    """ردیف فاکتور به dict (مقادیر عددی + متن جلالی قالب‌بندی‌شده)؛ برای خروجی فایل و API سرور."""
+    return {
+        **row._asdict(),
+        "enter_date": jalali.format_day_key(row.enter_day),
+        "enter_time": jalali.format_time(row.enter_ts),
+        "exit_date": jalali.format_date(row.exit_ts) or None,
+        "exit_time": jalali.format_time(row.exit_ts) or None,
+    }
+
+
+def _day_record(day: DayKey, **counts: int) -> Record:
+    return {"day": day, "date": jalali.format_day_key(day), **counts}
+
+
+def iter_records(
+    controller: Controller, kind: str, start_day: Optional[DayKey] = None, end_day: Optional[DayKey] = None
+) -> Tuple[Sequence[str], Iterator[Record]]:
+    """(ستون‌ها، پیمایشگر رکوردها) برای یک نوع خروجی."""
+    if kind == KIND_INVOICES:
+        return INVOICE_FIELDS, (invoice_record(row) for row in controller.iter_invoices(start_day, end_day))
+    if kind == KIND_DAILY:
+        return DAILY_FIELDS, (
+            _day_record(day, entered=entered, exited=exited, open=open_)
+            for day, entered, exited, open_ in controller.iter_daily_stats(start_day, end_day)
+        )
+    if kind == KIND_WEEKLY:
+        return WEEKLY_FIELDS, (
+            _day_record(day, entered=entered, exited=exited) for day, entered, exited in controller.get_weekly_data()
+        )
+    if kind == KIND_MONTHLY:
+        return MONTHLY_FIELDS, (_day_record(day, entered=entered) for day, entered in controller.get_monthly_data())
+    raise ValueError(f"نوع خروجی نامعتبر: {kind} (مجاز: {', '.join(EXPORT_KINDS)})")
+
+
+def write_records(handle: TextIO, fields: Sequence[str], records: Iterable[Record], fmt: str) -> int:
+    """نوشتن رکوردها (یکی‌یکی، بدون نگه‌داشتن) در handle؛ تعداد رکوردها."""
+    count = 0
+    if fmt == FORMAT_CSV:
+        writer = csv.DictWriter(handle, fieldnames=list(fields), extrasaction="ignore")
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+            count += 1
+    elif fmt == FORMAT_JSONL:
+        for record in records:
+            handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    else:
+        raise ValueError(f"قالب خروجی نامعتبر: {fmt} (مجاز: {', '.join(EXPORT_FORMATS)})")
+    return count
+
+
+def format_for_path(path: Union[str, Path]) -> str:
+    """قالب بر اساس پسوند فایل (.jsonl / .ndjson -> jsonl، در غیر این صورت csv)."""
+    return FORMAT_JSONL if Path(path).suffix.lower() in (".jsonl", ".ndjson") else FORMAT_CSV
+
+
+def export_to_path(
+    controller: Controller,
+    path: Union[str, Path],
+    kind: str = KIND_INVOICES,
+    fmt: Optional[str] = None,
+    *,
+    start_day: Optional[DayKey] = None,
+    end_day: Optional[DayKey] = None,
+) -> int:
+    """خروجی گرفتن در فایل path؛ تعداد ردیف‌های نوشته‌شده."""
+    fmt = fmt or format_for_path(path)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"قالب خروجی نامعتبر: {fmt} (مجاز: {', '.join(EXPORT_FORMATS)})")
+    fields, records = iter_records(controller, kind, start_day, end_day)
+    target = Path(path)
+    partial = target.with_name(target.name + ".part")
+    try:
+        encoding = "utf-8-sig" if fmt == FORMAT_CSV else "utf-8"
+        with open(partial, "w", newline="", encoding=encoding) as handle:
+            count = write_records(handle, fields, records, fmt)
+        os.replace(partial, target)
+    finally:
+        # بستن generator تا اتصال خواننده فوراً آزاد شود (حتی در خطای نوشتن)
+        close = getattr(records, "close", None)
+        if close is not None:
+            close()
+        partial.unlink(missing_ok=True)
+    return count
@@ -0,0 +1,272 @@
+# instrumentation.py
+"""ابزار اندازه‌گیری اختیاری مسیرهای داغ (زمان اجرا + تعداد دستور SQL).
+
+فقط وقتی فعال شود (INVOICE_PERF=1) متدهای عمومی Controller و Database و متدهای update_* / _render_*
+پنجره اصلی در سطح کلاس با یک wrapper جایگزین می‌شوند؛ در حالت غیرفعال هیچ چیزی نصب نمی‌شود و
+سربار صفر است. تعداد دستورهای SQL با trace callback روی همه اتصال‌های ConnectionPool شمرده می‌شود
+(گام‌های trigger و BEGIN/COMMIT شمرده نمی‌شوند؛ تکرار پشت‌سرهم یک نوشتن با همان مقادیر یک دستور است).
+
+- هیستوگرام غلتان: آخرین window نمونه هر متد برای صدک‌ها، به علاوه شمارنده‌های کل
+- snapshot(): خلاصه همه متدها (برای پنل آمار view یا لاگ)
+- dump_jsonl(path): افزودن یک خط JSON با زمان و snapshot (برای تخلیه دوره‌ای)
+
+متغیرهای محیطی:
+    INVOICE_PERF=1                  فعال‌سازی
+    INVOICE_PERF_DUMP=perf.jsonl    مسیر فایل JSON-lines (اختیاری)
+    INVOICE_PERF_INTERVAL=30        فاصله تخلیه دوره‌ای به ثانیه
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from db_pool import ConnectionPool
+
+PERF_ENV = "INVOICE_PERF"
+PERF_DUMP_ENV = "INVOICE_PERF_DUMP"
+PERF_INTERVAL_ENV = "INVOICE_PERF_INTERVAL"
+DEFAULT_WINDOW = 512
+DEFAULT_DUMP_INTERVAL = 30.0
+
+_TRANSACTION_CONTROL = ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE")
+# فقط این دستورها trigger اجرا می‌کنند (و trace تکراری گام‌های trigger را دارند)
+_TRIGGERING = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+# دستورهای داخلی جدول مجازی FTS5 نام schema را به شکل 'main'. نقل‌قول می‌کنند (کد پروژه هرگز)
+_INTERNAL_SCHEMA = "'main'."
+
+
+class PerfSettings(NamedTuple):
+    """تنظیمات ابزار اندازه‌گیری (از متغیرهای محیطی)."""
+    enabled: bool = False
+    dump_path: Optional[str] = None
+    dump_interval: float = DEFAULT_DUMP_INTERVAL
+
+
+def load_perf_settings(environ: Optional[Mapping[str, str]] = None) -> PerfSettings:
+    """خواندن PerfSettings از متغیرهای محیطی."""
+    environ = os.environ if environ is None else environ
+    enabled = environ.get(PERF_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+    interval = float(environ.get(PERF_INTERVAL_ENV) or DEFAULT_DUMP_INTERVAL)
+    if interval <= 0:
+        raise ValueError(f"{PERF_INTERVAL_ENV} باید مثبت باشد")
+    return PerfSettings(enabled, environ.get(PERF_DUMP_ENV) or None, interval)
+
+
+class MetricSnapshot(NamedTuple):
+    """خلاصه یک متد؛ زمان‌ها به میلی‌ثانیه و صدک‌ها روی پنجره غلتان."""
+    name: str
+    calls: int
+    p50_ms: float
+    p95_ms: float
+    max_ms: float
+    mean_ms: float
+    sql_per_call: float
+
+
+class RollingHistogram:
+    """آخرین window نمونه (ثانیه) برای صدک‌ها + شمارنده‌های کل."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.total_statements = 0
+
+    def add(self, seconds: float, statements: int) -> None:
+        """ثبت یک فراخوانی."""
+        self._samples.append(seconds)
+        self.calls += 1
+        self.total_seconds += seconds
+        self.total_statements += statements
+
+    def snapshot(self, name: str) -> MetricSnapshot:
+        """خلاصه فعلی."""
+        ordered = sorted(self._samples)
+        return MetricSnapshot(
+            name,
+            self.calls,
+            round(_percentile(ordered, 50) * 1e3, 3),
+            round(_percentile(ordered, 95) * 1e3, 3),
+            round((ordered[-1] if ordered else 0.0) * 1e3, 3),
+            round(self.total_seconds / self.calls * 1e3, 3) if self.calls else 0.0,
+            round(self.total_statements / self.calls, 2) if self.calls else 0.0,
+        )
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(len(ordered) * pct / 100) - 1))]
+
+
+class Instrumentation:
+    """ثبت زمان و تعداد SQL متدهای کلاس‌های نصب‌شده."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        self._window = window
+        self._histograms: Dict[str, RollingHistogram] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._patched: List[Tuple[type, str, Any]] = []
+        self._pools: List[ConnectionPool] = []
+
+    @property
+    def installed(self) -> bool:
+        """آیا wrapper ها نصب شده‌اند."""
+        return bool(self._patched)
+
+    # ---------------------- نصب ----------------------
+    def instrument_class(self, cls: type, names: Optional[Iterable[str]] = None, prefix: Optional[str] = None) -> None:
+        """جایگزینی متدهای کلاس با wrapper اندازه‌گیری.
+
+        names: نام متدها (پیش‌فرض: همه تابع‌های عمومی تعریف‌شده در خود کلاس).
+        """
+        label = prefix or cls.__name__
+        if names is None:
+            names = [n for n, v in vars(cls).items() if not n.startswith("_") and inspect.isfunction(v)]
+        for name in names:
+            original = vars(cls).get(name)
+            if not inspect.isfunction(original):
+                continue
+            setattr(cls, name, self._wrap(f"{label}.{name}", original))
+            self._patched.append((cls, name, original))
+
+    def attach_pool(self, pool: ConnectionPool) -> None:
+        """شمارش دستورهای SQL روی همه اتصال‌های استخر (فعلی و آینده)."""
+        pool.add_connect_hook(self._attach_connection)
+        self._pools.append(pool)
+
+    def uninstall(self) -> None:
+        """بازگرداندن متدهای اصلی و حذف trace ها."""
+        for cls, name, original in reversed(self._patched):
+            setattr(cls, name, original)
+        self._patched = []
+        for pool in self._pools:
+            pool.remove_connect_hook(self._attach_connection)
+            for connection in pool.connections():
+                try:
+                    connection.set_trace_callback(None)
+                except sqlite3.ProgrammingError:
+                    pass  # اتصال بسته شده
+        self._pools = []
+
+    # ---------------------- ثبت ----------------------
+    def record(self, name: str, seconds: float, statements: int = 0) -> None:
+        """ثبت دستی یک اندازه‌گیری."""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = RollingHistogram(self._window)
+            histogram.add(seconds, statements)
+
+    def snapshot(self) -> List[MetricSnapshot]:
+        """خلاصه همه متدها، کندترین (p95) اول."""
+        with self._lock:
+            snapshots = [h.snapshot(name) for name, h in self._histograms.items()]
+        return sorted(snapshots, key=lambda m: m.p95_ms, reverse=True)
+
+    def reset(self) -> None:
+        """پاک کردن همه هیستوگرام‌ها."""
+        with self._lock:
+            self._histograms.clear()
+
+    def dump_jsonl(self, path: str) -> None:
+        """افزودن یک خط JSON (زمان + همه متریک‌ها) به فایل."""
+        line = {"ts": round(time.time(), 3), "metrics": [m._asdict() for m in self.snapshot()]}
+        with open(path, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+    def format_summary(self, limit: Optional[int] = None) -> str:
+        """متن چندخطی خلاصه (برای پنل آمار / tooltip)."""
+        rows = self.snapshot()[:limit] if limit else self.snapshot()
+        return "\n".join(
+            f"{m.name}: n={m.calls} p50={m.p50_ms:.2f}ms p95={m.p95_ms:.2f}ms sql={m.sql_per_call:g}"
+            for m in rows
+        )
+
+    # ---------------------- داخلی ----------------------
+    def _statements(self) -> int:
+        return getattr(self._local, "statements", 0)
+
+    def _trace(self, statement: str) -> None:
+        # sqlite3 برای هر گام trigger متن دستور بیرونی را دوباره می‌فرستد (و trace راهی برای تشخیص آن از اجرای
+        # دوباره همان دستور ندارد)؛ پس فقط تکرار پشت‌سرهم INSERT/UPDATE/DELETE یک دستور حساب می‌شود. متن trace
+        # شامل مقادیر bind شده است: فقط تکرار همان نوشتن با همان مقادیر (مثلاً شماره تکراری در executemany)
+        # کم شمرده می‌شود؛ SELECT و PRAGMA تکراری دقیق شمرده می‌شوند
+        if statement.startswith("--") or _INTERNAL_SCHEMA in statement:
+            # دستورهای داخلی SQLite روی جدول‌های سایه جدول مجازی (ایندکس FTS5، از جمله بارگذاری پیکربندی آن
+            # بعد از تغییر schema) رفت‌وبرگشت جدا نیستند
+            return
+        previous = getattr(self._local, "last", None)
+        self._local.last = statement
+        head = statement.lstrip()[:9].upper()
+        if head.startswith(_TRANSACTION_CONTROL):
+            return
+        if statement == previous and head.startswith(_TRIGGERING):
+            return
+        self._local.statements = self._statements() + 1
+
+    def _attach_connection(self, connection: sqlite3.Connection) -> None:
+        connection.set_trace_callback(self._trace)
+
+    def _wrap(self, name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            before = self._statements()
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - start, self._statements() - before)
+
+        return wrapper
+
+
+class PeriodicDumper:
+    """تخلیه دوره‌ای dump_jsonl روی یک thread پس‌زمینه (برای اجرای بدون رابط کاربری)."""
+
+    def __init__(self, instrumentation: Instrumentation, path: str, interval: float = DEFAULT_DUMP_INTERVAL) -> None:
+        self._instrumentation = instrumentation
+        self._path = path
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="perf-dump", daemon=True)
+
+    def start(self) -> None:
+        """شروع thread تخلیه."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """توقف و یک تخلیه نهایی."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self._instrumentation.dump_jsonl(self._path)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self._instrumentation.dump_jsonl(self._path)
+
+
+def install_default(pool: ConnectionPool, extra: Iterable[Tuple[type, Iterable[str]]] = ()) -> Instrumentation:
+    """نصب روی Controller و Database (+ کلاس‌های اضافه با نام متدها) و اتصال‌های استخر."""
+    # import داخل تابع: این ماژول بدون نصب، به controller/model وابسته نیست
+    from controller import Controller  # pylint: disable=import-outside-toplevel
+    from model import Database  # pylint: disable=import-outside-toplevel
+
+    instrumentation = Instrumentation()
+    instrumentation.instrument_class(Controller)
+    instrumentation.instrument_class(Database)
+    for cls, names in extra:
+        instrumentation.instrument_class(cls, names)
+    instrumentation.attach_pool(pool)
+    return instrumentation
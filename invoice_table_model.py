@@ -0,0 +1,210 @@
+# invoice_table_model.py
+"""مدل جدول فاکتورها (QAbstractTableModel) با بارگذاری تنبل صفحه‌ای از SQLite.
+
+به جای ساخت دوباره کل QTableWidget بعد از هر اسکن:
+    - فقط صفحه اول بارگذاری می‌شود و بقیه با اسکرول (canFetchMore/fetchMore) واکشی می‌شوند؛
+      صفحه‌ها با توکن ادامه (keyset) خوانده می‌شوند، پس هزینه هر صفحه به عمق اسکرول بستگی ندارد.
+    - Qt فقط برای ردیف‌های قابل مشاهده data() را صدا می‌زند.
+    - ثبت/خروج/حذف یک فاکتور فقط همان ردیف را اضافه، به‌روز یا حذف می‌کند.
+    - با AsyncBridge، واکشی صفحه‌ها روی thread کارگر انجام می‌شود و رابط کاربری منتظر SQLite نمی‌ماند؛
+      تغییرات درجای رسیده در حین واکشی روی صفحه رسیده اعمال می‌شوند.
+    - ردیف‌ها همان InvoiceRow فشرده (__slots__) دیتابیس‌اند؛ متن تاریخ، ساعت و ستون خروج فقط در data()
+      برای ردیف‌های قابل مشاهده ساخته می‌شود و برای ردیف‌های بارگذاری‌شده رشته‌ای نگه داشته نمی‌شود.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, List, Optional, Set
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QPersistentModelIndex, Qt, Signal
+from PySide6.QtGui import QColor
+
+import jalali
+from async_bridge import AsyncBridge
+from constants import STATUS_EXITED
+from controller import Controller, InvoiceListRow, InvoicePage
+
+# ستون‌ها (راست به چپ مانند جدول قبلی)
+COLUMN_STATUS = 0
+COLUMN_TIME = 1
+COLUMN_DATE = 2
+COLUMN_NUMBER = 3
+HEADERS = ("خروج", "ساعت", "تاریخ", "شماره فاکتور")
+
+DEFAULT_PAGE_SIZE = 200
+
+_ModelIndex = QModelIndex | QPersistentModelIndex
+
+_LOG = logging.getLogger(__name__)
+
+
+class InvoiceTableModel(QAbstractTableModel):
+    """مدل فقط‌خواندنی لیست فاکتورها با واکشی صفحه‌ای."""
+
+    # یک صفحه از بارگذاری جاری رسید (حتی خالی)؛ برای تشخیص پایان بارگذاری اولیه
+    page_loaded = Signal()
+    # واکشی صفحه روی thread کارگر ناموفق بود (استثنا)؛ canFetchMore درست می‌ماند تا همان صفحه دوباره واکشی شود
+    page_failed = Signal(object)
+
+    def __init__(
+        self,
+        controller: Controller,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        parent: Any = None,
+        bridge: Optional[AsyncBridge] = None,
+    ) -> None:
+        super().__init__(parent)
+        self._controller = controller
+        self._page_size = page_size
+        self._bridge = bridge
+        self._rows: List[InvoiceListRow] = []
+        self._loaded: Set[int] = set()
+        self._has_more = True
+        self._cursor: Optional[str] = None  # توکن ادامه صفحه بعد
+        self._red = QColor("red")
+        # وضعیت واکشی در جریان: نسل بارگذاری و تغییرات درجای رسیده در این فاصله
+        self._generation = 0
+        self._fetching = False
+        self._patched: Dict[int, InvoiceListRow] = {}
+        self._removed: Set[int] = set()
+
+    # ---------------------- Qt model API ----------------------
+    def rowCount(self, parent: _ModelIndex = QModelIndex()) -> int:  # pylint: disable=invalid-name
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: _ModelIndex = QModelIndex()) -> int:  # pylint: disable=invalid-name
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole) -> Any:  # pylint: disable=invalid-name
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return HEADERS[section]
+        return None
+
+    def data(self, index: _ModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == COLUMN_STATUS:
+                # اگر فاکتور خارج شده بود، تاریخ خروج را نمایش بده (از همان ردیف، بدون کوئری اضافه)
+                if row.status == STATUS_EXITED and row.exit_ts is not None:
+                    return jalali.format_date(row.exit_ts)
+                return row.status
+            if column == COLUMN_TIME:
+                return jalali.format_time(row.enter_ts)
+            if column == COLUMN_DATE:
+                return jalali.format_day_key(row.enter_day)
+            return str(row.invoice_number)
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        # اگر فاکتور خارج شده بود، رنگ قرمز شود
+        if role == Qt.ItemDataRole.ForegroundRole and row.status == STATUS_EXITED and column in (COLUMN_STATUS, COLUMN_NUMBER):
+            return self._red
+        return None
+
+    def canFetchMore(self, parent: _ModelIndex = QModelIndex()) -> bool:  # pylint: disable=invalid-name
+        return not parent.isValid() and self._has_more and not self._fetching
+
+    def fetchMore(self, parent: _ModelIndex = QModelIndex()) -> None:  # pylint: disable=invalid-name
+        if parent.isValid() or not self._has_more or self._fetching:
+            return
+        self._fetching = True
+        generation = self._generation
+        if self._bridge is None:
+            self._on_page(generation, self._controller.list_invoices(self._cursor, self._page_size))
+        else:
+            self._bridge.submit(
+                self._controller.list_invoices,
+                self._cursor,
+                self._page_size,
+                on_result=lambda page: self._on_page(generation, page),
+                on_error=lambda exc: self._on_page_error(generation, exc),
+            )
+
+    def _on_page(self, generation: int, page: InvoicePage) -> None:
+        if generation != self._generation:
+            return  # صفحه مربوط به بارگذاری قبلی است
+        self._fetching = False
+        self._cursor = page.next_cursor
+        self._has_more = page.next_cursor is not None
+        fresh = [
+            self._patched.get(row.invoice_number, row)
+            for row in page.rows
+            if row.invoice_number not in self._loaded and row.invoice_number not in self._removed
+        ]
+        self._patched.clear()
+        self._removed.clear()
+        if fresh:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(fresh) - 1)
+            self._rows.extend(fresh)
+            self._loaded.update(row.invoice_number for row in fresh)
+            self.endInsertRows()
+        self.page_loaded.emit()
+
+    def _on_page_error(self, generation: int, exc: BaseException) -> None:
+        if generation != self._generation:
+            return
+        # نشانگر و _has_more دست نمی‌خورند: خطا پایان داده نیست و اسکرول بعدی همان صفحه را دوباره می‌خواند
+        self._fetching = False
+        _LOG.warning("invoice page fetch failed: %s", exc, exc_info=exc)
+        self.page_failed.emit(exc)
+
+    # ---------------------- به‌روزرسانی درجا ----------------------
+    def reload(self) -> None:
+        """پاک کردن ردیف‌های بارگذاری‌شده و واکشی دوباره صفحه اول."""
+        self.beginResetModel()
+        self._generation += 1
+        self._rows = []
+        self._loaded = set()
+        self._has_more = True
+        self._cursor = None
+        self._fetching = False
+        self._patched.clear()
+        self._removed.clear()
+        self.endResetModel()
+        self.fetchMore()
+
+    def prepend_invoice(self, row: InvoiceListRow) -> None:
+        """افزودن فاکتور تازه ثبت‌شده به بالای جدول (بدون بازسازی)."""
+        if row.invoice_number in self._loaded:
+            self.update_invoice(row)
+            return
+        self._removed.discard(row.invoice_number)
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self._rows.insert(0, row)
+        self._loaded.add(row.invoice_number)
+        self.endInsertRows()
+
+    def update_invoice(self, row: InvoiceListRow) -> None:
+        """به‌روزرسانی ردیف بارگذاری‌شده یک فاکتور (مثلاً بعد از خروج)."""
+        if self._fetching:
+            self._patched[row.invoice_number] = row
+        position = self._find(row.invoice_number)
+        if position is None:
+            return
+        self._rows[position] = row
+        self.dataChanged.emit(self.index(position, 0), self.index(position, len(HEADERS) - 1))
+
+    def remove_invoice(self, invoice_number: int) -> None:
+        """حذف ردیف یک فاکتور از جدول در صورت بارگذاری بودن."""
+        if self._fetching:
+            self._removed.add(invoice_number)
+        position = self._find(invoice_number)
+        if position is None:
+            return
+        self.beginRemoveRows(QModelIndex(), position, position)
+        del self._rows[position]
+        self._loaded.discard(invoice_number)
+        self.endRemoveRows()
+
+    # ---------------------- helpers ----------------------
+    def _find(self, invoice_number: int) -> Optional[int]:
+        if invoice_number not in self._loaded:
+            return None
+        for position, row in enumerate(self._rows):
+            if row.invoice_number == invoice_number:
+                return position
+        return None
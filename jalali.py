@@ -0,0 +1,236 @@
+# jalali.py
+"""ابزار تاریخ جلالی: تبدیل زمان epoch (UTC) به کلید روز و متن نمایشی.
+
+ذخیره‌سازی در دیتابیس عددی است:
+    - زمان: ثانیه epoch (UTC)
+    - کلید روز: عدد صحیح YYYYMMDD جلالی بر اساس ساعت محلی (مثلاً 14040726)
+قالب‌بندی متنی («1404/07/26» و «14:03:11») فقط در لایه نمایش (view / پیام‌های controller) انجام می‌شود.
+
+کارایی (همه تولید کلید روز در model / controller / view از این ماژول می‌گذرد):
+    - جدول از پیش محاسبه‌شده «ordinal میلادی -> کلید روز جلالی» (و برعکس) برای بازه سال‌های
+      configure_table (پیش‌فرض 2000 تا 2060 میلادی)؛ ساخت تنبل در اولین استفاده با شمارش ماه‌های جلالی
+      (فقط یک فراخوانی jdatetime برای هر سال). خارج از بازه، تبدیل مستقیم jdatetime انجام می‌شود.
+    - کش «امروز» آگاه از گذر نیمه‌شب: بازه [نیمه‌شب، نیمه‌شب بعد) امروز نگه داشته می‌شود؛ کلید روز هر
+      اسکن بدون تبدیل تقویم برمی‌گردد و با رسیدن به نیمه‌شب بعد، خودکار دوباره محاسبه می‌شود.
+    - روزهای دیگر (تاریخچه در خروجی و جدول): فقط date.fromtimestamp و یک اندیس لیست.
+    - jdatetime فقط هنگام ساخت جدول (یا تبدیل خارج از بازه) وارد می‌شود، نه هنگام وارد کردن این ماژول؛
+      در رابط کاربری اولین کلید روز روی thread کارگر (واکشی گزارش‌ها) ساخته می‌شود و راه‌اندازی منتظر آن نمی‌ماند.
+"""
+
+from __future__ import annotations
+
+import threading
+import time as _time
+from datetime import date, datetime, time as _clock_time, timedelta
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Tuple
+
+if TYPE_CHECKING:
+    import jdatetime
+
+DEFAULT_TABLE_YEARS = (2000, 2060)
+
+
+class _DayWindow(NamedTuple):
+    # بازه زمانی محلی یک روز: [start, end) و کلید روز آن
+    key: int
+    start: float
+    end: float
+
+
+class _DayTable:
+    """کلیدهای روز جلالی برای همه روزهای بازه سال‌های میلادی first_year..last_year."""
+
+    def __init__(self, first_year: int, last_year: int) -> None:
+        if first_year > last_year:
+            raise ValueError("first_year نباید از last_year بزرگ‌تر باشد")
+        self.first_year = first_year
+        self.last_year = last_year
+        import jdatetime  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+        self.first_ordinal = date(first_year, 1, 1).toordinal()
+        last_ordinal = date(last_year, 12, 31).toordinal()
+        start = jdatetime.date.fromgregorian(date=date(first_year, 1, 1))
+        year, month, day = start.year, start.month, start.day
+        length = _month_length(year, month)
+        keys: List[int] = []
+        for _ in range(last_ordinal - self.first_ordinal + 1):
+            keys.append(year * 10000 + month * 100 + day)
+            day += 1
+            if day > length:
+                day = 1
+                month += 1
+                if month > 12:
+                    month = 1
+                    year += 1
+                length = _month_length(year, month)
+        self.keys = keys
+        self.ordinals: Dict[int, int] = {key: self.first_ordinal + i for i, key in enumerate(keys)}
+
+    def key_of(self, ordinal: int) -> Optional[int]:
+        """کلید روز یک ordinal میلادی (None خارج از بازه)."""
+        offset = ordinal - self.first_ordinal
+        return self.keys[offset] if 0 <= offset < len(self.keys) else None
+
+
+def _month_length(year: int, month: int) -> int:
+    import jdatetime  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    if month <= 6:
+        return 31
+    if month <= 11:
+        return 30
+    return 30 if jdatetime.date(year, 1, 1).isleap() else 29
+
+
+class _CalendarState:
+    """جدول فعلی و بازه امروز (جایگزینی اتمی ارجاع‌ها؛ قفل فقط برای ساخت جدول)."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.years: Tuple[int, int] = DEFAULT_TABLE_YEARS
+        self.table: Optional[_DayTable] = None
+        self.today: Optional[_DayWindow] = None
+
+    # جدول با ساخت تنبل در اولین استفاده
+    def get_table(self) -> _DayTable:
+        table = self.table
+        if table is None:
+            with self.lock:
+                if self.table is None:
+                    self.table = _DayTable(*self.years)
+                table = self.table
+        return table
+
+
+_state = _CalendarState()
+
+
+def configure_table(first_year: int, last_year: int) -> None:
+    """تعیین بازه سال‌های میلادی جدول (ساخت دوباره تنبل در استفاده بعدی)."""
+    if first_year > last_year:
+        raise ValueError("first_year نباید از last_year بزرگ‌تر باشد")
+    with _state.lock:
+        _state.years = (first_year, last_year)
+        _state.table = None
+        _state.today = None
+
+
+def table_years() -> Tuple[int, int]:
+    """بازه سال‌های میلادی جدول فعلی."""
+    return _state.years
+
+
+def now_ts() -> int:
+    """زمان جاری به ثانیه epoch."""
+    return int(_time.time())
+
+
+def jalali_date_key(jdate: jdatetime.date) -> int:
+    """کلید روز YYYYMMDD از یک تاریخ جلالی."""
+    return jdate.year * 10000 + jdate.month * 100 + jdate.day
+
+
+def _key_of_ordinal(ordinal: int) -> int:
+    key = _state.get_table().key_of(ordinal)
+    if key is None:
+        import jdatetime  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+        key = jalali_date_key(jdatetime.date.fromgregorian(date=date.fromordinal(ordinal)))
+    return key
+
+
+def _ordinal_of_key(key: int) -> int:
+    ordinal = _state.get_table().ordinals.get(key)
+    if ordinal is None:
+        import jdatetime  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+        ordinal = jdatetime.date(key // 10000, key // 100 % 100, key % 100).togregorian().toordinal()
+    return ordinal
+
+
+def gregorian_to_day_key(gdate: date) -> int:
+    """کلید روز جلالی برای یک تاریخ میلادی."""
+    return _key_of_ordinal(gdate.toordinal())
+
+
+def _window_for(local: date) -> _DayWindow:
+    start = datetime.combine(local, _clock_time()).timestamp()
+    end = datetime.combine(local + timedelta(days=1), _clock_time()).timestamp()
+    return _DayWindow(_key_of_ordinal(local.toordinal()), start, end)
+
+
+def day_key(ts: float) -> int:
+    """کلید روز جلالی (ساعت محلی) برای زمان epoch."""
+    window = _state.today
+    if window is not None and window.start <= ts < window.end:
+        return window.key
+    local = date.fromtimestamp(ts)
+    if local != date.today():
+        return _key_of_ordinal(local.toordinal())
+    window = _state.today = _window_for(local)
+    return window.key
+
+
+def today_key() -> int:
+    """کلید روز جلالی امروز (کش تا نیمه‌شب بعد)."""
+    return day_key(_time.time())
+
+
+def day_key_to_gregorian(key: int) -> date:
+    """تاریخ میلادی متناظر با کلید روز جلالی."""
+    return date.fromordinal(_ordinal_of_key(key))
+
+
+def shift_day_key(key: int, days: int) -> int:
+    """کلید روز جلالی days روز بعد (منفی: قبل)."""
+    return _key_of_ordinal(_ordinal_of_key(key) + days)
+
+
+def day_start_ts(key: int) -> int:
+    """زمان epoch نیمه‌شب محلی شروع روز (برای تبدیل بازه روز به بازه زمانی)."""
+    return int(datetime.combine(day_key_to_gregorian(key), _clock_time()).timestamp())
+
+
+def month_bounds(year: int, month: int) -> Tuple[int, int]:
+    """بازه کلیدهای روز یک ماه جلالی (برای اسکن بازه‌ای عددی)."""
+    base = year * 10000 + month * 100
+    return base + 1, base + 31
+
+
+def month_length(year: int, month: int) -> int:
+    """تعداد روزهای یک ماه جلالی."""
+    return _month_length(year, month)
+
+
+def shift_month(year: int, month: int, months: int) -> Tuple[int, int]:
+    """(سال، ماه) جلالی months ماه بعد (منفی: قبل)."""
+    index = year * 12 + month - 1 + months
+    return index // 12, index % 12 + 1
+
+
+def format_day_key(key: int) -> str:
+    """متن «YYYY/MM/DD» برای کلید روز."""
+    return f"{key // 10000:04d}/{key // 100 % 100:02d}/{key % 100:02d}"
+
+
+def format_date(ts: Optional[float]) -> str:
+    """تاریخ جلالی محلی «YYYY/MM/DD» برای زمان epoch (None -> رشته خالی)."""
+    return "" if ts is None else format_day_key(day_key(ts))
+
+
+def format_time(ts: Optional[float]) -> str:
+    """ساعت محلی «HH:MM:SS» برای زمان epoch (None -> رشته خالی)."""
+    return "" if ts is None else datetime.fromtimestamp(ts).strftime("%H:%M:%S")
+
+
+def epoch_from_jalali(date_text: str, time_text: str) -> int:
+    """تبدیل متن تاریخ جلالی «YYYY/MM/DD» و ساعت محلی «HH:MM:SS» به epoch (برای مهاجرت داده قدیمی)."""
+    hour, minute, second = (int(part) for part in (time_text or "00:00:00").split(":"))
+    gdate = day_key_to_gregorian(day_key_from_text(date_text))
+    return int(datetime(gdate.year, gdate.month, gdate.day, hour, minute, second).timestamp())
+
+
+def day_key_from_text(date_text: str) -> int:
+    """کلید روز از متن «YYYY/MM/DD»."""
+    year, month, day = (int(part) for part in date_text.split("/"))
+    return year * 10000 + month * 100 + day
@@ -0,0 +1,171 @@
+# manage.py
+"""دستورات نگهداری دیتابیس فاکتورها (خط فرمان).
+
+نمونه اجرا (از ریشه پروژه، کنار invoices.db):
+    python manage.py verify-stats     # بررسی انحراف daily_stats (کد خروج 1 در صورت اختلاف)
+    python manage.py rebuild-stats    # بازسازی کامل daily_stats از invoices
+    python manage.py import-csv scans.csv [--exit] [--report outcomes.csv]
+                                      # ثبت ورود/خروج انبوه از خروجی CSV اسکنرهای دستی (ستون اول)
+    python manage.py export invoices_1404-07.csv --from 1404/07/01 --to 1404/07/30
+    python manage.py export weekly.jsonl --kind weekly
+                                      # خروجی جریانی CSV / JSON-lines (قالب از پسوند یا --format)
+    python manage.py archive --days 90
+                                      # انتقال فاکتورهای خارج‌شده قدیمی به invoices_archive
+    python manage.py sync             # یک دور ارسال/دریافت با مخزن مرکزی (sync_path تنظیمات)
+    python manage.py report --from 1403/08/01 --to 1404/07/30
+                                      # صدک ماندگاری، ورود ساعتی و بار روزهای هفته (پیش‌فرض: 365 روز اخیر)
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import sys
+from collections import Counter
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional
+
+import jalali
+from controller import Controller
+from export import EXPORT_FORMATS, EXPORT_KINDS, KIND_INVOICES, export_to_path
+
+
+def _cmd_verify_stats(controller: Controller, _args: argparse.Namespace) -> int:
+    drift = controller.verify_daily_stats()
+    for day, expected, stored in drift:
+        print(f"{day}: expected(entered, exited, open, dwell_total)={expected} stored={stored}")
+    if drift:
+        print(f"daily_stats drift on {len(drift)} day(s); run 'rebuild-stats' to repair.")
+        return 1
+    print("daily_stats OK")
+    return 0
+
+
+def _cmd_rebuild_stats(controller: Controller, _args: argparse.Namespace) -> int:
+    days = controller.rebuild_daily_stats()
+    print(f"daily_stats rebuilt ({days} day(s))")
+    return 0
+
+
+def _read_first_column(path: str) -> Iterator[str]:
+    with open(path, newline="", encoding="utf-8-sig") as handle:
+        for row in csv.reader(handle):
+            if row and row[0].strip():
+                yield row[0]
+
+
+def _cmd_import_csv(controller: Controller, args: argparse.Namespace) -> int:
+    operation = controller.process_exit_bulk if args.exit else controller.add_invoices_bulk
+    numbers = _read_first_column(args.path)
+    totals: Counter[str] = Counter()
+    report_handle = open(args.report, "w", newline="", encoding="utf-8") if args.report else None  # pylint: disable=consider-using-with
+    try:
+        writer = csv.writer(report_handle) if report_handle else None
+        # هر دسته در یک تراکنش ثبت می‌شود تا حافظه برای فایل‌های بزرگ ثابت بماند
+        while batch := list(islice(numbers, args.batch_size)):
+            outcomes = operation(batch)
+            totals.update(outcome for _, outcome in outcomes)
+            if writer:
+                writer.writerows(outcomes)
+    finally:
+        if report_handle:
+            report_handle.close()
+    for outcome, count in sorted(totals.items()):
+        print(f"{outcome}: {count}")
+    return 0
+
+
+def _cmd_export(controller: Controller, args: argparse.Namespace) -> int:
+    count = export_to_path(
+        controller, args.path, args.kind, args.format, start_day=args.start_day, end_day=args.end_day
+    )
+    print(f"{count} row(s) written to {args.path}")
+    return 0
+
+
+def _cmd_archive(controller: Controller, args: argparse.Namespace) -> int:
+    moved = controller.archive_old_invoices(args.days, args.batch_size)
+    working, archived = controller.count_rows()
+    print(f"{moved} invoice(s) archived; working table {working} row(s), archive {archived} row(s)")
+    return 0
+
+
+def _cmd_sync(controller: Controller, _args: argparse.Namespace) -> int:
+    if not controller.sync_enabled():
+        print("sync_path is not configured", file=sys.stderr)
+        return 1
+    report = controller.sync_once()
+    print(f"pushed: {report.pushed}, pulled: {report.pulled}, changed locally: {len(report.changed)}")
+    return 0
+
+
+def _format_seconds(seconds: float) -> str:
+    minutes, secs = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}"
+
+
+def _cmd_report(controller: Controller, args: argparse.Namespace) -> int:
+    end_day = args.end_day or jalali.today_key()
+    start_day = args.start_day or jalali.shift_day_key(end_day, -364)
+    report = controller.get_range_report(start_day, end_day)
+    print(f"{jalali.format_day_key(start_day)} - {jalali.format_day_key(end_day)}: {report.days} day(s), "
+          f"entered {report.entered}, exited {report.exited}")
+    dwell = ", ".join(f"p{pct}={_format_seconds(value)}" for pct, value in report.dwell_percentiles.items())
+    print(f"dwell: mean={_format_seconds(report.dwell_mean)}, {dwell}")
+    print("hourly: " + " ".join(f"{hour:02d}={count}" for hour, count in enumerate(report.hourly) if count))
+    print("weekday (Sat..Fri): " + " ".join(str(count) for count in report.weekday))
+    return 0
+
+
+def _day_key_arg(text: str) -> int:
+    try:
+        return jalali.day_key_from_text(text)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"تاریخ جلالی YYYY/MM/DD نامعتبر: {text}") from exc
+
+
+COMMANDS: Dict[str, Callable[[Controller, argparse.Namespace], int]] = {
+    "verify-stats": _cmd_verify_stats,
+    "rebuild-stats": _cmd_rebuild_stats,
+    "import-csv": _cmd_import_csv,
+    "export": _cmd_export,
+    "archive": _cmd_archive,
+    "sync": _cmd_sync,
+    "report": _cmd_report,
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="ابزار نگهداری دیتابیس فاکتورها")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("verify-stats", help="بررسی انحراف جدول daily_stats")
+    subparsers.add_parser("rebuild-stats", help="بازسازی جدول daily_stats از invoices")
+    import_parser = subparsers.add_parser("import-csv", help="ثبت ورود/خروج انبوه از فایل CSV (ستون اول)")
+    import_parser.add_argument("path", help="مسیر فایل CSV")
+    import_parser.add_argument("--exit", action="store_true", help="ثبت خروج به جای ورود")
+    import_parser.add_argument("--batch-size", type=int, default=50_000, help="تعداد شماره در هر تراکنش")
+    import_parser.add_argument("--report", help="مسیر CSV خروجی نتیجه هر شماره")
+    export_parser = subparsers.add_parser("export", help="خروجی جریانی فاکتورها یا خلاصه‌ها (CSV / JSON-lines)")
+    export_parser.add_argument("path", help="مسیر فایل خروجی (.csv یا .jsonl)")
+    export_parser.add_argument("--kind", choices=EXPORT_KINDS, default=KIND_INVOICES)
+    export_parser.add_argument("--format", choices=EXPORT_FORMATS, help="پیش‌فرض: از پسوند فایل")
+    export_parser.add_argument("--from", dest="start_day", type=_day_key_arg, help="اولین روز ورود (جلالی YYYY/MM/DD)")
+    export_parser.add_argument("--to", dest="end_day", type=_day_key_arg, help="آخرین روز ورود (جلالی YYYY/MM/DD)")
+    archive_parser = subparsers.add_parser("archive", help="انتقال فاکتورهای خارج‌شده قدیمی به بایگانی")
+    archive_parser.add_argument("--days", type=int, help="قدیمی‌تر از این تعداد روز (پیش‌فرض: archive_days تنظیمات)")
+    archive_parser.add_argument("--batch-size", type=int, default=500, help="تعداد فاکتور در هر تراکنش")
+    subparsers.add_parser("sync", help="همگام‌سازی با مخزن مرکزی ایستگاه‌ها")
+    report_parser = subparsers.add_parser("report", help="گزارش ماندگاری و بار ورود یک بازه")
+    report_parser.add_argument("--from", dest="start_day", type=_day_key_arg, help="اولین روز (پیش‌فرض: 364 روز پیش از --to)")
+    report_parser.add_argument("--to", dest="end_day", type=_day_key_arg, help="آخرین روز (پیش‌فرض: امروز)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return COMMANDS[args.command](Controller(), args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,598 @@
+# migrations.py
+"""مهاجرت schema دیتابیس فاکتورها (PRAGMA user_version).
+
+Database در ساخت instance تابع migrate را روی اتصال نویسنده اجرا می‌کند؛ فایل‌های invoices.db قدیمی
+درجا تا SCHEMA_VERSION ارتقا می‌یابند. مرجع بازسازی / بررسی daily_stats (DAILY_STATS_FROM_ALL) هم
+اینجاست چون با schema همان نسخه گره خورده است.
+"""
+
+import logging
+import sqlite3
+from typing import Callable, Dict, Optional, Tuple
+
+import jalali
+
+_LOG = logging.getLogger(__name__)
+
+
+# هر گام یک نسخه schema را بالا می‌برد؛ شماره نسخه جاری در PRAGMA user_version ذخیره می‌شود.
+# گام‌ها فقط اضافه می‌شوند و هرگز ویرایش نمی‌شوند تا فایل‌های invoices.db قدیمی درجا ارتقا یابند.
+def _migration_v1_create_invoices(connection: sqlite3.Connection) -> None:
+    """جدول پایه فاکتورها (schema اولیه پروژه)."""
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS invoices (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            invoice_number INTEGER NOT NULL,
+            date_enter TEXT NOT NULL,
+            time_enter TEXT NOT NULL,
+            first_status TEXT NOT NULL,
+            date_exit TEXT,
+            time_exit TEXT,
+            second_status TEXT
+        )
+        """
+    )
+
+
+def _preserve_v1_duplicates(connection: sqlite3.Connection) -> None:
+    """انتقال ردیف‌های تکراری فایل v1 به invoices_duplicates پیش از گام v2 (که آن‌ها را حذف می‌کند).
+
+    قدیمی‌ترین id هر شماره در invoices می‌ماند؛ بقیه با همه ستون‌ها منتقل می‌شوند و تعداد در لاگ هشدار
+    ثبت می‌شود. بعد از این گام، DELETE گام v2 چیزی برای حذف پیدا نمی‌کند.
+    """
+    duplicates = """
+        SELECT id FROM invoices
+        WHERE id NOT IN (SELECT MIN(id) FROM invoices GROUP BY invoice_number)
+    """
+    moved = connection.execute(f"SELECT COUNT(*) FROM ({duplicates})").fetchone()[0]
+    if not moved:
+        return
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS invoices_duplicates (
+            id INTEGER PRIMARY KEY,
+            invoice_number INTEGER NOT NULL,
+            date_enter TEXT NOT NULL,
+            time_enter TEXT NOT NULL,
+            first_status TEXT NOT NULL,
+            date_exit TEXT,
+            time_exit TEXT,
+            second_status TEXT,
+            moved_ts INTEGER NOT NULL
+        )
+        """
+    )
+    connection.execute(
+        f"""
+        INSERT INTO invoices_duplicates
+            (id, invoice_number, date_enter, time_enter, first_status, date_exit, time_exit, second_status,
+             moved_ts)
+        SELECT id, invoice_number, date_enter, time_enter, first_status, date_exit, time_exit, second_status,
+               CAST(strftime('%s', 'now') AS INTEGER)
+        FROM invoices WHERE id IN ({duplicates})
+        """
+    )
+    connection.execute(f"DELETE FROM invoices WHERE id IN ({duplicates})")
+    _LOG.warning("%d duplicate invoice row(s) moved to invoices_duplicates before the unique index", moved)
+
+
+def _migration_v2_lookup_indexes(connection: sqlite3.Connection) -> None:
+    """ایندکس یکتا روی invoice_number و ایندکس‌های تاریخ/وضعیت.
+
+    رکوردهای تکراری احتمالی (قدیمی‌ترین id حفظ می‌شود) قبل از ساخت ایندکس یکتا حذف می‌شوند.
+    """
+    connection.execute(
+        """
+        DELETE FROM invoices
+        WHERE id NOT IN (SELECT MIN(id) FROM invoices GROUP BY invoice_number)
+        """
+    )
+    connection.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_invoices_number ON invoices (invoice_number)"
+    )
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS idx_invoices_date_enter ON invoices (date_enter, time_enter)"
+    )
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS idx_invoices_status ON invoices (first_status, second_status)"
+    )
+
+
+# شمارش‌های روزانه با schema متنی نسخه ۳ (فقط برای گام مهاجرت v3؛ گام‌ها ویرایش نمی‌شوند)
+_V3_DAILY_STATS_FROM_INVOICES = """
+    SELECT date_enter,
+           COUNT(*),
+           SUM(CASE WHEN second_status IS NOT NULL THEN 1 ELSE 0 END),
+           SUM(CASE WHEN second_status IS NULL THEN 1 ELSE 0 END)
+    FROM invoices
+    GROUP BY date_enter
+"""
+
+
+def _migration_v3_daily_stats(connection: sqlite3.Connection) -> None:
+    """جدول خلاصه روزانه (کلید: تاریخ جلالی ورود) که با trigger همگام می‌ماند.
+
+    entered_count: فاکتورهای ورودی آن روز، exited_count: از همان‌ها خارج شده، open_count: هنوز باز.
+    گزارش‌های هفتگی/ماهانه و شمارنده به جای اسکن invoices از این جدول (O(روز)) خوانده می‌شوند.
+    """
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS daily_stats (
+            day TEXT PRIMARY KEY,
+            entered_count INTEGER NOT NULL DEFAULT 0,
+            exited_count INTEGER NOT NULL DEFAULT 0,
+            open_count INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    connection.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_daily_stats_insert AFTER INSERT ON invoices
+        BEGIN
+            INSERT INTO daily_stats (day, entered_count, exited_count, open_count)
+            VALUES (NEW.date_enter, 1, NEW.second_status IS NOT NULL, NEW.second_status IS NULL)
+            ON CONFLICT (day) DO UPDATE SET
+                entered_count = entered_count + excluded.entered_count,
+                exited_count = exited_count + excluded.exited_count,
+                open_count = open_count + excluded.open_count;
+        END
+        """
+    )
+    connection.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_daily_stats_update AFTER UPDATE OF date_enter, second_status ON invoices
+        BEGIN
+            UPDATE daily_stats SET
+                entered_count = entered_count - 1,
+                exited_count = exited_count - (OLD.second_status IS NOT NULL),
+                open_count = open_count - (OLD.second_status IS NULL)
+            WHERE day = OLD.date_enter;
+            INSERT INTO daily_stats (day, entered_count, exited_count, open_count)
+            VALUES (NEW.date_enter, 1, NEW.second_status IS NOT NULL, NEW.second_status IS NULL)
+            ON CONFLICT (day) DO UPDATE SET
+                entered_count = entered_count + excluded.entered_count,
+                exited_count = exited_count + excluded.exited_count,
+                open_count = open_count + excluded.open_count;
+        END
+        """
+    )
+    connection.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_daily_stats_delete AFTER DELETE ON invoices
+        BEGIN
+            UPDATE daily_stats SET
+                entered_count = entered_count - 1,
+                exited_count = exited_count - (OLD.second_status IS NOT NULL),
+                open_count = open_count - (OLD.second_status IS NULL)
+            WHERE day = OLD.date_enter;
+        END
+        """
+    )
+    connection.execute("DELETE FROM daily_stats")
+    connection.execute(
+        f"INSERT INTO daily_stats (day, entered_count, exited_count, open_count) {_V3_DAILY_STATS_FROM_INVOICES}"
+    )
+
+
+def _legacy_epoch(date_text: Optional[str], time_text: Optional[str]) -> Optional[int]:
+    return None if date_text is None else jalali.epoch_from_jalali(date_text, time_text or "00:00:00")
+
+
+def _legacy_day_key(date_text: Optional[str]) -> Optional[int]:
+    return None if date_text is None else jalali.day_key_from_text(date_text)
+
+
+def _migration_v4_integer_timestamps(connection: sqlite3.Connection) -> None:
+    """تبدیل تاریخ/ساعت متنی جلالی به ستون‌های عددی.
+
+    enter_ts / exit_ts: ثانیه epoch (UTC)
+    enter_day / exit_day: کلید روز جلالی محلی به صورت عدد YYYYMMDD (مثلاً 14040726)
+    ترتیب، بازه‌های هفتگی/ماهانه و فیلتر ماه به اسکن بازه‌ای عددی روی ایندکس تبدیل می‌شوند؛
+    قالب‌بندی متنی به لایه نمایش منتقل شده است. daily_stats هم با کلید عددی دوباره ساخته می‌شود.
+    """
+    connection.create_function("legacy_epoch", 2, _legacy_epoch, deterministic=True)
+    connection.create_function("legacy_day_key", 1, _legacy_day_key, deterministic=True)
+    connection.execute(
+        """
+        CREATE TABLE invoices_v4 (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            invoice_number INTEGER NOT NULL,
+            enter_ts INTEGER NOT NULL,
+            enter_day INTEGER NOT NULL,
+            first_status TEXT NOT NULL,
+            exit_ts INTEGER,
+            exit_day INTEGER,
+            second_status TEXT
+        )
+        """
+    )
+    connection.execute(
+        """
+        INSERT INTO invoices_v4
+            (id, invoice_number, enter_ts, enter_day, first_status, exit_ts, exit_day, second_status)
+        SELECT id, invoice_number,
+               legacy_epoch(date_enter, time_enter), legacy_day_key(date_enter), first_status,
+               legacy_epoch(date_exit, time_exit), legacy_day_key(date_exit), second_status
+        FROM invoices
+        """
+    )
+    for trigger in ("trg_daily_stats_insert", "trg_daily_stats_update", "trg_daily_stats_delete"):
+        connection.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    connection.execute("DROP TABLE invoices")
+    connection.execute("ALTER TABLE invoices_v4 RENAME TO invoices")
+    connection.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_invoices_number ON invoices (invoice_number)"
+    )
+    # rowid (id) جزء ضمنی هر ایندکس است؛ ORDER BY enter_ts DESC, id DESC بدون مرتب‌سازی اجرا می‌شود
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS idx_invoices_enter_ts ON invoices (enter_ts)"
+    )
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS idx_invoices_enter_day ON invoices (enter_day)"
+    )
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS idx_invoices_status ON invoices (first_status, second_status)"
+    )
+
+    connection.execute("DROP TABLE IF EXISTS daily_stats")
+    connection.execute(
+        """
+        CREATE TABLE daily_stats (
+            day INTEGER PRIMARY KEY,
+            entered_count INTEGER NOT NULL DEFAULT 0,
+            exited_count INTEGER NOT NULL DEFAULT 0,
+            open_count INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    connection.execute(
+        """
+        CREATE TRIGGER trg_daily_stats_insert AFTER INSERT ON invoices
+        BEGIN
+            INSERT INTO daily_stats (day, entered_count, exited_count, open_count)
+            VALUES (NEW.enter_day, 1, NEW.exit_ts IS NOT NULL, NEW.exit_ts IS NULL)
+            ON CONFLICT (day) DO UPDATE SET
+                entered_count = entered_count + excluded.entered_count,
+                exited_count = exited_count + excluded.exited_count,
+                open_count = open_count + excluded.open_count;
+        END
+        """
+    )
+    connection.execute(
+        """
+        CREATE TRIGGER trg_daily_stats_update AFTER UPDATE OF enter_day, exit_ts ON invoices
+        BEGIN
+            UPDATE daily_stats SET
+                entered_count = entered_count - 1,
+                exited_count = exited_count - (OLD.exit_ts IS NOT NULL),
+                open_count = open_count - (OLD.exit_ts IS NULL)
+            WHERE day = OLD.enter_day;
+            INSERT INTO daily_stats (day, entered_count, exited_count, open_count)
+            VALUES (NEW.enter_day, 1, NEW.exit_ts IS NOT NULL, NEW.exit_ts IS NULL)
+            ON CONFLICT (day) DO UPDATE SET
+                entered_count = entered_count + excluded.entered_count,
+                exited_count = exited_count + excluded.exited_count,
+                open_count = open_count + excluded.open_count;
+        END
+        """
+    )
+    connection.execute(
+        """
+        CREATE TRIGGER trg_daily_stats_delete AFTER DELETE ON invoices
+        BEGIN
+            UPDATE daily_stats SET
+                entered_count = entered_count - 1,
+                exited_count = exited_count - (OLD.exit_ts IS NOT NULL),
+                open_count = open_count - (OLD.exit_ts IS NULL)
+            WHERE day = OLD.enter_day;
+        END
+        """
+    )
+    rebuild_daily_stats(connection)
+
+
+def _migration_v5_archive(connection: sqlite3.Connection) -> None:
+    """جدول بایگانی invoices_archive برای فاکتورهای خارج‌شده قدیمی (جدول کاری invoices کوچک می‌ماند).
+
+    ستون‌ها همان invoices به اضافه archived_ts؛ id اصلی حفظ می‌شود تا صفحه‌بندی keyset روی هر دو جدول
+    یکتا بماند. daily_stats شامل ردیف‌های بایگانی‌شده هم می‌ماند: trigger حذف برای ردیفی که همان لحظه
+    به بایگانی منتقل شده (id موجود در invoices_archive) شمارش‌ها را کم نمی‌کند.
+    """
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS invoices_archive (
+            id INTEGER PRIMARY KEY,
+            invoice_number INTEGER NOT NULL,
+            enter_ts INTEGER NOT NULL,
+            enter_day INTEGER NOT NULL,
+            first_status TEXT NOT NULL,
+            exit_ts INTEGER NOT NULL,
+            exit_day INTEGER,
+            second_status TEXT NOT NULL,
+            archived_ts INTEGER NOT NULL
+        )
+        """
+    )
+    connection.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_archive_number ON invoices_archive (invoice_number)"
+    )
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS idx_archive_enter_ts ON invoices_archive (enter_ts)"
+    )
+    connection.execute("DROP TRIGGER IF EXISTS trg_daily_stats_delete")
+    connection.execute(
+        """
+        CREATE TRIGGER trg_daily_stats_delete AFTER DELETE ON invoices
+        WHEN NOT EXISTS (SELECT 1 FROM invoices_archive WHERE id = OLD.id)
+        BEGIN
+            UPDATE daily_stats SET
+                entered_count = entered_count - 1,
+                exited_count = exited_count - (OLD.exit_ts IS NOT NULL),
+                open_count = open_count - (OLD.exit_ts IS NULL)
+            WHERE day = OLD.enter_day;
+        END
+        """
+    )
+
+
+def _migration_v6_sync_outbox(connection: sqlite3.Connection) -> None:
+    """صف ارسال (outbox) تغییرات برای همگام‌سازی بین ایستگاه‌ها و جدول وضعیت sync_state.
+
+    هر نوشتن روی invoices (ورود، خروج، حذف) با trigger و در همان تراکنش اسکن یک ردیف به outbox اضافه
+    می‌کند؛ ارسال به مخزن مرکزی بعداً روی thread کارگر انجام می‌شود (sync.py). trigger ها فقط وقتی
+    ثبت می‌کنند که sync_state['outbox'] = 1 باشد: ایستگاه بدون همگام‌سازی چیزی در صف نمی‌گذارد و هنگام
+    اعمال تغییرات دریافتی این مقدار موقتاً 0 می‌شود تا تغییرات دوباره ارسال نشوند. انتقال به بایگانی حذف
+    به حساب نمی‌آید. seq با AUTOINCREMENT هرگز تکرار نمی‌شود (کلید یکتای هر تغییر در مخزن مرکزی).
+    """
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS outbox (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            invoice_number INTEGER NOT NULL,
+            op TEXT NOT NULL,
+            enter_ts INTEGER NOT NULL,
+            exit_ts INTEGER,
+            ts INTEGER NOT NULL
+        )
+        """
+    )
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sync_state (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        ) WITHOUT ROWID
+        """
+    )
+    connection.execute(
+        """
+        CREATE TRIGGER trg_outbox_insert AFTER INSERT ON invoices
+        WHEN (SELECT value FROM sync_state WHERE key = 'outbox') = 1
+        BEGIN
+            INSERT INTO outbox (invoice_number, op, enter_ts, exit_ts, ts)
+            VALUES (NEW.invoice_number, CASE WHEN NEW.exit_ts IS NULL THEN 'enter' ELSE 'exit' END,
+                    NEW.enter_ts, NEW.exit_ts, COALESCE(NEW.exit_ts, NEW.enter_ts));
+        END
+        """
+    )
+    connection.execute(
+        """
+        CREATE TRIGGER trg_outbox_exit AFTER UPDATE OF exit_ts ON invoices
+        WHEN NEW.exit_ts IS NOT NULL AND (SELECT value FROM sync_state WHERE key = 'outbox') = 1
+        BEGIN
+            INSERT INTO outbox (invoice_number, op, enter_ts, exit_ts, ts)
+            VALUES (NEW.invoice_number, 'exit', NEW.enter_ts, NEW.exit_ts, NEW.exit_ts);
+        END
+        """
+    )
+    connection.execute(
+        """
+        CREATE TRIGGER trg_outbox_delete AFTER DELETE ON invoices
+        WHEN (SELECT value FROM sync_state WHERE key = 'outbox') = 1
+            AND NOT EXISTS (SELECT 1 FROM invoices_archive WHERE id = OLD.id)
+        BEGIN
+            INSERT INTO outbox (invoice_number, op, enter_ts, exit_ts, ts)
+            VALUES (OLD.invoice_number, 'delete', OLD.enter_ts, NULL, CAST(strftime('%s', 'now') AS INTEGER));
+        END
+        """
+    )
+
+
+def _migration_v7_number_search(connection: sqlite3.Connection) -> None:
+    """ایندکس جستجوی پیشوند / پسوند / زیررشته شماره فاکتورها (FTS5 با tokenizer trigram).
+
+    rowid هر ردیف همان id فاکتور است (AUTOINCREMENT؛ بین جدول کاری و بایگانی یکتا) و صفحه‌بندی نتایج روی
+    آن انجام می‌شود. trigger درج و حذف invoices ایندکس را در همان تراکنش اسکن به‌روز نگه می‌دارند؛ انتقال
+    به بایگانی id را حفظ می‌کند و به ایندکس دست نمی‌زند. SQLite بدون FTS5 یا trigram (پیش از 3.34) ایندکس
+    نمی‌سازد و Database.search_invoices به پیمایش مستقیم جدول‌ها برمی‌گردد.
+    """
+    try:
+        connection.execute(
+            "CREATE VIRTUAL TABLE invoice_search USING fts5(number, tokenize = 'trigram', detail = 'none')"
+        )
+    except sqlite3.OperationalError:
+        return
+    connection.execute(
+        """
+        CREATE TRIGGER trg_search_insert AFTER INSERT ON invoices
+        BEGIN
+            INSERT INTO invoice_search (rowid, number) VALUES (NEW.id, NEW.invoice_number);
+        END
+        """
+    )
+    connection.execute(
+        """
+        CREATE TRIGGER trg_search_delete AFTER DELETE ON invoices
+        WHEN NOT EXISTS (SELECT 1 FROM invoices_archive WHERE id = OLD.id)
+        BEGIN
+            DELETE FROM invoice_search WHERE rowid = OLD.id;
+        END
+        """
+    )
+    connection.execute(
+        """
+        INSERT INTO invoice_search (rowid, number)
+        SELECT id, invoice_number FROM invoices
+        UNION ALL
+        SELECT id, invoice_number FROM invoices_archive
+        """
+    )
+
+
+def _migration_v8_daily_dwell_total(connection: sqlite3.Connection) -> None:
+    """ستون dwell_total در daily_stats: جمع ماندگاری (exit_ts - enter_ts، حداقل صفر) خارج‌شده‌های هر روز.
+
+    شمارش‌ها با اصلاح زمان ورود یا خروج (مثلاً «زودترین خروج» همگام‌سازی) عوض نمی‌شوند؛ این جمع عوض
+    می‌شود و ReportEngine با آن اعتبار خلاصه روزهای کش‌شده را می‌سنجد. trigger به‌روزرسانی از این نسخه
+    با تغییر enter_ts هم اجرا می‌شود.
+    """
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(daily_stats)")}
+    if "dwell_total" not in columns:
+        connection.execute("ALTER TABLE daily_stats ADD COLUMN dwell_total INTEGER NOT NULL DEFAULT 0")
+    for trigger in ("trg_daily_stats_insert", "trg_daily_stats_update", "trg_daily_stats_delete"):
+        connection.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    connection.execute(
+        f"""
+        CREATE TRIGGER trg_daily_stats_insert AFTER INSERT ON invoices
+        BEGIN
+            INSERT INTO daily_stats (day, entered_count, exited_count, open_count, dwell_total)
+            VALUES (NEW.enter_day, 1, NEW.exit_ts IS NOT NULL, NEW.exit_ts IS NULL, {_dwell("NEW")})
+            ON CONFLICT (day) DO UPDATE SET
+                entered_count = entered_count + excluded.entered_count,
+                exited_count = exited_count + excluded.exited_count,
+                open_count = open_count + excluded.open_count,
+                dwell_total = dwell_total + excluded.dwell_total;
+        END
+        """
+    )
+    connection.execute(
+        f"""
+        CREATE TRIGGER trg_daily_stats_update AFTER UPDATE OF enter_day, enter_ts, exit_ts ON invoices
+        BEGIN
+            UPDATE daily_stats SET
+                entered_count = entered_count - 1,
+                exited_count = exited_count - (OLD.exit_ts IS NOT NULL),
+                open_count = open_count - (OLD.exit_ts IS NULL),
+                dwell_total = dwell_total - {_dwell("OLD")}
+            WHERE day = OLD.enter_day;
+            INSERT INTO daily_stats (day, entered_count, exited_count, open_count, dwell_total)
+            VALUES (NEW.enter_day, 1, NEW.exit_ts IS NOT NULL, NEW.exit_ts IS NULL, {_dwell("NEW")})
+            ON CONFLICT (day) DO UPDATE SET
+                entered_count = entered_count + excluded.entered_count,
+                exited_count = exited_count + excluded.exited_count,
+                open_count = open_count + excluded.open_count,
+                dwell_total = dwell_total + excluded.dwell_total;
+        END
+        """
+    )
+    connection.execute(
+        f"""
+        CREATE TRIGGER trg_daily_stats_delete AFTER DELETE ON invoices
+        WHEN NOT EXISTS (SELECT 1 FROM invoices_archive WHERE id = OLD.id)
+        BEGIN
+            UPDATE daily_stats SET
+                entered_count = entered_count - 1,
+                exited_count = exited_count - (OLD.exit_ts IS NOT NULL),
+                open_count = open_count - (OLD.exit_ts IS NULL),
+                dwell_total = dwell_total - {_dwell("OLD")}
+            WHERE day = OLD.enter_day;
+        END
+        """
+    )
+    rebuild_daily_stats(connection, DAILY_STATS_FROM_ALL, DAILY_STATS_COLUMNS)
+
+
+def _dwell(row: str = "") -> str:
+    # ماندگاری یک فاکتور در SQL (صفر برای فاکتور باز)؛ همان MAX(exit_ts - enter_ts, 0) ستون‌های گزارش
+    prefix = f"{row}." if row else ""
+    return f"COALESCE(MAX({prefix}exit_ts - {prefix}enter_ts, 0), 0)"
+
+
+# شمارش‌های یک روز ورود بر اساس ردیف‌های invoices (مرجع بازسازی/بررسی daily_stats)
+_DAILY_STATS_FROM_INVOICES = """
+    SELECT enter_day,
+           COUNT(*),
+           SUM(CASE WHEN exit_ts IS NOT NULL THEN 1 ELSE 0 END),
+           SUM(CASE WHEN exit_ts IS NULL THEN 1 ELSE 0 END)
+    FROM invoices
+    GROUP BY enter_day
+"""
+
+
+# شمارش‌ها و جمع ماندگاری روی جدول کاری و بایگانی (از schema v8)
+DAILY_STATS_FROM_ALL = f"""
+    SELECT enter_day,
+           COUNT(*),
+           SUM(CASE WHEN exit_ts IS NOT NULL THEN 1 ELSE 0 END),
+           SUM(CASE WHEN exit_ts IS NULL THEN 1 ELSE 0 END),
+           SUM({_dwell()})
+    FROM (
+        SELECT enter_day, enter_ts, exit_ts FROM invoices
+        UNION ALL
+        SELECT enter_day, enter_ts, exit_ts FROM invoices_archive
+    )
+    GROUP BY enter_day
+"""
+DAILY_STATS_COLUMNS = "day, entered_count, exited_count, open_count, dwell_total"
+
+
+def rebuild_daily_stats(
+    connection: sqlite3.Connection,
+    source: str = _DAILY_STATS_FROM_INVOICES,
+    columns: str = "day, entered_count, exited_count, open_count",
+) -> int:
+    """محاسبه دوباره daily_stats از روی source (داخل تراکنش جاری)؛ تعداد روزها را برمی‌گرداند."""
+    connection.execute("DELETE FROM daily_stats")
+    cursor = connection.execute(f"INSERT INTO daily_stats ({columns}) {source}")
+    return cursor.rowcount
+
+
+SCHEMA_MIGRATIONS: Tuple[Callable[[sqlite3.Connection], None], ...] = (
+    _migration_v1_create_invoices,
+    _migration_v2_lookup_indexes,
+    _migration_v3_daily_stats,
+    _migration_v4_integer_timestamps,
+    _migration_v5_archive,
+    _migration_v6_sync_outbox,
+    _migration_v7_number_search,
+    _migration_v8_daily_dwell_total,
+)
+SCHEMA_VERSION = len(SCHEMA_MIGRATIONS)
+# گام‌های ترمیمی: پیش از گام منتشرشده همان نسخه و در همان تراکنش، فقط روی فایل‌هایی که هنوز به آن نسخه
+# نرسیده‌اند اجرا می‌شوند (رفتار تازه بدون ویرایش گام منتشرشده؛ فایل‌های ارتقایافته را لمس نمی‌کنند)
+SCHEMA_PRE_STEPS: Dict[int, Callable[[sqlite3.Connection], None]] = {
+    2: _preserve_v1_duplicates,
+}
+
+
+def get_schema_version(connection: sqlite3.Connection) -> int:
+    """نسخه schema ذخیره‌شده در فایل دیتابیس (PRAGMA user_version)."""
+    return int(connection.execute("PRAGMA user_version").fetchone()[0])
+
+
+def migrate(connection: sqlite3.Connection) -> int:
+    """اجرای گام‌های باقی‌مانده مهاجرت؛ هر گام در یک تراکنش جدا اجرا می‌شود.
+
+    خروجی: نسخه نهایی schema.
+    """
+    version = get_schema_version(connection)
+    for target, step in enumerate(SCHEMA_MIGRATIONS, start=1):
+        if version >= target:
+            continue
+        if connection.in_transaction:
+            connection.commit()
+        connection.execute("BEGIN")
+        try:
+            pre_step = SCHEMA_PRE_STEPS.get(target)
+            if pre_step is not None:
+                pre_step(connection)
+            step(connection)
+            # PRAGMA پارامتر نمی‌پذیرد؛ target عدد صحیح داخلی است.
+            connection.execute(f"PRAGMA user_version = {target}")
+        except Exception:
+            connection.rollback()
+            raise
+        connection.commit()
+        version = target
+    return version
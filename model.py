@@ -1,31 +1,94 @@
 # model.py
 
+import heapq
 import sqlite3
-from datetime import datetime, timedelta
-from typing import Optional, Tuple, List
-import jdatetime
+import threading
+from array import array
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-# کلاس اتصال به دیتابیس
-class Database:
+import db_archive_sync
+import jalali
+from db_archive_sync import SyncChange
+from db_config import DatabaseSettings, load_settings
+from db_pool import ConnectionPool
+from db_rows import (
+    IN_CHUNK,
+    INVOICE_ROW_COLUMNS,
+    DayColumns,
+    InvoicePage,
+    InvoiceRow,
+    chunks,
+    decode_page_cursor,
+    encode_page_cursor,
+    enter_ts_range,
+    fetch_batches,
+    finish_day_columns,
+    invoice_row_factory,
+    to_invoice_row,
+)
+from migrations import DAILY_STATS_COLUMNS, DAILY_STATS_FROM_ALL, migrate, rebuild_daily_stats
+from constants import (
+    STATUS_ENTERED,
+    STATUS_EXITED,
+    OUTCOME_REGISTERED,
+    OUTCOME_ALREADY_PRESENT,
+    OUTCOME_EXITED,
+    OUTCOME_ALREADY_EXITED,
+    OUTCOME_NOT_FOUND,
+    SEARCH_MODES,
+    SEARCH_PREFIX,
+    SEARCH_SUBSTRING,
+    SEARCH_SUFFIX,
+)
+
+
+# بازه گروه‌بندی ساعت ورود در iter_day_columns (همه اختلاف‌های منطقه زمانی مضرب ۱۵ دقیقه‌اند)
+_REPORT_BUCKET_SECONDS = 900
+# جدول کاری و بایگانی با ستون‌های مشترک (id ها بین دو جدول یکتاست)
+_ALL_INVOICES = """
+    SELECT id, invoice_number, enter_ts, enter_day, first_status, exit_ts, second_status FROM invoices
+    UNION ALL
+    SELECT id, invoice_number, enter_ts, enter_day, first_status, exit_ts, second_status FROM invoices_archive
+"""
+
+# عمق batch() فعال روی هر thread (قفل نویسنده در طول دسته در اختیار همان thread است)
+_batch_state = threading.local()
+
+
+class Database:  # pylint: disable=too-many-public-methods
     """Singleton ساده برای مدیریت ارتباط با دیتابیس فاکتورها.
 
     یادداشت:
         - invoice_number در دیتابیس INTEGER است؛ در لایه بالاتر (controller) به صورت str ارسال می‌شود.
           SQLite تبدیل را خود انجام می‌دهد. برای یکپارچگی، پارامترها را str نگه می‌داریم و خروجی SELECT عددی می‌آید.
         - متدها مقادیر Optional برمی‌گردانند وقتی رکوردی وجود ندارد.
+        - متدها thread-safe هستند: نوشتن‌ها روی اتصال نویسنده سریال می‌شوند و خواندن‌ها از اتصال‌های
+          خواننده ConnectionPool انجام می‌شوند؛ هر فراخوانی cursor مخصوص خودش را دارد.
+        - فاکتورهای خارج‌شده قدیمی با archive_exited به invoices_archive منتقل می‌شوند. جستجوی یک شماره،
+          ثبت تکراری، get_all_invoices / get_invoices_page، لیست صفحه‌ای و پیمایش خروجی هر دو جدول را
+          می‌بینند؛ get_recent_statuses (گرم‌کردن کش با روزهای اخیر) فقط جدول کاری را.
     """
 
     _instance: "Database | None" = None
+    pool: ConnectionPool
     connection: sqlite3.Connection
-    cursor: sqlite3.Cursor
+    settings: DatabaseSettings
+    # ایندکس FTS5 شماره‌ها ساخته شده است (SQLite با FTS5 و trigram)
+    search_indexed: bool
 
-    def __new__(cls):
+    def __new__(cls, settings: Optional[DatabaseSettings] = None):
+        """ساخت singleton؛ settings فقط در اولین فراخوانی اعمال می‌شود (پیش‌فرض: load_settings())."""
         if cls._instance is None:
             cls._instance = super(Database, cls).__new__(cls)
-            # تعریف connection و cursor به صورت attribute شیء
-            cls.connection = sqlite3.connect("invoices.db")
-            cls.cursor = cls.connection.cursor()
+            cls.settings = settings if settings is not None else load_settings()
+            cls.pool = ConnectionPool(cls.settings)
+            # connection: اتصال نویسنده (برای مهاجرت و ابزارهای تشخیصی مثل set_trace_callback)
+            cls.connection = cls.pool.writer_connection
             cls._instance.create_table()
+            cls.search_indexed = cls.connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'invoice_search'"
+            ).fetchone() is not None
         return cls._instance
 
     @classmethod
@@ -33,171 +96,705 @@ class Database:
         """Reset singleton safely (for tests)."""
         if cls._instance is not None:
             try:
-                cls.cursor.close()  # type: ignore[attr-defined]
-            except Exception:  # pylint: disable=broad-except
-                pass
-            try:
-                cls.connection.close()  # type: ignore[attr-defined]
+                cls.pool.close()
             except Exception:  # pylint: disable=broad-except
                 pass
         cls._instance = None
-    # ایجاد جدول
-    def create_table(self) -> None:
-        query = """
-            CREATE TABLE IF NOT EXISTS invoices (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                invoice_number INTEGER NOT NULL,
-                date_enter TEXT NOT NULL,
-                time_enter TEXT NOT NULL,
-                first_status TEXT NOT NULL,
-                date_exit TEXT,
-                time_exit TEXT,
-                second_status TEXT
-            )
+
+    # ---------------------- دسترسی به اتصال‌ها ----------------------
+    def _fetchone(self, query: str, params: Sequence[Any] = ()) -> Optional[Tuple[Any, ...]]:
+        with self._read_connection() as connection:
+            return connection.execute(query, params).fetchone()
+
+    def _fetchall(self, query: str, params: Sequence[Any] = ()) -> List[Tuple[Any, ...]]:
+        with self._read_connection() as connection:
+            return connection.execute(query, params).fetchall()
+
+    def _fetch_invoice_rows(self, query: str, params: Sequence[Any] = ()) -> List[InvoiceRow]:
+        # کوئری با ستون‌های INVOICE_ROW_COLUMNS؛ row_factory روی همین cursor، نه کل اتصال
+        with self._read_connection() as connection:
+            cursor = connection.cursor()
+            cursor.row_factory = invoice_row_factory
+            return cursor.execute(query, params).fetchall()
+
+    def _in_batch(self) -> bool:
+        return getattr(_batch_state, "depth", 0) > 0
+
+    @contextmanager
+    def _read_connection(self) -> Iterator[sqlite3.Connection]:
+        """اتصال خواننده؛ داخل batch همان اتصال نویسنده تا نوشتن‌های commit نشده دسته دیده شوند."""
+        pool = type(self).pool
+        with pool.writer() if self._in_batch() else pool.reader() as connection:
+            yield connection
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """اتصال نویسنده داخل یک تراکنش (commit در پایان، rollback در صورت خطا).
+
+        داخل batch() همین thread، تراکنش بیرونی ادامه می‌یابد و commit به پایان دسته موکول می‌شود.
+        """
+        with type(self).pool.writer() as connection:
+            if self._in_batch():
+                yield connection
+                return
+            with connection:
+                yield connection
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """اجرای چند نوشتن پشت سر هم در یک تراکنش (یک commit برای کل دسته).
+
+        قفل نویسنده تا پایان دسته نگه داشته می‌شود؛ خطا در هر دستور کل دسته را rollback می‌کند.
+        batch تودرتو به دسته بیرونی می‌پیوندد.
+        """
+        with type(self).pool.writer() as connection:
+            if self._in_batch():
+                yield
+                return
+            _batch_state.depth = 1
+            try:
+                with connection:
+                    yield
+            finally:
+                _batch_state.depth = 0
+
+    def _write_returning(self, query: str, params: Sequence[Any]) -> Optional[InvoiceRow]:
+        """اجرای یک دستور نوشتن با RETURNING در تراکنش خودش؛ ردیف متأثر یا None."""
+        with self._transaction() as connection:
+            cursor = connection.cursor()
+            cursor.row_factory = invoice_row_factory
+            # fetchall: دستور قبل از commit کامل اجرا و بسته می‌شود
+            rows = cursor.execute(query, params).fetchall()
+        return rows[0] if rows else None
+
+    def _fetch_by_number(self, columns: str, invoice_number: str) -> Optional[Tuple[Any, ...]]:
+        """ردیف یک شماره از جدول کاری، وگرنه از بایگانی (یک کوئری).
+
+        با LIMIT 1 بخش دوم UNION ALL فقط وقتی اجرا می‌شود که جدول کاری ردیفی نداشت؛ جستجوی بایگانی یک
+        پرش روی ایندکس یکتای idx_archive_number است.
         """
-        self.__class__.cursor.execute(query)
-        self.__class__.connection.commit()
+        return self._fetchone(
+            f"""
+            SELECT {columns} FROM invoices WHERE invoice_number = ?
+            UNION ALL
+            SELECT {columns} FROM invoices_archive WHERE invoice_number = ?
+            LIMIT 1
+            """,
+            (invoice_number, invoice_number),
+        )
+
+    # ایجاد جدول و ارتقای schema
+    def create_table(self) -> None:
+        """ایجاد/ارتقای schema تا آخرین نسخه (نام حفظ شده برای سازگاری)."""
+        self.migrate()
+
+    def migrate(self) -> int:
+        """اجرای مهاجرت‌های معوق روی اتصال نویسنده و بازگرداندن نسخه schema."""
+        with type(self).pool.writer() as connection:
+            return migrate(connection)
 
     # بررسی وجود فاکتور
     def invoice_exists(self, invoice_number: str) -> bool:
         """بررسی وجود فاکتور با شماره داده شده."""
-        self.__class__.cursor.execute(
-            "SELECT id FROM invoices WHERE invoice_number = ?", (invoice_number,)
-        )
-        return self.__class__.cursor.fetchone() is not None
+        return self._fetch_by_number("id", invoice_number) is not None
 
     # ثبت فاکتور جدید
-    def add_invoice(self, invoice_number: str) -> None:
-        """افزودن فاکتور جدید در صورت نبود قبلی (ایگنور اگر موجود)."""
-        if self.invoice_exists(invoice_number):
-            return
-        date = jdatetime.datetime.now().strftime("%Y/%m/%d")
-        time = datetime.now().strftime("%H:%M:%S")
-        self.__class__.cursor.execute("""
-            INSERT INTO invoices (invoice_number, date_enter, time_enter, first_status) 
-            VALUES (?, ?, ?, ?)
-        """, (invoice_number, date, time, "وارد شده"))
-        self.__class__.connection.commit()
+    def add_invoice(self, invoice_number: str) -> Optional[InvoiceRow]:
+        """افزودن فاکتور جدید در صورت نبود قبلی (ایگنور اگر موجود).
 
-    # دریافت زمان ثبت فاکتور وارد شده
-    def get_invoice_enter(self, invoice_number: str) -> Optional[Tuple[str, str, str]]:
-        """دریافت تاریخ/ساعت/وضعیت اولیه فاکتور (یا None)."""
-        self.__class__.cursor.execute(
-            "SELECT date_enter, time_enter, first_status FROM invoices WHERE invoice_number = ?",
-            (invoice_number,),
+        یک دستور اتمی (INSERT ... ON CONFLICT DO NOTHING RETURNING)؛ بین چند ایستگاه اسکن که فایل را
+        به اشتراک دارند هم race ندارد. شماره بایگانی‌شده هم تکراری است (پرش روی ایندکس بایگانی در همان دستور).
+        خروجی: ردیف ثبت‌شده، یا None اگر شماره از قبل وجود داشت.
+        """
+        timestamp = jalali.now_ts()
+        return self._write_returning(
+            f"""
+            INSERT INTO invoices (invoice_number, enter_ts, enter_day, first_status)
+            SELECT ?, ?, ?, ?
+            WHERE NOT EXISTS (SELECT 1 FROM invoices_archive WHERE invoice_number = ?)
+            ON CONFLICT (invoice_number) DO NOTHING
+            RETURNING {INVOICE_ROW_COLUMNS}
+            """,
+            (invoice_number, timestamp, jalali.day_key(timestamp), "وارد شده", invoice_number),
         )
-        return self.__class__.cursor.fetchone()
+
+    # ثبت گروهی فاکتورها در یک تراکنش
+    def add_invoices_bulk(self, invoice_numbers: Iterable[str]) -> List[Tuple[str, str]]:
+        """ثبت انبوه شماره‌های معتبر (فقط رقم) با executemany در یک تراکنش.
+
+        تکراری‌ها با ایندکس یکتا (و داخل همین دسته) تشخیص داده می‌شوند.
+        خروجی: (شماره، OUTCOME_REGISTERED | OUTCOME_ALREADY_PRESENT) به ترتیب ورودی.
+        """
+        numbers = list(invoice_numbers)
+        keys = list(dict.fromkeys(int(n) for n in numbers))
+        timestamp = jalali.now_ts()
+        day = jalali.day_key(timestamp)
+        with self._transaction() as connection:
+            existing = set()
+            for chunk in chunks(keys, IN_CHUNK // 2):
+                existing.update(
+                    int(r[0])
+                    for r in connection.execute(
+                        f"""
+                        SELECT invoice_number FROM invoices WHERE invoice_number IN ({','.join('?' * len(chunk))})
+                        UNION ALL
+                        SELECT invoice_number FROM invoices_archive WHERE invoice_number IN ({','.join('?' * len(chunk))})
+                        """,
+                        chunk * 2,
+                    )
+                )
+            new_keys = [k for k in keys if k not in existing]
+            connection.executemany(
+                """
+                INSERT INTO invoices (invoice_number, enter_ts, enter_day, first_status)
+                VALUES (?, ?, ?, ?)
+                """,
+                ((k, timestamp, day, "وارد شده") for k in new_keys),
+            )
+        registered = set(new_keys)
+        outcomes: List[Tuple[str, str]] = []
+        for number in numbers:
+            key = int(number)
+            if key in registered:
+                registered.discard(key)  # تکرار بعدی همین شماره در دسته «موجود» است
+                outcomes.append((number, OUTCOME_REGISTERED))
+            else:
+                outcomes.append((number, OUTCOME_ALREADY_PRESENT))
+        return outcomes
+
+    # ثبت گروهی خروج فاکتورها در یک تراکنش
+    def process_exit_bulk(self, invoice_numbers: Iterable[str]) -> List[Tuple[str, str]]:
+        """ثبت خروج انبوه با executemany در یک تراکنش.
+
+        خروجی: (شماره، OUTCOME_EXITED | OUTCOME_ALREADY_EXITED | OUTCOME_NOT_FOUND) به ترتیب ورودی.
+        """
+        numbers = list(invoice_numbers)
+        keys = list(dict.fromkeys(int(n) for n in numbers))
+        timestamp = jalali.now_ts()
+        day = jalali.day_key(timestamp)
+        with self._transaction() as connection:
+            exited_before: Dict[int, bool] = {}
+            for chunk in chunks(keys, IN_CHUNK // 2):
+                exited_before.update(
+                    (int(r[0]), bool(r[1]))
+                    for r in connection.execute(
+                        f"""
+                        SELECT invoice_number, second_status IS NOT NULL
+                        FROM invoices WHERE invoice_number IN ({','.join('?' * len(chunk))})
+                        UNION ALL
+                        SELECT invoice_number, 1
+                        FROM invoices_archive WHERE invoice_number IN ({','.join('?' * len(chunk))})
+                        """,
+                        chunk * 2,
+                    )
+                )
+            to_exit = [k for k in keys if exited_before.get(k) is False]
+            connection.executemany(
+                """
+                UPDATE invoices
+                SET exit_ts = ?, exit_day = ?, second_status = ?
+                WHERE invoice_number = ? AND second_status IS NULL
+                """,
+                ((timestamp, day, "خارج شده", k) for k in to_exit),
+            )
+        pending = set(to_exit)
+        outcomes: List[Tuple[str, str]] = []
+        for number in numbers:
+            key = int(number)
+            if key not in exited_before:
+                outcomes.append((number, OUTCOME_NOT_FOUND))
+            elif key in pending:
+                pending.discard(key)
+                outcomes.append((number, OUTCOME_EXITED))
+            else:
+                outcomes.append((number, OUTCOME_ALREADY_EXITED))
+        return outcomes
+
+    # دریافت زمان ثبت فاکتور وارد شده
+    def get_invoice_enter(self, invoice_number: str) -> Optional[Tuple[int, str]]:
+        """دریافت زمان ورود (epoch) و وضعیت اولیه فاکتور (یا None)."""
+        return self._fetch_by_number("enter_ts, first_status", invoice_number)  # type: ignore[return-value]
+
     # شمارش فاکتور های وارد شده
     def count_invoice_enter(self) -> int:
-        """شمار فاکتورهای در وضعیت ورود (وارد شده)."""
-        self.__class__.cursor.execute(
-            "SELECT COUNT(*) FROM invoices WHERE first_status = 'وارد شده'"
-        )
-        return int(self.__class__.cursor.fetchone()[0])
+        """شمار فاکتورهای در وضعیت ورود (وارد شده)؛ از جمع daily_stats."""
+        row = self._fetchone("SELECT COALESCE(SUM(entered_count), 0) FROM daily_stats")
+        return int(row[0]) if row else 0
+
     # ثبت خروج فاکتور
-    def update_invoice_exit(self, invoice_number: str) -> None:
-        date = jdatetime.datetime.now().strftime("%Y/%m/%d")
-        time = datetime.now().strftime("%H:%M:%S")
-        self.__class__.cursor.execute("""
+    def update_invoice_exit(self, invoice_number: str) -> Optional[InvoiceRow]:
+        """ثبت خروج فاکتور وارد شده با یک دستور اتمی (UPDATE ... RETURNING).
+
+        خروجی: ردیف بعد از خروج، یا None اگر فاکتور وجود ندارد یا قبلاً خارج شده است.
+        """
+        timestamp = jalali.now_ts()
+        return self._write_returning(
+            f"""
             UPDATE invoices
-            SET date_exit = ?, time_exit = ?, second_status = ?
-            WHERE invoice_number = ? AND second_status IS NULL
-        """, (date, time, "خارج شده", invoice_number))
-        self.__class__.connection.commit()
+            SET exit_ts = ?, exit_day = ?, second_status = ?
+            WHERE invoice_number = ? AND first_status = ? AND second_status IS NULL
+            RETURNING {INVOICE_ROW_COLUMNS}
+            """,
+            (timestamp, jalali.day_key(timestamp), "خارج شده", invoice_number, "وارد شده"),
+        )
 
     # دریافت وضعیت فاکتور
     def get_invoice_status(
         self, invoice_number: str
-    ) -> Optional[Tuple[str, str, str, Optional[str], Optional[str], Optional[str]]]:
-        """وضعیت کامل فاکتور یا None اگر وجود نداشته باشد."""
-        self.__class__.cursor.execute(
+    ) -> Optional[Tuple[int, str, Optional[int], Optional[str]]]:
+        """وضعیت کامل فاکتور (enter_ts, first_status, exit_ts, second_status) یا None اگر وجود نداشته باشد."""
+        return self._fetch_by_number(  # type: ignore[return-value]
+            "enter_ts, first_status, exit_ts, second_status", invoice_number
+        )
+
+    # دریافت وضعیت فاکتورهای اخیر (گرم‌کردن کش وضعیت)
+    def get_recent_statuses(
+        self, since_day: int, limit: int
+    ) -> List[Tuple[int, int, str, Optional[int], Optional[str]]]:
+        """(invoice_number, enter_ts, first_status, exit_ts, second_status) فاکتورهای ورودی از since_day، جدید به قدیم."""
+        return self._fetchall(  # type: ignore[return-value]
             """
-            SELECT date_enter, time_enter, first_status, date_exit, time_exit, second_status 
-            FROM invoices WHERE invoice_number = ?
+            SELECT invoice_number, enter_ts, first_status, exit_ts, second_status
+            FROM invoices
+            WHERE enter_day >= ?
+            ORDER BY enter_ts DESC, id DESC
+            LIMIT ?
             """,
-            (invoice_number,),
+            (since_day, limit),
         )
-        return self.__class__.cursor.fetchone()
+
     # دریافت اطلاعات کامل فاکتور
     def get_invoice_info(
         self, invoice_number: str
-    ) -> Optional[Tuple[str, str, str, Optional[str], Optional[str], Optional[str]]]:
+    ) -> Optional[Tuple[int, str, Optional[int], Optional[str]]]:
         """همان get_invoice_status (نام حفظ شده برای سازگاری)."""
-        self.__class__.cursor.execute(
+        return self.get_invoice_status(invoice_number)
+
+    # دریافت همه فاکتورها بر اساس زمان ثبت، از جدید به قدیم
+    def get_all_invoices(self) -> List[InvoiceRow]:
+        """لیست همه فاکتورها (جدول کاری و بایگانی) به همراه تاریخ/ساعت خروج (یک کوئری)."""
+        return self._fetch_invoice_rows(
+            f"""
+            SELECT {INVOICE_ROW_COLUMNS} FROM ({_ALL_INVOICES})
+            ORDER BY enter_ts DESC, id DESC
             """
-            SELECT date_enter, time_enter, first_status, date_exit, time_exit, second_status 
-            FROM invoices WHERE invoice_number = ?
+        )
+
+    # دریافت یک صفحه از فاکتورها (برای بارگذاری تنبل جدول)
+    def get_invoices_page(self, offset: int, limit: int) -> List[InvoiceRow]:
+        """یک صفحه از فاکتورها با همان ترتیب و ساختار get_all_invoices.
+
+        OFFSET است و هزینه‌اش با عمق صفحه بالا می‌رود؛ برای ورق زدن تاریخچه از list_invoices استفاده شود.
+        """
+        return self._fetch_invoice_rows(
+            f"""
+            SELECT {INVOICE_ROW_COLUMNS} FROM ({_ALL_INVOICES})
+            ORDER BY enter_ts DESC, id DESC
+            LIMIT ? OFFSET ?
             """,
-            (invoice_number,),
+            (limit, offset),
         )
-        return self.__class__.cursor.fetchone()
 
-    # دریافت همه فاکتورها بر اساس زمان ثبت، از جدید به قدیم
-    def get_all_invoices(self) -> List[Tuple[int, str, str, str]]:
-        """لیست همه فاکتورها: (invoice_number, date_enter, time_enter, status)."""
-        type(self).cursor.execute(
-            """
-            SELECT invoice_number, date_enter, time_enter,
-                   CASE WHEN second_status IS NOT NULL THEN second_status ELSE first_status END AS status
-            FROM invoices
-            ORDER BY date_enter DESC, time_enter DESC
+    # لیست صفحه‌ای فاکتورها با کلید ادامه (keyset)
+    def list_invoices(  # pylint: disable=too-many-arguments
+        self,
+        after_cursor: Optional[str] = None,
+        limit: int = 200,
+        *,
+        status: Optional[str] = None,
+        date_from: Optional[int] = None,
+        date_to: Optional[int] = None,
+        number_prefix: Optional[str] = None,
+    ) -> InvoicePage:
+        """یک صفحه از فاکتورها (جدیدترین اول) بعد از after_cursor، با فیلترهای اختیاری.
+
+        صفحه‌بندی keyset روی (enter_ts, id) و ایندکس idx_invoices_enter_ts است، نه OFFSET؛ هزینه هر صفحه
+        به عمق آن در تاریخچه بستگی ندارد و ثبت فاکتور تازه در حین ورق زدن ردیف تکراری یا جاافتاده نمی‌سازد.
+        بایگانی هم با همان کلید (id ها بین دو جدول یکتاست) و ایندکس idx_archive_enter_ts ادغام می‌شود.
+
+        status: STATUS_ENTERED (خارج‌نشده) یا STATUS_EXITED
+        date_from / date_to: کلید روز ورود (دو سر شامل)
+        number_prefix: پیشوند رقمی شماره فاکتور
+        """
+        if limit < 1:
+            raise ValueError("limit باید مثبت باشد")
+        conditions, params = enter_ts_range(date_from, date_to)
+        if status == STATUS_ENTERED:
+            conditions.append("second_status IS NULL")
+        elif status == STATUS_EXITED:
+            conditions.append("second_status IS NOT NULL")
+        elif status is not None:
+            raise ValueError(f"وضعیت نامعتبر: {status}")
+        if number_prefix:
+            if not number_prefix.isdigit():
+                raise ValueError(f"پیشوند شماره باید رقمی باشد: {number_prefix}")
+            conditions.append("CAST(invoice_number AS TEXT) LIKE ?")
+            params.append(f"{number_prefix}%")
+        if after_cursor:
+            conditions.append("(enter_ts, id) < (?, ?)")
+            params.extend(decode_page_cursor(after_cursor))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        # id آخر ستون‌هاست تا to_invoice_row ردیف را بدون برش tuple بخواند
+        page_query = f"SELECT {INVOICE_ROW_COLUMNS}, id FROM {{table}} {where} ORDER BY enter_ts DESC, id DESC LIMIT ?"
+        if status == STATUS_ENTERED:
+            # همه ردیف‌های بایگانی خارج شده‌اند
+            rows = self._fetchall(page_query.format(table="invoices"), (*params, limit + 1))
+        else:
+            # هر جدول حداکثر limit + 1 ردیف از ایندکس خودش می‌دهد؛ ادغام فقط روی همین ردیف‌هاست
+            rows = self._fetchall(
+                f"""
+                SELECT * FROM ({page_query.format(table="invoices")})
+                UNION ALL
+                SELECT * FROM ({page_query.format(table="invoices_archive")})
+                ORDER BY enter_ts DESC, id DESC
+                LIMIT ?
+                """,
+                (*params, limit + 1, *params, limit + 1, limit + 1),
+            )
+        # یک ردیف اضافه فقط برای دانستن وجود صفحه بعد
+        page = rows[:limit]
+        next_cursor = encode_page_cursor(page[-1][1], page[-1][5]) if len(rows) > limit else None
+        return InvoicePage([to_invoice_row(r) for r in page], next_cursor)
+
+    # جستجوی پیشوند / پسوند / زیررشته شماره فاکتور
+    def search_invoices(
+        self, pattern: str, mode: str = SEARCH_SUBSTRING, limit: int = 20, after_cursor: Optional[str] = None
+    ) -> InvoicePage:
+        """فاکتورهایی (با بایگانی) که شماره‌شان با pattern شروع یا تمام می‌شود یا آن را در بر دارد.
+
+        ترتیب: تازه‌ترین ثبت در همین ایستگاه اول (id نزولی)؛ صفحه‌بندی keyset روی id.
+        با ایندکس invoice_search فقط فهرست ردیف‌های سه‌رقمی‌های الگو خوانده می‌شود و پیمایش با رسیدن به
+        limit + 1 نتیجه تمام می‌شود؛ الگوی کوتاه‌تر از سه رقم (که نتیجه زیادی دارد) ایندکس را از جدیدترین ردیف
+        پیمایش می‌کند. بدون ایندکس همین جستجو روی id نزولی دو جدول انجام می‌شود.
+        mode: SEARCH_PREFIX / SEARCH_SUFFIX / SEARCH_SUBSTRING
+        """
+        if limit < 1:
+            raise ValueError("limit باید مثبت باشد")
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"حالت جستجوی نامعتبر: {mode}")
+        if not pattern.isdigit():
+            raise ValueError(f"الگوی جستجو باید رقمی باشد: {pattern}")
+        like = {SEARCH_PREFIX: f"{pattern}%", SEARCH_SUFFIX: f"%{pattern}", SEARCH_SUBSTRING: f"%{pattern}%"}[mode]
+        params: List[Any] = [like]
+        before = ""
+        if after_cursor:
+            before = "AND {column} < ?"
+            params.append(decode_page_cursor(after_cursor)[1])
+        with self._read_connection() as connection:
+            if type(self).search_indexed:
+                ids = [
+                    r[0]
+                    for r in connection.execute(
+                        f"""
+                        SELECT rowid FROM invoice_search
+                        WHERE number LIKE ? {before.format(column="rowid")}
+                        ORDER BY rowid DESC LIMIT ?
+                        """,
+                        (*params, limit + 1),
+                    )
+                ]
+                rows: List[Tuple[Any, ...]] = []
+                for chunk in chunks(ids):
+                    marks = ",".join("?" * len(chunk))
+                    rows.extend(
+                        connection.execute(
+                            f"""
+                            SELECT {INVOICE_ROW_COLUMNS}, id FROM invoices WHERE id IN ({marks})
+                            UNION ALL
+                            SELECT {INVOICE_ROW_COLUMNS}, id FROM invoices_archive WHERE id IN ({marks})
+                            """,
+                            (*chunk, *chunk),
+                        )
+                    )
+                rows.sort(key=lambda r: r[5], reverse=True)
+            else:
+                page_query = (
+                    f"SELECT {INVOICE_ROW_COLUMNS}, id FROM {{table}} "
+                    f"WHERE CAST(invoice_number AS TEXT) LIKE ? {before.format(column='id')} ORDER BY id DESC LIMIT ?"
+                )
+                rows = connection.execute(
+                    f"""
+                    SELECT * FROM ({page_query.format(table="invoices")})
+                    UNION ALL
+                    SELECT * FROM ({page_query.format(table="invoices_archive")})
+                    ORDER BY id DESC
+                    LIMIT ?
+                    """,
+                    (*params, limit + 1, *params, limit + 1, limit + 1),
+                ).fetchall()
+        page = rows[:limit]
+        next_cursor = encode_page_cursor(page[-1][1], page[-1][5]) if len(rows) > limit else None
+        return InvoicePage([to_invoice_row(r) for r in page], next_cursor)
+
+    # پیمایش جریانی فاکتورها (خروجی گرفتن)
+    def iter_invoices(
+        self, start_day: Optional[int] = None, end_day: Optional[int] = None, batch_size: int = 1000
+    ) -> Iterator[InvoiceRow]:
+        """فاکتورهای بازه روز ورود (دو سر شامل؛ None یعنی بدون حد) به ترتیب زمان ورود، قدیم به جدید.
+
+        ردیف‌ها دسته‌ای با fetchmany از یک cursor خوانده می‌شوند؛ حافظه مستقل از تعداد کل ردیف‌هاست.
+        بازه روز به بازه enter_ts تبدیل می‌شود تا پیمایش روی ایندکس زمان و بدون مرتب‌سازی موقت باشد.
+        جدول کاری و بایگانی هر کدام با cursor جدا پیمایش و به ترتیب (enter_ts, id) ادغام می‌شوند.
+        اتصال خواننده تا پایان پیمایش (یا بسته شدن generator) نگه داشته می‌شود.
+        """
+        conditions, params = enter_ts_range(start_day, end_day)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with type(self).pool.reader() as connection:
+            cursors = [
+                connection.execute(
+                    f"SELECT {INVOICE_ROW_COLUMNS}, id FROM {table} {where} ORDER BY enter_ts ASC, id ASC",
+                    params,
+                )
+                for table in ("invoices", "invoices_archive")
+            ]
+            try:
+                for r in heapq.merge(*(fetch_batches(c, batch_size) for c in cursors), key=lambda r: (r[1], r[5])):
+                    yield to_invoice_row(r)
+            finally:
+                for cursor in cursors:
+                    cursor.close()
+
+    # پیمایش خلاصه روزانه
+    def iter_daily_stats(
+        self, start_day: Optional[int] = None, end_day: Optional[int] = None
+    ) -> Iterator[Tuple[int, int, int, int]]:
+        """(کلید روز، ورودی، خارج‌شده، باز) روزهای بازه از daily_stats، به ترتیب روز."""
+        with type(self).pool.reader() as connection:
+            cursor = connection.execute(
+                """
+                SELECT day, entered_count, exited_count, open_count
+                FROM daily_stats
+                WHERE day BETWEEN ? AND ? AND entered_count > 0
+                ORDER BY day ASC
+                """,
+                (start_day if start_day is not None else 0, end_day if end_day is not None else 99999999),
+            )
+            try:
+                yield from fetch_batches(cursor, 500)
+            finally:
+                cursor.close()
+
+    # امضای روزها برای اعتبارسنجی کش گزارش‌ها
+    def get_daily_totals(self, start_day: int, end_day: int) -> List[Tuple[int, int, int, int]]:
+        """(کلید روز، ورودی، خارج‌شده، جمع ماندگاری) روزهای دارای ورود بازه از daily_stats، به ترتیب روز."""
+        return self._fetchall(
             """
+            SELECT day, entered_count, exited_count, dwell_total
+            FROM daily_stats
+            WHERE day BETWEEN ? AND ? AND entered_count > 0
+            ORDER BY day ASC
+            """,
+            (start_day, end_day),
         )
-        rows_raw = type(self).cursor.fetchall()
-        rows: List[Tuple[int, str, str, str]] = [
-            (int(r[0]), str(r[1]), str(r[2]), str(r[3])) for r in rows_raw
-        ]
-        return rows
+
+    # بارگذاری ستونی بازه برای گزارش‌ها
+    def iter_day_columns(self, start_day: int, end_day: int) -> Iterator[DayColumns]:
+        """ستون‌های هر روز دارای ورود در start_day..end_day (با بایگانی)، به ترتیب روز.
+
+        گروه‌بندی و شمارش داخل SQLite انجام می‌شود و برای هر بازه ۱۵ دقیقه‌ای یک ردیف برمی‌گردد؛
+        ماندگاری‌ها با group_concat بسته‌بندی و با split و map(int) (بدون tuple برای هر فاکتور) در array
+        ریخته می‌شوند.
+        """
+        conditions, params = enter_ts_range(start_day, end_day)
+        where = " AND ".join(conditions)
+        source = f"""
+            SELECT enter_day, enter_ts, exit_ts FROM invoices WHERE {where}
+            UNION ALL
+            SELECT enter_day, enter_ts, exit_ts FROM invoices_archive WHERE {where}
+        """
+        with type(self).pool.reader() as connection:
+            cursor = connection.execute(
+                f"""
+                SELECT enter_day, enter_ts / {_REPORT_BUCKET_SECONDS}, COUNT(*),
+                       group_concat(CASE WHEN exit_ts IS NULL THEN NULL ELSE MAX(exit_ts - enter_ts, 0) END)
+                FROM ({source})
+                GROUP BY 1, 2 ORDER BY 1, 2
+                """,
+                params * 2,
+            )
+            try:
+                current: Optional[DayColumns] = None
+                packed: List[str] = []
+                for day, bucket, count, dwell in fetch_batches(cursor, 1000):
+                    if current is None or current.day != day:
+                        if current is not None:
+                            yield finish_day_columns(current, packed)
+                        current = DayColumns(int(day), array("q"), array("l"), array("q"))
+                        packed = []
+                    current.bucket_starts.append(int(bucket) * _REPORT_BUCKET_SECONDS)
+                    current.bucket_counts.append(int(count))
+                    if dwell:
+                        packed.append(dwell)
+                if current is not None:
+                    yield finish_day_columns(current, packed)
+            finally:
+                cursor.close()
+
+    # دریافت ردیف لیست یک فاکتور
+    def get_invoice_row(self, invoice_number: str) -> Optional[InvoiceRow]:
+        """ردیف یک فاکتور با ساختار get_all_invoices (یا None)."""
+        r = self._fetch_by_number(INVOICE_ROW_COLUMNS, invoice_number)
+        return None if r is None else to_invoice_row(r)
+
     # دریافت فاکتور ها برای جدول هفتگی
-    def get_weekly_summary(self) -> List[Tuple[str, int, int]]:
-        today = jdatetime.datetime.now().strftime("%Y/%m/%d")
-        gdate = jdatetime.datetime.now().togregorian() - timedelta(days=7)
-        one_week_ago = jdatetime.datetime.fromgregorian(datetime=gdate).strftime("%Y/%m/%d")
-        type(self).cursor.execute(
+    def get_weekly_summary(self) -> List[Tuple[int, int, int]]:
+        """(کلید روز، ورودی، خارج‌شده) هفت روز اخیر؛ اسکن بازه‌ای روی کلید عددی daily_stats."""
+        today = jalali.today_key()
+        one_week_ago = jalali.shift_day_key(today, -7)
+        # ستون‌های INTEGER از sqlite3 خودشان int هستند؛ ردیف‌ها بدون لیست دوم برگردانده می‌شوند
+        return self._fetchall(  # type: ignore[return-value]
             """
-            SELECT date_enter, 
-                SUM(CASE WHEN first_status = 'وارد شده' THEN 1 ELSE 0 END) as count_enter,
-                SUM(CASE WHEN second_status = 'خارج شده' THEN 1 ELSE 0 END) as count_exit
-            FROM invoices
-            WHERE date_enter BETWEEN ? AND ?
-            GROUP BY date_enter
-            ORDER BY date_enter DESC
+            SELECT day, entered_count, exited_count
+            FROM daily_stats
+            WHERE day BETWEEN ? AND ? AND entered_count > 0
+            ORDER BY day DESC
             """,
             (one_week_ago, today),
         )
-        rows_raw = type(self).cursor.fetchall()
-        rows: List[Tuple[str, int, int]] = [
-            (str(r[0]), int(r[1]), int(r[2])) for r in rows_raw
-        ]
-        return rows
+
     # دریافت خلاصه داده‌های ماهانه
-    def get_monthly_summary(self) -> List[Tuple[str, int]]:
-        current_month = jdatetime.datetime.now().strftime("%Y/%m")
-        type(self).cursor.execute(
+    def get_monthly_summary(self) -> List[Tuple[int, int]]:
+        """(کلید روز، ورودی) ماه جلالی جاری؛ اسکن بازه‌ای روی کلید عددی daily_stats."""
+        today = jalali.today_key()
+        return self._fetchall(  # type: ignore[return-value]
             """
-            SELECT date_enter, COUNT(*) as count_enter
-            FROM invoices
-            WHERE date_enter LIKE ?
-            GROUP BY date_enter
-            ORDER BY date_enter ASC
+            SELECT day, entered_count
+            FROM daily_stats
+            WHERE day BETWEEN ? AND ? AND entered_count > 0
+            ORDER BY day ASC
+            """,
+            jalali.month_bounds(today // 10000, today // 100 % 100),
+        )
+
+    # خلاصه یک ماه دلخواه (مرور تاریخچه)
+    def get_month_summary(self, year: int, month: int) -> List[Tuple[int, int, int]]:
+        """(کلید روز، ورودی، خارج‌شده) روزهای دارای ورود ماه جلالی year/month از daily_stats."""
+        return self._fetchall(  # type: ignore[return-value]
+            """
+            SELECT day, entered_count, exited_count
+            FROM daily_stats
+            WHERE day BETWEEN ? AND ? AND entered_count > 0
+            ORDER BY day ASC
             """,
-            (f"{current_month}%",),
+            jalali.month_bounds(year, month),
         )
-        rows_raw = type(self).cursor.fetchall()
-        rows: List[Tuple[str, int]] = [
-            (str(r[0]), int(r[1])) for r in rows_raw
+
+    # بازسازی جدول خلاصه روزانه
+    def rebuild_daily_stats(self) -> int:
+        """محاسبه دوباره کامل daily_stats از invoices و بایگانی؛ تعداد روزها را برمی‌گرداند."""
+        with self._transaction() as connection:
+            return rebuild_daily_stats(connection, DAILY_STATS_FROM_ALL, DAILY_STATS_COLUMNS)
+
+    # بررسی انحراف جدول خلاصه روزانه
+    def verify_daily_stats(self) -> List[Tuple[int, Tuple[int, int, int, int], Tuple[int, int, int, int]]]:
+        """مقایسه daily_stats (ورودی، خارج‌شده، باز، جمع ماندگاری) با شمارش مستقیم invoices و بایگانی.
+
+        خروجی: لیست (روز، مقدار مورد انتظار، مقدار ذخیره‌شده) برای روزهای دارای اختلاف؛ لیست خالی یعنی سالم.
+        """
+        # هر دو شمارش زیر قفل نویسنده خوانده می‌شوند تا نوشتن هم‌زمان بین آن‌ها اختلاف کاذب نسازد
+        with type(self).pool.writer() as connection:
+            expected = {
+                int(r[0]): (int(r[1]), int(r[2]), int(r[3]), int(r[4]))
+                for r in connection.execute(DAILY_STATS_FROM_ALL)
+            }
+            stored = {
+                int(r[0]): (int(r[1]), int(r[2]), int(r[3]), int(r[4]))
+                for r in connection.execute(f"SELECT {DAILY_STATS_COLUMNS} FROM daily_stats")
+            }
+        zero = (0, 0, 0, 0)
+        return [
+            (day, expected.get(day, zero), stored.get(day, zero))
+            for day in sorted(expected.keys() | stored.keys())
+            if expected.get(day, zero) != stored.get(day, zero)
         ]
-        return rows
+
     # حذف فاکتور از دیتابیس
     def delete_invoice(self, invoice_number: str) -> bool:
         """حذف فاکتور اگر در وضعیت خروج نهایی نباشد."""
-        status = self.get_invoice_status(invoice_number)
-        if status:
-            _, _, _, _, _, second_status = status
-            if second_status == "خارج شده":
-                return False
-        self.__class__.cursor.execute(
-            "DELETE FROM invoices WHERE invoice_number = ?", (invoice_number,)
+        if self.delete_open_invoice(invoice_number) is not None:
+            return True
+        # فقط وقتی چیزی حذف نشد: نبودن فاکتور خطا نیست، خارج شده بودن هست
+        return self.get_invoice_status(invoice_number) is None
+
+    # حذف شرطی فاکتور باز
+    def delete_open_invoice(self, invoice_number: str) -> Optional[InvoiceRow]:
+        """حذف اتمی فاکتوری که هنوز خارج نشده (DELETE ... RETURNING).
+
+        خروجی: ردیف حذف‌شده، یا None اگر فاکتور وجود ندارد یا خارج شده است.
+        """
+        return self._write_returning(
+            f"""
+            DELETE FROM invoices
+            WHERE invoice_number = ? AND second_status IS NULL
+            RETURNING {INVOICE_ROW_COLUMNS}
+            """,
+            (invoice_number,),
         )
-        self.__class__.connection.commit()
-        return True
+
+    # انتقال فاکتورهای خارج‌شده قدیمی به بایگانی
+    def archive_exited(self, before_ts: int, limit: int = 500) -> int:
+        """انتقال حداکثر limit فاکتور خارج‌شده پیش از before_ts (epoch) به invoices_archive.
+
+        یک تراکنش کوتاه برای هر دسته (قفل نویسنده بین دسته‌ها آزاد است و اسکن‌ها منتظر کل کار نمی‌مانند).
+        قدیمی‌ترین ورودها اول (db_archive_sync.archive_exited). daily_stats تغییر نمی‌کند.
+        خروجی: تعداد منتقل‌شده؛ کمتر از limit یعنی کاری باقی نمانده است.
+        """
+        if limit < 1:
+            raise ValueError("limit باید مثبت باشد")
+        with self._transaction() as connection:
+            return db_archive_sync.archive_exited(connection, before_ts, limit, jalali.now_ts())
+
+    # شمارش ردیف‌های جدول کاری و بایگانی
+    def count_rows(self) -> Tuple[int, int]:
+        """(تعداد ردیف‌های invoices، تعداد ردیف‌های invoices_archive)."""
+        row = self._fetchone("SELECT (SELECT COUNT(*) FROM invoices), (SELECT COUNT(*) FROM invoices_archive)")
+        return (int(row[0]), int(row[1])) if row else (0, 0)
+
+    # ---------------------- همگام‌سازی بین ایستگاه‌ها (outbox) ----------------------
+    def enable_outbox(self) -> int:
+        """فعال کردن ثبت تغییرات در outbox (بی‌اثر اگر از قبل فعال است).
+
+        بار اول همه فاکتورهای موجود (جدول کاری و بایگانی) به ترتیب ورود به صف اضافه می‌شوند تا سابقه
+        این ایستگاه هم به مخزن مرکزی برسد. خروجی: تعداد تغییرهای اضافه‌شده به صف.
+        """
+        with self._transaction() as connection:
+            return db_archive_sync.enable_outbox(connection)
+
+    def station_uuid(self) -> str:
+        """شناسه پایدار این فایل دیتابیس در همگام‌سازی (بار اول ساخته می‌شود؛ دیتابیس تازه UUID تازه دارد)."""
+        with self._transaction() as connection:
+            return db_archive_sync.station_uuid(connection)
+
+    def pending_changes(self, station: str, limit: int = 500) -> List[SyncChange]:
+        """قدیمی‌ترین limit تغییر ارسال‌نشده این ایستگاه (station_seq همان seq صف است)."""
+        rows = self._fetchall("SELECT seq, invoice_number, op, enter_ts, exit_ts, ts FROM outbox ORDER BY seq LIMIT ?", (limit,))
+        return [SyncChange(station, *row) for row in rows]
+
+    def ack_changes(self, up_to_seq: int) -> int:
+        """حذف تغییرهای ارسال‌شده (seq تا up_to_seq) از صف؛ تعداد حذف‌شده."""
+        with self._transaction() as connection:
+            return connection.execute("DELETE FROM outbox WHERE seq <= ?", (up_to_seq,)).rowcount
+
+    def outbox_size(self) -> int:
+        """تعداد تغییرهای در صف ارسال."""
+        row = self._fetchone("SELECT COUNT(*) FROM outbox")
+        return int(row[0]) if row else 0
+
+    def sync_cursor(self) -> int:
+        """آخرین seq مخزن مرکزی که تغییراتش اینجا اعمال شده است (0 در ابتدا)."""
+        row = self._fetchone("SELECT value FROM sync_state WHERE key = 'pulled_seq'")
+        return int(row[0]) if row else 0
+
+    def apply_changes(self, changes: Sequence[SyncChange], pulled_seq: int) -> List[int]:
+        """اعمال تغییرات ایستگاه‌های دیگر و جلو بردن sync_cursor در یک تراکنش.
+
+        حل تعارض برای هر فاکتور (نتیجه مستقل از ترتیب رسیدن تغییرها بین ایستگاه‌ها یکسان می‌شود):
+            - ورود: اگر نیست ثبت می‌شود؛ اگر هست زودترین زمان ورود می‌ماند.
+            - خروج: بر ورود و حذف غلبه دارد (فاکتور نبود با همان ورود و خروج ثبت می‌شود)؛ زودترین خروج می‌ماند.
+            - حذف: فقط فاکتور باز با ورود هم‌زمان یا قدیمی‌تر از ورود حذف‌شده را حذف می‌کند.
+            - شماره بایگانی‌شده (خارج‌شده قدیمی) تغییر نمی‌کند.
+        تغییرات اعمال‌شده در outbox ثبت نمی‌شوند (بازگشت به مخزن ندارند). daily_stats با trigger ها همگام است.
+        خروجی: شماره فاکتورهایی که اینجا تغییر کردند (یکتا، به ترتیب اولین تغییر).
+        """
+        with self._transaction() as connection:
+            return db_archive_sync.apply_changes(connection, changes, pulled_seq)
@@ -0,0 +1,213 @@
+# reports.py
+"""گزارش‌های تحلیلی بازه‌ای: صدک ماندگاری، نمودار ساعتی ورود و بار روزهای هفته.
+
+گزارش‌های ثابت هفتگی و ماهانه از daily_stats می‌آیند؛ این ماژول گزارش هر بازه دلخواه (مثلاً یک سال) را
+بدون ساخت tuple برای هر فاکتور در پایتون می‌سازد:
+    - بارگذاری ستونی: Database.iter_day_columns برای هر روز لازم ستون‌های فشرده array برمی‌گرداند
+      (شمارش ورود هر بازه ۱۵ دقیقه‌ای و ماندگاری‌های مرتب)؛ گروه‌بندی و شمارش داخل SQLite انجام می‌شود.
+    - تجمیع برداری: نمودار ساعتی از چند ده بازه هر روز، و صدک‌ها بدون ادغام ماندگاری‌ها: k امین مقدار
+      با جستجوی دودویی روی مقدار و bisect (کد C) روی دنباله مرتب هر روز پیدا می‌شود.
+    - کش روزهای بسته: خلاصه هر روز پیش از امروز (ورود تازه نمی‌گیرد) نگه داشته می‌شود و گزارش بعدی فقط
+      امروز و روزهای تغییرکرده را از دیتابیس می‌خواند. اعتبار هر خلاصه با (ورودی، خارج‌شده، جمع ماندگاری)
+      همان روز در daily_stats سنجیده می‌شود؛ خروج دیرهنگام، حذف، همگام‌سازی یا اصلاح زمان ورود / خروج که
+      شمارش یا ماندگاری روز را عوض کند خلاصه را باطل می‌کند.
+
+NumPy وابستگی پروژه نیست؛ ستون‌ها array کتابخانه استاندارد هستند.
+"""
+
+from __future__ import annotations
+
+import threading
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from itertools import repeat
+from typing import Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+import jalali
+from model import Database, DayColumns
+
+HOURS = 24
+DWELL_PERCENTILES = (50, 90, 95, 99)
+# حدود یک سال و یک ماه روز بسته در کش
+DEFAULT_CACHE_DAYS = 400
+
+
+class DayAggregate(NamedTuple):
+    """خلاصه یک روز: dwell ماندگاری‌های مرتب (ثانیه) فاکتورهای خارج‌شده و dwell_total جمع آن‌ها."""
+    day: int
+    entered: int
+    hourly: Tuple[int, ...]
+    dwell: array
+    dwell_total: int
+
+    @property
+    def exited(self) -> int:
+        return len(self.dwell)
+
+
+class RangeReport(NamedTuple):
+    """گزارش بازه start_day..end_day.
+
+    hourly: ورودی هر ساعت محلی (0..23)؛ weekday: ورودی هر روز هفته از شنبه تا جمعه؛
+    dwell_percentiles: {صدک: ثانیه}؛ cached_days: روزهایی که از کش آمدند.
+    """
+    start_day: int
+    end_day: int
+    days: int
+    entered: int
+    exited: int
+    dwell_mean: float
+    dwell_percentiles: Dict[int, float]
+    hourly: Tuple[int, ...]
+    weekday: Tuple[int, ...]
+    cached_days: int
+
+
+def kth_smallest(runs: Sequence[Sequence[int]], k: int) -> int:
+    """k امین کوچک‌ترین مقدار (از صفر) در اجتماع دنباله‌های مرتب runs، بدون ادغام آن‌ها."""
+    low = min(run[0] for run in runs if run)
+    high = max(run[-1] for run in runs if run)
+    while low < high:
+        middle = (low + high) // 2
+        if sum(map(bisect_right, runs, repeat(middle))) > k:
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+
+def runs_percentile(runs: Sequence[Sequence[int]], total: int, pct: float) -> float:
+    """صدک با درون‌یابی خطی (مثل benchmarks.suite.percentile) روی اجتماع دنباله‌های مرتب با total عضو."""
+    if not total:
+        return 0.0
+    rank = (total - 1) * pct / 100
+    low = int(rank)
+    value = kth_smallest(runs, low)
+    if low + 1 >= total or rank == low:
+        return float(value)
+    if sum(map(bisect_right, runs, repeat(value))) > low + 1:
+        following = value
+    else:
+        following = min(run[index] for run in runs if (index := bisect_right(run, value)) < len(run))
+    return value + (following - value) * (rank - low)
+
+
+def weekday_index(day: int) -> int:
+    """شماره روز هفته کلید روز جلالی: شنبه 0 تا جمعه 6."""
+    return (jalali.day_key_to_gregorian(day).weekday() + 2) % 7
+
+
+def aggregate_day(columns: DayColumns) -> DayAggregate:
+    """خلاصه یک روز از ستون‌های iter_day_columns."""
+    day_start = jalali.day_start_ts(columns.day)
+    hourly = [0] * HOURS
+    for bucket_start, count in zip(columns.bucket_starts, columns.bucket_counts):
+        hourly[min(max((bucket_start - day_start) // 3600, 0), HOURS - 1)] += count
+    return DayAggregate(columns.day, sum(columns.bucket_counts), tuple(hourly), columns.dwell, sum(columns.dwell))
+
+
+def _consecutive_runs(days: Sequence[int], stats_days: Sequence[int]) -> Iterable[Tuple[int, int]]:
+    # بازه‌های پیوسته (در ترتیب روزهای daily_stats) از روزهای days تا هر بازه با یک پرس‌وجو خوانده شود
+    wanted = set(days)
+    run_start = None
+    previous = None
+    for day in stats_days:
+        if day in wanted:
+            if run_start is None:
+                run_start = day
+            previous = day
+        elif run_start is not None:
+            yield run_start, previous
+            run_start = None
+    if run_start is not None:
+        yield run_start, previous
+
+
+class ReportEngine:
+    """ساخت RangeReport با کش خلاصه روزهای بسته (امن برای فراخوانی از چند thread)."""
+
+    def __init__(self, db: Database, cache_days: int = DEFAULT_CACHE_DAYS) -> None:
+        self.db = db
+        self.cache_days = cache_days
+        self._lock = threading.Lock()
+        # روز -> ((ورودی، خارج‌شده، جمع ماندگاری) هنگام ساخت، خلاصه)؛ ترتیب LRU
+        self._cache: OrderedDict[int, Tuple[Tuple[int, int, int], DayAggregate]] = OrderedDict()
+
+    def cached_days(self) -> int:
+        """تعداد روزهای بسته در کش."""
+        with self._lock:
+            return len(self._cache)
+
+    def clear(self) -> None:
+        """خالی کردن کش."""
+        with self._lock:
+            self._cache.clear()
+
+    def _from_cache(self, stats: List[Tuple[int, int, int, int]]) -> Dict[int, DayAggregate]:
+        found: Dict[int, DayAggregate] = {}
+        with self._lock:
+            for day, entered, exited, dwell_total in stats:
+                entry = self._cache.get(day)
+                if entry is None:
+                    continue
+                if entry[0] != (entered, exited, dwell_total):
+                    del self._cache[day]
+                    continue
+                self._cache.move_to_end(day)
+                found[day] = entry[1]
+        return found
+
+    def _store(self, aggregates: Iterable[DayAggregate], closed: Dict[int, Tuple[int, int, int]]) -> None:
+        if self.cache_days <= 0:
+            return
+        with self._lock:
+            for aggregate in aggregates:
+                signature = closed.get(aggregate.day)
+                # فقط وقتی خلاصه با daily_stats همان لحظه می‌خواند (بین دو خواندن اسکنی نیامده)
+                if signature == (aggregate.entered, aggregate.exited, aggregate.dwell_total):
+                    self._cache[aggregate.day] = (signature, aggregate)
+                    self._cache.move_to_end(aggregate.day)
+            while len(self._cache) > self.cache_days:
+                self._cache.popitem(last=False)
+
+    def day_aggregates(self, start_day: int, end_day: int) -> Tuple[List[DayAggregate], int]:
+        """خلاصه روزهای دارای ورود در بازه (به ترتیب روز)؛ (خلاصه‌ها، تعداد روزهای آمده از کش)."""
+        stats = self.db.get_daily_totals(start_day, end_day)
+        found = self._from_cache(stats)
+        hits = len(found)
+        stats_days = [row[0] for row in stats]
+        missing = [day for day in stats_days if day not in found]
+        today = jalali.today_key()
+        closed = {day: (entered, exited, dwell_total) for day, entered, exited, dwell_total in stats if day < today}
+        for first, last in _consecutive_runs(missing, stats_days):
+            aggregates = [aggregate_day(columns) for columns in self.db.iter_day_columns(first, last)]
+            self._store(aggregates, closed)
+            for aggregate in aggregates:
+                found[aggregate.day] = aggregate
+        return [found[day] for day in sorted(found)], hits
+
+    def range_report(self, start_day: int, end_day: int) -> RangeReport:
+        """گزارش روزهای start_day..end_day (دو سر شامل)."""
+        if start_day > end_day:
+            raise ValueError("start_day نباید از end_day بزرگ‌تر باشد")
+        aggregates, hits = self.day_aggregates(start_day, end_day)
+        hourly = [0] * HOURS
+        weekday = [0] * 7
+        for aggregate in aggregates:
+            hourly = [total + count for total, count in zip(hourly, aggregate.hourly)]
+            weekday[weekday_index(aggregate.day)] += aggregate.entered
+        runs = [aggregate.dwell for aggregate in aggregates if aggregate.dwell]
+        exited = sum(len(run) for run in runs)
+        return RangeReport(
+            start_day=start_day,
+            end_day=end_day,
+            days=len(aggregates),
+            entered=sum(aggregate.entered for aggregate in aggregates),
+            exited=exited,
+            dwell_mean=sum(aggregate.dwell_total for aggregate in aggregates) / exited if exited else 0.0,
+            dwell_percentiles={pct: runs_percentile(runs, exited, pct) for pct in DWELL_PERCENTILES},
+            hourly=tuple(hourly),
+            weekday=tuple(weekday),
+            cached_days=hits,
+        )
@@ -0,0 +1,141 @@
+# scan_queue.py
+"""صف اسکن بارکد برای بارکدخوان‌هایی که بارکدها را پشت سر هم می‌فرستند.
+
+هر اسکن فوراً در صف قرار می‌گیرد (ورودی بارکد بلافاصله خالی می‌شود) و thread رابط کاربری منتظر
+SQLite نمی‌ماند. صف روی AsyncBridge در دسته‌های حداکثر batch_size با Controller.process_scans
+(یک تراکنش برای هر دسته) تخلیه می‌شود:
+    - debounce: اولین اسکن بعد از بیکاری، debounce_ms صبر می‌کند تا اسکن‌های پشت سرِ رگبار به همان
+      دسته بپیوندند.
+    - در هر لحظه فقط یک دسته در حال اجراست؛ اسکن‌هایی که در حین اجرا می‌رسند دسته بعدی را می‌سازند،
+      پس ترتیب اسکن‌ها حفظ می‌شود و در رگبار دسته‌ها خودبه‌خود بزرگ‌تر می‌شوند.
+    - دسته ناموفق (کل دسته rollback شده) دوباره و این بار اسکن‌به‌اسکن اجرا می‌شود تا فقط اسکن خراب
+      با failed گزارش شود و بقیه ثبت شوند.
+    - نتیجه اسکن‌های هر دسته به ترتیب با یک سیگنال scanned روی thread رابط تحویل داده می‌شود؛
+      رویدادهای تغییر دسته قبل از آن با Controller.publish_events روی همان thread منتشر می‌شوند.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Deque, List, Optional
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from async_bridge import AsyncBridge
+from controller import Controller, InvoiceNumber, ScanRequest, ScanResult
+
+DEFAULT_BATCH_SIZE = 64
+# چند میلی‌ثانیه: اسکن‌هایی که در همان دور رویداد / پشت سر هم می‌رسند به یک دسته می‌پیوندند
+DEFAULT_DEBOUNCE_MS = 5
+
+
+class ScanQueue(QObject):
+    """صف FIFO اسکن‌ها با پردازش دسته‌ای روی thread کارگر."""
+
+    # لیست ScanResult های یک دسته، به ترتیب اسکن‌ها
+    scanned = Signal(object)
+    # ([ScanRequest ناموفق]، استثنا)؛ همیشه یک اسکن (دسته‌های چندتایی اسکن‌به‌اسکن تکرار می‌شوند)
+    failed = Signal(object, object)
+    # صف خالی شد و دسته‌ای در حال اجرا نیست
+    drained = Signal()
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        controller: Controller,
+        bridge: Optional[AsyncBridge] = None,
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        debounce_ms: int = DEFAULT_DEBOUNCE_MS,
+        parent: Optional[QObject] = None,
+    ) -> None:
+        super().__init__(parent)
+        self._controller = controller
+        self._bridge = bridge if bridge is not None else AsyncBridge(parent=self)
+        self._batch_size = max(1, batch_size)
+        self._queue: Deque[ScanRequest] = deque()
+        self._in_flight = 0
+        # تعداد اسکن‌های ابتدای صف که بعد از شکست دسته‌شان تک‌تک اجرا می‌شوند
+        self._single = 0
+        # پایان اجرای دسته در جریان روی thread کارگر (flush فقط منتظر همین دسته می‌ماند)
+        self._batch_done = threading.Event()
+        self._batch_done.set()
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(max(0, debounce_ms))
+        self._debounce.timeout.connect(self._submit_next)  # type: ignore[arg-type]
+
+    def enqueue(self, kind: str, number: InvoiceNumber) -> None:
+        """افزودن یک اسکن (kind: EVENT_ADDED، EVENT_EXITED یا EVENT_DELETED) به انتهای صف."""
+        self._queue.append((kind, number))
+        if not self._in_flight and not self._debounce.isActive():
+            self._debounce.start()
+
+    def pending_count(self) -> int:
+        """تعداد اسکن‌های در صف یا در حال پردازش."""
+        return len(self._queue) + self._in_flight
+
+    def flush(self) -> None:
+        """پردازش هم‌زمان باقی‌مانده صف روی thread جاری (برای بستن پنجره).
+
+        فقط منتظر دسته در حال اجرا می‌ماند، نه کارهای دیگر thread pool (بایگانی، همگام‌سازی، خروجی).
+        """
+        self._debounce.stop()
+        self._batch_done.wait()
+        while self._queue:
+            batch = self._take_batch()
+            try:
+                results = self._controller.process_scans(batch)
+            except Exception as exc:  # pylint: disable=broad-except
+                self._on_batch_failed(batch, exc)
+            else:
+                self._deliver(results)
+
+    def _take_batch(self) -> List[ScanRequest]:
+        if self._single:
+            self._single -= 1
+            return [self._queue.popleft()]
+        return [self._queue.popleft() for _ in range(min(self._batch_size, len(self._queue)))]
+
+    def _on_batch_failed(self, batch: List[ScanRequest], exc: BaseException) -> None:
+        if len(batch) > 1:
+            # کل دسته rollback شده است: همان اسکن‌ها به ترتیب و تک‌تک دوباره اجرا می‌شوند
+            self._queue.extendleft(reversed(batch))
+            self._single += len(batch)
+        else:
+            self.failed.emit(batch, exc)
+
+    def _process_batch(self, batch: List[ScanRequest]) -> List[ScanResult]:
+        # روی thread کارگر
+        try:
+            return self._controller.process_scans(batch)
+        finally:
+            self._batch_done.set()
+
+    def _submit_next(self) -> None:
+        if not self._queue:
+            self.drained.emit()
+            return
+        batch = self._take_batch()
+        self._in_flight = len(batch)
+        self._batch_done.clear()
+        self._bridge.submit(
+            self._process_batch,
+            batch,
+            on_result=self._on_results,
+            on_error=lambda exc: self._on_error(batch, exc),
+        )
+
+    def _on_results(self, results: List[ScanResult]) -> None:
+        self._in_flight = 0
+        self._deliver(results)
+        self._submit_next()
+
+    def _on_error(self, batch: List[ScanRequest], exc: BaseException) -> None:
+        self._in_flight = 0
+        self._on_batch_failed(batch, exc)
+        self._submit_next()
+
+    def _deliver(self, results: List[ScanResult]) -> None:
+        self._controller.publish_events(result.event for result in results)
+        self.scanned.emit(results)
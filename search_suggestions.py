@@ -0,0 +1,145 @@
+# search_suggestions.py
+"""پیشنهاد شماره‌های مشابه زیر کادر بارکد برای بارکدهای ناقص یا ناخوانا.
+
+با هر تغییر متن کادر (بعد از مکث تایپ delay_ms و دست‌کم min_digits رقم) Controller.search_invoices
+روی AsyncBridge اجرا می‌شود و نتیجه (شماره‌های دارای متن به صورت زیررشته، تازه‌ترین ثبت اول) در
+فهرست کشویی QCompleter زیر کادر نمایش داده می‌شود:
+    - اسکنر کل بارکد و اینتر را پیش از پایان مکث می‌فرستد؛ اسکن جستجو را لغو می‌کند و فهرست باز نمی‌شود.
+    - completer فقط با setWidget به کادر وصل است (نه setCompleter)، پس تایپ آن را خودکار باز نمی‌کند و
+      هیچ پیشنهادی از پیش انتخاب نمی‌شود؛ اینتر بدون انتخاب همان متن تایپ‌شده را ثبت می‌کند.
+    - نتیجه کهنه (متن در حین جستجو عوض شده) دور ریخته می‌شود.
+    - رسیدن به انتهای فهرست صفحه بعد نتایج (keyset) را اضافه می‌کند.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from PySide6.QtCore import QModelIndex, QObject, Qt, QTimer
+from PySide6.QtGui import QStandardItem, QStandardItemModel
+from PySide6.QtWidgets import QCompleter, QLineEdit
+
+import jalali
+from async_bridge import AsyncBridge
+from constants import SEARCH_SUBSTRING
+from controller import Controller, InvoicePage
+
+DEFAULT_MIN_DIGITS = 3
+DEFAULT_DELAY_MS = 150
+DEFAULT_PAGE_SIZE = 20
+# نقش داده شماره فاکتور در مدل پیشنهادها (متن نمایشی شامل تاریخ و وضعیت است)
+NUMBER_ROLE = Qt.ItemDataRole.UserRole
+
+
+class SearchSuggestions(QObject):  # pylint: disable=too-many-instance-attributes
+    """فهرست کشویی شماره‌های مشابه متن کادر بارکد."""
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        controller: Controller,
+        line_edit: QLineEdit,
+        bridge: Optional[AsyncBridge] = None,
+        *,
+        min_digits: int = DEFAULT_MIN_DIGITS,
+        delay_ms: int = DEFAULT_DELAY_MS,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        parent: Optional[QObject] = None,
+    ) -> None:
+        super().__init__(parent)
+        self._controller = controller
+        self._line_edit = line_edit
+        self._bridge = bridge if bridge is not None else AsyncBridge(parent=self)
+        self.min_digits = max(1, min_digits)
+        self.page_size = max(1, page_size)
+        self.model = QStandardItemModel(self)
+        self.completer = QCompleter(self.model, self)
+        self.completer.setWidget(line_edit)
+        self.completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.completer.setCompletionRole(NUMBER_ROLE)
+        self.completer.setMaxVisibleItems(8)
+        self.completer.activated.connect(self._on_activated)  # type: ignore[arg-type]
+        popup = self.completer.popup()
+        popup.setStyleSheet(
+            "QListView { background:#1e1e1e; color:#f5f5f5; font-size:16px; border:2px solid #444; }"
+            "QListView::item:selected { background:#274a2a; }"
+        )
+        popup.verticalScrollBar().valueChanged.connect(self._on_scrolled)  # type: ignore[arg-type]
+        self._text = ""
+        self._next_cursor: Optional[str] = None
+        self._loading = False
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(max(0, delay_ms))
+        self._timer.timeout.connect(lambda: self.request(self._line_edit.text().strip()))  # type: ignore[arg-type]
+        line_edit.textEdited.connect(self._on_text_edited)  # type: ignore[arg-type]
+
+    def has_selection(self) -> bool:
+        """آیا فهرست باز است و کاربر پیشنهادی را انتخاب کرده است (اینتر یعنی انتخاب، نه اسکن)."""
+        popup = self.completer.popup()
+        return popup.isVisible() and popup.selectionModel().hasSelection()
+
+    def is_visible(self) -> bool:
+        """آیا فهرست پیشنهادها باز است."""
+        return self.completer.popup().isVisible()
+
+    def hide(self) -> None:
+        """بستن فهرست و لغو جستجوی منتظر (نتیجه در راه دور ریخته می‌شود)."""
+        self._timer.stop()
+        self._text = ""
+        self.completer.popup().hide()
+
+    def request(self, text: str, min_digits: Optional[int] = None, after_cursor: Optional[str] = None) -> None:
+        """جستجوی text روی thread کارگر و نمایش نتیجه (after_cursor: افزودن صفحه بعد)."""
+        if len(text) < (self.min_digits if min_digits is None else min_digits) or not text.isdigit():
+            self.hide()
+            return
+        self._text = text
+        self._loading = True
+
+        def on_result(page: InvoicePage) -> None:
+            self._loading = False
+            if text != self._text:
+                # در حین جستجو متن عوض شده یا اسکن ثبت شده است
+                return
+            self._show(page, append=after_cursor is not None)
+
+        self._bridge.submit(
+            self._controller.search_invoices, text, SEARCH_SUBSTRING, self.page_size, after_cursor, on_result=on_result
+        )
+
+    def _on_text_edited(self, text: str) -> None:
+        if len(text.strip()) >= self.min_digits:
+            self._timer.start()
+        else:
+            self.hide()
+
+    def _show(self, page: InvoicePage, append: bool) -> None:
+        if not append:
+            self.model.clear()
+        for row in page.rows:
+            item = QStandardItem(f"{row.invoice_number}    {jalali.format_date(row.enter_ts)}    {row.status}")
+            item.setData(str(row.invoice_number), NUMBER_ROLE)
+            self.model.appendRow(item)
+        self._next_cursor = page.next_cursor
+        popup = self.completer.popup()
+        if not self.model.rowCount():
+            popup.hide()
+        elif not append:
+            self.completer.complete()
+            # هیچ پیشنهادی از پیش انتخاب نمی‌شود تا اینتر اسکنر همان بارکد تایپ‌شده را ثبت کند
+            popup.selectionModel().clear()
+            popup.setCurrentIndex(QModelIndex())
+
+    def _on_scrolled(self, value: int) -> None:
+        if value == self.completer.popup().verticalScrollBar().maximum() and self._next_cursor and self._text \
+                and not self._loading:
+            self.request(self._text, min_digits=1, after_cursor=self._next_cursor)
+
+    def _on_activated(self, number: str) -> None:
+        if not self._line_edit.text().strip():
+            # همان اینتری که اسکن را ثبت و کادر را خالی کرد؛ پیشنهاد در کادر نوشته نمی‌شود
+            return
+        self._timer.stop()
+        self._text = ""
+        self._line_edit.setText(number)
+        self._line_edit.setFocus()
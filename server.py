@@ -0,0 +1,475 @@
+# server.py
+"""حالت سرور بدون رابط کاربری: API HTTP/JSON روی Controller برای چند ایستگاه اسکن و داشبورد.
+
+فقط کتابخانه استاندارد (asyncio)؛ HTTP/1.1 با keep-alive و بدنه JSON.
+
+- نوشتن‌ها (ورود / خروج / حذف) در یک صف asyncio قرار می‌گیرند و یک writer task آن‌ها را به ترتیب
+  رسیدن روی یک thread اختصاصی اجرا می‌کند (هر اسکن همان تراکنش اتمی Controller است؛ چند اسکن منتظر
+  در یک رفت‌وبرگشت thread اجرا می‌شوند تا سربار سوییچ برای هر اسکن تکرار نشود)
+- خواندن‌ها (جستجو، لیست، گزارش‌ها) هم‌زمان روی thread pool خوانندگان اجرا می‌شوند
+  (Database از اتصال‌های خواننده ConnectionPool استفاده می‌کند)
+
+Endpoint ها:
+    POST   /invoices/{number}/enter   ثبت ورود
+    POST   /invoices/{number}/exit    ثبت خروج
+    DELETE /invoices/{number}         حذف فاکتور خارج‌نشده
+    GET    /invoices/{number}         وضعیت فاکتور (404 اگر نبود)
+    GET    /invoices?limit=100&cursor=…   صفحه‌ای از فاکتورها (جدیدترین اول، صفحه‌بندی keyset)
+           فیلترها: status=entered|exited، from / to (کلید روز YYYYMMDD یا YYYY/MM/DD)، prefix (پیشوند شماره)
+           پاسخ: {"invoices": [...], "next_cursor": توکن صفحه بعد یا null}
+    GET    /invoices/search?q=123&mode=substring&limit=20&cursor=…
+           شماره‌های شامل q (mode: prefix|suffix|substring)، تازه‌ترین ثبت اول؛ پاسخ مثل لیست فاکتورها
+    GET    /reports/weekly            خلاصه ۷ روز اخیر
+    GET    /reports/monthly           خلاصه ماه جاری
+    GET    /reports/entered           تعداد کل فاکتورهای ثبت‌شده (شمارنده رابط کاربری)
+    GET    /health
+
+پاسخ نوشتن: {"number", "message", "event", "invoice"}؛ event یکی از added/exited/deleted است اگر
+تغییری انجام شد و null اگر فقط وضعیت قبلی گزارش شد. شماره نامعتبر: 400.
+
+اجرا:
+    python server.py --host 0.0.0.0 --port 8765      # مسیر دیتابیس از db_config (INVOICE_DB_PATH)
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import jalali
+from constants import (
+    EVENT_ADDED,
+    EVENT_DELETED,
+    EVENT_EXITED,
+    MSG_INVALID_NUMBER,
+    SEARCH_MODES,
+    SEARCH_SUBSTRING,
+    STATUS_ENTERED,
+    STATUS_EXITED,
+)
+from controller import Controller, InvoiceEvent
+from export import KIND_MONTHLY, KIND_WEEKLY, invoice_record, iter_records
+from instrumentation import PeriodicDumper, install_default, load_perf_settings
+from model import Database
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WRITE_BATCH = 256
+MAX_PAGE_SIZE = 1000
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 64 * 1024
+KEEPALIVE_TIMEOUT = 30.0
+# متن پاسخ 500؛ جزئیات استثنا (SQL، مسیر فایل) فقط در لاگ سرور ثبت می‌شود
+INTERNAL_ERROR_MESSAGE = "internal server error"
+
+_LOG = logging.getLogger(__name__)
+
+WRITE_OPERATIONS: Dict[str, Callable[[Controller, str], str]] = {
+    EVENT_ADDED: Controller.add_invoice,
+    EVENT_EXITED: Controller.process_exit_invoice,
+    EVENT_DELETED: Controller.delete_invoice,
+}
+
+# مقدار پارامتر status در API -> وضعیت دیتابیس
+STATUS_FILTERS: Dict[str, str] = {"entered": STATUS_ENTERED, "exited": STATUS_EXITED}
+
+JsonBody = Union[Dict[str, Any], List[Any]]
+
+
+class HttpError(Exception):
+    """خطای قابل گزارش به کلاینت با کد وضعیت HTTP."""
+
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class Request(NamedTuple):
+    """درخواست HTTP تجزیه‌شده."""
+    method: str
+    path: str
+    query: Dict[str, str]
+    headers: Dict[str, str]
+    body: bytes
+
+
+class _WriteJob(NamedTuple):
+    operation: str
+    number: str
+    future: "asyncio.Future[Dict[str, Any]]"
+
+
+class ScanServer:
+    """سرور HTTP/JSON روی یک Controller (یک writer task + خواندن‌های هم‌زمان)."""
+
+    def __init__(
+        self,
+        controller: Optional[Controller] = None,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        write_batch: int = DEFAULT_WRITE_BATCH,
+        read_workers: Optional[int] = None,
+    ) -> None:
+        self.controller = controller if controller is not None else Controller()
+        self.host = host
+        self.port = port
+        self.write_batch = max(1, write_batch)
+        workers = read_workers or max(1, Database.settings.read_connections)
+        self._read_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan-read")
+        self._write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scan-write")
+        self._writes: "Optional[asyncio.Queue[_WriteJob]]" = None
+        self._writer_task: "Optional[asyncio.Task[None]]" = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        # رویدادهای کنترلر فقط روی thread نویسنده تولید و همان‌جا خوانده می‌شوند
+        self._events: List[InvoiceEvent] = []
+        self.controller.subscribe(self._events.append)
+
+    # ---------------------- چرخه عمر ----------------------
+    async def start(self) -> None:
+        """شروع گوش دادن و writer task (port=0: پورت آزاد؛ پورت واقعی در self.port)."""
+        self._writes = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._writer_loop(), name="scan-writer")
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port, limit=MAX_HEADER_BYTES
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        """اجرا تا لغو (Ctrl+C)."""
+        if self._server is None:
+            await self.start()
+        assert self._server is not None
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """توقف پذیرش اتصال، اجرای نوشتن‌های در صف و آزادسازی thread ها."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._writes is not None:
+            await self._writes.join()
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+        self.controller.unsubscribe(self._events.append)
+        self._read_executor.shutdown(wait=True)
+        self._write_executor.shutdown(wait=True)
+
+    # ---------------------- نوشتن (سریال) ----------------------
+    async def submit_write(self, operation: str, number: str) -> Dict[str, Any]:
+        """قرار دادن یک اسکن در صف نویسنده و انتظار برای نتیجه."""
+        if self._writes is None:
+            raise RuntimeError("server not started")
+        future: "asyncio.Future[Dict[str, Any]]" = asyncio.get_running_loop().create_future()
+        await self._writes.put(_WriteJob(operation, number, future))
+        return await future
+
+    async def _writer_loop(self) -> None:
+        assert self._writes is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._writes.get()]
+            while len(batch) < self.write_batch and not self._writes.empty():
+                batch.append(self._writes.get_nowait())
+            try:
+                results = await loop.run_in_executor(
+                    self._write_executor, self._apply_writes, [(job.operation, job.number) for job in batch]
+                )
+            except Exception as exc:  # pylint: disable=broad-except
+                results = [exc] * len(batch)
+            try:
+                for job, result in zip(batch, results):
+                    if job.future.done():
+                        continue
+                    if isinstance(result, BaseException):
+                        job.future.set_exception(result)
+                    else:
+                        job.future.set_result(result)
+            finally:
+                for _ in batch:
+                    self._writes.task_done()
+
+    def _apply_writes(self, jobs: List[Tuple[str, str]]) -> List[Union[Dict[str, Any], BaseException]]:
+        # روی thread نویسنده: هر اسکن جدا و به ترتیب، با تراکنش اتمی خود Controller
+        results: List[Union[Dict[str, Any], BaseException]] = []
+        for operation, number in jobs:
+            self._events.clear()
+            try:
+                message = WRITE_OPERATIONS[operation](self.controller, number)
+            except Exception as exc:  # pylint: disable=broad-except
+                results.append(exc)
+                continue
+            event = self._events[-1] if self._events else None
+            results.append({
+                "number": number.strip(),
+                "message": message,
+                "event": event.kind if event else None,
+                "invoice": invoice_record(event.row) if event and event.row else None,
+            })
+        return results
+
+    # ---------------------- خواندن (هم‌زمان) ----------------------
+    async def read(self, func: Callable[..., Any], *args: Any) -> Any:
+        """اجرای یک خواندن روی thread pool خوانندگان."""
+        return await asyncio.get_running_loop().run_in_executor(self._read_executor, func, *args)
+
+    # ---------------------- مسیریابی ----------------------
+    async def dispatch(self, request: Request) -> Tuple[HTTPStatus, JsonBody]:
+        """اجرای درخواست؛ (کد وضعیت، بدنه JSON)."""
+        parts = [unquote(part) for part in request.path.strip("/").split("/") if part]
+        method = request.method
+        if parts[:1] == ["invoices"]:
+            if len(parts) == 3 and method == "POST" and parts[2] in ("enter", "exit"):
+                return await self._write(EVENT_ADDED if parts[2] == "enter" else EVENT_EXITED, parts[1])
+            if parts[1:] == ["search"] and method == "GET":
+                return await self._search_invoices(request.query)
+            if len(parts) == 2 and method == "DELETE":
+                return await self._write(EVENT_DELETED, parts[1])
+            if len(parts) == 2 and method == "GET":
+                return await self._get_invoice(parts[1])
+            if len(parts) == 1 and method == "GET":
+                return await self._list_invoices(request.query)
+        if parts[:1] == ["reports"] and len(parts) == 2 and method == "GET":
+            return await self._report(parts[1])
+        if parts == ["health"] and method == "GET":
+            assert self._writes is not None
+            return HTTPStatus.OK, {"status": "ok", "pending_writes": self._writes.qsize()}
+        raise HttpError(HTTPStatus.NOT_FOUND, f"no route for {method} {request.path}")
+
+    async def _write(self, operation: str, number: str) -> Tuple[HTTPStatus, JsonBody]:
+        result = await self.submit_write(operation, number)
+        if result["message"] == MSG_INVALID_NUMBER:
+            return HTTPStatus.BAD_REQUEST, result
+        return HTTPStatus.OK, result
+
+    async def _get_invoice(self, number: str) -> Tuple[HTTPStatus, JsonBody]:
+        row = await self.read(self.controller.get_invoice_row, number)
+        if row is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, f"invoice {number} not found")
+        return HTTPStatus.OK, invoice_record(row)
+
+    async def _list_invoices(self, query: Dict[str, str]) -> Tuple[HTTPStatus, JsonBody]:
+        try:
+            limit = min(MAX_PAGE_SIZE, max(1, int(query.get("limit", 100))))
+            status = STATUS_FILTERS[query["status"]] if "status" in query else None
+            date_from = _day_param(query.get("from"))
+            date_to = _day_param(query.get("to"))
+        except (KeyError, ValueError) as exc:
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"invalid filter: {exc}") from exc
+        try:
+            page = await self.read(
+                functools.partial(
+                    self.controller.list_invoices,
+                    query.get("cursor") or None,
+                    limit,
+                    status=status,
+                    date_from=date_from,
+                    date_to=date_to,
+                    number_prefix=query.get("prefix") or None,
+                )
+            )
+        except ValueError as exc:
+            raise HttpError(HTTPStatus.BAD_REQUEST, str(exc)) from exc
+        return HTTPStatus.OK, {"invoices": [invoice_record(r) for r in page.rows], "next_cursor": page.next_cursor}
+
+    async def _search_invoices(self, query: Dict[str, str]) -> Tuple[HTTPStatus, JsonBody]:
+        mode = query.get("mode", SEARCH_SUBSTRING)
+        try:
+            limit = min(MAX_PAGE_SIZE, max(1, int(query.get("limit", 20))))
+        except ValueError as exc:
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"invalid limit: {exc}") from exc
+        if mode not in SEARCH_MODES:
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"invalid mode: {mode}")
+        try:
+            page = await self.read(
+                self.controller.search_invoices, query.get("q", ""), mode, limit, query.get("cursor") or None
+            )
+        except ValueError as exc:
+            raise HttpError(HTTPStatus.BAD_REQUEST, str(exc)) from exc
+        return HTTPStatus.OK, {"invoices": [invoice_record(r) for r in page.rows], "next_cursor": page.next_cursor}
+
+    async def _report(self, name: str) -> Tuple[HTTPStatus, JsonBody]:
+        if name in (KIND_WEEKLY, KIND_MONTHLY):
+            return HTTPStatus.OK, await self.read(_report_records, self.controller, name)
+        if name == "entered":
+            return HTTPStatus.OK, {"entered": await self.read(self.controller.get_count_invoice_enter)}
+        raise HttpError(HTTPStatus.NOT_FOUND, f"unknown report {name}")
+
+    # ---------------------- HTTP ----------------------
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(_read_request(reader), KEEPALIVE_TIMEOUT)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except HttpError as exc:
+                    await _write_response(writer, exc.status, {"error": str(exc)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                try:
+                    status, body = await self.dispatch(request)
+                except HttpError as exc:
+                    status, body = exc.status, {"error": str(exc)}
+                except Exception:  # pylint: disable=broad-except
+                    _LOG.exception("unhandled error in %s %s", request.method, request.path)
+                    status, body = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": INTERNAL_ERROR_MESSAGE}
+                keep_alive = request.headers.get("connection", "").lower() != "close"
+                await _write_response(writer, status, body, keep_alive)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+def _day_param(text: Optional[str]) -> Optional[int]:
+    # کلید روز از پارامتر query: «14040726» یا «1404/07/26»
+    if not text:
+        return None
+    return jalali.day_key_from_text(text) if "/" in text else int(text)
+
+
+def _report_records(controller: Controller, kind: str) -> List[Dict[str, Any]]:
+    # همان رکوردهای خروجی فایل (کلید روز + تاریخ جلالی + شمارنده‌ها)
+    return list(iter_records(controller, kind)[1])
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Request]:
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.LimitOverrunError as exc:
+        raise HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "headers too large") from exc
+    except asyncio.IncompleteReadError as exc:
+        if not exc.partial:
+            return None  # اتصال keep-alive بسته شد
+        raise
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, _version = lines[0].split(" ", 2)
+    except ValueError as exc:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "malformed request line") from exc
+    headers: Dict[str, str] = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    length_text = headers.get("content-length", "0") or "0"
+    if not length_text.isdigit():
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"invalid content-length: {length_text}")
+    length = int(length_text)
+    if length > MAX_BODY_BYTES:
+        raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "body too large")
+    body = await reader.readexactly(length) if length else b""
+    url = urlsplit(target)
+    query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+    return Request(method.upper(), url.path, query, headers, body)
+
+
+async def _write_response(writer: asyncio.StreamWriter, status: HTTPStatus, body: JsonBody, keep_alive: bool) -> None:
+    payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + payload)
+    await writer.drain()
+
+
+class BackgroundServer:
+    """اجرای ScanServer روی event loop یک thread جدا (برای تست‌ها، بنچمارک و جاسازی).
+
+    نمونه:
+        with BackgroundServer(port=0) as background:
+            urlopen(f"http://127.0.0.1:{background.port}/health")
+    """
+
+    def __init__(self, controller: Optional[Controller] = None, host: str = DEFAULT_HOST, port: int = 0, **kwargs: Any) -> None:
+        self._loop = asyncio.new_event_loop()
+        self.server = ScanServer(controller, host, port, **kwargs)
+        self._thread = threading.Thread(target=self._loop.run_forever, name="scan-server", daemon=True)
+
+    @property
+    def port(self) -> int:
+        """پورت واقعی سرور."""
+        return self.server.port
+
+    def start(self) -> "BackgroundServer":
+        """شروع thread و انتظار تا آماده شدن سوکت."""
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.server.start(), self._loop).result()
+        return self
+
+    def stop(self) -> None:
+        """بستن سرور (بعد از اجرای نوشتن‌های در صف) و توقف thread."""
+        if not self._thread.is_alive():
+            return
+        asyncio.run_coroutine_threadsafe(self.server.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self) -> "BackgroundServer":
+        return self.start()
+
+    def __exit__(self, *_exc: object) -> None:
+        self.stop()
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    server = ScanServer(host=args.host, port=args.port, write_batch=args.write_batch)
+    await server.start()
+    # گرم کردن کش وضعیت مثل شروع رابط کاربری (خارج از event loop)
+    await server.read(server.controller.warm_status_cache)
+    print(f"scan server listening on http://{server.host}:{server.port}")
+    await server.serve_forever()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="سرور HTTP/JSON اسکن فاکتور (بدون رابط کاربری)")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--write-batch", type=int, default=DEFAULT_WRITE_BATCH, help="حداکثر اسکن در هر رفت‌وبرگشت نویسنده")
+    args = parser.parse_args(argv)
+
+    settings = load_perf_settings()
+    dumper: Optional[PeriodicDumper] = None
+    if settings.enabled:
+        instrumentation = install_default(Database().pool)
+        if settings.dump_path:
+            dumper = PeriodicDumper(instrumentation, settings.dump_path, settings.dump_interval)
+            dumper.start()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if dumper is not None:
+            dumper.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,89 @@
+# startup.py
+"""زمان‌سنجی راه‌اندازی رابط کاربری: اولین رسم پنجره و آماده به کار شدن.
+
+پنجره اول به صورت پوسته خالی نمایش داده می‌شود و داده‌ها (صفحه اول جدول، گزارش هفتگی و ماهانه، شمارنده)
+بعد از آن روی thread کارگر واکشی و به تدریج رسم می‌شوند. این ماژول لحظه‌ها را ثبت می‌کند:
+    - first_paint: اولین paintEvent پنجره اصلی
+    - interactive: همه گام‌های بارگذاری اولیه رسم شده‌اند
+زمان‌ها ثانیه epoch هستند تا بنچمارک بیرونی (benchmarks/bench_startup.py) آن‌ها را با لحظه اجرای
+پروسه (نسخه سورس یا فایل اجرایی PyInstaller) مقایسه کند.
+
+فعال‌سازی گزارش:
+    INVOICE_STARTUP_REPORT=startup.json   بعد از interactive گزارش JSON نوشته و برنامه بسته می‌شود
+
+این ماژول قبل از PySide6 وارد می‌شود و خودش فقط کتابخانه سبک استاندارد وارد می‌کند.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Callable, Dict, Iterable, Mapping, Optional, Set
+
+STARTUP_REPORT_ENV = "INVOICE_STARTUP_REPORT"
+MARK_FIRST_PAINT = "first_paint"
+MARK_INTERACTIVE = "interactive"
+
+# لحظه ورود اولین ماژول برنامه (پیش از وارد کردن Qt)
+IMPORT_STARTED = time.time()
+
+
+class StartupTimer:
+    """ثبت یک‌باره لحظه‌های راه‌اندازی و تشخیص پایان گام‌های بارگذاری اولیه."""
+
+    def __init__(
+        self,
+        steps: Iterable[str],
+        report_path: Optional[str] = None,
+        on_report: Optional[Callable[[], None]] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.report_path = report_path
+        self._on_report = on_report
+        self._clock = clock
+        self._pending: Set[str] = set(steps)
+        self.marks: Dict[str, float] = {}
+
+    @classmethod
+    def from_environ(
+        cls,
+        steps: Iterable[str],
+        on_report: Optional[Callable[[], None]] = None,
+        environ: Optional[Mapping[str, str]] = None,
+    ) -> "StartupTimer":
+        """StartupTimer با مسیر گزارش از INVOICE_STARTUP_REPORT (خالی: بدون گزارش)."""
+        environ = os.environ if environ is None else environ
+        return cls(steps, environ.get(STARTUP_REPORT_ENV) or None, on_report)
+
+    def mark(self, name: str) -> bool:
+        """ثبت لحظه name (فقط بار اول)؛ True اگر همین الان ثبت شد."""
+        if name in self.marks:
+            return False
+        self.marks[name] = self._clock()
+        return True
+
+    def step_done(self, step: str) -> None:
+        """پایان یک گام بارگذاری اولیه؛ با پایان آخرین گام interactive ثبت و گزارش نوشته می‌شود."""
+        if step not in self._pending:
+            return
+        self._pending.discard(step)
+        if not self._pending and self.mark(MARK_INTERACTIVE) and self.report_path:
+            self.write_report(self.report_path)
+            if self._on_report is not None:
+                self._on_report()
+
+    @property
+    def interactive(self) -> bool:
+        return MARK_INTERACTIVE in self.marks
+
+    def elapsed_ms(self) -> Dict[str, float]:
+        """میلی‌ثانیه هر لحظه از IMPORT_STARTED."""
+        return {name: (value - IMPORT_STARTED) * 1000 for name, value in self.marks.items()}
+
+    def write_report(self, path: str) -> None:
+        """نوشتن {import_started, marks, elapsed_ms} به صورت JSON."""
+        import json  # pylint: disable=import-outside-toplevel  # فقط هنگام گزارش
+
+        report = {"import_started": IMPORT_STARTED, "marks": self.marks, "elapsed_ms": self.elapsed_ms()}
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(report, handle)
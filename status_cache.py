@@ -0,0 +1,146 @@
+# status_cache.py
+"""کش درون‌حافظه وضعیت فاکتورهای پرتکرار (LRU با سقف اندازه + TTL).
+
+در یک شیفت معمولاً چند هزار شماره بارها اسکن/جستجو می‌شوند (ورود، خروج، جستجوی دوباره)؛
+این کش جلوی Database قرار می‌گیرد تا پاسخ این اسکن‌ها بدون رفتن به SQLite ساخته شود.
+
+- کلید: شماره فاکتور به صورت عدد صحیح (همان مقدار ستون invoice_number؛ «007» و «7» یک کلید هستند)
+- مقدار: رکورد وضعیت (در Controller از نوع InvoiceStatus)
+- سقف اندازه: با هر درج جدید، قدیمی‌ترین مورد استفاده‌نشده بیرون می‌رود (LRU)
+- TTL: هر مقدار بعد از ttl ثانیه منقضی می‌شود تا تغییرات ایستگاه‌های دیگر روی همان فایل دیده شود
+- ثبت ورود فقط برای وضعیت نهایی (خارج‌شده) به کش اکتفا می‌کند؛ وضعیت «ورود» کش‌شده ممکن است در ایستگاه
+  دیگر حذف شده باشد، پس درج اتمی در دیتابیس همیشه اجرا می‌شود
+- capacity=0 یعنی کش خاموش (همه get ها miss)
+- thread-safe (گرم‌کردن اولیه روی thread کارگر انجام می‌شود)
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Iterable, NamedTuple, Optional, Tuple, TypeVar
+
+DEFAULT_CAPACITY = 5000
+DEFAULT_TTL_SECONDS = 300.0
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class CacheStats(NamedTuple):
+    """شمارنده‌های کش (از زمان ساخت یا آخرین reset_stats)."""
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    size: int
+    capacity: int
+
+    @property
+    def hit_ratio(self) -> float:
+        """نسبت hit به کل درخواست‌ها (0 اگر درخواستی نبوده)."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class StatusCache(Generic[K, V]):
+    """کش LRU/TTL با شمارنده hit/miss."""
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_CAPACITY,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if capacity < 0 or ttl <= 0:
+            raise ValueError("capacity باید نامنفی و ttl مثبت باشد")
+        self.capacity = capacity
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        """آیا کش فعال است (capacity > 0)."""
+        return self.capacity > 0
+
+    def get(self, key: K) -> Optional[V]:
+        """مقدار معتبر کلید (و جابه‌جایی به انتهای LRU) یا None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: K, value: V) -> None:
+        """درج/به‌روزرسانی مقدار (write-through بعد از ثبت/خروج)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._store(key, value, self._clock() + self.ttl)
+
+    def put_many(self, items: Iterable[Tuple[K, V]]) -> int:
+        """درج گروهی (گرم‌کردن اولیه)؛ اولین موارد ورودی تازه‌ترین جایگاه LRU را می‌گیرند."""
+        if not self.enabled:
+            return 0
+        batch = list(items)[:self.capacity]
+        with self._lock:
+            expires_at = self._clock() + self.ttl
+            # به ترتیب معکوس درج می‌شوند تا اولین مورد (معمولاً جدیدترین فاکتور) آخر از همه بیرون برود
+            for key, value in reversed(batch):
+                self._store(key, value, expires_at)
+        return len(batch)
+
+    def invalidate(self, key: K) -> None:
+        """حذف یک کلید (بعد از حذف فاکتور یا تغییر نامعلوم)."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_many(self, keys: Iterable[K]) -> None:
+        """حذف چند کلید (بعد از عملیات انبوه)."""
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """خالی کردن کامل کش (شمارنده‌ها حفظ می‌شوند)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        """شمارنده‌های فعلی."""
+        with self._lock:
+            return CacheStats(
+                self._hits, self._misses, self._evictions, self._expirations, len(self._entries), self.capacity
+            )
+
+    def reset_stats(self) -> None:
+        """صفر کردن شمارنده‌ها."""
+        with self._lock:
+            self._hits = self._misses = self._evictions = self._expirations = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _store(self, key: K, value: V, expires_at: float) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self._evictions += 1
@@ -0,0 +1,210 @@
+# sync.py
+"""همگام‌سازی چند ایستگاه اسکن از طریق یک مخزن مرکزی.
+
+هر ایستگاه invoices.db محلی خودش را دارد؛ اسکن‌ها فقط روی فایل محلی نوشته می‌شوند و منتظر شبکه نمی‌مانند.
+    - ثبت: هر ورود / خروج / حذف با trigger در همان تراکنش اسکن به جدول outbox اضافه می‌شود (model.py).
+    - ارسال (push): Synchronizer تغییرهای صف را دسته‌ای به مخزن مرکزی می‌فرستد و بعد از موفقیت از صف
+      حذف می‌کند. کلید یکتای (station, station_seq) ارسال دوباره بعد از قطع شبکه را بی‌اثر می‌کند؛ کلید
+      ایستگاه UUID پایدار فایل محلی را دارد، پس دیتابیسی که از نو ساخته شود (seq از 1) ایستگاه تازه‌ای است و
+      تغییر دیگری با همان کلید به جای ارسال دوباره بی‌صدا دور ریخته نمی‌شود (SyncConflictError).
+    - دریافت (pull): تغییرهای ایستگاه‌های دیگر بعد از sync_cursor به ترتیب seq مرکزی خوانده و با
+      Database.apply_changes (حل تعارض برای هر فاکتور) اعمال می‌شوند.
+ورودی/خروجی مخزن مرکزی بیرون از قفل نویسنده دیتابیس محلی انجام می‌شود؛ در رابط کاربری sync_once روی
+thread کارگر و با تایمر اجرا می‌شود.
+
+مخزن مرکزی (CentralStore) یک فایل SQLite مشترک است (مثلاً روی پوشه شبکه، با journal_mode=DELETE چون
+WAL روی فایل شبکه‌ای امن نیست). هر پیاده‌سازی دیگری با متدهای push / pull / close (ChangeStore)، مثلاً
+یک سرویس HTTP، جایگزین آن می‌شود.
+"""
+
+from __future__ import annotations
+
+import socket
+import sqlite3
+import threading
+from typing import List, NamedTuple, Optional, Protocol, Sequence, Tuple
+
+from model import Database, SyncChange
+
+DEFAULT_SYNC_BATCH = 500
+
+# (seq مرکزی، تغییر)
+PulledChange = Tuple[int, SyncChange]
+
+
+class SyncConflictError(Exception):
+    """مخزن مرکزی تغییر دیگری با همان (station, station_seq) دارد (کلید ایستگاه تکراری، مثلاً فایل کپی‌شده)."""
+
+
+class ChangeStore(Protocol):
+    """مخزن مرکزی تغییرها."""
+
+    def push(self, changes: Sequence[SyncChange]) -> int:
+        """ذخیره تغییرها (ارسال دوباره همان تغییر نادیده گرفته می‌شود)؛ تعداد تغییرهای تازه.
+
+        تغییر متفاوت با کلیدی که از قبل هست: SyncConflictError و هیچ تغییری ذخیره نمی‌شود.
+        """
+
+    def pull(self, after_seq: int, exclude_station: str, limit: int) -> List[PulledChange]:
+        """حداکثر limit تغییر بعد از after_seq به ترتیب seq، به جز تغییرهای exclude_station."""
+
+    def close(self) -> None:
+        """بستن اتصال."""
+
+
+class CentralStore:
+    """مخزن مرکزی روی یک فایل SQLite مشترک بین ایستگاه‌ها."""
+
+    def __init__(self, path: str, busy_timeout: int = 5000) -> None:
+        self.path = path
+        self._busy_timeout = busy_timeout
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    # اتصال تنبل؛ بعد از خطای ورودی/خروجی (قطع شبکه) بسته و در فراخوانی بعد دوباره باز می‌شود
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, timeout=self._busy_timeout / 1000, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode = DELETE")
+            with connection:
+                connection.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS changes (
+                        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                        station TEXT NOT NULL,
+                        station_seq INTEGER NOT NULL,
+                        invoice_number INTEGER NOT NULL,
+                        op TEXT NOT NULL,
+                        enter_ts INTEGER NOT NULL,
+                        exit_ts INTEGER,
+                        ts INTEGER NOT NULL,
+                        UNIQUE (station, station_seq)
+                    )
+                    """
+                )
+            self._connection = connection
+        return self._connection
+
+    def _drop_connection(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def push(self, changes: Sequence[SyncChange]) -> int:
+        """درج تغییرها در یک تراکنش (INSERT OR IGNORE روی کلید یکتای ایستگاه + بررسی تکراری‌ها)."""
+        with self._lock:
+            try:
+                connection = self._connect()
+                with connection:
+                    before = connection.total_changes
+                    connection.executemany(
+                        """
+                        INSERT OR IGNORE INTO changes
+                            (station, station_seq, invoice_number, op, enter_ts, exit_ts, ts)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        changes,
+                    )
+                    inserted = connection.total_changes - before
+                    if inserted < len(changes):
+                        # فقط وقتی کلیدی از قبل بوده است (ارسال دوباره بعد از قطع شبکه)
+                        _check_duplicates(connection, changes)
+                    return inserted
+            except sqlite3.OperationalError:
+                self._drop_connection()
+                raise
+
+    def pull(self, after_seq: int, exclude_station: str, limit: int) -> List[PulledChange]:
+        """تغییرهای بعد از after_seq (پرش روی کلید اصلی seq)."""
+        with self._lock:
+            try:
+                rows = self._connect().execute(
+                    """
+                    SELECT seq, station, station_seq, invoice_number, op, enter_ts, exit_ts, ts
+                    FROM changes WHERE seq > ? AND station <> ?
+                    ORDER BY seq LIMIT ?
+                    """,
+                    (after_seq, exclude_station, limit),
+                ).fetchall()
+            except sqlite3.OperationalError:
+                self._drop_connection()
+                raise
+        return [(row[0], SyncChange(*row[1:])) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._drop_connection()
+
+
+def _check_duplicates(connection: sqlite3.Connection, changes: Sequence[SyncChange]) -> None:
+    for change in changes:
+        stored = connection.execute(
+            """
+            SELECT invoice_number, op, enter_ts, exit_ts, ts FROM changes
+            WHERE station = ? AND station_seq = ?
+            """,
+            (change.station, change.station_seq),
+        ).fetchone()
+        if stored != tuple(change[2:]):
+            raise SyncConflictError(
+                f"مخزن مرکزی تغییر دیگری با کلید ({change.station}, {change.station_seq}) دارد"
+            )
+
+
+class SyncReport(NamedTuple):
+    """نتیجه یک دور همگام‌سازی؛ changed: شماره فاکتورهایی که محلی تغییر کردند."""
+    pushed: int
+    pulled: int
+    changed: List[int]
+
+
+def station_id(db: Database) -> str:
+    """کلید ایستگاه در مخزن مرکزی: «نام/UUID»؛ نام از station_id تنظیمات، وگرنه نام میزبان.
+
+    UUID پایدار فایل دیتابیس محلی (Database.station_uuid) کلید را یکتا نگه می‌دارد، حتی اگر دو ایستگاه هم‌نام
+    باشند یا دیتابیس محلی از نو ساخته شود.
+    """
+    return f"{db.settings.station_id or socket.gethostname()}/{db.station_uuid()}"
+
+
+class Synchronizer:
+    """ارسال outbox محلی و دریافت تغییرهای دیگر ایستگاه‌ها (یک دور در هر sync_once)."""
+
+    def __init__(self, db: Database, store: ChangeStore, station: str, batch_size: int = DEFAULT_SYNC_BATCH) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size باید مثبت باشد")
+        self.db = db
+        self.store = store
+        self.station = station
+        self.batch_size = batch_size
+        # از این لحظه نوشتن‌های محلی در outbox ثبت می‌شوند (بار اول همراه سابقه موجود؛ روی thread سازنده،
+        # در رابط کاربری thread کارگر)
+        db.enable_outbox()
+
+    def push_pending(self) -> int:
+        """ارسال همه تغییرهای صف در دسته‌های batch_size؛ تعداد تغییرهای ارسال‌شده."""
+        sent = 0
+        while True:
+            changes = self.db.pending_changes(self.station, self.batch_size)
+            if not changes:
+                return sent
+            self.store.push(changes)
+            self.db.ack_changes(changes[-1].station_seq)
+            sent += len(changes)
+
+    def pull_remote(self) -> Tuple[int, List[int]]:
+        """دریافت و اعمال تغییرهای تازه دیگر ایستگاه‌ها؛ (تعداد دریافتی، شماره‌های تغییرکرده)."""
+        pulled = 0
+        changed: List[int] = []
+        while True:
+            batch = self.store.pull(self.db.sync_cursor(), self.station, self.batch_size)
+            if not batch:
+                return pulled, changed
+            changed.extend(self.db.apply_changes([change for _, change in batch], batch[-1][0]))
+            pulled += len(batch)
+
+    def sync_once(self) -> SyncReport:
+        """یک دور کامل: اول ارسال، بعد دریافت."""
+        pushed = self.push_pending()
+        pulled, changed = self.pull_remote()
+        return SyncReport(pushed, pulled, changed)
@@ -1,59 +1,19 @@
-import sqlite3
 import pytest
+from db_config import DatabaseSettings
 from model import Database
 from controller import Controller  # moved to top-level to satisfy pylint C0415
 
 
-SCHEMA = """
-CREATE TABLE IF NOT EXISTS invoices (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    invoice_number INTEGER NOT NULL,
-    date_enter TEXT NOT NULL,
-    time_enter TEXT NOT NULL,
-    first_status TEXT NOT NULL,
-    date_exit TEXT,
-    time_exit TEXT,
-    second_status TEXT
-);
-"""
-
-
 @pytest.fixture()
-def memory_db(monkeypatch):  # noqa: D401
+def memory_db():  # noqa: D401
     """Provide an isolated in-memory Database instance.
 
-    ترتیب مهم است:
-    1. reset -> تضمین حذف singleton قبلی.
-    2. ساخت instance (که به طور پیش‌فرض فایل invoices.db را باز می‌کند).
-    3. بستن اتصال فایل و جایگزینی با :memory: (patch روی attribute های کلاس).
-    4. ایجاد schema روی دیتابیس جدید.
-
-    اگر قبل از ساخت instance پچ کنیم، __new__ اتصال ما را overwrite می‌کند.
+    reset -> تضمین حذف singleton قبلی؛ سپس ساخت instance با مسیر :memory:
+    (مهاجرت‌های schema در ساخت instance اجرا می‌شوند).
     """
     Database.reset()
-    instance = Database()  # اینجا singleton ساخته می‌شود (فایل واقعی)
-    # بستن اتصال فایل و جایگزینی با in-memory
-    try:
-        instance.__class__.cursor.close()
-    except Exception:  # pylint: disable=broad-except
-        pass
-    try:
-        instance.__class__.connection.close()
-    except Exception:  # pylint: disable=broad-except
-        pass
-
-    conn = sqlite3.connect(":memory:")
-    cursor = conn.cursor()
-    cursor.executescript(SCHEMA)
-    conn.commit()
-    monkeypatch.setattr(Database, "connection", conn, raising=False)
-    monkeypatch.setattr(Database, "cursor", cursor, raising=False)
+    instance = Database(DatabaseSettings(path=":memory:"))
     yield instance
-    # teardown
-    try:
-        cursor.close()
-    finally:
-        conn.close()
     Database.reset()
 
 
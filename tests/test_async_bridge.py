@@ -0,0 +1,48 @@
+import threading
+
+import pytest
+
+pytest.importorskip("PySide6.QtCore")
+from PySide6.QtCore import QCoreApplication  # noqa: E402  pylint: disable=wrong-import-position
+from async_bridge import AsyncBridge  # noqa: E402  pylint: disable=wrong-import-position
+
+
+@pytest.fixture(name="qt_app")
+def fixture_qt_app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def _drain(app, bridge):
+    for _ in range(100):
+        bridge.wait_for_done(1000)
+        app.processEvents()
+        if bridge.pending_count() == 0:
+            return
+    raise AssertionError("async calls did not finish")
+
+
+def test_result_delivered_on_owner_thread(qt_app):
+    bridge = AsyncBridge()
+    seen = []
+    worker_threads = []
+
+    def work(value):
+        worker_threads.append(threading.current_thread())
+        return value * 2
+
+    bridge.submit(work, 21, on_result=lambda result: seen.append((result, threading.current_thread())))
+    _drain(qt_app, bridge)
+    assert seen == [(42, threading.main_thread())]
+    assert worker_threads and worker_threads[0] is not threading.main_thread()
+
+
+def test_errors_go_to_error_callback(qt_app):
+    bridge = AsyncBridge()
+    errors = []
+
+    def fail():
+        raise ValueError("boom")
+
+    bridge.submit(fail, on_result=lambda _: errors.append("unexpected"), on_error=errors.append)
+    _drain(qt_app, bridge)
+    assert len(errors) == 1 and isinstance(errors[0], ValueError)
@@ -0,0 +1,139 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("PySide6.QtCore")
+from PySide6.QtCore import QCoreApplication  # noqa: E402  pylint: disable=wrong-import-position
+from async_bridge import AsyncBridge  # noqa: E402  pylint: disable=wrong-import-position
+from background_jobs import BackgroundJobs  # noqa: E402  pylint: disable=wrong-import-position
+from controller import Controller  # noqa: E402  pylint: disable=wrong-import-position
+from db_config import DatabaseSettings  # noqa: E402  pylint: disable=wrong-import-position
+from model import Database  # noqa: E402  pylint: disable=wrong-import-position
+from sync import CentralStore  # noqa: E402  pylint: disable=wrong-import-position
+
+
+@pytest.fixture(name="qt_app")
+def fixture_qt_app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def _settle(app, jobs):
+    deadline = time.monotonic() + 10
+    while jobs.is_running():
+        if time.monotonic() > deadline:
+            raise AssertionError("background jobs did not finish")
+        app.processEvents()
+        time.sleep(0.001)
+
+
+@pytest.mark.usefixtures("qt_app")
+def test_start_runs_nothing_by_default(app_controller):
+    # بایگانی و همگام‌سازی هر دو انتخابی‌اند (archive_days = 0 و sync_path خالی)
+    jobs = BackgroundJobs(app_controller, AsyncBridge())
+    jobs.start()
+    assert not jobs.is_running()
+    assert not jobs.archive_timer.isActive() and not jobs.sync_timer.isActive()
+
+
+def test_start_archives_once_and_skips_sync_without_sync_path(qt_app, memory_db):
+    del memory_db
+    Database.reset()
+    Database(DatabaseSettings(path=":memory:", archive_days=90))
+    app_controller = Controller()
+    app_controller.add_invoice("950")
+    app_controller.process_exit_invoice("950")
+    app_controller.db.connection.execute(
+        "UPDATE invoices SET enter_ts = enter_ts - 400 * 86400, exit_ts = exit_ts - 400 * 86400"
+    )
+    jobs = BackgroundJobs(app_controller, AsyncBridge())
+    jobs.start()
+    # اجرای دوم تا پایان اجرای اول نادیده گرفته می‌شود
+    jobs.run_archive()
+    assert jobs.is_running()
+    _settle(qt_app, jobs)
+    assert app_controller.count_rows() == (0, 1)
+    assert jobs.archive_timer.isActive() and not jobs.sync_timer.isActive()
+    jobs.archive_timer.stop()
+
+
+def test_failed_archive_is_logged_and_reported(qt_app, app_controller, monkeypatch, caplog):
+    def broken(*_args, **_kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(app_controller, "archive_old_invoices", broken)
+    jobs = BackgroundJobs(app_controller, AsyncBridge())
+    messages = []
+    jobs.failed.connect(messages.append)
+    with caplog.at_level("WARNING", logger="background_jobs"):
+        jobs.run_archive()
+        _settle(qt_app, jobs)
+    assert len(messages) == 1 and "disk full" in messages[0]
+    assert "archive failed" in caplog.text
+
+
+def test_stop_cancels_timers_and_later_runs(qt_app, app_controller, monkeypatch):
+    calls = []
+    monkeypatch.setattr(app_controller, "archive_old_invoices", lambda **kwargs: calls.append(kwargs["cancelled"]) or 0)
+    jobs = BackgroundJobs(app_controller, AsyncBridge())
+    jobs.archive_timer.start()
+    jobs.run_archive()
+    _settle(qt_app, jobs)
+    # دور در جریان پرچم لغو را می‌بیند؛ بعد از stop() دور تازه‌ای شروع نمی‌شود
+    assert len(calls) == 1 and not calls[0]()
+    jobs.stop()
+    assert calls[0]() and not jobs.archive_timer.isActive()
+    jobs.run_archive()
+    jobs.run_sync()
+    assert not jobs.is_running() and len(calls) == 1
+
+
+def test_outbox_backfill_runs_once_on_the_worker_thread(qt_app, tmp_path, monkeypatch):
+    threads = []
+    original = Database.enable_outbox
+
+    def recording(self):
+        threads.append(threading.current_thread())
+        return original(self)
+
+    monkeypatch.setattr(Database, "enable_outbox", recording)
+    central = str(tmp_path / "central.db")
+    Database.reset()
+    try:
+        db = Database(DatabaseSettings(path=str(tmp_path / "station.db"), sync_path=central, station_id="a"))
+        db.add_invoice("960")
+        controller = Controller()
+        # سازنده (روی thread رابط کاربری) سابقه را در outbox نمی‌ریزد
+        assert not threads and db.outbox_size() == 0
+        jobs = BackgroundJobs(controller, AsyncBridge())
+        jobs.start()
+        _settle(qt_app, jobs)
+        jobs.stop()
+        assert len(threads) == 1 and threads[0] is not threading.main_thread()
+        # پرچم sync_state: اجرای بعدی برنامه سابقه را دوباره نمی‌فرستد
+        assert db.enable_outbox() == 0
+        store = CentralStore(central)
+        assert [c.invoice_number for _, c in store.pull(0, "", 10)] == [960]
+        store.close()
+    finally:
+        Database.reset()
+
+
+def test_unreachable_central_store_is_reported_once(qt_app, tmp_path, caplog):
+    # مسیر مخزن مرکزی یک پوشه است: CentralStore نمی‌تواند فایل SQLite را باز کند
+    central = tmp_path / "central"
+    central.mkdir()
+    Database.reset()
+    try:
+        Database(DatabaseSettings(path=str(tmp_path / "station.db"), sync_path=str(central), station_id="a"))
+        jobs = BackgroundJobs(Controller(), AsyncBridge())
+        messages = []
+        jobs.failed.connect(messages.append)
+        with caplog.at_level("WARNING", logger="background_jobs"):
+            for _ in range(3):
+                jobs.run_sync()
+                _settle(qt_app, jobs)
+        assert len(messages) == 1 and "unable to open database file" in messages[0]
+        assert caplog.text.count("sync failed") == 1
+    finally:
+        Database.reset()
@@ -0,0 +1,70 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from benchmarks import bench_reports, bench_rows, bench_search, bench_server, bench_sync, datagen, suite
+from constants import SEARCH_MODES
+from server import BackgroundServer
+
+
+def test_generated_invoices_are_ordered_and_consistent():
+    now = datetime(2025, 10, 18, 15, 0, 0)
+    rows = list(datagen.generate_invoices(500, days=10, now=now))
+    assert len(rows) == 500
+    assert [r[0] for r in rows] == list(range(datagen.FIRST_INVOICE_NUMBER, datagen.FIRST_INVOICE_NUMBER + 500))
+    assert all(a[1] <= b[1] for a, b in zip(rows, rows[1:]))
+    assert all(r[4] is None or r[4] >= r[1] for r in rows)
+    assert rows[-1][2] == 14040726 and rows[0][2] == 14040717
+    assert rows == list(datagen.generate_invoices(500, days=10, now=now))
+
+
+def test_suite_reports_percentiles_and_flags_regressions():
+    report = suite.run([200], backends=["memory"], scans=3, reps=2, list_reps=1)
+    summary = report["results"]["memory/200/add_invoice"]
+    assert summary["n"] == 3 and summary["p50_us"] <= summary["p99_us"]
+    assert {"memory/200/get_weekly_data", "memory/200/get_all_invoices"} <= report["results"].keys()
+
+    baseline = {"results": {"memory/200/add_invoice": dict(summary, p50_us=summary["p50_us"] / 10)}}
+    regressions = suite.compare(report, baseline, threshold=0.25, min_delta_us=0)
+    assert [r.key for r in regressions] == ["memory/200/add_invoice"]
+    assert not suite.compare(report, report)
+
+
+def test_percentile_interpolates():
+    assert suite.percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+    assert suite.percentile([], 95) == 0.0
+
+
+@pytest.mark.usefixtures("memory_db")
+def test_server_load_test_runs_against_local_instance():
+    with BackgroundServer(port=0) as background:
+        report = asyncio.run(bench_server.load_test("127.0.0.1", background.port, clients=3, scans=30, read_ratio=1.0))
+    assert report["requests"] == 30 * 4  # ورود + خروج، هرکدام با یک جستجو
+    assert report["latency"]["enter"]["n"] == 30 and report["scans_per_second"] > 0
+
+
+def test_sync_benchmark_pushes_and_applies_every_change(tmp_path):
+    report = bench_sync.run(changes=40, stations=2, batch_size=16, scans=20, workdir=tmp_path)
+    assert report["push"]["changes"] == 40
+    assert report["pull"]["changes"] == 40 and report["pull"]["invoices"] == 27
+    assert report["scans"]["idle"]["n"] == 20 and report["scans"]["during_sync"]["n"] == 20
+
+
+def test_reports_benchmark_matches_tuple_report(tmp_path):
+    report = bench_reports.run(rows=3000, days=30, repeat=1, workdir=tmp_path)
+    assert report["cold"]["matches_tuples"] and report["warm"]["matches_tuples"]
+    assert report["cold"]["result"].entered == 3000
+    assert report["warm"]["result"].cached_days == 29
+
+
+def test_rows_benchmark_reports_bytes_per_row(tmp_path):
+    report = bench_rows.run(rows=2000, workdir=tmp_path)
+    assert report["namedtuple"]["rows"] == report["rows"]["rows"] == 2000
+    assert report["rows"]["retained_bytes_per_row"] < report["namedtuple"]["retained_bytes_per_row"]
+
+
+def test_search_benchmark_index_matches_scan(tmp_path):
+    report = bench_search.run(rows=2000, queries=5, workdir=tmp_path)
+    for mode in SEARCH_MODES:
+        assert report[mode]["same_results"] and report[mode]["index"]["n"] == 5
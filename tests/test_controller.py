@@ -1,7 +1,28 @@
+import sqlite3
+
+import pytest
+
+import jalali
+
+from controller import Controller
+from db_config import DatabaseSettings
+from model import Database
+from status_cache import StatusCache
 from constants import (
     EMOJI_SUCCESS,
     EMOJI_ERROR,
+    STATUS_ENTERED,
     STATUS_EXITED,
+    EVENT_ADDED,
+    EVENT_EXITED,
+    EVENT_DELETED,
+    EVENT_RELOADED,
+    OUTCOME_REGISTERED,
+    OUTCOME_ALREADY_PRESENT,
+    OUTCOME_INVALID,
+    OUTCOME_EXITED,
+    OUTCOME_ALREADY_EXITED,
+    OUTCOME_NOT_FOUND,
 )
 
 
@@ -47,3 +68,298 @@ def test_get_all_invoices(app_controller):
     app_controller.add_invoice("400")
     rows = app_controller.get_all_invoices()
     assert any(str(r[0]) == "400" for r in rows)
+
+
+def test_get_invoice_row(app_controller):
+    app_controller.add_invoice("401")
+    row = app_controller.get_invoice_row(" 401 ")
+    assert row is not None and row[0] == 401
+    assert app_controller.get_invoice_row("402") is None
+    assert app_controller.get_invoice_row("abc") is None
+
+
+def _count_statements(connection, action):
+    statements = []
+    connection.set_trace_callback(statements.append)
+    try:
+        result = action()
+    finally:
+        connection.set_trace_callback(None)
+    return result, statements
+
+
+def _data_statements(statements):
+    # کنترل تراکنش حذف می‌شود؛ گام‌های trigger با متن همان دستور بیرونی گزارش می‌شوند (یکتا سازی)
+    # و دستورهای داخلی ایندکس FTS5 با پیشوند «--» یا نام schema نقل‌قول‌شده ('main'.) می‌آیند
+    return list(dict.fromkeys(
+        s for s in statements
+        if s.split()[0].upper() not in ("BEGIN", "COMMIT", "ROLLBACK") and not s.startswith("--") and "'main'." not in s
+    ))
+
+
+def test_each_successful_scan_is_one_statement(app_controller):
+    connection = app_controller.db.connection
+    for action in (
+        lambda: app_controller.add_invoice("450"),
+        lambda: app_controller.process_exit_invoice("450"),
+        lambda: app_controller.add_invoice("451"),
+        lambda: app_controller.delete_invoice("451"),
+    ):
+        message, statements = _count_statements(connection, action)
+        assert EMOJI_SUCCESS in message
+        assert len(_data_statements(statements)) == 1, statements
+    # حالت‌های بدون تغییر: با کش بدون کوئری، بدون کش فقط یک کوئری اضافه برای پیام
+    message, statements = _count_statements(connection, lambda: app_controller.add_invoice("450"))
+    assert STATUS_EXITED in message and not _data_statements(statements)
+    uncached = Controller(StatusCache(capacity=0))
+    message, statements = _count_statements(connection, lambda: uncached.add_invoice("450"))
+    assert STATUS_EXITED in message and len(_data_statements(statements)) == 2
+    message, statements = _count_statements(connection, lambda: uncached.delete_invoice("450"))
+    assert EMOJI_ERROR in message and len(_data_statements(statements)) == 2
+
+
+def test_status_cache_write_through_and_invalidation(app_controller):
+    app_controller.add_invoice("460")
+    assert app_controller.status_cache.get(460).second_status is None
+    app_controller.process_exit_invoice("460")
+    assert app_controller.status_cache.get(460).second_status == STATUS_EXITED
+    app_controller.add_invoice("461")
+    app_controller.delete_invoice("461")
+    assert app_controller.status_cache.get(461) is None
+    assert app_controller.get_invoice_status("461") is None
+    app_controller.add_invoices_bulk(["462"])
+    app_controller.get_invoice_status("462")
+    app_controller.process_exit_bulk(["462"])
+    assert app_controller.get_invoice_status("462").second_status == STATUS_EXITED
+    stats = app_controller.status_cache_stats()
+    assert stats.hits >= 2 and stats.misses >= 1
+
+
+def test_status_cache_keys_leading_zero_numbers_together(app_controller):
+    # «007» و «7» همان ردیف invoice_number = 7 هستند و یک ورودی کش دارند
+    app_controller.add_invoice("007")
+    app_controller.process_exit_invoice("7")
+    assert len(app_controller.status_cache) == 1
+    assert app_controller.status_cache.get(7).second_status == STATUS_EXITED
+    assert app_controller.get_invoice_status("007").second_status == STATUS_EXITED
+    app_controller.add_invoice("8")
+    assert EMOJI_SUCCESS in app_controller.delete_invoice("0008")
+    assert app_controller.status_cache.get(8) is None and app_controller.get_invoice_status("8") is None
+
+
+def test_status_cache_warmed_from_recent_days(app_controller):
+    for number in ("470", "471"):
+        app_controller.db.add_invoice(number)
+    app_controller.db.update_invoice_exit("471")
+    assert app_controller.warm_status_cache(days=1) == 2
+    statements = []
+    app_controller.db.connection.set_trace_callback(statements.append)
+    try:
+        message = app_controller.process_exit_invoice("471")
+        status = app_controller.get_invoice_status(" 470 ")
+    finally:
+        app_controller.db.connection.set_trace_callback(None)
+    assert STATUS_EXITED in message and status.second_status is None
+    assert not statements
+    # کش فقط زمان‌های عددی را نگه می‌دارد؛ متن جلالی هنگام خواندن ساخته می‌شود
+    assert not hasattr(status, "__dict__") and status.time_exit is None
+    assert status.date_enter == jalali.format_date(status.enter_ts)
+
+
+def test_cached_entered_invoice_deleted_by_another_station_can_be_rescanned(tmp_path):
+    path = tmp_path / "shared.db"
+    Database.reset()
+    Database(DatabaseSettings(path=str(path)))
+    try:
+        controller = Controller()
+        assert EMOJI_SUCCESS in controller.add_invoice("480")
+        assert controller.status_cache.get(480).second_status is None
+        # ایستگاه دیگر (اتصال جدا به همان فایل) فاکتور را حذف می‌کند؛ کش این ایستگاه خبر ندارد
+        other = sqlite3.connect(path)
+        with other:
+            other.execute("DELETE FROM invoices WHERE invoice_number = 480")
+        other.close()
+        message = controller.add_invoice("480")
+        assert EMOJI_SUCCESS in message and STATUS_ENTERED not in message
+        assert controller.get_invoice_status("480").second_status is None
+        # تکرار فاکتور واردشده پیام وضعیت فعلی دیتابیس را می‌دهد
+        assert STATUS_ENTERED in controller.add_invoice("480")
+    finally:
+        Database.reset()
+
+
+def test_delete_unknown_invoice_reports_not_found(app_controller):
+    events = []
+    app_controller.subscribe(events.append)
+    assert EMOJI_ERROR in app_controller.delete_invoice("452")
+    assert EMOJI_ERROR in app_controller.process_exit_invoice("452")
+    assert not events
+
+
+def test_refresh_issues_single_query_for_exited_invoices(app_controller):
+    for number in ("500", "501", "502", "503"):
+        app_controller.add_invoice(number)
+        app_controller.process_exit_invoice(number)
+    rows, statements = _count_statements(app_controller.db.connection, app_controller.get_all_invoices)
+    assert len(statements) == 1
+    assert len(rows) == 4
+    assert all(row.status == STATUS_EXITED and row.exit_ts is not None for row in rows)
+
+    page, statements = _count_statements(
+        app_controller.db.connection, lambda: app_controller.get_invoices_page(0, 10)
+    )
+    assert len(statements) == 1
+    assert page == rows
+
+
+def test_change_events_carry_affected_row(app_controller):
+    events = []
+    app_controller.subscribe(events.append)
+    app_controller.add_invoice("700")
+    app_controller.add_invoice("700")  # تکراری: بدون رویداد
+    app_controller.process_exit_invoice("700")
+    app_controller.add_invoice("701")
+    app_controller.delete_invoice("701")
+    app_controller.delete_invoice("700")  # خارج شده: بدون رویداد
+    assert [(e.kind, e.row.invoice_number) for e in events] == [
+        (EVENT_ADDED, 700),
+        (EVENT_EXITED, 700),
+        (EVENT_ADDED, 701),
+        (EVENT_DELETED, 701),
+    ]
+    assert events[1].row.status == STATUS_EXITED
+    assert all(e.date == e.row.enter_day for e in events)
+    app_controller.unsubscribe(events.append)
+    app_controller.add_invoice("702")
+    assert len(events) == 4
+
+
+def test_bulk_add_and_exit_report_per_number(app_controller):
+    events = []
+    app_controller.subscribe(events.append)
+    app_controller.add_invoice("900")
+    report = app_controller.add_invoices_bulk(["901", " 900", "x9", "902", "901"])
+    assert report == [
+        ("901", OUTCOME_REGISTERED),
+        ("900", OUTCOME_ALREADY_PRESENT),
+        ("x9", OUTCOME_INVALID),
+        ("902", OUTCOME_REGISTERED),
+        ("901", OUTCOME_ALREADY_PRESENT),
+    ]
+    assert events[-1].kind == EVENT_RELOADED and events[-1].row is None
+    assert app_controller.get_count_invoice_enter() == 3
+
+    app_controller.process_exit_invoice("902")
+    exits = app_controller.process_exit_bulk(["900", "902", "903", "", "900"])
+    assert exits == [
+        ("900", OUTCOME_EXITED),
+        ("902", OUTCOME_ALREADY_EXITED),
+        ("903", OUTCOME_NOT_FOUND),
+        ("", OUTCOME_INVALID),
+        ("900", OUTCOME_ALREADY_EXITED),
+    ]
+    assert app_controller.get_invoice_row("900").status == STATUS_EXITED
+    assert app_controller.verify_daily_stats() == []
+
+
+def test_bulk_without_changes_emits_nothing(app_controller):
+    events = []
+    app_controller.subscribe(events.append)
+    assert app_controller.add_invoices_bulk([]) == []
+    assert app_controller.process_exit_bulk(["904"]) == [("904", OUTCOME_NOT_FOUND)]
+    assert not events
+
+
+def test_process_scans_in_order_with_deferred_events(app_controller):
+    events = []
+    app_controller.subscribe(events.append)
+    results = app_controller.process_scans(
+        [(EVENT_ADDED, "950"), (EVENT_ADDED, " 950"), (EVENT_EXITED, "950"), (EVENT_ADDED, "x"), (EVENT_EXITED, "951")]
+    )
+    assert [r.number for r in results] == ["950", " 950", "950", "x", "951"]
+    assert [r.event.kind if r.event else None for r in results] == [EVENT_ADDED, None, EVENT_EXITED, None, None]
+    assert EMOJI_SUCCESS in results[0].message and EMOJI_ERROR in results[4].message
+    # رویدادها تا publish_events به شنونده‌ها نمی‌رسند
+    assert not events
+    app_controller.publish_events(r.event for r in results)
+    assert [e.kind for e in events] == [EVENT_ADDED, EVENT_EXITED]
+    assert app_controller.get_invoice_row("950").status == STATUS_EXITED
+
+
+def test_process_scans_rolls_back_whole_batch(app_controller):
+    with pytest.raises(ValueError):
+        app_controller.process_scans([(EVENT_ADDED, "960"), ("bogus", "961")])
+    assert app_controller.get_invoice_row("960") is None
+
+    def boom(_number):
+        raise RuntimeError("disk full")
+
+    app_controller.process_exit_invoice = boom
+    with pytest.raises(RuntimeError):
+        app_controller.process_scans([(EVENT_ADDED, "962"), (EVENT_EXITED, "962")])
+    assert app_controller.get_invoice_row("962") is None
+    assert app_controller.get_invoice_status("962") is None
+
+
+def test_archive_old_invoices_keeps_scan_messages(app_controller):
+    for number in ("700", "701", "702"):
+        app_controller.add_invoice(number)
+    app_controller.process_exit_invoice("700")
+    app_controller.process_exit_invoice("701")
+    app_controller.db.connection.execute(
+        "UPDATE invoices SET enter_ts = enter_ts - 400 * 86400, exit_ts = exit_ts - 400 * 86400"
+        " WHERE invoice_number IN (700, 702)"
+    )
+    assert app_controller.archive_old_invoices(days=0) == 0
+    assert app_controller.archive_old_invoices(days=30, batch_size=1) == 1
+    assert app_controller.count_rows() == (2, 1)
+
+    app_controller.status_cache.invalidate_many([700])
+    assert STATUS_EXITED in app_controller.process_exit_invoice("700")
+    assert EMOJI_ERROR in app_controller.delete_invoice("700")
+    assert EMOJI_SUCCESS not in app_controller.add_invoice("700")
+    assert app_controller.count_rows() == (2, 1)
+
+
+def test_archive_old_invoices_stops_after_current_batch_when_cancelled(app_controller):
+    for number in range(710, 714):
+        app_controller.add_invoice(str(number))
+        app_controller.process_exit_invoice(str(number))
+    app_controller.db.connection.execute(
+        "UPDATE invoices SET enter_ts = enter_ts - 400 * 86400, exit_ts = exit_ts - 400 * 86400"
+    )
+    assert app_controller.archive_old_invoices(days=30, batch_size=1, cancelled=lambda: True) == 1
+    assert app_controller.count_rows() == (3, 1)
+
+
+def test_month_summary_caches_closed_months(app_controller):
+    def insert_open(number, day):
+        app_controller.db.connection.execute(
+            "INSERT INTO invoices (invoice_number, enter_ts, enter_day, first_status) VALUES (?, ?, ?, ?)",
+            (number, jalali.day_start_ts(day) + 3600, day, STATUS_ENTERED),
+        )
+
+    insert_open(800, 14030104)
+    insert_open(801, 14030104)
+    summary = app_controller.get_month_summary(1403, 1)
+    assert (summary.days, summary.closed, summary.total_entered, summary.entered[3]) == (31, True, 2, 2)
+    assert app_controller.cached_month_summary(1403, 1) is summary
+
+    # ماه بسته از کش داده می‌شود؛ حذف فاکتور همان ماه خلاصه را باطل می‌کند
+    insert_open(802, 14030110)
+    assert app_controller.get_month_summary(1403, 1).total_entered == 2
+    assert EMOJI_SUCCESS in app_controller.delete_invoice("800")
+    assert app_controller.cached_month_summary(1403, 1) is None
+    assert app_controller.get_month_summary(1403, 1).entered[3:10] == (1, 0, 0, 0, 0, 0, 1)
+
+    # ماه و سال قبل و بعد پیش‌واکشی می‌شوند؛ ماه جاری هرگز کش نمی‌شود
+    assert app_controller.prefetch_months(1403, 2) == 3
+    assert app_controller.cached_month_summary(1402, 2) is not None
+    assert app_controller.get_month_summary(1403, 12).days == 30
+    app_controller.add_invoice("803")
+    today = jalali.today_key()
+    current = app_controller.get_month_summary(today // 10000, today // 100 % 100)
+    assert not current.closed and current.total_entered == 1
+    assert app_controller.cached_month_summary(today // 10000, today // 100 % 100) is None
+    app_controller.rebuild_daily_stats()
+    assert app_controller.cached_month_summary(1403, 1) is None
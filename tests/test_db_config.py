@@ -0,0 +1,42 @@
+import pytest
+
+from db_config import DatabaseSettings, LEGACY_SETTINGS, connect, load_settings
+
+
+def test_defaults_without_config(tmp_path):
+    settings = load_settings(environ={}, cwd=tmp_path)
+    assert settings == DatabaseSettings()
+    assert settings.journal_mode == "WAL" and settings.synchronous == "NORMAL"
+
+
+def test_config_file_then_env_override(tmp_path):
+    (tmp_path / "invoice_management.ini").write_text(
+        "[database]\npath = data/inv.db\nsynchronous = full\ncache_size = -4000\n", encoding="utf-8"
+    )
+    settings = load_settings(environ={}, cwd=tmp_path)
+    assert settings.path == str(tmp_path / "data" / "inv.db")
+    assert settings.synchronous == "FULL" and settings.cache_size == -4000
+
+    env = {"INVOICE_DB_PATH": "/srv/shared.db", "INVOICE_DB_SYNCHRONOUS": "normal", "INVOICE_DB_ARCHIVE_DAYS": "30"}
+    settings = load_settings(environ=env, cwd=tmp_path)
+    assert settings.path == "/srv/shared.db" and settings.synchronous == "NORMAL"
+    assert settings.archive_days == 30
+
+
+def test_invalid_pragma_value_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        load_settings(environ={"INVOICE_DB_JOURNAL_MODE": "wal; DROP TABLE invoices"}, cwd=tmp_path)
+
+
+def test_connect_applies_pragmas(tmp_path):
+    tuned = connect(DatabaseSettings(path=str(tmp_path / "tuned.db")))
+    legacy = connect(LEGACY_SETTINGS._replace(path=str(tmp_path / "legacy.db")))
+    try:
+        assert tuned.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert tuned.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert tuned.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+        assert legacy.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+        assert legacy.execute("PRAGMA synchronous").fetchone()[0] == 2  # FULL
+    finally:
+        tuned.close()
+        legacy.close()
@@ -0,0 +1,80 @@
+import sqlite3
+import threading
+
+import pytest
+
+from db_config import DatabaseSettings
+from db_pool import ConnectionPool
+from model import Database
+
+
+def test_memory_pool_reads_through_writer():
+    pool = ConnectionPool(DatabaseSettings(path=":memory:"))
+    try:
+        with pool.writer() as connection:
+            connection.execute("CREATE TABLE t (x INTEGER)")
+        with pool.reader() as connection:
+            assert connection is pool.writer_connection
+            assert connection.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    finally:
+        pool.close()
+
+
+def test_file_pool_readers_are_separate_and_read_only(tmp_path):
+    pool = ConnectionPool(DatabaseSettings(path=str(tmp_path / "pool.db"), read_connections=2))
+    try:
+        with pool.writer() as connection:
+            connection.execute("CREATE TABLE t (x INTEGER)")
+            connection.execute("INSERT INTO t VALUES (1)")
+            connection.commit()
+        with pool.reader() as first, pool.reader() as second:
+            assert first is not second and pool.writer_connection not in (first, second)
+            assert first.execute("SELECT x FROM t").fetchone() == (1,)
+            with pytest.raises(sqlite3.OperationalError):
+                second.execute("INSERT INTO t VALUES (2)")
+        assert len(pool.connections()) == 3
+    finally:
+        pool.close()
+
+
+def test_database_concurrent_scans_and_reads(tmp_path):
+    Database.reset()
+    try:
+        db = Database(DatabaseSettings(path=str(tmp_path / "invoices.db"), read_connections=3))
+        errors = []
+
+        def scan(offset):
+            try:
+                for i in range(50):
+                    db.add_invoice(str(offset + i))
+                    db.get_invoice_row(str(offset + i))
+                    db.get_weekly_summary()
+            except Exception as exc:  # pylint: disable=broad-except
+                errors.append(exc)
+
+        threads = [threading.Thread(target=scan, args=(1000 * t,)) for t in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors
+        assert db.count_invoice_enter() == 200
+        assert db.verify_daily_stats() == []
+    finally:
+        Database.reset()
+
+
+def test_connect_hook_applies_to_existing_and_new_readers(tmp_path):
+    pool = ConnectionPool(DatabaseSettings(path=str(tmp_path / "hook.db"), read_connections=2))
+    seen = []
+    try:
+        with pool.reader():
+            pass
+        pool.add_connect_hook(seen.append)
+        assert seen == pool.connections()
+        with pool.reader() as first, pool.reader() as second:
+            assert first in seen and second in seen
+        assert len(seen) == 3
+        pool.remove_connect_hook(seen.append)
+    finally:
+        pool.close()
@@ -0,0 +1,86 @@
+import csv
+import json
+import tracemalloc
+
+import pytest
+
+import export
+import jalali
+import manage
+from benchmarks import datagen
+from model import Database
+
+
+def test_iter_invoices_filters_by_enter_day_oldest_first(memory_db):
+    today = jalali.today_key()
+    yesterday = jalali.shift_day_key(today, -1)
+    with Database.pool.writer() as connection:
+        connection.executemany(
+            "INSERT INTO invoices (invoice_number, enter_ts, enter_day, first_status) VALUES (?, ?, ?, 'وارد شده')",
+            [
+                (1, jalali.day_start_ts(yesterday) + 60, yesterday),
+                (2, jalali.day_start_ts(today) + 60, today),
+                (3, jalali.day_start_ts(today) + 120, today),
+            ],
+        )
+        connection.commit()
+    assert [r.invoice_number for r in memory_db.iter_invoices()] == [1, 2, 3]
+    assert [r.invoice_number for r in memory_db.iter_invoices(today, today)] == [2, 3]
+    assert [r.invoice_number for r in memory_db.iter_invoices(None, yesterday)] == [1]
+    assert list(memory_db.iter_daily_stats(yesterday, yesterday)) == [(yesterday, 1, 0, 1)]
+
+
+def test_export_csv_and_jsonl(app_controller, tmp_path):
+    for number in ("100", "101"):
+        app_controller.add_invoice(number)
+    app_controller.process_exit_invoice("100")
+
+    count = export.export_to_path(app_controller, tmp_path / "all.csv")
+    with open(tmp_path / "all.csv", newline="", encoding="utf-8-sig") as handle:
+        rows = list(csv.DictReader(handle))
+    assert count == 2 and [r["invoice_number"] for r in rows] == ["100", "101"]
+    assert list(rows[0]) == list(export.INVOICE_FIELDS)
+    assert rows[0]["exit_date"] == jalali.format_day_key(jalali.today_key()) and rows[1]["exit_date"] == ""
+
+    export.export_to_path(app_controller, tmp_path / "weekly.jsonl", export.KIND_WEEKLY)
+    weekly = [json.loads(line) for line in (tmp_path / "weekly.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert weekly == [{"day": jalali.today_key(), "date": jalali.format_day_key(jalali.today_key()), "entered": 2, "exited": 1}]
+    assert export.export_to_path(app_controller, tmp_path / "monthly.csv", export.KIND_MONTHLY) == 1
+    assert export.export_to_path(app_controller, tmp_path / "daily.csv", export.KIND_DAILY) == 1
+
+
+def test_export_rejects_unknown_kind_without_leaving_files(app_controller, tmp_path):
+    with pytest.raises(ValueError):
+        export.export_to_path(app_controller, tmp_path / "x.csv", "yearly")
+    assert not list(tmp_path.iterdir())
+
+
+def test_export_memory_does_not_grow_with_rows(app_controller, tmp_path):
+    with Database.pool.writer() as connection:
+        datagen.populate(connection, 8_000, days=8)
+    tracemalloc.start()
+    try:
+        count = export.export_to_path(app_controller, tmp_path / "big.jsonl")
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert count == 8_000
+    # لیست کامل همین ردیف‌ها چند مگابایت است؛ خروجی جریانی فقط یک دسته fetchmany را نگه می‌دارد
+    assert peak < 1_500_000
+
+
+@pytest.mark.usefixtures("memory_db")
+def test_manage_export_command(tmp_path, capsys):
+    manage.main(["import-csv", str(_write_numbers(tmp_path, ["7", "8"]))])
+    today = jalali.format_day_key(jalali.today_key())
+    assert manage.main(["export", str(tmp_path / "out.jsonl"), "--from", today, "--to", today]) == 0
+    assert "2 row(s)" in capsys.readouterr().out
+    assert len((tmp_path / "out.jsonl").read_text(encoding="utf-8").splitlines()) == 2
+    with pytest.raises(SystemExit):
+        manage.main(["export", str(tmp_path / "bad.csv"), "--from", "1404-07"])
+
+
+def _write_numbers(tmp_path, numbers):
+    path = tmp_path / "numbers.csv"
+    path.write_text("\n".join(numbers), encoding="utf-8")
+    return path
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from controller import Controller
+from instrumentation import Instrumentation, install_default, load_perf_settings
+from model import Database
+
+
+def test_load_perf_settings_from_environment():
+    assert not load_perf_settings({}).enabled
+    settings = load_perf_settings({"INVOICE_PERF": "1", "INVOICE_PERF_DUMP": "perf.jsonl", "INVOICE_PERF_INTERVAL": "5"})
+    assert settings.enabled and settings.dump_path == "perf.jsonl" and settings.dump_interval == 5.0
+    with pytest.raises(ValueError):
+        load_perf_settings({"INVOICE_PERF_INTERVAL": "0"})
+
+
+@pytest.mark.usefixtures("memory_db")
+def test_install_and_uninstall_restore_original_methods():
+    original = vars(Database)["add_invoice"]
+    instrumentation = install_default(Database.pool)
+    try:
+        assert instrumentation.installed
+        assert vars(Database)["add_invoice"] is not original
+    finally:
+        instrumentation.uninstall()
+    assert vars(Database)["add_invoice"] is original
+    assert not instrumentation.installed
+
+
+@pytest.mark.usefixtures("memory_db")
+def test_records_latency_and_sql_count_per_call():
+    instrumentation = install_default(Database.pool)
+    try:
+        controller = Controller()
+        controller.add_invoice("500")
+        controller.add_invoice("501")
+    finally:
+        instrumentation.uninstall()
+    metrics = {m.name: m for m in instrumentation.snapshot()}
+    assert metrics["Controller.add_invoice"].calls == 2
+    # هر ثبت موفق یک INSERT ... RETURNING است (گام‌های trigger و BEGIN/COMMIT شمرده نمی‌شوند)
+    assert metrics["Database.add_invoice"].sql_per_call == 1
+    assert metrics["Controller.add_invoice"].p95_ms >= metrics["Controller.add_invoice"].p50_ms >= 0
+    # بعد از uninstall دیگر چیزی ثبت نمی‌شود
+    Controller().add_invoice("502")
+    assert {m.name: m for m in instrumentation.snapshot()}["Controller.add_invoice"].calls == 2
+
+
+@pytest.mark.usefixtures("memory_db")
+def test_repeated_identical_queries_are_each_counted():
+    class Probe:  # pylint: disable=too-few-public-methods
+        def run(self):
+            with Database.pool.reader() as connection:
+                for _ in range(3):
+                    connection.execute("SELECT COUNT(*) FROM invoices").fetchone()
+
+    instrumentation = Instrumentation()
+    instrumentation.instrument_class(Probe)
+    instrumentation.attach_pool(Database.pool)
+    try:
+        Probe().run()
+    finally:
+        instrumentation.uninstall()
+    assert {m.name: m for m in instrumentation.snapshot()}["Probe.run"].sql_per_call == 3
+
+
+def test_dump_jsonl_appends_one_line_per_dump(tmp_path):
+    instrumentation = Instrumentation(window=4)
+    for seconds in (0.001, 0.002, 0.003, 0.004, 0.010):
+        instrumentation.record("op", seconds, 2)
+    path = tmp_path / "perf.jsonl"
+    instrumentation.dump_jsonl(str(path))
+    instrumentation.dump_jsonl(str(path))
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert len(lines) == 2
+    metric = lines[0]["metrics"][0]
+    assert metric["name"] == "op" and metric["calls"] == 5 and metric["sql_per_call"] == 2
+    assert metric["max_ms"] == 10.0  # پنجره فقط ۴ نمونه آخر را نگه می‌دارد
+    assert "op: n=5" in instrumentation.format_summary()
@@ -0,0 +1,72 @@
+import pytest
+
+pytest.importorskip("PySide6.QtCore")
+from PySide6.QtCore import QCoreApplication, Qt  # noqa: E402  pylint: disable=wrong-import-position
+import jalali  # noqa: E402  pylint: disable=wrong-import-position
+from async_bridge import AsyncBridge  # noqa: E402  pylint: disable=wrong-import-position
+from constants import STATUS_EXITED  # noqa: E402  pylint: disable=wrong-import-position
+from invoice_table_model import InvoiceTableModel, COLUMN_STATUS  # noqa: E402  pylint: disable=wrong-import-position
+
+
+def test_reload_issues_one_query_per_page(app_controller):
+    for number in ("600", "601", "602"):
+        app_controller.add_invoice(number)
+        app_controller.process_exit_invoice(number)
+    model = InvoiceTableModel(app_controller, page_size=2)
+    pages = []
+    model.page_loaded.connect(lambda: pages.append(model.rowCount()))
+    statements = []
+    app_controller.db.connection.set_trace_callback(statements.append)
+    try:
+        model.reload()
+    finally:
+        app_controller.db.connection.set_trace_callback(None)
+    assert len(statements) == 1
+    assert model.rowCount() == 2 and model.canFetchMore()
+    model.fetchMore()
+    assert model.rowCount() == 3 and not model.canFetchMore()
+    assert pages == [2, 3]
+    exited = app_controller.get_invoice_row("600")
+    assert exited.status == STATUS_EXITED
+    shown = model.data(model.index(2, COLUMN_STATUS), Qt.ItemDataRole.DisplayRole)
+    assert shown == jalali.format_date(exited.exit_ts)
+
+
+def test_prepend_and_remove_touch_single_row(app_controller):
+    app_controller.add_invoice("610")
+    model = InvoiceTableModel(app_controller)
+    model.reload()
+    app_controller.add_invoice("611")
+    model.prepend_invoice(app_controller.get_invoice_row("611"))
+    assert model.rowCount() == 2
+    assert model.data(model.index(0, 3), Qt.ItemDataRole.DisplayRole) == "611"
+    model.remove_invoice(610)
+    assert model.rowCount() == 1
+
+
+def test_failed_page_is_reported_and_fetched_again(app_controller, monkeypatch):
+    app = QCoreApplication.instance() or QCoreApplication([])
+    for number in ("620", "621"):
+        app_controller.add_invoice(number)
+    bridge = AsyncBridge()
+    model = InvoiceTableModel(app_controller, bridge=bridge)
+    failures = []
+    model.page_failed.connect(failures.append)
+    list_invoices = app_controller.list_invoices
+
+    def broken(*_args):
+        raise OSError("database is locked")
+
+    monkeypatch.setattr(app_controller, "list_invoices", broken)
+    model.reload()
+    bridge.wait_for_done()
+    app.processEvents()
+    # خطا پایان داده نیست: ردیفی نیامده و صفحه دوباره قابل واکشی است
+    assert len(failures) == 1 and isinstance(failures[0], OSError)
+    assert model.rowCount() == 0 and model.canFetchMore()
+
+    monkeypatch.setattr(app_controller, "list_invoices", list_invoices)
+    model.fetchMore()
+    bridge.wait_for_done()
+    app.processEvents()
+    assert model.rowCount() == 2 and not model.canFetchMore()
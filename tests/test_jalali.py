@@ -0,0 +1,83 @@
+from datetime import date, datetime, timedelta
+
+import jdatetime
+import pytest
+
+import jalali
+
+
+def test_day_key_round_trip():
+    key = jalali.gregorian_to_day_key(date(2025, 10, 18))
+    assert key == 14040726
+    assert jalali.format_day_key(key) == "1404/07/26"
+    assert jalali.day_key_to_gregorian(key) == date(2025, 10, 18)
+
+
+def test_shift_day_key_crosses_month_and_year():
+    assert jalali.shift_day_key(14040701, -1) == 14040631
+    assert jalali.shift_day_key(14031230, 1) == 14040101
+    assert jalali.shift_day_key(14040726, -7) == 14040719
+
+
+def test_epoch_formatting_uses_local_time():
+    ts = int(datetime(2025, 10, 18, 14, 3, 11).timestamp())
+    assert jalali.epoch_from_jalali("1404/07/26", "14:03:11") == ts
+    assert jalali.day_key(ts) == 14040726
+    assert (jalali.format_date(ts), jalali.format_time(ts)) == ("1404/07/26", "14:03:11")
+    assert jalali.format_date(None) == "" and jalali.format_time(None) == ""
+
+
+def test_month_bounds_cover_whole_month():
+    assert jalali.month_bounds(1404, 7) == (14040701, 14040731)
+    assert jalali.day_key_from_text("1404/12/29") == 14041229
+
+
+def test_shift_month_and_month_length():
+    assert jalali.shift_month(1404, 1, -1) == (1403, 12)
+    assert jalali.shift_month(1404, 12, 1) == (1405, 1)
+    assert jalali.shift_month(1404, 7, -12) == (1403, 7)
+    assert [jalali.month_length(1403, m) for m in (6, 7, 12)] == [31, 30, 30]
+    assert jalali.month_length(1404, 12) == 29
+
+
+def test_day_start_ts_is_local_midnight():
+    start = jalali.day_start_ts(14040726)
+    assert datetime.fromtimestamp(start) == datetime(2025, 10, 18)
+    assert jalali.day_key(start) == 14040726 and jalali.day_key(start - 1) == 14040725
+
+
+def test_table_matches_jdatetime_across_leap_years():
+    start = date(2023, 1, 1)  # شامل سال کبیسه 1403 (اسفند 30 روزه)
+    for offset in range(0, 3 * 366):
+        gdate = start + timedelta(days=offset)
+        expected = jalali.jalali_date_key(jdatetime.date.fromgregorian(date=gdate))
+        assert jalali.gregorian_to_day_key(gdate) == expected
+        assert jalali.day_key_to_gregorian(expected) == gdate
+    assert jalali.shift_day_key(14031229, 1) == 14031230 and jalali.shift_day_key(14041229, 1) == 14050101
+
+
+def test_dates_outside_table_fall_back_to_jdatetime():
+    jalali.configure_table(2024, 2025)
+    try:
+        assert jalali.table_years() == (2024, 2025)
+        assert jalali.gregorian_to_day_key(date(2025, 10, 18)) == 14040726
+        assert jalali.gregorian_to_day_key(date(1990, 3, 21)) == 13690101
+        assert jalali.day_key_to_gregorian(14100101) == date(2031, 3, 21)
+        assert jalali.shift_day_key(14041229, 30 * 365) == jalali.gregorian_to_day_key(
+            date(2026, 3, 20) + timedelta(days=30 * 365)
+        )
+    finally:
+        jalali.configure_table(*jalali.DEFAULT_TABLE_YEARS)
+    with pytest.raises(ValueError):
+        jalali.configure_table(2030, 2020)
+
+
+def test_today_cache_rolls_over_at_midnight():
+    today = jalali.today_key()
+    midnight = jalali.day_start_ts(today)
+    tomorrow = jalali.day_start_ts(jalali.shift_day_key(today, 1))
+    assert jalali.day_key(midnight) == today and jalali.day_key(tomorrow - 1) == today
+    # بعد از کش شدن امروز، ثانیه‌های بیرون از بازه روز دیگر کلید امروز نمی‌گیرند
+    assert jalali.day_key(tomorrow) == jalali.shift_day_key(today, 1)
+    assert jalali.day_key(midnight - 1) == jalali.shift_day_key(today, -1)
+    assert jalali.today_key() == today
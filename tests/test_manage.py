@@ -0,0 +1,34 @@
+import manage
+
+
+def test_verify_and_rebuild_stats_commands(memory_db, capsys):
+    memory_db.add_invoice("800")
+    assert manage.main(["verify-stats"]) == 0
+    memory_db.connection.execute("DELETE FROM daily_stats")
+    assert manage.main(["verify-stats"]) == 1
+    assert "drift" in capsys.readouterr().out
+    assert manage.main(["rebuild-stats"]) == 0
+    assert manage.main(["verify-stats"]) == 0
+
+
+def test_import_csv_registers_and_exits(memory_db, tmp_path, capsys):
+    source = tmp_path / "scans.csv"
+    source.write_text("810,a\n811,b\n810,c\nbad\n", encoding="utf-8")
+    report = tmp_path / "report.csv"
+    assert manage.main(["import-csv", str(source), "--batch-size", "2", "--report", str(report)]) == 0
+    out = capsys.readouterr().out
+    assert "registered: 2" in out and "already_present: 1" in out and "invalid: 1" in out
+    assert report.read_text(encoding="utf-8").splitlines()[0] == "810,registered"
+    assert manage.main(["import-csv", str(source), "--exit"]) == 0
+    assert "exited: 2" in capsys.readouterr().out
+    assert memory_db.get_invoice_status("811")[3] == "خارج شده"
+
+
+def test_archive_command_reports_table_sizes(memory_db, capsys):
+    memory_db.add_invoice("820")
+    memory_db.update_invoice_exit("820")
+    memory_db.connection.execute("UPDATE invoices SET enter_ts = enter_ts - 200 * 86400, exit_ts = exit_ts - 200 * 86400")
+    assert manage.main(["archive", "--days", "90"]) == 0
+    out = capsys.readouterr().out
+    assert "1 invoice(s) archived" in out and "archive 1 row(s)" in out
+    assert memory_db.invoice_exists("820")
@@ -1,5 +1,17 @@
-import jdatetime
-from model import Database
+import sqlite3
+import pytest
+import jalali
+from db_config import DatabaseSettings
+from constants import (
+    OUTCOME_ALREADY_PRESENT,
+    OUTCOME_REGISTERED,
+    SEARCH_PREFIX,
+    SEARCH_SUFFIX,
+    STATUS_ENTERED,
+    STATUS_EXITED,
+)
+from migrations import SCHEMA_MIGRATIONS, SCHEMA_VERSION, get_schema_version, _migration_v1_create_invoices
+from model import Database, InvoiceRow
 
 
 def test_add_and_count(memory_db: Database):
@@ -17,10 +29,24 @@ def test_duplicate_add_does_not_increase(memory_db: Database):
 def test_exit_updates_status(memory_db: Database):
     memory_db.add_invoice("3")
     status_before = memory_db.get_invoice_status("3")
-    assert status_before and status_before[5] is None
+    assert status_before and status_before[2] is None and status_before[3] is None
     memory_db.update_invoice_exit("3")
     status_after = memory_db.get_invoice_status("3")
-    assert status_after and status_after[5] == "خارج شده"
+    assert status_after and status_after[3] == "خارج شده"
+    assert isinstance(status_after[2], int) and status_after[2] >= status_before[0]
+
+
+def test_write_operations_return_affected_row(memory_db: Database):
+    added = memory_db.add_invoice("10")
+    assert added is not None and added.invoice_number == 10 and added.exit_ts is None
+    assert memory_db.add_invoice("10") is None
+    exited = memory_db.update_invoice_exit("10")
+    assert exited is not None and exited.status == "خارج شده" and exited.exit_ts is not None
+    assert memory_db.update_invoice_exit("10") is None
+    assert memory_db.delete_open_invoice("10") is None
+    memory_db.add_invoice("11")
+    assert memory_db.delete_open_invoice("11").invoice_number == 11
+    assert memory_db.get_invoice_status("11") is None
 
 
 def test_delete_before_exit(memory_db: Database):
@@ -42,8 +68,366 @@ def test_weekly_summary_structure(add_sample_invoices: Database):
 
 
 def test_monthly_summary_includes_today(memory_db: Database):
-    today = jdatetime.datetime.now().strftime("%Y/%m/%d")
+    today = jalali.today_key()
     memory_db.add_invoice("6")
     month_rows = memory_db.get_monthly_summary()
     days = {r[0] for r in month_rows}
     assert today in days
+
+
+def test_migrations_create_unique_number_index(memory_db: Database):
+    assert get_schema_version(memory_db.connection) == SCHEMA_VERSION
+    indexes = {
+        row[1]: row[2] for row in memory_db.connection.execute("PRAGMA index_list('invoices')")
+    }
+    assert indexes.get("idx_invoices_number") == 1
+    plan = memory_db.connection.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM invoices WHERE invoice_number = ?", ("7",)
+    ).fetchall()
+    assert any("idx_invoices_number" in str(step[-1]) for step in plan)
+
+
+def test_legacy_database_upgraded_in_place(tmp_path):
+    legacy = sqlite3.connect(tmp_path / "invoices.db")
+    _migration_v1_create_invoices(legacy)
+    legacy.executemany(
+        "INSERT INTO invoices (invoice_number, date_enter, time_enter, first_status) VALUES (?, ?, ?, ?)",
+        [("8", "1404/01/01", "08:00:00", "وارد شده"), ("8", "1404/01/02", "09:00:00", "وارد شده")],
+    )
+    legacy.commit()
+    legacy.close()
+
+    Database.reset()
+    try:
+        db = Database(DatabaseSettings(path=str(tmp_path / "invoices.db")))
+        assert get_schema_version(Database.connection) == SCHEMA_VERSION
+        enter_ts = jalali.epoch_from_jalali("1404/01/01", "08:00:00")
+        assert db.get_invoice_enter("8") == (enter_ts, "وارد شده")
+        assert jalali.format_date(enter_ts) == "1404/01/01" and jalali.format_time(enter_ts) == "08:00:00"
+        assert db.get_invoice_row("8").enter_day == 14040101
+        assert db.verify_daily_stats() == []
+        with pytest.raises(sqlite3.IntegrityError):
+            Database.connection.execute(
+                "INSERT INTO invoices (invoice_number, enter_ts, enter_day, first_status) VALUES (?, ?, ?, ?)",
+                ("8", enter_ts, 14040103, "وارد شده"),
+            )
+        # اجرای دوباره مهاجرت نباید کاری انجام دهد
+        assert db.migrate() == SCHEMA_VERSION
+    finally:
+        Database.reset()
+
+
+def test_legacy_duplicates_moved_aside_not_deleted(tmp_path, caplog):
+    legacy = sqlite3.connect(tmp_path / "invoices.db")
+    _migration_v1_create_invoices(legacy)
+    legacy.executemany(
+        """
+        INSERT INTO invoices (invoice_number, date_enter, time_enter, first_status, second_status)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        [
+            ("5", "1404/01/01", "08:00:00", "وارد شده", None),
+            ("5", "1404/01/02", "09:00:00", "وارد شده", "خارج شده"),
+            ("6", "1404/01/03", "10:00:00", "وارد شده", None),
+            ("5", "1404/01/04", "11:00:00", "وارد شده", None),
+        ],
+    )
+    legacy.commit()
+    legacy.close()
+
+    Database.reset()
+    try:
+        with caplog.at_level("WARNING", logger="migrations"):
+            db = Database(DatabaseSettings(path=str(tmp_path / "invoices.db")))
+        assert "2 duplicate invoice row(s)" in caplog.text
+        # قدیمی‌ترین ردیف هر شماره در جدول کاری می‌ماند و بقیه با همه ستون‌ها در invoices_duplicates هستند
+        assert db.get_invoice_row("5").enter_day == 14040101 and db.get_invoice_row("6") is not None
+        moved = Database.connection.execute(
+            "SELECT id, invoice_number, date_enter, time_enter, second_status FROM invoices_duplicates ORDER BY id"
+        ).fetchall()
+        assert moved == [(2, 5, "1404/01/02", "09:00:00", "خارج شده"), (4, 5, "1404/01/04", "11:00:00", None)]
+        assert db.count_rows()[0] + len(moved) == 4
+    finally:
+        Database.reset()
+
+
+def test_invoices_page_matches_full_listing(memory_db: Database):
+    for number in ("20", "21", "22", "23", "24"):
+        memory_db.add_invoice(number)
+    full = memory_db.get_all_invoices()
+    pages = memory_db.get_invoices_page(0, 2) + memory_db.get_invoices_page(2, 2) + memory_db.get_invoices_page(4, 2)
+    assert pages == full
+    assert memory_db.get_invoices_page(5, 2) == []
+
+
+def test_invoice_rows_are_compact_and_tuple_compatible(memory_db: Database):
+    for number in ("25", "26"):
+        memory_db.add_invoice(number)
+    memory_db.update_invoice_exit("26")
+    exited, entered = memory_db.get_all_invoices()
+    assert not hasattr(entered, "__dict__")
+    # متن وضعیت بین ردیف‌ها مشترک است، نه یک رشته تازه برای هر ردیف
+    assert entered.status is STATUS_ENTERED and exited.status is STATUS_EXITED
+    number, enter_ts, enter_day, status, exit_ts = exited
+    assert (number, status, exited[0], len(exited)) == (26, STATUS_EXITED, 26, 5)
+    assert exit_ts >= enter_ts and enter_day == jalali.today_key()
+    assert exited == InvoiceRow(*exited) and exited != entered and len({exited, InvoiceRow(*exited)}) == 1
+    assert exited._asdict()["exit_ts"] == exit_ts
+    assert memory_db.get_weekly_summary() == [(jalali.today_key(), 2, 1)]
+
+
+def test_list_invoices_keyset_pages_and_filters(memory_db: Database):
+    for number in ("40", "41", "42", "43", "50"):
+        memory_db.add_invoice(number)
+    memory_db.update_invoice_exit("41")
+    full = memory_db.get_all_invoices()
+    rows, cursor = [], None
+    while True:
+        page = memory_db.list_invoices(cursor, 2)
+        rows += page.rows
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+    assert rows == full
+    # ردیف تازه در حین ورق زدن روی صفحه‌های بعدی اثر ندارد
+    first = memory_db.list_invoices(None, 2)
+    memory_db.add_invoice("44")
+    assert memory_db.list_invoices(first.next_cursor, 10).rows == full[2:]
+
+    assert [r.invoice_number for r in memory_db.list_invoices(status=STATUS_EXITED).rows] == [41]
+    assert 41 not in [r.invoice_number for r in memory_db.list_invoices(status=STATUS_ENTERED).rows]
+    assert {r.invoice_number for r in memory_db.list_invoices(number_prefix="4").rows} == {40, 41, 42, 43, 44}
+    today = jalali.today_key()
+    assert len(memory_db.list_invoices(date_from=today, date_to=today).rows) == 6
+    assert memory_db.list_invoices(date_to=jalali.shift_day_key(today, -1)).rows == []
+    with pytest.raises(ValueError):
+        memory_db.list_invoices("%%%")
+    with pytest.raises(ValueError):
+        memory_db.list_invoices(number_prefix="4%")
+
+
+def test_list_invoices_page_uses_index_without_offset(memory_db: Database):
+    page = memory_db.list_invoices(None, 1)
+    assert page.next_cursor is None
+    plan = memory_db.connection.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM invoices WHERE (enter_ts, id) < (?, ?) ORDER BY enter_ts DESC, id DESC LIMIT 10",
+        (1, 1),
+    ).fetchall()
+    assert "idx_invoices_enter_ts" in str(plan) and "TEMP B-TREE" not in str(plan)
+
+
+def test_daily_stats_follow_writes(memory_db: Database):
+    today = jalali.today_key()
+    for number in ("30", "31", "32"):
+        memory_db.add_invoice(number)
+    memory_db.update_invoice_exit("30")
+    memory_db.delete_invoice("31")
+    row = memory_db.connection.execute(
+        "SELECT entered_count, exited_count, open_count FROM daily_stats WHERE day = ?", (today,)
+    ).fetchone()
+    assert row == (2, 1, 1)
+    assert memory_db.count_invoice_enter() == 2
+    assert memory_db.get_weekly_summary() == [(today, 2, 1)]
+    assert memory_db.verify_daily_stats() == []
+
+
+def test_daily_stats_drift_detected_and_rebuilt(memory_db: Database):
+    memory_db.add_invoice("33")
+    memory_db.connection.execute("UPDATE daily_stats SET entered_count = 9")
+    drift = memory_db.verify_daily_stats()
+    assert len(drift) == 1 and drift[0][1] == (1, 0, 1, 0) and drift[0][2] == (9, 0, 1, 0)
+    assert memory_db.rebuild_daily_stats() == 1
+    assert memory_db.verify_daily_stats() == []
+
+
+def test_legacy_exit_times_converted(tmp_path):
+    legacy = sqlite3.connect(tmp_path / "invoices.db")
+    _migration_v1_create_invoices(legacy)
+    legacy.execute(
+        """
+        INSERT INTO invoices (invoice_number, date_enter, time_enter, first_status, date_exit, time_exit, second_status)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        ("9", "1404/07/26", "14:03:11", "وارد شده", "1404/07/27", "09:15:00", "خارج شده"),
+    )
+    legacy.commit()
+    legacy.close()
+
+    Database.reset()
+    try:
+        db = Database(DatabaseSettings(path=str(tmp_path / "invoices.db")))
+        enter_ts, _, exit_ts, second_status = db.get_invoice_status("9")
+        assert (jalali.format_date(enter_ts), jalali.format_time(enter_ts)) == ("1404/07/26", "14:03:11")
+        assert (jalali.format_date(exit_ts), jalali.format_time(exit_ts)) == ("1404/07/27", "09:15:00")
+        assert second_status == "خارج شده"
+        row = Database.connection.execute(
+            "SELECT entered_count, exited_count, open_count FROM daily_stats WHERE day = 14040726"
+        ).fetchone()
+        assert row == (1, 1, 0)
+    finally:
+        Database.reset()
+
+
+def test_report_queries_use_integer_range_scans(memory_db: Database):
+    plan = memory_db.connection.execute(
+        "EXPLAIN QUERY PLAN SELECT day FROM daily_stats WHERE day BETWEEN ? AND ?", (14040701, 14040731)
+    ).fetchall()
+    assert any("SEARCH" in str(step[-1]) for step in plan)
+    plan = memory_db.connection.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM invoices ORDER BY enter_ts DESC, id DESC LIMIT 10"
+    ).fetchall()
+    assert not any("TEMP B-TREE" in str(step[-1]) for step in plan)
+
+
+def test_batch_is_one_transaction_and_reads_its_own_writes(tmp_path):
+    Database.reset()
+    db = Database(DatabaseSettings(path=str(tmp_path / "batch.db")))
+    try:
+        with db.batch():
+            assert db.add_invoice("1") is not None
+            assert db.update_invoice_exit("1") is not None
+            assert Database.pool.writer_connection.in_transaction
+            # خواندن داخل دسته از اتصال نویسنده: ردیف commit نشده دیده می‌شود
+            assert db.get_invoice_info("1")[3] == STATUS_EXITED
+        assert not Database.pool.writer_connection.in_transaction
+
+        with pytest.raises(RuntimeError):
+            with db.batch():
+                db.add_invoice("2")
+                raise RuntimeError("boom")
+        assert db.get_invoice_info("2") is None
+        assert db.verify_daily_stats() == []
+    finally:
+        Database.reset()
+
+
+def _age_invoice(db: Database, number: str, days: int) -> None:
+    # جابه‌جایی ورود و خروج یک فاکتور به days روز قبل
+    shift = days * 86400
+    enter_ts, exit_ts = db.connection.execute(
+        "SELECT enter_ts, exit_ts FROM invoices WHERE invoice_number = ?", (number,)
+    ).fetchone()
+    db.connection.execute(
+        "UPDATE invoices SET enter_ts = ?, enter_day = ?, exit_ts = ?, exit_day = ? WHERE invoice_number = ?",
+        (
+            enter_ts - shift,
+            jalali.day_key(enter_ts - shift),
+            None if exit_ts is None else exit_ts - shift,
+            None if exit_ts is None else jalali.day_key(exit_ts - shift),
+            number,
+        ),
+    )
+
+
+def test_archive_moves_old_exited_rows_transparently(memory_db: Database):
+    for number in ("60", "61", "62", "63"):
+        memory_db.add_invoice(number)
+    for number in ("60", "61", "63"):
+        memory_db.update_invoice_exit(number)
+    for number in ("60", "61", "62"):
+        _age_invoice(memory_db, number, 200)
+    memory_db.rebuild_daily_stats()
+    stats_before = memory_db.connection.execute("SELECT * FROM daily_stats ORDER BY day").fetchall()
+
+    before_ts = jalali.now_ts() - 100 * 86400
+    assert memory_db.archive_exited(before_ts, limit=1) == 1
+    assert memory_db.archive_exited(before_ts) == 1
+    assert memory_db.archive_exited(before_ts) == 0
+    # فاکتور باز (62) و خروج اخیر (63) در جدول کاری می‌مانند
+    assert memory_db.count_rows() == (2, 2)
+    assert memory_db.connection.execute("SELECT * FROM daily_stats ORDER BY day").fetchall() == stats_before
+    assert memory_db.verify_daily_stats() == []
+
+    assert memory_db.invoice_exists("60")
+    assert memory_db.get_invoice_status("61")[3] == STATUS_EXITED
+    assert memory_db.get_invoice_row("60")[0] == 60
+    assert memory_db.add_invoice("60") is None
+    assert memory_db.update_invoice_exit("60") is None
+    assert memory_db.add_invoices_bulk(["60", "64"]) == [("60", OUTCOME_ALREADY_PRESENT), ("64", OUTCOME_REGISTERED)]
+
+    assert [row[0] for row in memory_db.list_invoices(limit=10).rows] == [64, 63, 62, 61, 60]
+    assert [row[0] for row in memory_db.list_invoices(limit=10, status=STATUS_EXITED).rows] == [63, 61, 60]
+    first = memory_db.list_invoices(limit=3)
+    assert [row[0] for row in memory_db.list_invoices(first.next_cursor, limit=3).rows] == [61, 60]
+    assert [row[0] for row in memory_db.iter_invoices(batch_size=2)] == [60, 61, 62, 63, 64]
+    assert [row[0] for row in memory_db.get_all_invoices()] == [64, 63, 62, 61, 60]
+    assert [row[0] for row in memory_db.get_invoices_page(3, 10)] == [61, 60]
+
+
+def test_search_invoices_by_prefix_suffix_and_substring(memory_db: Database, monkeypatch):
+    for number in ("51234", "12399", "91230", "700"):
+        memory_db.add_invoice(number)
+    memory_db.update_invoice_exit("51234")
+    _age_invoice(memory_db, "51234", 200)
+    assert memory_db.archive_exited(jalali.now_ts() - 100 * 86400) == 1
+
+    def numbers(*args, **kwargs):
+        return [row.invoice_number for row in memory_db.search_invoices(*args, **kwargs).rows]
+
+    # تازه‌ترین ثبت اول؛ بایگانی هم جستجو می‌شود
+    assert numbers("123") == [91230, 12399, 51234]
+    assert numbers("123", SEARCH_PREFIX) == [12399]
+    assert numbers("30", SEARCH_SUFFIX) == [91230]
+    assert numbers("2", limit=2) == [91230, 12399]
+    first = memory_db.search_invoices("2", limit=2)
+    assert [row.invoice_number for row in memory_db.search_invoices("2", limit=2, after_cursor=first.next_cursor).rows] == [51234]
+    memory_db.delete_open_invoice("12399")
+    assert numbers("123") == [91230, 51234]
+    # بدون FTS5 همان نتیجه با پیمایش جدول‌ها
+    monkeypatch.setattr(Database, "search_indexed", False)
+    assert numbers("123") == [91230, 51234] and numbers("2", limit=1, after_cursor=first.next_cursor) == [51234]
+    with pytest.raises(ValueError):
+        memory_db.search_invoices("12a")
+    with pytest.raises(ValueError):
+        memory_db.search_invoices("12", "fuzzy")
+
+
+def test_search_index_migration_backfills_existing_rows(tmp_path):
+    path = str(tmp_path / "search.db")
+    Database.reset()
+    try:
+        db = Database(DatabaseSettings(path=path))
+        db.add_invoice("4455")
+        # دیتابیس ساخته‌شده پیش از schema v7 (گام v8 هم دوباره اجرا می‌شود)
+        for statement in ("DROP TRIGGER trg_search_insert", "DROP TRIGGER trg_search_delete", "DROP TABLE invoice_search"):
+            db.connection.execute(statement)
+        db.connection.execute("PRAGMA user_version = 6")
+        Database.reset()
+        db = Database(DatabaseSettings(path=path))
+        assert db.search_indexed and get_schema_version(db.connection) == SCHEMA_VERSION
+        assert [row.invoice_number for row in db.search_invoices("45").rows] == [4455]
+    finally:
+        Database.reset()
+
+
+def test_dwell_total_migration_backfills_v7_rows(tmp_path):
+    path = str(tmp_path / "v7.db")
+    # فایل واقعی schema v7 (بدون ستون dwell_total) با ردیف‌های خارج‌شده و باز
+    connection = sqlite3.connect(path)
+    for version, step in enumerate(SCHEMA_MIGRATIONS[:7], start=1):
+        step(connection)
+        connection.execute(f"PRAGMA user_version = {version}")
+    day = jalali.today_key()
+    start = jalali.day_start_ts(day)
+    connection.executemany(
+        """
+        INSERT INTO invoices (invoice_number, enter_ts, enter_day, first_status, exit_ts, exit_day, second_status)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (71, start + 60, day, STATUS_ENTERED, start + 660, day, STATUS_EXITED),
+            (72, start + 120, day, STATUS_ENTERED, start + 420, day, STATUS_EXITED),
+            (73, start + 180, day, STATUS_ENTERED, None, None, None),
+        ],
+    )
+    connection.commit()
+    assert "dwell_total" not in {row[1] for row in connection.execute("PRAGMA table_info(daily_stats)")}
+    connection.close()
+    Database.reset()
+    try:
+        db = Database(DatabaseSettings(path=path))
+        assert get_schema_version(db.connection) == SCHEMA_VERSION
+        assert db.get_daily_totals(day, day) == [(day, 3, 2, 600 + 300)]
+        assert db.verify_daily_stats() == []
+    finally:
+        Database.reset()
@@ -0,0 +1,95 @@
+import manage
+import jalali
+from constants import STATUS_ENTERED, STATUS_EXITED
+from reports import ReportEngine, aggregate_day, runs_percentile, weekday_index
+
+# روز گذشته ثابت (شنبه 1403/01/04) تا نتیجه به ساعت اجرای تست وابسته نباشد
+PAST_DAY = 14030104
+
+
+def _insert(db, number, day, hour, dwell=None):
+    # فاکتور با ورود در ساعت hour روز day و خروج dwell ثانیه بعد (None: باز)
+    enter_ts = jalali.day_start_ts(day) + hour * 3600 + 60
+    exit_ts = None if dwell is None else enter_ts + dwell
+    db.connection.execute(
+        """
+        INSERT INTO invoices (invoice_number, enter_ts, enter_day, first_status, exit_ts, exit_day, second_status)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        (number, enter_ts, day, STATUS_ENTERED, exit_ts, None if exit_ts is None else jalali.day_key(exit_ts),
+         None if exit_ts is None else STATUS_EXITED),
+    )
+
+
+def test_day_columns_and_aggregates(memory_db):
+    next_day = jalali.shift_day_key(PAST_DAY, 1)
+    _insert(memory_db, 1, PAST_DAY, 9, 600)
+    _insert(memory_db, 2, PAST_DAY, 9)
+    _insert(memory_db, 3, PAST_DAY, 14, 120)
+    _insert(memory_db, 4, next_day, 8, 3600)
+    # خارج‌شده‌ها به بایگانی می‌روند؛ ستون‌ها هر دو جدول را می‌خوانند
+    assert memory_db.archive_exited(before_ts=jalali.now_ts()) == 3
+    first, second = (aggregate_day(columns) for columns in memory_db.iter_day_columns(PAST_DAY, next_day))
+    assert (first.day, first.entered, first.exited, list(first.dwell)) == (PAST_DAY, 3, 2, [120, 600])
+    assert first.hourly[9] == 2 and first.hourly[14] == 1 and sum(first.hourly) == 3
+    assert (second.day, second.hourly[8], list(second.dwell)) == (next_day, 1, [3600])
+    assert weekday_index(PAST_DAY) == 0
+    # صدک روی اجتماع دنباله‌های مرتب همان صدک لیست ادغام‌شده است
+    runs = [[1, 5, 9], [2, 2, 10], [7]]
+    assert [runs_percentile(runs, 7, pct) for pct in (0, 50, 90, 100)] == [1.0, 5.0, 9.4, 10.0]
+
+
+def test_range_report_caches_closed_days(memory_db):
+    closed_day = jalali.shift_day_key(PAST_DAY, 1)
+    _insert(memory_db, 1, PAST_DAY, 9)
+    for number, dwell in ((2, 100), (3, 200), (4, 300), (5, 400)):
+        _insert(memory_db, number, closed_day, 10, dwell)
+    engine = ReportEngine(memory_db)
+    report = engine.range_report(PAST_DAY, closed_day)
+    assert (report.days, report.entered, report.exited, report.cached_days) == (2, 5, 4, 0)
+    assert report.dwell_percentiles[50] == 250 and report.dwell_mean == 250
+    assert report.hourly[9] == 1 and report.hourly[10] == 4
+    assert report.weekday[:2] == (1, 4)
+    assert engine.cached_days() == 2
+    assert engine.range_report(PAST_DAY, closed_day).cached_days == 2
+
+    # خروج دیرهنگام یا ورود تازه شمارش روز را عوض می‌کند و فقط خلاصه همان روز باطل می‌شود
+    memory_db.update_invoice_exit("1")
+    _insert(memory_db, 6, closed_day, 11, 1000)
+    report = engine.range_report(PAST_DAY, closed_day)
+    assert (report.cached_days, report.exited, report.entered) == (0, 6, 6)
+    assert engine.range_report(closed_day, closed_day).dwell_percentiles[99] == 976.0
+    assert engine.range_report(PAST_DAY, closed_day).cached_days == 2
+
+    # امروز کش نمی‌شود
+    memory_db.add_invoice("7")
+    today = jalali.today_key()
+    assert engine.range_report(today, today).entered == 1
+    assert engine.range_report(today, today).cached_days == 0
+
+
+def test_exit_time_change_on_closed_day_invalidates_cached_dwell(memory_db):
+    _insert(memory_db, 1, PAST_DAY, 9, 100)
+    _insert(memory_db, 2, PAST_DAY, 9, 300)
+    engine = ReportEngine(memory_db)
+    assert engine.range_report(PAST_DAY, PAST_DAY).dwell_mean == 200
+    # همگام‌سازی («زودترین خروج») یا اصلاح زمان ورود شمارش روز را عوض نمی‌کند ولی ماندگاری را چرا
+    memory_db.connection.execute("UPDATE invoices SET exit_ts = exit_ts - 200 WHERE invoice_number = 2")
+    report = engine.range_report(PAST_DAY, PAST_DAY)
+    assert (report.cached_days, report.dwell_mean, report.dwell_percentiles[99]) == (0, 100, 100.0)
+    memory_db.connection.execute("UPDATE invoices SET enter_ts = enter_ts - 50 WHERE invoice_number = 1")
+    report = engine.range_report(PAST_DAY, PAST_DAY)
+    assert (report.cached_days, report.dwell_mean) == (0, 125)
+    assert engine.range_report(PAST_DAY, PAST_DAY).cached_days == 1
+    assert memory_db.verify_daily_stats() == []
+
+
+def test_controller_range_report_and_manage_command(app_controller, capsys):
+    app_controller.add_invoice("700")
+    app_controller.process_exit_invoice("700")
+    today = jalali.today_key()
+    report = app_controller.get_range_report(today, today)
+    assert (report.entered, report.exited, report.cached_days) == (1, 1, 0)
+    assert manage.main(["report"]) == 0
+    out = capsys.readouterr().out
+    assert "entered 1, exited 1" in out and "weekday (Sat..Fri)" in out
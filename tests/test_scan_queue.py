@@ -0,0 +1,123 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("PySide6.QtCore")
+from PySide6.QtCore import QCoreApplication  # noqa: E402  pylint: disable=wrong-import-position
+from constants import EMOJI_ERROR, EMOJI_SUCCESS, EVENT_ADDED, EVENT_DELETED, EVENT_EXITED  # noqa: E402  pylint: disable=wrong-import-position
+from async_bridge import AsyncBridge  # noqa: E402  pylint: disable=wrong-import-position
+from scan_queue import ScanQueue  # noqa: E402  pylint: disable=wrong-import-position
+
+
+@pytest.fixture(name="qt_app")
+def fixture_qt_app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def _drain(app, queue):
+    deadline = time.monotonic() + 10
+    while queue.pending_count():
+        if time.monotonic() > deadline:
+            raise AssertionError("scan queue did not drain")
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def test_burst_is_processed_in_order_in_batches(qt_app, app_controller):
+    queue = ScanQueue(app_controller, batch_size=8)
+    batches, events = [], []
+    queue.scanned.connect(batches.append)
+    app_controller.subscribe(events.append)
+    for number in range(300, 320):
+        queue.enqueue(EVENT_ADDED, str(number))
+    queue.enqueue(EVENT_EXITED, "300")
+    assert queue.pending_count() == 21
+    _drain(qt_app, queue)
+
+    results = [result for batch in batches for result in batch]
+    assert [r.number for r in results] == [str(n) for n in range(300, 320)] + ["300"]
+    assert all(len(batch) <= 8 for batch in batches) and len(batches) >= 3
+    # رویدادها روی همین thread و به ترتیب منتشر شده‌اند
+    assert [e.kind for e in events] == [EVENT_ADDED] * 20 + [EVENT_EXITED]
+    assert app_controller.get_count_invoice_enter() == 20
+
+
+def test_failed_batch_is_reported_and_queue_continues(qt_app, app_controller):
+    queue = ScanQueue(app_controller)
+    failures, batches = [], []
+    queue.failed.connect(lambda batch, exc: failures.append((batch, exc)))
+    queue.scanned.connect(batches.append)
+    queue.enqueue("bogus", "400")
+    _drain(qt_app, queue)
+    queue.enqueue(EVENT_ADDED, "401")
+    _drain(qt_app, queue)
+    assert failures[0][0] == [("bogus", "400")] and isinstance(failures[0][1], ValueError)
+    assert [r.number for batch in batches for r in batch] == ["401"]
+
+
+def test_failed_batch_is_retried_scan_by_scan(qt_app, app_controller):
+    queue = ScanQueue(app_controller, debounce_ms=10_000)
+    failures, batches = [], []
+    queue.failed.connect(lambda batch, exc: failures.append(batch))
+    queue.scanned.connect(batches.append)
+    queue.enqueue(EVENT_ADDED, "410")
+    queue.enqueue("bogus", "411")
+    queue.enqueue(EVENT_ADDED, "412")
+    # تایمر debounce طولانی است: هر سه اسکن در یک دسته اجرا می‌شوند و آن دسته rollback می‌شود
+    queue._submit_next()  # pylint: disable=protected-access
+    _drain(qt_app, queue)
+    # فقط اسکن خراب گزارش می‌شود و بقیه به ترتیب ثبت می‌شوند
+    assert failures == [[("bogus", "411")]]
+    assert [r.number for batch in batches for r in batch] == ["410", "412"]
+    assert app_controller.get_count_invoice_enter() == 2
+
+
+def test_flush_does_not_wait_for_unrelated_background_work(qt_app, app_controller):
+    release = threading.Event()
+    AsyncBridge().submit(release.wait, 10)
+    queue = ScanQueue(app_controller, debounce_ms=10_000)
+    batches = []
+    queue.scanned.connect(batches.append)
+    queue.enqueue(EVENT_ADDED, "510")
+    started = time.monotonic()
+    queue.flush()
+    try:
+        assert time.monotonic() - started < 5
+        assert [r.number for batch in batches for r in batch] == ["510"]
+    finally:
+        release.set()
+        qt_app.processEvents()
+
+
+def test_flush_processes_remaining_scans(qt_app, app_controller):
+    queue = ScanQueue(app_controller, debounce_ms=10_000)
+    batches = []
+    queue.scanned.connect(batches.append)
+    queue.enqueue(EVENT_ADDED, "500")
+    queue.enqueue(EVENT_ADDED, "501")
+    queue.flush()
+    qt_app.processEvents()
+    assert [r.number for batch in batches for r in batch] == ["500", "501"]
+    assert queue.pending_count() == 0
+
+
+def test_delete_runs_after_earlier_scans_and_drains(qt_app, app_controller):
+    queue = ScanQueue(app_controller)
+    batches, events, drained = [], [], []
+    queue.scanned.connect(batches.append)
+    queue.drained.connect(lambda: drained.append(True))
+    app_controller.subscribe(events.append)
+    # حذف پشت سر اسکن ثبت همان شماره در صف است و بعد از آن اجرا می‌شود
+    queue.enqueue(EVENT_ADDED, "600")
+    queue.enqueue(EVENT_DELETED, "600")
+    queue.enqueue(EVENT_DELETED, "601")
+    _drain(qt_app, queue)
+    qt_app.processEvents()
+
+    results = [result for batch in batches for result in batch]
+    assert [(r.kind, r.number) for r in results] == [(EVENT_ADDED, "600"), (EVENT_DELETED, "600"), (EVENT_DELETED, "601")]
+    assert EMOJI_SUCCESS in results[1].message and EMOJI_ERROR in results[2].message
+    assert [e.kind for e in events] == [EVENT_ADDED, EVENT_DELETED]
+    assert app_controller.get_count_invoice_enter() == 0
+    assert drained
@@ -0,0 +1,77 @@
+import os
+import time
+
+import pytest
+
+pytest.importorskip("PySide6.QtWidgets")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PySide6.QtCore import Qt  # noqa: E402  pylint: disable=wrong-import-position
+from PySide6.QtTest import QTest  # noqa: E402  pylint: disable=wrong-import-position
+from PySide6.QtWidgets import QApplication, QLineEdit  # noqa: E402  pylint: disable=wrong-import-position
+from search_suggestions import NUMBER_ROLE, SearchSuggestions  # noqa: E402  pylint: disable=wrong-import-position
+
+
+# QApplication (نه QCoreApplication) باید پیش از اجرای اولین تست Qt ساخته شود؛ هر پردازه فقط یک
+# application دارد و fixture های test_async_bridge / test_scan_queue همان را برمی‌دارند
+QT_APP = QApplication.instance() or QApplication([])
+
+
+@pytest.fixture(name="qt_app")
+def fixture_qt_app():
+    if not isinstance(QT_APP, QApplication):
+        pytest.skip("QCoreApplication already created without widgets")
+    return QT_APP
+
+
+def _settle(app, suggestions):
+    deadline = time.monotonic() + 10
+    while suggestions._loading or suggestions._timer.isActive():  # pylint: disable=protected-access
+        if time.monotonic() > deadline:
+            raise AssertionError("search did not finish")
+        app.processEvents()
+        time.sleep(0.001)
+    app.processEvents()
+
+
+def test_suggestions_list_matches_without_stealing_enter(qt_app, app_controller):
+    for number in ("12345", "91230", "555"):
+        app_controller.add_invoice(number)
+    line_edit = QLineEdit()
+    line_edit.show()
+    suggestions = SearchSuggestions(app_controller, line_edit, delay_ms=0)
+    scanned = []
+
+    def on_return():
+        # همان رفتار MainWindow.handle_barcode
+        if suggestions.has_selection():
+            return
+        suggestions.hide()
+        scanned.append(line_edit.text())
+        line_edit.clear()
+
+    line_edit.returnPressed.connect(on_return)
+    QTest.keyClicks(line_edit, "123")
+    _settle(qt_app, suggestions)
+    model = suggestions.model
+    assert [model.item(i).data(NUMBER_ROLE) for i in range(model.rowCount())] == ["91230", "12345"]
+    assert suggestions.is_visible() and not suggestions.has_selection()
+
+    # اینتر بدون انتخاب: همان متن تایپ‌شده ثبت می‌شود
+    QTest.keyClick(suggestions.completer.popup(), Qt.Key.Key_Return)
+    assert scanned == ["123"] and not suggestions.is_visible() and line_edit.text() == ""
+
+    # انتخاب پیشنهاد و اینتر: شماره در کادر می‌نشیند و اسکنی ثبت نمی‌شود
+    QTest.keyClicks(line_edit, "123")
+    _settle(qt_app, suggestions)
+    popup = suggestions.completer.popup()
+    QTest.keyClick(popup, Qt.Key.Key_Down)
+    QTest.keyClick(popup, Qt.Key.Key_Down)
+    assert suggestions.has_selection()
+    QTest.keyClick(popup, Qt.Key.Key_Return)
+    assert scanned == ["123"] and line_edit.text() == "12345"
+
+    # کمتر از سه رقم جستجو نمی‌کند
+    line_edit.clear()
+    QTest.keyClicks(line_edit, "12")
+    _settle(qt_app, suggestions)
+    assert not suggestions.is_visible()
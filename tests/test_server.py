@@ -0,0 +1,118 @@
+import json
+import socket
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection
+
+import pytest
+
+from constants import EVENT_ADDED, EVENT_DELETED, EVENT_EXITED, STATUS_EXITED
+from server import INTERNAL_ERROR_MESSAGE, BackgroundServer
+
+
+@pytest.fixture(name="background")
+def fixture_background(memory_db):  # noqa: D401
+    """سرور روی پورت آزاد با دیتابیس حافظه تست."""
+    del memory_db
+    with BackgroundServer(port=0) as background:
+        yield background
+
+
+def _call(port, method, path):
+    connection = HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        connection.request(method, path)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read().decode("utf-8"))
+    finally:
+        connection.close()
+
+
+def test_scan_lifecycle_over_http(background):
+    port = background.port
+    status, body = _call(port, "POST", "/invoices/700/enter")
+    assert status == 200 and body["event"] == EVENT_ADDED
+    assert body["invoice"]["invoice_number"] == 700 and body["invoice"]["exit_ts"] is None
+
+    status, body = _call(port, "POST", "/invoices/700/enter")
+    assert status == 200 and body["event"] is None and "700" in body["message"]
+
+    status, body = _call(port, "POST", "/invoices/700/exit")
+    assert body["event"] == EVENT_EXITED and body["invoice"]["exit_date"]
+
+    status, body = _call(port, "DELETE", "/invoices/700")
+    assert status == 200 and body["event"] is None
+
+    _call(port, "POST", "/invoices/701/enter")
+    status, body = _call(port, "DELETE", "/invoices/701")
+    assert body["event"] == EVENT_DELETED
+    assert _call(port, "GET", "/invoices/701")[0] == 404
+
+
+def test_reads_and_reports(background):
+    port = background.port
+    for number in ("800", "801", "802"):
+        _call(port, "POST", f"/invoices/{number}/enter")
+    _call(port, "POST", "/invoices/801/exit")
+
+    status, body = _call(port, "GET", "/invoices/801")
+    assert status == 200 and body["status"] == STATUS_EXITED and body["exit_ts"] is not None
+    status, body = _call(port, "GET", "/invoices?limit=2")
+    assert [row["invoice_number"] for row in body["invoices"]] == [802, 801]
+    status, body = _call(port, "GET", f"/invoices?limit=2&cursor={body['next_cursor']}")
+    assert [row["invoice_number"] for row in body["invoices"]] == [800] and body["next_cursor"] is None
+    status, body = _call(port, "GET", "/invoices?status=exited&prefix=80")
+    assert [row["invoice_number"] for row in body["invoices"]] == [801]
+    status, body = _call(port, "GET", "/invoices/search?q=0&mode=suffix&limit=5")
+    assert status == 200 and [row["invoice_number"] for row in body["invoices"]] == [800]
+    assert _call(port, "GET", "/reports/entered")[1] == {"entered": 3}
+    weekly = _call(port, "GET", "/reports/weekly")[1]
+    assert sum(day["entered"] for day in weekly) == 3 and sum(day["exited"] for day in weekly) == 1
+    monthly = _call(port, "GET", "/reports/monthly")[1]
+    assert sum(day["entered"] for day in monthly) == 3
+
+
+def test_errors(background):
+    port = background.port
+    assert _call(port, "POST", "/invoices/abc/enter")[0] == 400
+    assert _call(port, "GET", "/invoices?limit=x")[0] == 400
+    assert _call(port, "GET", "/invoices?status=open")[0] == 400
+    assert _call(port, "GET", "/invoices?cursor=not-a-cursor")[0] == 400
+    assert _call(port, "GET", "/invoices/search?q=1&mode=fuzzy")[0] == 400
+    assert _call(port, "GET", "/nowhere")[0] == 404
+    assert _call(port, "GET", "/health")[1]["status"] == "ok"
+
+
+def test_malformed_content_length_is_bad_request(background):
+    for length in ("abc", "-5"):
+        with socket.create_connection(("127.0.0.1", background.port), timeout=10) as client:
+            client.sendall(f"POST /invoices/1/enter HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode("latin-1"))
+            response = client.makefile("rb").read().decode("utf-8")
+        assert response.startswith("HTTP/1.1 400 ") and "invalid content-length" in response
+    # درخواست نامعتبر ثبتی انجام نداده است
+    assert _call(background.port, "GET", "/invoices/1")[0] == 404
+
+
+def test_internal_error_is_logged_not_returned(background, monkeypatch, caplog):
+    def broken(_number):
+        raise sqlite3.OperationalError("disk I/O error at /srv/secret/invoices.db")
+
+    monkeypatch.setattr(background.server.controller, "get_invoice_row", broken)
+    with caplog.at_level("ERROR", logger="server"):
+        status, body = _call(background.port, "GET", "/invoices/5")
+    assert status == 500 and body == {"error": INTERNAL_ERROR_MESSAGE}
+    assert "/srv/secret" in caplog.text and "GET /invoices/5" in caplog.text
+
+
+def test_concurrent_scans_are_serialized(background):
+    port = background.port
+    numbers = [str(900 + i) for i in range(40)]
+
+    def scan(number):
+        # هر شماره دو بار هم‌زمان اسکن می‌شود؛ دقیقاً یکی باید ثبت کند
+        return _call(port, "POST", f"/invoices/{number}/enter")[1]["event"]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        events = list(pool.map(scan, numbers + numbers))
+    assert events.count(EVENT_ADDED) == len(numbers)
+    assert _call(port, "GET", "/reports/entered")[1] == {"entered": len(numbers)}
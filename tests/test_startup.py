@@ -0,0 +1,42 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from startup import IMPORT_STARTED, MARK_FIRST_PAINT, MARK_INTERACTIVE, STARTUP_REPORT_ENV, StartupTimer
+
+
+def test_interactive_after_all_steps_and_report_written(tmp_path):
+    clock = iter(range(100, 200))
+    reports = []
+    path = tmp_path / "startup.json"
+    timer = StartupTimer(("table", "weekly"), str(path), on_report=lambda: reports.append(1), clock=lambda: next(clock))
+    assert timer.mark(MARK_FIRST_PAINT) and not timer.mark(MARK_FIRST_PAINT)
+    timer.step_done("table")
+    timer.step_done("table")
+    assert not timer.interactive and not path.exists()
+    timer.step_done("weekly")
+    timer.step_done("weekly")
+    assert timer.interactive and reports == [1]
+    report = json.loads(path.read_text(encoding="utf-8"))
+    assert report["marks"] == {MARK_FIRST_PAINT: 100, MARK_INTERACTIVE: 101}
+    assert report["import_started"] == IMPORT_STARTED
+
+
+def test_report_only_with_environment_variable(tmp_path):
+    assert StartupTimer.from_environ(["table"], environ={}).report_path is None
+    path = str(tmp_path / "s.json")
+    assert StartupTimer.from_environ(["table"], environ={STARTUP_REPORT_ENV: path}).report_path == path
+
+
+def test_startup_imports_skip_sync_and_export():
+    pytest.importorskip("PySide6.QtWidgets")
+    # پردازه جدا: ماژول‌های تنبل در این پردازه تست ممکن است قبلاً وارد شده باشند
+    code = "import sys, view; print(sorted({'sync', 'export', 'instrumentation'} & set(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=Path(__file__).resolve().parent.parent, capture_output=True, text=True,
+        check=True, timeout=60,
+    )
+    assert result.stdout.strip().splitlines()[-1] == "[]"
@@ -0,0 +1,45 @@
+import pytest
+from status_cache import StatusCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = StatusCache(capacity=2)
+    cache.put("1", "a")
+    cache.put("2", "b")
+    assert cache.get("1") == "a"
+    cache.put("3", "c")
+    assert cache.get("2") is None
+    assert cache.get("1") == "a" and cache.get("3") == "c"
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.size) == (3, 1, 1, 2)
+
+
+def test_entries_expire_after_ttl():
+    clock = _Clock()
+    cache = StatusCache(capacity=10, ttl=5, clock=clock)
+    cache.put("1", "a")
+    clock.now = 4.9
+    assert cache.get("1") == "a"
+    clock.now = 5.0
+    assert cache.get("1") is None
+    assert cache.stats().expirations == 1 and len(cache) == 0
+
+
+def test_put_many_prefers_first_items_and_disabled_cache():
+    cache = StatusCache(capacity=2)
+    assert cache.put_many([("1", "newest"), ("2", "b"), ("3", "oldest")]) == 2
+    assert cache.get("3") is None and cache.get("1") == "newest"
+    off = StatusCache(capacity=0)
+    off.put("1", "a")
+    assert off.get("1") is None and not off.enabled
+    assert off.stats().hit_ratio == 0.0
+    with pytest.raises(ValueError):
+        StatusCache(capacity=1, ttl=0)
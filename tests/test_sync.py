@@ -0,0 +1,142 @@
+import pytest
+
+import manage
+from constants import CHANGE_DELETE, CHANGE_ENTER, CHANGE_EXIT, EMOJI_SUCCESS, STATUS_EXITED
+from controller import Controller
+from db_config import DatabaseSettings
+from model import Database, SyncChange
+from sync import CentralStore, SyncConflictError, Synchronizer, station_id
+
+
+@pytest.fixture(name="central")
+def fixture_central(tmp_path):
+    store = CentralStore(str(tmp_path / "central.db"))
+    yield store
+    store.close()
+
+
+def _open_station(tmp_path, name):
+    # هر ایستگاه فایل محلی خودش را دارد؛ Database singleton است، پس ایستگاه‌ها به نوبت باز می‌شوند
+    Database.reset()
+    return Database(DatabaseSettings(path=str(tmp_path / f"{name}.db"), sync_path=str(tmp_path / "central.db"),
+                                     station_id=name))
+
+
+def test_outbox_records_only_when_enabled(memory_db):
+    memory_db.add_invoice("900")
+    assert memory_db.outbox_size() == 0
+    assert memory_db.enable_outbox() == 1 and memory_db.enable_outbox() == 0
+    memory_db.add_invoice("901")
+    memory_db.update_invoice_exit("901")
+    memory_db.delete_invoice("900")
+    ops = [(c.invoice_number, c.op) for c in memory_db.pending_changes("a")]
+    assert ops == [(900, CHANGE_ENTER), (901, CHANGE_ENTER), (901, CHANGE_EXIT), (900, CHANGE_DELETE)]
+    assert memory_db.ack_changes(2) == 2 and memory_db.outbox_size() == 2
+
+    memory_db.connection.execute("UPDATE invoices SET enter_ts = 1, exit_ts = 2")
+    memory_db.ack_changes(10**9)
+    assert memory_db.archive_exited(before_ts=100) == 1
+    assert memory_db.outbox_size() == 0
+
+
+def test_apply_changes_resolves_conflicts_without_echo(memory_db):
+    memory_db.enable_outbox()
+    memory_db.add_invoice("910")
+    memory_db.add_invoice("911")
+    memory_db.update_invoice_exit("911")
+    memory_db.ack_changes(10**9)
+    enter_910 = memory_db.get_invoice_row("910").enter_ts
+    changes = [
+        SyncChange("b", 1, 910, CHANGE_ENTER, enter_910 - 60, None, enter_910 - 60),  # ورود زودتر می‌ماند
+        SyncChange("b", 2, 911, CHANGE_DELETE, enter_910 + 60, None, enter_910 + 60),  # خروج بر حذف غلبه دارد
+        SyncChange("b", 3, 912, CHANGE_EXIT, 100, 200, 200),  # فاکتور نبود: با ورود و خروج ثبت می‌شود
+        SyncChange("b", 4, 912, CHANGE_ENTER, 150, None, 150),
+    ]
+    assert memory_db.apply_changes(changes, pulled_seq=4) == [910, 912]
+    assert memory_db.get_invoice_row("910").enter_ts == enter_910 - 60
+    assert memory_db.get_invoice_status("911")[3] == STATUS_EXITED
+    row_912 = memory_db.get_invoice_row("912")
+    assert (row_912.enter_ts, row_912.exit_ts) == (100, 200)
+    assert memory_db.sync_cursor() == 4
+    assert memory_db.outbox_size() == 0
+    assert memory_db.verify_daily_stats() == []
+    assert memory_db.apply_changes([SyncChange("b", 5, 910, CHANGE_DELETE, enter_910, None, enter_910)], 5) == [910]
+    assert not memory_db.invoice_exists("910")
+
+
+def test_stations_converge_through_central_store(tmp_path, central):
+    try:
+        _open_station(tmp_path, "receiving")
+        receiving = Controller()
+        # مثل شروع برنامه: دور اول همگام‌سازی outbox را فعال می‌کند
+        assert receiving.sync_once().pushed == 0
+        receiving.add_invoice("920")
+        receiving.add_invoice("921")
+        receiving.delete_invoice("921")
+        assert receiving.sync_once().pushed == 3
+
+        _open_station(tmp_path, "shipping")
+        shipping = Controller()
+        report = shipping.sync_once()
+        assert report.pulled == 3 and sorted(report.changed) == [920, 921]
+        assert EMOJI_SUCCESS in shipping.process_exit_invoice("920")
+        assert not shipping.db.invoice_exists("921")
+        assert shipping.sync_once().pushed == 1
+
+        _open_station(tmp_path, "receiving")
+        receiving = Controller()
+        assert receiving.sync_once().changed == [920]
+        assert receiving.db.get_invoice_status("920")[3] == STATUS_EXITED
+        assert len(central.pull(0, "", 100)) == 4
+    finally:
+        Database.reset()
+
+
+def test_recreated_station_database_still_reaches_other_stations(tmp_path):
+    try:
+        receiving_db = _open_station(tmp_path, "receiving")
+        old_key = station_id(receiving_db)
+        assert old_key == station_id(receiving_db) and old_key.startswith("receiving/")
+        receiving = Controller()
+        receiving.add_invoice("940")
+        assert receiving.sync_once().pushed == 1
+
+        # فایل محلی از دست رفته و از نو ساخته می‌شود: outbox دوباره از seq 1 شروع می‌شود
+        Database.reset()
+        for suffix in ("", "-wal", "-shm"):
+            (tmp_path / f"receiving.db{suffix}").unlink(missing_ok=True)
+        receiving_db = _open_station(tmp_path, "receiving")
+        assert station_id(receiving_db) != old_key
+        receiving = Controller()
+        receiving.add_invoice("941")
+        report = receiving.sync_once()
+        # تغییر تازه با کلید تازه ارسال می‌شود و سابقه نسخه قبلی همین ایستگاه دوباره دریافت می‌شود
+        assert report.pushed == 1 and report.changed == [940]
+
+        _open_station(tmp_path, "shipping")
+        assert sorted(Controller().sync_once().changed) == [940, 941]
+    finally:
+        Database.reset()
+
+
+def test_push_rejects_a_different_change_under_an_existing_key(central):
+    change = SyncChange("a/1", 1, 950, CHANGE_ENTER, 100, None, 100)
+    assert central.push([change]) == 1
+    # ارسال دوباره همان تغییر (بعد از قطع شبکه) بی‌اثر است
+    assert central.push([change]) == 0
+    fresh = SyncChange("a/1", 2, 951, CHANGE_ENTER, 110, None, 110)
+    with pytest.raises(SyncConflictError):
+        central.push([fresh, change._replace(invoice_number=952)])
+    # کل دسته rollback شده است
+    assert [c.invoice_number for _, c in central.pull(0, "", 10)] == [950]
+
+
+def test_manage_sync_requires_central_store(memory_db, capsys):
+    assert manage.main(["sync"]) == 1
+    assert "sync_path" in capsys.readouterr().err
+    store = CentralStore(":memory:")
+    synchronizer = Synchronizer(memory_db, store, "a", batch_size=2)
+    for number in ("930", "931", "932"):
+        memory_db.add_invoice(number)
+    assert synchronizer.sync_once().pushed == 3 and memory_db.outbox_size() == 0
+    store.close()
@@ -0,0 +1,35 @@
+import os
+
+import pytest
+
+pytest.importorskip("PySide6.QtWidgets")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PySide6.QtWidgets import QApplication  # noqa: E402  pylint: disable=wrong-import-position
+from view import MainWindow  # noqa: E402  pylint: disable=wrong-import-position
+
+
+# مثل test_search_suggestions: QApplication پیش از اولین تست Qt (در زمان جمع‌آوری تست‌ها) ساخته می‌شود
+QT_APP = QApplication.instance() or QApplication([])
+
+
+@pytest.fixture(name="qt_app")
+def fixture_qt_app():
+    if not isinstance(QT_APP, QApplication):
+        pytest.skip("QCoreApplication already created without widgets")
+    return QT_APP
+
+
+@pytest.mark.usefixtures("memory_db")
+def test_instrumentation_records_handlers_connected_to_signals(qt_app, monkeypatch):
+    monkeypatch.setenv("INVOICE_PERF", "1")
+    monkeypatch.delenv("INVOICE_PERF_DUMP", raising=False)
+    window = MainWindow()
+    try:
+        window.barcode_input.setText("abc")
+        window.search_button.click()
+        qt_app.processEvents()
+    finally:
+        window.perf.uninstall()
+        window.close()
+    metrics = {m.name: m for m in window.perf.snapshot()}
+    assert metrics["MainWindow.handle_search"].calls == 1
@@ -1,8 +1,20 @@
 # Minimal type stubs for jdatetime used in this project
 # This is NOT a complete stub – only what we call.
 from typing import Optional, Any
+from datetime import date as _GDate
 from datetime import datetime as _GDateTime
 
+class date:
+    year: int
+    month: int
+    day: int
+    def __init__(self, year: int, month: int, day: int) -> None: ...
+    # تبدیل به date استاندارد پایتون
+    def togregorian(self) -> _GDate: ...
+    def isleap(self) -> bool: ...
+    @staticmethod
+    def fromgregorian(date: _GDate) -> 'date': ...
+
 class datetime:
     @staticmethod
     def now(tz: Optional[Any] = ...) -> 'datetime': ...
@@ -1,8 +1,11 @@
 # view.py
 
 import sys
-from datetime import timedelta
+from collections import deque
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 
+# قبل از Qt وارد می‌شود تا لحظه شروع راه‌اندازی ثبت شود
+from startup import StartupTimer, MARK_FIRST_PAINT  # pylint: disable=wrong-import-order
 # وارد کردن کلاس‌های Qt در چند خط برای کوتاه شدن طول خطوط
 from PySide6.QtWidgets import (
     QMainWindow,
@@ -14,19 +17,61 @@ from PySide6.QtWidgets import (
     QLineEdit,
     QLabel,
     QTableWidget,
+    QTableView,
     QSizePolicy,
     QSpacerItem,
     QTableWidgetItem,
     QHeaderView,
     QAbstractItemView,
+    QFileDialog,
 )
 from PySide6.QtCore import Qt, QTimer, QSize
-from PySide6.QtGui import QColor, QIcon
-import jdatetime
-from controller import Controller
+from PySide6.QtGui import QIcon
+import jalali
+from async_bridge import AsyncBridge
+from background_jobs import BackgroundJobs
+from controller import Controller, InvoiceEvent, MonthSummary, ScanRequest, ScanResult
+from constants import (
+    EVENT_ADDED,
+    EVENT_EXITED,
+    EVENT_DELETED,
+    EVENT_RELOADED,
+    EMOJI_SUCCESS,
+    EMOJI_ERROR,
+    MSG_EXPORTED,
+    MSG_EXPORT_FAILED,
+    MSG_PAGE_FAILED,
+    MSG_SCAN_FAILED,
+    STATUS_EXITED,
+)
+from invoice_table_model import InvoiceTableModel
+from scan_queue import ScanQueue
+from search_suggestions import SearchSuggestions
 import resources_rc  # pylint: disable=unused-import  # لازم برای ثبت ریسورس ها
 _ = resources_rc
 
+if TYPE_CHECKING:
+    from instrumentation import Instrumentation
+
+# حداقل فاصله دو به‌روزرسانی رابط کاربری (حدود یک فریم)؛ رویدادها و پیام‌های بین دو فریم یک‌جا رسم می‌شوند
+FRAME_INTERVAL_MS = 16
+# درخواست گزارش ناهمگام: (واکشی روی thread کارگر، رسم روی thread رابط، callback بعد از رسم)
+ReportRequest = Tuple[Callable[[], Any], Callable[[Any], None], Optional[Callable[[], None]]]
+# تعداد پیام‌های اخیر اسکن در tooltip کادر پیام
+RECENT_MESSAGES = 20
+# گام‌های بارگذاری اولیه بعد از نمایش پوسته پنجره (پایان همه = آماده به کار)
+STARTUP_STEPS = ("invoices", "weekly", "monthly", "count")
+
+PERSIAN_MONTHS = (
+    "فروردین", "اردیبهشت", "خرداد", "تیر", "مرداد", "شهریور",
+    "مهر", "آبان", "آذر", "دی", "بهمن", "اسفند",
+)
+NAV_BUTTON_STYLE = (
+    "QPushButton { background:#1e1e1e; color:#f5f5f5; font-size:14px; border:2px solid #444; border-radius:14px; padding:0 10px; }"
+    "QPushButton:hover { border-color:#777; }"
+    "QPushButton:pressed { border-color:#999; }"
+)
+
 # کلاس پنجره اصلی
 class MainWindow(QMainWindow):  # pylint: disable=too-many-instance-attributes
     """پنجره اصلی برنامه مدیریت فاکتور."""
@@ -34,13 +79,47 @@ class MainWindow(QMainWindow):  # pylint: disable=too-many-instance-attributes
     def __init__(self) -> None:  # pylint: disable=too-many-instance-attributes
         super().__init__()
         self.controller = Controller()
+        self.controller.subscribe(self._on_invoice_event)
+        # گزارش‌ها و بارگذاری جدول روی thread کارگر اجرا می‌شوند تا ورودی بارکد مسدود نشود
+        self.bridge = AsyncBridge(parent=self)
+        # شماره نسخه داده‌های گزارش؛ با هر تغییر درجا بالا می‌رود تا نتیجه کهنه واکشی ناهمگام دور ریخته شود
+        self._report_version = 0
+        # گزارش‌هایی که نتیجه‌شان کهنه بود (کلید: تابع رسم، تا درخواست جدیدتر جای قبلی را بگیرد)
+        self._stale_reports: Dict[Callable[[Any], None], ReportRequest] = {}
+        # کلیدهای روز نمایش‌داده‌شده در جداول (برای پیدا کردن خانه متناظر هر رویداد)
+        self._weekly_dates: list[int] = []
+        self._monthly_key = 0  # YYYYMM ماه جدول ماهانه
+        # ماه انتخاب‌شده در مرور تاریخچه (سال، ماه)؛ None یعنی همیشه ماه جاری
+        self._monthly_month: Optional[Tuple[int, int]] = None
+        self._monthly_total = 0
+        self._entered_count = 0
+        # اسکن‌ها فوراً در صف می‌روند و دسته‌ای روی thread کارگر ثبت می‌شوند
+        self.scan_queue = ScanQueue(self.controller, self.bridge, parent=self)
+        self.scan_queue.scanned.connect(self._on_scanned)
+        self.scan_queue.failed.connect(self._on_scan_failed)
+        self.scan_queue.drained.connect(self._retry_stale_reports)
+        # رویدادها و پیام‌های منتظر فریم بعد
+        self._pending_events: List[InvoiceEvent] = []
+        self._pending_messages: List[str] = []
+        self._recent_messages: deque[str] = deque(maxlen=RECENT_MESSAGES)
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setSingleShot(True)
+        self.frame_timer.setInterval(FRAME_INTERVAL_MS)
+        self.frame_timer.timeout.connect(self._flush_frame)  # type: ignore[arg-type]
+        # بایگانی و همگام‌سازی دوره‌ای روی thread کارگر
+        self.jobs = BackgroundJobs(self.controller, self.bridge, parent=self)
+        self.jobs.failed.connect(lambda text: self._show_notice(text, "#d32f2f"))
+        # wrapper های اندازه‌گیری باید پیش از وصل شدن سیگنال‌ها به handle_* نصب شوند (connect متد bound را نگه می‌دارد)
+        self._install_instrumentation()
         self._base_setup()
         self._setup_top_bar()
         self._setup_message_box()
         self._setup_mode_and_counter()
         self._setup_tables()
         self._setup_monthly_table()
-        self._post_initialize()
+        # پنجره اول خالی نمایش داده می‌شود؛ بارگذاری داده‌ها در اولین دور حلقه رویداد شروع می‌شود
+        self.startup = StartupTimer.from_environ(STARTUP_STEPS, on_report=QApplication.quit)
+        QTimer.singleShot(0, self._post_initialize)
 
     # ---------------------- setup sections ----------------------
     def _base_setup(self) -> None:
@@ -82,6 +161,8 @@ class MainWindow(QMainWindow):  # pylint: disable=too-many-instance-attributes
         )
         self.first_horizontal_layout.addWidget(self.barcode_input)
         self.barcode_input.returnPressed.connect(self.handle_barcode)  # type: ignore[arg-type]
+        # پیشنهاد شماره‌های مشابه (زیررشته شماره، تازه‌ترین اول) زیر کادر برای بارکد ناقص یا ناخوانا
+        self.suggestions = SearchSuggestions(self.controller, self.barcode_input, self.bridge, parent=self)
         self.delete_button = QPushButton()
         self.delete_button.setObjectName("deleteButton")
         self.delete_button.setIcon(QIcon(":/icons/recycle-bin.png"))
@@ -124,14 +205,34 @@ class MainWindow(QMainWindow):  # pylint: disable=too-many-instance-attributes
         self.second_horizontal_layout.addWidget(self.exit_mode)
         self.count_invoice_enter = QLabel()
         self.count_invoice_enter.setObjectName("countLabel")
-        invoice_count = self.controller.get_count_invoice_enter()
-        self.count_invoice_enter.setText(f"ورودی: {invoice_count}")
+        self.count_invoice_enter.setText("ورودی: …")
         self.count_invoice_enter.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.count_invoice_enter.setFixedHeight(40)
         self.count_invoice_enter.setStyleSheet(
             "background:#1e1e1e; color:#f5f5f5; font-size:20px; border:2px solid #444; border-radius:20px; padding:0 10px;"
         )
         self.second_horizontal_layout.addWidget(self.count_invoice_enter)
+        # خروجی کامل فاکتورها (CSV / JSON-lines) روی thread کارگر
+        self.export_button = QPushButton("خروجی CSV", self)
+        self.export_button.setObjectName("exportButton")
+        self.export_button.setMinimumSize(0, 40)
+        self.export_button.setStyleSheet(
+            "QPushButton { background:#1e1e1e; color:#f5f5f5; font-size:20px; border:2px solid #444; border-radius:20px; padding:0 14px; }"
+            "QPushButton:hover { border-color:#777; }"
+            "QPushButton:pressed { border-color:#999; }"
+            "QPushButton:disabled { color:#777; }"
+        )
+        self.second_horizontal_layout.addWidget(self.export_button)
+        self.export_button.clicked.connect(self.handle_export)  # type: ignore[arg-type]
+        # پنل آمار کارایی (فقط با INVOICE_PERF=1 نمایش داده می‌شود؛ جزئیات کامل در tooltip)
+        self.perf_label = QLabel()
+        self.perf_label.setObjectName("perfLabel")
+        self.perf_label.setFixedHeight(40)
+        self.perf_label.setStyleSheet(
+            "background:#1e1e1e; color:#9e9e9e; font-size:12px; border:2px solid #444; border-radius:20px; padding:0 10px;"
+        )
+        self.perf_label.setVisible(False)
+        self.second_horizontal_layout.addWidget(self.perf_label)
         self.main_vertical_layout.addLayout(self.second_horizontal_layout)
 
     def _setup_tables(self) -> None:
@@ -157,29 +258,61 @@ class MainWindow(QMainWindow):  # pylint: disable=too-many-instance-attributes
             "QTableWidget::item:selected { background:#274a2a; }"
         )
         self.third_horizontal_layout.addWidget(self.weekly_table)
-        # invoice table
-        self.invoice_table = QTableWidget()
+        # invoice table (مدل مجازی با بارگذاری صفحه‌ای)
+        self.invoice_model = InvoiceTableModel(self.controller, parent=self, bridge=self.bridge)
+        self.invoice_model.page_failed.connect(
+            lambda exc: self._show_notice(MSG_PAGE_FAILED.format(reason=exc, error=EMOJI_ERROR), "#d32f2f")
+        )
+        self.invoice_table = QTableView()
         self.invoice_table.setObjectName("invoiceTable")
-        self.invoice_table.setColumnCount(4)
-        self.invoice_table.setHorizontalHeaderLabels(["خروج", "ساعت", "تاریخ", "شماره فاکتور"])
+        self.invoice_table.setModel(self.invoice_model)
         self.invoice_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.invoice_table.horizontalHeader().setDefaultAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.invoice_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.invoice_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.invoice_table.verticalHeader().setVisible(False)
         self.invoice_table.setAlternatingRowColors(True)
         self.invoice_table.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
         self.invoice_table.setStyleSheet(
-            "QTableWidget { background:#1e1e1e; border:2px solid #444; border-radius:20px; "
+            "QTableView { background:#1e1e1e; border:2px solid #444; border-radius:20px; "
             "font-size:16px; color:#f5f5f5; gridline-color:transparent; }"
             "QHeaderView::section { background:#1e1e1e; color:#f5f5f5; font-size:16px; border-bottom:2px solid #444; }"
-            "QTableWidget::item { border:none; padding:10px; }"
-            "QTableWidget::item:alternate { background:#242424; }"
-            "QTableWidget::item:selected { background:#274a2a; }"
+            "QTableView::item { border:none; padding:10px; }"
+            "QTableView::item:alternate { background:#242424; }"
+            "QTableView::item:selected { background:#274a2a; }"
         )
         self.third_horizontal_layout.addWidget(self.invoice_table)
         self.main_vertical_layout.addLayout(self.third_horizontal_layout)
 
     def _setup_monthly_table(self) -> None:
+        # مرور ماه‌ها و سال‌های گذشته (ماه‌های بسته از کش کنترلر، ماه‌های مجاور پیش‌واکشی می‌شوند)
+        self.month_nav_layout = QHBoxLayout()
+        self.month_nav_buttons: dict[int, QPushButton] = {}
+        for name, text, delta in (
+            ("nextYearButton", "سال بعد", 12),
+            ("nextMonthButton", "ماه بعد", 1),
+            ("prevMonthButton", "ماه قبل", -1),
+            ("prevYearButton", "سال قبل", -12),
+        ):
+            button = QPushButton(text, self)
+            button.setObjectName(name)
+            button.setFixedHeight(30)
+            button.setStyleSheet(NAV_BUTTON_STYLE)
+            button.clicked.connect(lambda _checked=False, d=delta: self.page_month(d))  # type: ignore[arg-type]
+            self.month_nav_buttons[delta] = button
+            if delta == -1:
+                self.month_label = QLabel()
+                self.month_label.setObjectName("monthLabel")
+                self.month_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+                self.month_label.setStyleSheet("color:#f5f5f5; font-size:14px;")
+                self.month_nav_layout.addWidget(self.month_label, 1)
+            self.month_nav_layout.addWidget(button)
+        self.current_month_button = QPushButton("ماه جاری", self)
+        self.current_month_button.setObjectName("currentMonthButton")
+        self.current_month_button.setFixedHeight(30)
+        self.current_month_button.setStyleSheet(NAV_BUTTON_STYLE)
+        self.current_month_button.clicked.connect(lambda: self.show_month(None))  # type: ignore[arg-type]
+        self.month_nav_layout.insertWidget(0, self.current_month_button)
+        self.main_vertical_layout.addLayout(self.month_nav_layout)
         self.monthly_table = QTableWidget()
         self.monthly_table.setObjectName("monthlyTable")
         self.monthly_table.setRowCount(2)
@@ -208,24 +341,114 @@ class MainWindow(QMainWindow):  # pylint: disable=too-many-instance-attributes
         self.monthly_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
         self.main_vertical_layout.addWidget(self.monthly_table)
 
+    # ماژول instrumentation فقط بعد از نمایش پنجره (در _post_initialize) وارد می‌شود
+    def _install_instrumentation(self) -> None:
+        # pylint: disable=attribute-defined-outside-init
+        from instrumentation import install_default, load_perf_settings  # pylint: disable=import-outside-toplevel
+
+        self.perf: Optional["Instrumentation"] = None
+        self.perf_settings = load_perf_settings()
+        if not self.perf_settings.enabled:
+            return
+        window_methods = [
+            name for name in vars(MainWindow)
+            if name.startswith(("update_", "_render_", "handle_"))
+        ]
+        self.perf = install_default(self.controller.db.pool, extra=[(MainWindow, window_methods)])
+
+    def _setup_perf_panel(self) -> None:
+        # pylint: disable=attribute-defined-outside-init
+        if self.perf is None:
+            return
+        self.perf_label.setVisible(True)
+        self.perf_timer = QTimer(self)
+        self.perf_timer.timeout.connect(self._refresh_perf_panel)  # type: ignore[arg-type]
+        self.perf_timer.start(2000)
+        if self.perf_settings.dump_path:
+            self.perf_dump_timer = QTimer(self)
+            self.perf_dump_timer.timeout.connect(self._dump_perf)  # type: ignore[arg-type]
+            self.perf_dump_timer.start(int(self.perf_settings.dump_interval * 1000))
+
+    def _refresh_perf_panel(self) -> None:
+        if self.perf is None:
+            return
+        slowest = self.perf.snapshot()[:2]
+        self.perf_label.setText(" | ".join(f"{m.name.split('.')[-1]} p95={m.p95_ms:.1f}ms" for m in slowest))
+        self.perf_label.setToolTip(self.perf.format_summary())
+
+    def _dump_perf(self) -> None:
+        if self.perf is not None and self.perf_settings.dump_path:
+            self.perf.dump_jsonl(self.perf_settings.dump_path)
+
+    def closeEvent(self, event: Any) -> None:  # pylint: disable=invalid-name
+        """لغو کارهای پس‌زمینه، ثبت اسکن‌های باقی‌مانده صف و تخلیه نهایی آمار کارایی هنگام بستن پنجره."""
+        # اول لغو: بستن پنجره منتظر بایگانی یا همگام‌سازی نمی‌ماند
+        self.jobs.stop()
+        self.scan_queue.flush()
+        self._dump_perf()
+        super().closeEvent(event)
+
+    def paintEvent(self, event: Any) -> None:  # pylint: disable=invalid-name
+        """ثبت لحظه اولین رسم پنجره برای زمان‌سنجی راه‌اندازی."""
+        self.startup.mark(MARK_FIRST_PAINT)
+        super().paintEvent(event)
+
+    # بارگذاری تدریجی داده‌ها بعد از نمایش پوسته پنجره (همه واکشی‌ها روی thread کارگر)
     def _post_initialize(self) -> None:
         self.barcode_input.setFocus()
+        self._setup_perf_panel()
+        self.invoice_model.page_loaded.connect(lambda: self.startup.step_done("invoices"))
         self.update_invoice_table()
-        self.update_weekly_table()
-        self.update_monthly_table()
-
-    # عملگر اینتر برای کادر ثبت
+        self.update_weekly_table(on_rendered=lambda: self.startup.step_done("weekly"))
+        self.update_monthly_table(on_rendered=lambda: self.startup.step_done("monthly"))
+        self.update_entered_count(on_rendered=lambda: self.startup.step_done("count"))
+        # گرم‌کردن کش وضعیت با فاکتورهای روزهای اخیر (روی thread کارگر)
+        self.bridge.submit(self.controller.warm_status_cache)
+        self.jobs.start()
+
+    # عملگر اینتر برای کادر ثبت: اسکن در صف می‌رود و کادر بلافاصله برای بارکد بعدی خالی می‌شود
     def handle_barcode(self):
+        if self.suggestions.has_selection():
+            # اینتر روی پیشنهاد انتخاب‌شده: شماره در کادر گذاشته می‌شود و اسکنی ثبت نمی‌شود
+            return
+        self.suggestions.hide()
         barcode = self.barcode_input.text().strip()
+        self.barcode_input.clear()
+        self.scan_queue.enqueue(EVENT_EXITED if self.exit_mode.isChecked() else EVENT_ADDED, barcode)
 
-        if self.exit_mode.isChecked():
-            message = self.controller.process_exit_invoice(barcode)
-        else:
-            message = self.controller.add_invoice(barcode)
+    def _on_scanned(self, results: List[ScanResult]) -> None:
+        self._pending_messages.extend(result.message for result in results)
+        self._schedule_frame()
 
+    def _on_scan_failed(self, batch: List[ScanRequest], exc: BaseException) -> None:
+        self._pending_messages.append(
+            MSG_SCAN_FAILED.format(count=len(batch), reason=exc, error=EMOJI_ERROR)
+        )
+        self._schedule_frame()
+
+    def _schedule_frame(self) -> None:
+        if not self.frame_timer.isActive():
+            self.frame_timer.start()
+
+    # رسم یک‌جای تغییرات رسیده از فریم قبل (رویدادها به ترتیب، سپس آخرین پیام)
+    def _flush_frame(self) -> None:
+        events, self._pending_events = self._pending_events, []
+        messages, self._pending_messages = self._pending_messages, []
+        if any(event.kind == EVENT_RELOADED or event.row is None or event.date is None for event in events):
+            # بارگذاری دوباره همه تغییرات این فریم را هم در بر دارد
+            self._reload_all()
+        else:
+            for event in events:
+                self._apply_invoice_event(event)
+        if messages:
+            self._recent_messages.extend(messages)
+            self._show_scan_message(messages[-1])
+        self._retry_stale_reports()
+
+    def _show_scan_message(self, message: str) -> None:
         self.message_box.setText(message)
-        count = self.controller.get_count_invoice_enter()
-        self.count_invoice_enter.setText(f"ورودی: {count}")
+        # پیام‌های اسکن‌های قبلی رگبار به ترتیب در tooltip می‌مانند
+        self.message_box.setToolTip("\n".join(self._recent_messages))
 
         # تعیین استایل پیام بر اساس نتیجه (دارک تم inline)
         if "✅" in message:
@@ -240,11 +463,8 @@ class MainWindow(QMainWindow):  # pylint: disable=too-many-instance-attributes
             self.message_box.setStyleSheet(
                 "background:#c9a800; color:#121212; font-size:20px; border:2px solid #444; border-radius:20px;"
             )
-        self.update_invoice_table()
-        self.update_weekly_table()
-        self.update_monthly_table()
+        # جداول و شمارنده از طریق رویداد کنترلر (_on_invoice_event) درجا به‌روز می‌شوند
         self.message_timer.start(10000)
-        self.barcode_input.clear()
 
     # پاک کردن کادر پیام
     def clear_message_box(self):
@@ -253,58 +473,55 @@ class MainWindow(QMainWindow):  # pylint: disable=too-many-instance-attributes
             "background:#1e1e1e; color:#f5f5f5; font-size:20px; border:2px solid #444; border-radius:20px;"
         )
 
-    # به روز رسانی جدول فاکتور ها
+    # به روز رسانی جدول فاکتور ها (بارگذاری دوباره صفحه اول)
     def update_invoice_table(self):
-        self.invoice_table.setRowCount(0)
-        invoices = self.controller.get_all_invoices()
-        for row_index, (number, date, time, status) in enumerate(invoices):
-            self.invoice_table.insertRow(row_index)
-
-            # اگر فاکتور خارج شده بود، تاریخ خروج را نمایش بده
-            if status == "خارج شده":
-                # دریافت اطلاعات خروج از دیتابیس
-                invoice_info = self.controller.db.get_invoice_info(str(number))
-                if invoice_info and invoice_info[3]:  # date_exit
-                    status_display = invoice_info[3]  # date_exit
-                else:
-                    status_display = status
+        self.invoice_model.reload()
+
+    # اجرای ناهمگام یک گزارش و رسم نتیجه در صورت کهنه نبودن
+    def _request_report(
+        self,
+        fetch: Callable[[], Any],
+        render: Callable[[Any], None],
+        on_rendered: Optional[Callable[[], None]] = None,
+    ) -> None:
+        version = self._report_version
+
+        def on_result(data: Any) -> None:
+            if version != self._report_version or self._pending_events or self.scan_queue.pending_count():
+                # در حین واکشی تغییر درجا رخ داده یا در راه است؛ نتیجه ممکن است با آن ناهمگام باشد و
+                # بعد از تخلیه صف و رسم رویدادها یک بار دوباره واکشی می‌شود
+                self._stale_reports[render] = (fetch, render, on_rendered)
+                self._retry_stale_reports()
             else:
-                status_display = status
-
-            status_item = QTableWidgetItem(status_display)
-            status_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                render(data)
+                if on_rendered is not None:
+                    on_rendered()
 
-            time_item = QTableWidgetItem(time)
-            time_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.bridge.submit(fetch, on_result=on_result)
 
-            date_item = QTableWidgetItem(date)
-            date_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-
-            number_item = QTableWidgetItem(str(number))
-            number_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-
-            # اگر فاکتور خارج شده بود، رنگ قرمز شود
-            if status == "خارج شده":
-                status_item.setForeground(QColor("red"))
-                number_item.setForeground(QColor("red"))
+    # واکشی دوباره گزارش‌های کهنه وقتی صف اسکن خالی است و رویدادی منتظر فریم نیست
+    def _retry_stale_reports(self) -> None:
+        if not self._stale_reports or self._pending_events or self.scan_queue.pending_count():
+            # drained صف یا فریم بعد دوباره این‌جا را صدا می‌زند
+            return
+        stale, self._stale_reports = self._stale_reports, {}
+        for fetch, render, on_rendered in stale.values():
+            self._request_report(fetch, render, on_rendered)
 
-            self.invoice_table.setItem(row_index, 0, status_item)
-            self.invoice_table.setItem(row_index, 1, time_item)
-            self.invoice_table.setItem(row_index, 2, date_item)
-            self.invoice_table.setItem(row_index, 3, number_item)
+    # به روز رسانی شمارنده فاکتورهای ورودی
+    def update_entered_count(self, on_rendered: Optional[Callable[[], None]] = None):
+        self._request_report(self.controller.get_count_invoice_enter, self._set_entered_count, on_rendered)
 
     # به روز رسانی جدول هفتگی
-    def update_weekly_table(self):
-        weekly_data = self.controller.get_weekly_data()
+    def update_weekly_table(self, on_rendered: Optional[Callable[[], None]] = None):
+        self._request_report(self.controller.get_weekly_data, self._render_weekly_table, on_rendered)
+
+    def _render_weekly_table(self, weekly_data):
         self.weekly_table.setRowCount(0)
 
-        today = jdatetime.datetime.now()
-        dates = []
-        for i in range(7):
-            # تبدیل تاریخ جلالی به میلادی و کم کردن روز، سپس تبدیل مجدد به جلالی
-            gdate = today.togregorian() - timedelta(days=i)
-            date_fixed = jdatetime.datetime.fromgregorian(datetime=gdate)
-            dates.append(date_fixed.strftime("%Y/%m/%d"))
+        today = jalali.today_key()
+        dates = [jalali.shift_day_key(today, -i) for i in range(7)]
+        self._weekly_dates = dates
         data_dict = {row[0]: row[1:] for row in weekly_data}
 
         for row_index, date in enumerate(dates):
@@ -326,36 +543,139 @@ class MainWindow(QMainWindow):  # pylint: disable=too-many-instance-attributes
             elif row_index == 1:
                 date_text = "دیروز"
             else:
-                date_text = date
+                date_text = jalali.format_day_key(date)
 
             date_item = QTableWidgetItem(date_text)
             date_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
             self.weekly_table.setItem(row_index, 2, date_item)
 
-    # به روز رسانی جدول ماهانه
-    def update_monthly_table(self):
-        monthly_data = self.controller.get_monthly_data()
-
-        persian_months = [
-            "فروردین", "اردیبهشت", "خرداد", "تیر", "مرداد", "شهریور",
-            "مهر", "آبان", "آذر", "دی", "بهمن", "اسفند"
-        ]
-
-        current_month_number = jdatetime.datetime.now().month
-        current_month_name = persian_months[current_month_number - 1]
+    # ماه نمایش‌داده‌شده در جدول ماهانه (سال، ماه)
+    def _shown_month(self) -> Tuple[int, int]:
+        if self._monthly_month is not None:
+            return self._monthly_month
+        today = jalali.today_key()
+        return today // 10000, today // 100 % 100
+
+    # نمایش ماه دلخواه (None: ماه جاری که با عوض شدن ماه جلو می‌رود)
+    def show_month(self, month: Optional[Tuple[int, int]]) -> None:
+        today = jalali.today_key()
+        if month is not None and month[0] * 100 + month[1] >= today // 100:
+            # ماه‌های آینده داده‌ای ندارند؛ رسیدن به ماه جاری یعنی دنبال کردن امروز
+            month = None
+        self._monthly_month = month
+        self.update_monthly_table()
 
-        self.monthly_table.setVerticalHeaderLabels([current_month_name, "تعداد"])
+    # ورق زدن تاریخچه: delta ماه (±12 یعنی یک سال)
+    def page_month(self, delta: int) -> None:
+        self.show_month(jalali.shift_month(*self._shown_month(), delta))
+
+    # به روز رسانی جدول ماهانه (ماه بسته از کش بدون رفت‌وبرگشت به thread کارگر)
+    def update_monthly_table(self, on_rendered: Optional[Callable[[], None]] = None):
+        year, month = self._shown_month()
+        cached = self.controller.cached_month_summary(year, month)
+        if cached is not None:
+            self._render_monthly_table(cached)
+            if on_rendered is not None:
+                on_rendered()
+        else:
+            self._request_report(
+                lambda: self.controller.get_month_summary(year, month), self._render_monthly_table, on_rendered
+            )
+        # ماه‌ها و سال‌های مجاور در پس‌زمینه آماده می‌شوند تا کلیک بعدی از کش رسم شود
+        self.bridge.submit(self.controller.prefetch_months, year, month)
 
+    def _render_monthly_table(self, summary: MonthSummary) -> None:
+        if (summary.year, summary.month) != self._shown_month():
+            # در حین واکشی ماه دیگری انتخاب شده است
+            return
+        self._monthly_key = summary.year * 100 + summary.month
+        self._monthly_total = summary.total_entered
+        self.monthly_table.setVerticalHeaderLabels([PERSIAN_MONTHS[summary.month - 1], "تعداد"])
+        # خانه‌های موجود فقط متن تازه می‌گیرند (بدون ساخت ۶۲ آیتم در هر رسم)
         for col in range(31):
-            count_item = QTableWidgetItem("")
-            count_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.monthly_table.setItem(1, col, count_item)
+            in_month = col < summary.days
+            count = summary.entered[col] if in_month else 0
+            self._set_cell_text(0, col, str(col + 1) if in_month else "")
+            self._set_cell_text(1, col, str(count) if count else "")
+        self.month_nav_buttons[1].setEnabled(self._monthly_month is not None)
+        self.month_nav_buttons[12].setEnabled(self._monthly_month is not None)
+        self.current_month_button.setEnabled(self._monthly_month is not None)
+        self._update_month_label()
+
+    def _set_cell_text(self, row: int, col: int, text: str) -> None:
+        item = self.monthly_table.item(row, col)
+        if item is None:
+            item = QTableWidgetItem(text)
+            item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+            self.monthly_table.setItem(row, col, item)
+        elif item.text() != text:
+            item.setText(text)
+
+    def _update_month_label(self) -> None:
+        year, month = divmod(self._monthly_key, 100)
+        self.month_label.setText(f"{PERSIAN_MONTHS[month - 1]} {year} — ورودی: {self._monthly_total}")
+
+    # رویداد کنترلر تا فریم بعد نگه داشته می‌شود (حداکثر یک به‌روزرسانی در هر FRAME_INTERVAL_MS)
+    def _on_invoice_event(self, event: InvoiceEvent) -> None:
+        self._pending_events.append(event)
+        self._schedule_frame()
+
+    # تغییر گروهی: همه جداول و شمارنده یک بار دوباره بارگذاری می‌شوند
+    def _reload_all(self) -> None:
+        self.update_invoice_table()
+        self.update_weekly_table()
+        self.update_monthly_table()
+        self.update_entered_count()
 
-        for date, count in monthly_data:
-            day = int(date.split("/")[-1])
-            count_item = QTableWidgetItem(str(count))
-            count_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.monthly_table.setItem(1, day - 1, count_item)
+    # به روز رسانی درجا بر اساس رویداد کنترلر (فقط ردیف/خانه‌های متأثر)
+    def _apply_invoice_event(self, event: InvoiceEvent) -> None:
+        if event.row is None or event.date is None:
+            return
+        self._report_version += 1
+        if event.kind == EVENT_ADDED:
+            if event.date not in self._weekly_dates:
+                # روز عوض شده است؛ جداول گزارش یک بار کامل ساخته می‌شوند
+                self.update_weekly_table()
+                self.update_monthly_table()
+            else:
+                self._bump_report_cells(event.date, enter_delta=1, exit_delta=0)
+            self.invoice_model.prepend_invoice(event.row)
+            self._set_entered_count(self._entered_count + 1)
+        elif event.kind == EVENT_EXITED:
+            self._bump_report_cells(event.date, enter_delta=0, exit_delta=1)
+            self.invoice_model.update_invoice(event.row)
+        elif event.kind == EVENT_DELETED:
+            self._bump_report_cells(event.date, enter_delta=-1, exit_delta=0)
+            self.invoice_model.remove_invoice(event.row.invoice_number)
+            self._set_entered_count(self._entered_count - 1)
+
+    def _bump_report_cells(self, date: int, enter_delta: int, exit_delta: int) -> None:
+        if date in self._weekly_dates:
+            row_index = self._weekly_dates.index(date)
+            self._bump_cell(self.weekly_table, row_index, 0, exit_delta, keep_zero=True)
+            self._bump_cell(self.weekly_table, row_index, 1, enter_delta, keep_zero=True)
+        if date // 100 == self._monthly_key:
+            day = date % 100
+            self._bump_cell(self.monthly_table, 1, day - 1, enter_delta, keep_zero=False)
+            if enter_delta:
+                self._monthly_total += enter_delta
+                self._update_month_label()
+
+    @staticmethod
+    def _bump_cell(table: QTableWidget, row: int, col: int, delta: int, keep_zero: bool) -> None:
+        if delta == 0:
+            return
+        item = table.item(row, col)
+        if item is None:
+            item = QTableWidgetItem("")
+            item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+            table.setItem(row, col, item)
+        value = int(item.text() or 0) + delta
+        item.setText(str(value) if value or keep_zero else "")
+
+    def _set_entered_count(self, count: int) -> None:
+        self._entered_count = count
+        self.count_invoice_enter.setText(f"ورودی: {count}")
 
     # متد برای حذف فاکتور
     def handle_delete(self):
@@ -368,29 +688,10 @@ class MainWindow(QMainWindow):  # pylint: disable=too-many-instance-attributes
             )
             return
 
-        result = self.controller.delete_invoice(invoice_number)
-        self.message_box.setText(result)
-
-        if "✅" in result:
-            self.message_box.setStyleSheet(
-                "background:#1faa00; color:#f5f5f5; font-size:20px; border:2px solid #444; border-radius:20px;"
-            )
-        elif "❌" in result:
-            self.message_box.setStyleSheet(
-                "background:#d32f2f; color:#f5f5f5; font-size:20px; border:2px solid #444; border-radius:20px;"
-            )
-        else:
-            self.message_box.setStyleSheet(
-                "background:#c9a800; color:#121212; font-size:20px; border:2px solid #444; border-radius:20px;"
-            )
-
-        # به‌روزرسانی جداول
-        self.update_invoice_table()
-        self.update_weekly_table()
-        self.update_monthly_table()
-        # به‌روزرسانی شمارش فاکتورهای ورودی
-        count = self.controller.get_count_invoice_enter()
-        self.count_invoice_enter.setText(f"ورودی: {count}")
+        # حذف هم مثل اسکن‌ها در صف می‌رود تا بعد از اسکن‌های قبلی و روی thread کارگر انجام شود؛
+        # پیام نتیجه با scanned می‌رسد
+        self.scan_queue.enqueue(EVENT_DELETED, invoice_number)
+        # جداول و شمارنده از طریق رویداد کنترلر (_on_invoice_event) درجا به‌روز می‌شوند
         self.barcode_input.clear()
         self.barcode_input.setFocus()
 
@@ -405,13 +706,17 @@ class MainWindow(QMainWindow):  # pylint: disable=too-many-instance-attributes
             )
             return
 
-        invoice_details = self.controller.db.get_invoice_info(invoice_number)
-        if invoice_details:
-            date_enter, time_enter, first_status, date_exit, time_exit, second_status = invoice_details
-            if second_status == "خارج شده":
-                self.message_box.setText(f"فاکتور {invoice_number} ({date_exit} - {time_exit}) {second_status}")
+        status = self.controller.get_invoice_status(invoice_number)
+        if status is not None:
+            # متن تاریخ و ساعت فقط برای همان ورود یا خروجی که نمایش داده می‌شود ساخته می‌شود
+            if status.second_status == STATUS_EXITED:
+                self.message_box.setText(
+                    f"فاکتور {invoice_number} ({status.date_exit} - {status.time_exit}) {status.second_status}"
+                )
             else:
-                self.message_box.setText(f"فاکتور {invoice_number} ({date_enter} - {time_enter}) {first_status}")
+                self.message_box.setText(
+                    f"فاکتور {invoice_number} ({status.date_enter} - {status.time_enter}) {status.first_status}"
+                )
 
             self.message_box.setStyleSheet(
                 "background:#c9a800; color:#121212; font-size:20px; border:2px solid #444; border-radius:20px;"
@@ -424,7 +729,44 @@ class MainWindow(QMainWindow):  # pylint: disable=too-many-instance-attributes
             )
 
         self.message_timer.start(10000)
-        self.barcode_input.clear()
+        if status is None:
+            # شماره کامل نبود؛ متن می‌ماند و شماره‌های مشابه زیر کادر پیشنهاد می‌شوند
+            self.suggestions.request(invoice_number, min_digits=1)
+        else:
+            self.barcode_input.clear()
+        self.barcode_input.setFocus()
+
+    # متد برای خروجی گرفتن از همه فاکتورها
+    def handle_export(self):
+        default_name = f"invoices_{jalali.format_day_key(jalali.today_key()).replace('/', '-')}.csv"
+        path, _ = QFileDialog.getSaveFileName(
+            self, "خروجی فاکتورها", default_name, "CSV (*.csv);;JSON Lines (*.jsonl)"
+        )
+        if path:
+            self.start_export(path)
+
+    # اجرای خروجی روی thread کارگر (پیمایش جریانی؛ ورودی بارکد مسدود نمی‌شود)
+    def start_export(self, path: str) -> None:
+        from export import export_to_path  # pylint: disable=import-outside-toplevel  # فقط هنگام خروجی
+
+        self.export_button.setEnabled(False)
+
+        def on_result(count: int) -> None:
+            self.export_button.setEnabled(True)
+            self._show_notice(MSG_EXPORTED.format(count=count, path=path, success=EMOJI_SUCCESS), "#1faa00")
+
+        def on_error(exc: BaseException) -> None:
+            self.export_button.setEnabled(True)
+            self._show_notice(MSG_EXPORT_FAILED.format(reason=exc, error=EMOJI_ERROR), "#d32f2f")
+
+        self.bridge.submit(export_to_path, self.controller, path, on_result=on_result, on_error=on_error)
+
+    def _show_notice(self, text: str, background: str) -> None:
+        self.message_box.setText(text)
+        self.message_box.setStyleSheet(
+            f"background:{background}; color:#f5f5f5; font-size:20px; border:2px solid #444; border-radius:20px;"
+        )
+        self.message_timer.start(10000)
         self.barcode_input.setFocus()
 
 